@@ -0,0 +1,253 @@
+"""
+Buffered, compact AuditLog writes and retention rollups.
+
+- `AuditBuffer` collects rows in memory and writes them with one executemany, inside the caller's
+  transaction (`flush(db)` right before the caller commits), so a scrape batch costs one audit
+  INSERT instead of one ORM object per change.
+- `AuditBuffer.diff` records only the fields that changed, as compact JSON
+  (old_value='{"cost":10.0}', new_value='{"cost":12.5}'); long values are clipped.
+- `audit_event` is for callers without a session of their own (LLM token usage): rows go to a
+  process-wide buffer flushed with its own session every RETAILOS_AUDIT_BATCH rows,
+  RETAILOS_AUDIT_FLUSH_SECONDS or at exit.
+- `rollup_audit_logs` folds rows older than RETAILOS_AUDIT_RETENTION_DAYS into one
+  `audit_daily_rollups` row per (day, entity, action) and deletes them.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import AuditDailyRollup, AuditLog, SessionLocal
+
+# Longer strings are clipped in diff payloads (head + total length).
+_MAX_VALUE_CHARS = 160
+
+
+def _env_int(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        v = int(os.getenv(name, str(default)) or default)
+    except ValueError:
+        v = default
+    return max(lo, min(hi, v))
+
+
+def audit_batch_size() -> int:
+    return _env_int("RETAILOS_AUDIT_BATCH", 500, 1, 50000)
+
+
+def audit_retention_days() -> int:
+    return _env_int("RETAILOS_AUDIT_RETENTION_DAYS", 30, 1, 3650)
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, str) and len(value) > _MAX_VALUE_CHARS:
+        return f"{value[:80]}...({len(value)} chars)"
+    if isinstance(value, (list, tuple, dict)):
+        if len(json.dumps(value, sort_keys=True, default=str)) > _MAX_VALUE_CHARS:
+            return f"<{len(value)} items>"
+    return value
+
+
+def _dumps(values: dict) -> str:
+    return json.dumps(values, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def json_diff(old: dict, new: dict) -> tuple[Optional[str], Optional[str]]:
+    """Compact JSON of the keys whose values differ, as (old_value, new_value); (None, None) if equal."""
+    changed = [k for k in sorted(set(old) | set(new)) if old.get(k) != new.get(k)]
+    if not changed:
+        return None, None
+    return _dumps({k: _compact(old.get(k)) for k in changed}), _dumps({k: _compact(new.get(k)) for k in changed})
+
+
+class AuditBuffer:
+    """AuditLog rows waiting for one bulk insert; see module docstring."""
+
+    def __init__(self):
+        self._rows: list[dict] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def record(
+        self,
+        entity_type: str,
+        entity_id: Any,
+        action: str,
+        old_value: Optional[str] = None,
+        new_value: Optional[str] = None,
+        user: str = "System",
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        row = {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "action": action,
+            "old_value": old_value,
+            "new_value": new_value,
+            "user": user,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+        }
+        with self._lock:
+            self._rows.append(row)
+
+    def diff(self, entity_type: str, entity_id: Any, action: str, old: dict, new: dict, user: str = "System") -> bool:
+        """Record a compact JSON diff of `old` -> `new`; nothing when they are equal. Returns True if recorded."""
+        old_value, new_value = json_diff(old, new)
+        if new_value is None:
+            return False
+        self.record(entity_type, entity_id, action, old_value, new_value, user=user)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+    def flush(self, db: Session, commit: bool = False) -> int:
+        """Insert buffered rows through `db` (one executemany). The caller commits unless `commit`."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if rows:
+            db.execute(insert(AuditLog), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+
+_events = AuditBuffer()
+_events_flushed_at = time.monotonic()
+_events_lock = threading.Lock()
+
+
+def audit_event(
+    action: str,
+    entity_type: str,
+    entity_id: Any,
+    old_value: Optional[str] = None,
+    new_value: Optional[str] = None,
+    user: str = "System",
+) -> None:
+    """Buffer a standalone audit row (no caller session); flushed in bulk, best-effort."""
+    _events.record(entity_type, entity_id, action, old_value, new_value, user=user)
+    flush_seconds = _env_int("RETAILOS_AUDIT_FLUSH_SECONDS", 5, 0, 3600)
+    if len(_events) >= audit_batch_size() or time.monotonic() - _events_flushed_at >= flush_seconds:
+        flush_audit_events()
+
+
+def flush_audit_events() -> int:
+    """Write the process-wide audit buffer with its own session. Never raises."""
+    global _events_flushed_at
+    with _events_lock:
+        _events_flushed_at = time.monotonic()
+        if not len(_events):
+            return 0
+        db = SessionLocal()
+        try:
+            return _events.flush(db, commit=True)
+        except Exception as e:
+            db.rollback()
+            print(f"Audit: failed to flush buffered events: {e}")
+            return 0
+        finally:
+            db.close()
+
+
+atexit.register(flush_audit_events)
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def rollup_audit_logs(db: Session, retention_days: Optional[int] = None, max_days: Optional[int] = None) -> dict:
+    """
+    Roll AuditLog rows from before the retention window up into daily per-(entity, action)
+    summaries and delete them, one UTC day per transaction (oldest first).
+    Returns {"days": n, "rows": rolled-up rows, "rollups": summary rows written or extended}.
+    """
+    days_kept = audit_retention_days() if retention_days is None else max(0, int(retention_days))
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = today - timedelta(days=days_kept)
+    out = {"days": 0, "rows": 0, "rollups": 0}
+
+    after = None
+    while max_days is None or out["days"] < int(max_days):
+        # Next day that still has rows to roll up (empty days are skipped).
+        q = select(func.min(AuditLog.timestamp)).where(AuditLog.timestamp < cutoff)
+        if after is not None:
+            q = q.where(AuditLog.timestamp >= after)
+        oldest = db.execute(q).scalar()
+        if oldest is None:
+            break
+        day_start = _utc(oldest).replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(days=1)
+        in_day = (AuditLog.timestamp >= day_start, AuditLog.timestamp < day_end)
+        groups: dict[tuple, list] = {}  # key -> [events, first_at, last_at, last_value]
+        rows = db.execute(
+            select(AuditLog.entity_type, AuditLog.entity_id, AuditLog.action, AuditLog.new_value, AuditLog.timestamp)
+            .where(*in_day)
+            .order_by(AuditLog.timestamp, AuditLog.id)
+            .execution_options(yield_per=5000)
+        )
+        for entity_type, entity_id, action, new_value, ts in rows:
+            g = groups.get((entity_type, entity_id, action))
+            if g is None:
+                groups[(entity_type, entity_id, action)] = [1, ts, ts, new_value]
+            else:
+                g[0] += 1
+                g[2], g[3] = ts, new_value
+
+        if groups:
+            day = day_start.date().isoformat()
+            try:
+                # A day can be rolled up twice (late rows); extend its existing summaries.
+                existing = {
+                    (r.entity_type, r.entity_id, r.action): r
+                    for r in db.query(AuditDailyRollup).filter(AuditDailyRollup.day == day).all()
+                }
+                new_rows = []
+                for key, (events, first_at, last_at, last_value) in groups.items():
+                    r = existing.get(key)
+                    if r is None:
+                        new_rows.append(
+                            {
+                                "day": day,
+                                "entity_type": key[0],
+                                "entity_id": key[1],
+                                "action": key[2],
+                                "events": events,
+                                "first_at": first_at,
+                                "last_at": last_at,
+                                "last_value": _compact(last_value),
+                            }
+                        )
+                    else:
+                        r.events = int(r.events or 0) + events
+                        r.first_at = min(_utc(r.first_at), _utc(first_at))
+                        if _utc(last_at) >= _utc(r.last_at):
+                            r.last_at, r.last_value = last_at, _compact(last_value)
+                if new_rows:
+                    db.execute(insert(AuditDailyRollup), new_rows)
+                deleted = db.execute(delete(AuditLog).where(*in_day).execution_options(synchronize_session=False))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            out["rows"] += int(deleted.rowcount or 0)
+            out["rollups"] += len(groups)
+        out["days"] += 1
+        after = day_end
+    return out
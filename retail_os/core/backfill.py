@@ -1,43 +1,22 @@
 from __future__ import annotations
 
 import json
-import os
 import time
 from collections import Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
 
-def _has_local(images: Any) -> bool:
-    if not images:
-        return False
-    if isinstance(images, str):
-        try:
-            images = json.loads(images)
-        except Exception:
-            images = [images]
-    if not isinstance(images, list):
-        return False
-        
-    from retail_os.core.database import REPO_ROOT
-    for img in images:
-        if not isinstance(img, str) or not img:
-            continue
-        # Case 1: Already absolute and exists
-        if os.path.isabs(img) and os.path.exists(img):
-            return True
-        # Case 2: Relative to CWD
-        if os.path.exists(img):
-            return True
-        # Case 3: Relative to REPO_ROOT (normpath handles slash differences)
-        norm = img.replace("\\", "/")
-        if "data/media/" in norm:
-            idx = norm.index("data/media/")
-            rel = norm[idx:]
-            full = os.path.join(REPO_ROOT, rel)
-            if os.path.exists(full):
-                return True
-    return False
+def _has_local(images: Any, present: set[str] | None = None) -> bool:
+    """`present`: batch preload from media_index.present_media_paths (else the images are probed)."""
+    from retail_os.core.media_index import local_images
+
+    return bool(local_images(None, images, present))
+
+
+def _present_for(session, rows) -> set[str]:
+    from retail_os.core.media_index import image_list, present_media_paths
+
+    return present_media_paths(session, (img for sp in rows for img in image_list(sp.images)))
 
 
 def _first_remote(images: Any) -> str:
@@ -71,14 +50,18 @@ def backfill_supplier_images_onecheq(
     Backfills local images for ONECHEQ SupplierProducts.
     - Uses any remote URL already stored in SupplierProduct.images
     - If images list is empty, falls back to scraping product page to discover images
+    Downloads run on the asyncio engine (utils/async_image_engine.py); `concurrency` is the number
+    of in-flight downloads, not threads.
     """
     from retail_os.core.database import SupplierProduct
+    from retail_os.utils.async_image_engine import AsyncImageEngine, ImageJob
     from retail_os.utils.image_downloader import ImageDownloader
     from retail_os.scrapers.onecheq.scraper import scrape_onecheq_product
-    import httpx
+    from retail_os.utils.http_cache import HTTPCache
+    from retail_os.utils.http_clients import get_http_client
 
     batch = max(1, min(50000, int(batch)))
-    concurrency = max(1, min(32, int(concurrency)))
+    concurrency = max(1, min(64, int(concurrency)))
 
     # Candidates: missing local image
     candidates: list[tuple[int, str, str, str]] = []
@@ -88,8 +71,9 @@ def backfill_supplier_images_onecheq(
         .order_by(SupplierProduct.id.asc())
         .all()
     )
+    present = _present_for(session, rows)
     for sp in rows:
-        if _has_local(sp.images):
+        if _has_local(sp.images, present):
             continue
         sku = (sp.external_sku or str(sp.id)).strip()
         remote = _first_remote(sp.images)
@@ -101,84 +85,81 @@ def backfill_supplier_images_onecheq(
             break
 
     started = time.perf_counter()
-    downloader = ImageDownloader()
     ok = 0
     fail = 0
     reasons: Counter[str] = Counter()
     total = len(candidates)
+    last_progress = 0.0
+
+    def _discover(product_url: str) -> str | None:
+        parsed = scrape_onecheq_product(product_url, client=get_http_client(), cache=HTTPCache.default()) or {}
+        return next((parsed[k] for k in ("photo1", "photo2", "photo3", "photo4") if parsed.get(k)), None)
 
-    def _dl(sp_id: int, sku: str, url: str, mode: str) -> tuple[int, dict]:
+    jobs = (
+        ImageJob(key=sku, url=url, ref=sp_id)
+        if mode == "remote"
+        else ImageJob(key=sku, ref=sp_id, discover=lambda u=url: _discover(u))
+        for sp_id, sku, url, mode in candidates
+    )
+    engine = AsyncImageEngine(
+        downloader=ImageDownloader(), concurrency=concurrency, max_seconds=max_seconds, should_abort=should_abort
+    )
+
+    def _on_result(job: ImageJob, res: dict) -> None:
+        # Runs on this thread (the session's), one result at a time, while the engine's loop
+        # thread keeps downloading.
+        nonlocal ok, fail, last_progress
+        if res.get("success"):
+            path = res.get("path")
+            sp = session.get(SupplierProduct, job.ref)
+            if sp:
+                imgs = sp.images
+                if isinstance(imgs, str):
+                    try:
+                        imgs = json.loads(imgs)
+                    except Exception:
+                        imgs = [imgs]
+                if not isinstance(imgs, list):
+                    imgs = []
+                if path and path not in imgs:
+                    imgs = [path] + [x for x in imgs if x != path]
+                    sp.images = imgs
+            ok += 1
+        else:
+            fail += 1
+            reasons[str(res.get("error") or "download_failed")[:160]] += 1
+
+        # Progress (best-effort, at most twice a second: the hook writes to the DB)
+        done = ok + fail
+        now = time.perf_counter()
+        if not progress_hook or (now - last_progress < 0.5 and done < total):
+            return
+        last_progress = now
         try:
-            try:
-                if should_abort and bool(should_abort()):
-                    return sp_id, {"success": False, "error": "cancelled"}
-            except Exception:
-                pass
-            if mode == "html_discover":
-                with httpx.Client(follow_redirects=True, timeout=25.0) as c:
-                    parsed = scrape_onecheq_product(url, client=c) or {}
-                remote_imgs = [parsed.get(k) for k in ("photo1", "photo2", "photo3", "photo4") if parsed.get(k)]
-                if not remote_imgs:
-                    return sp_id, {"success": False, "error": "no_images_found_on_product_page"}
-                return sp_id, downloader.download_image(remote_imgs[0], sku, should_abort=should_abort)
-            return sp_id, downloader.download_image(url, sku, should_abort=should_abort)
-        except Exception as e:
-            return sp_id, {"success": False, "error": f"exception: {e}"}
-
-    futures = []
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        for sp_id, sku, url, mode in candidates:
-            futures.append(ex.submit(_dl, sp_id, sku, url, mode))
-
-        for fut in as_completed(futures):
-            try:
-                if should_abort and bool(should_abort()):
-                    break
-            except Exception:
-                pass
-            if (time.perf_counter() - started) > max_seconds:
-                break
-            sp_id, res = fut.result()
-            if res.get("success"):
-                path = res.get("path")
-                sp = session.get(SupplierProduct, sp_id)
-                if sp:
-                    imgs = sp.images
-                    if isinstance(imgs, str):
-                        try:
-                            imgs = json.loads(imgs)
-                        except Exception:
-                            imgs = [imgs]
-                    if not isinstance(imgs, list):
-                        imgs = []
-                    if path and path not in imgs:
-                        imgs = [path] + [x for x in imgs if x != path]
-                        sp.images = imgs
-                ok += 1
-            else:
-                fail += 1
-                reasons[str(res.get("error") or "download_failed")[:160]] += 1
-
-            # Progress (best-effort)
-            done = ok + fail
-            try:
-                if progress_hook:
-                    elapsed = time.perf_counter() - started
-                    rate = (done / elapsed) if elapsed > 0 else 0.0
-                    eta = int(round((max(total - done, 0) / rate))) if rate > 0 and total else None
-                    progress_hook(
-                        {
-                            "phase": "images",
-                            "supplier_id": int(supplier_id),
-                            "done": int(done),
-                            "total": int(total),
-                            "eta_seconds": eta,
-                            "message": f"Images: {done}/{total} (ok {ok}, failed {fail})",
-                            "cmd_id": cmd_id,
-                        }
-                    )
-            except Exception:
-                pass
+            perf = engine.stats()
+            elapsed = now - started
+            rate = (done / elapsed) if elapsed > 0 else 0.0
+            eta = int(round((max(total - done, 0) / rate))) if rate > 0 and total else None
+            progress_hook(
+                {
+                    "phase": "images",
+                    "supplier_id": int(supplier_id),
+                    "done": int(done),
+                    "total": int(total),
+                    "eta_seconds": eta,
+                    "message": (
+                        f"Images: {done}/{total} (ok {ok}, failed {fail}; "
+                        f"{perf['images_per_sec']} img/s, {perf['bytes_per_sec'] / 1e6:.1f} MB/s)"
+                    ),
+                    "cmd_id": cmd_id,
+                }
+            )
+        except Exception:
+            pass
+
+    for job, res in engine.iter_results(jobs):
+        _on_result(job, res)
+    perf = engine.stats()
 
     session.commit()
     elapsed = time.perf_counter() - started
@@ -189,7 +170,8 @@ def backfill_supplier_images_onecheq(
         .filter(SupplierProduct.supplier_id == int(supplier_id))
         .all()
     )
-    remaining_without_local = sum(1 for sp in remaining if not _has_local(sp.images))
+    present = _present_for(session, remaining)
+    remaining_without_local = sum(1 for sp in remaining if not _has_local(sp.images, present))
 
     return {
         "candidates_queued": len(candidates),
@@ -197,6 +179,10 @@ def backfill_supplier_images_onecheq(
         "downloaded_failed": fail,
         "top_failures": reasons.most_common(10),
         "remaining_without_local_images": remaining_without_local,
+        "bytes_downloaded": perf["bytes"],
+        "images_per_sec": perf["images_per_sec"],
+        "bytes_per_sec": perf["bytes_per_sec"],
+        "retries": perf["retries"],
         "seconds": round(elapsed, 3),
         "batch": batch,
         "concurrency": concurrency,
@@ -212,16 +198,38 @@ def validate_launchlock(
     cmd_id: str | None = None,
     progress_hook=None,
     should_abort=None,
+    changed_only: bool = False,
 ) -> dict[str, Any]:
-    from retail_os.core.database import SupplierProduct, InternalProduct
+    """
+    LaunchLock over the supplier's internal products.
+    `changed_only`: only products with NEW / PRICE_CHANGED / CONTENT_CHANGED events in the
+    product_changes feed since the last changed-only run (the first one validates everything).
+    """
+    from sqlalchemy import select
+
+    from retail_os.core.change_feed import (
+        CONTENT_CHANGED, NEW, PRICE_CHANGED, commit_offset, consumer_offset, latest_change_id, read_floor,
+    )
+    from retail_os.core.database import ProductChange, SupplierProduct, InternalProduct
     from retail_os.core.validator import LaunchLock
 
+    consumer = f"validate_launchlock:{int(supplier_id)}"
+    offset = consumer_offset(session, consumer) if changed_only else None
+    upto = latest_change_id(session) if changed_only else 0
+
     q = (
         session.query(InternalProduct)
         .join(SupplierProduct, InternalProduct.primary_supplier_product_id == SupplierProduct.id)
         .filter(SupplierProduct.supplier_id == int(supplier_id))
         .order_by(InternalProduct.id.asc())
     )
+    if offset is not None:
+        changed_since = select(ProductChange.supplier_product_id).where(
+            ProductChange.id > read_floor(session, offset),
+            ProductChange.id <= upto,
+            ProductChange.kind.in_([NEW, PRICE_CHANGED, CONTENT_CHANGED]),
+        )
+        q = q.filter(SupplierProduct.id.in_(changed_since))
     if limit is not None:
         q = q.limit(int(limit))
 
@@ -235,9 +243,11 @@ def validate_launchlock(
     total = len(ips)
     started = time.perf_counter()
 
+    aborted = False
     for i, ip in enumerate(ips, 1):
         try:
             if should_abort and bool(should_abort()):
+                aborted = True
                 break
         except Exception:
             pass
@@ -280,6 +290,11 @@ def validate_launchlock(
         except Exception:
             pass
 
+    # Advance the feed offset only when every changed product was validated.
+    if changed_only and not aborted and (limit is None or total < int(limit)):
+        commit_offset(session, consumer, upto)
+        session.commit()
+
     return {
         "validated": int(min(total, (ready + blocked))),
         "ready": ready,
@@ -287,5 +302,6 @@ def validate_launchlock(
         "top_blockers": reasons.most_common(20),
         "blocked_samples": blocked_samples,
         "limit": limit,
+        "changed_only": bool(changed_only),
     }
 
@@ -0,0 +1,216 @@
+"""
+Append-only product change feed (`product_changes`).
+
+Writers append typed events in the same transaction as the change itself:
+- ProductUpserter and the supplier adapters: NEW, PRICE_CHANGED, CONTENT_CHANGED, OUT_OF_STOCK
+  (derived from the field-group hashes, see core/field_hashes.py)
+- ReconciliationEngine: REMOVED (INSERT ... SELECT alongside the status transition)
+
+Each consumer keeps its own offset in `change_feed_offsets` and reads only events past it, so
+downstream work scales with churn instead of catalog size. Consumers without an offset yet
+(first run) do one full pass and then continue from the feed.
+
+Ids are allocated at INSERT but become visible at COMMIT. SQLite serializes writers, so they
+commit in id order and "everything past the offset" is exact. With concurrent writers a lower id
+can commit after a reader moved past it: consumers read from `read_floor`, which re-reads the
+last RETAILOS_CHANGE_FEED_OVERLAP ids there, and must be idempotent over them.
+
+`prune_changes` (scheduler, daily) drops events older than RETAILOS_CHANGE_FEED_RETENTION_DAYS
+that every recently active consumer has read. A consumer whose unread events were pruned is
+treated as new (full pass).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import ChangeFeedOffset, ProductChange, SystemSetting
+
+NEW = "NEW"
+PRICE_CHANGED = "PRICE_CHANGED"
+CONTENT_CHANGED = "CONTENT_CHANGED"
+OUT_OF_STOCK = "OUT_OF_STOCK"
+REMOVED = "REMOVED"
+
+PRUNED_KEY = "product_changes.pruned_through"
+
+# Supplier statuses that mean "cannot be bought right now".
+_UNAVAILABLE_STATUSES = {"sold", "sold out", "out of stock", "unavailable", "hidden"}
+
+
+def change_retention_days() -> int:
+    try:
+        n = int(os.getenv("RETAILOS_CHANGE_FEED_RETENTION_DAYS", "30") or "30")
+    except ValueError:
+        n = 30
+    return max(1, min(3650, n))
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def is_out_of_stock(stock_level, status: Optional[str]) -> bool:
+    if str(status or "").strip().lower() in _UNAVAILABLE_STATUSES:
+        return True
+    try:
+        return stock_level is not None and int(stock_level) <= 0
+    except (TypeError, ValueError):
+        return False
+
+
+def change_kinds(created: bool, changed: Iterable[str], stock_level=None, status: Optional[str] = None) -> list[str]:
+    """Event kinds for one product write, given the field groups that changed."""
+    if created:
+        return [NEW]
+    changed = set(changed)
+    kinds = []
+    if "pricing" in changed:
+        kinds.append(PRICE_CHANGED)
+    if "content" in changed:
+        kinds.append(CONTENT_CHANGED)
+    if "stock" in changed and is_out_of_stock(stock_level, status):
+        kinds.append(OUT_OF_STOCK)
+    return kinds
+
+
+class ChangeBuffer:
+    """Change events waiting for one bulk insert inside the writer's transaction."""
+
+    def __init__(self, supplier_id: Optional[int] = None):
+        self.supplier_id = supplier_id
+        self._rows: list[dict] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, supplier_product_id: Optional[int], kinds: Iterable[str]) -> None:
+        if supplier_product_id is None:
+            return
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"supplier_product_id": int(supplier_product_id), "supplier_id": self.supplier_id, "kind": k, "created_at": now}
+            for k in kinds
+        ]
+        if rows:
+            with self._lock:
+                self._rows.extend(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+    def flush(self, db: Session) -> int:
+        """Insert buffered events through `db`; the caller commits."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if rows:
+            db.execute(insert(ProductChange), rows)
+        return len(rows)
+
+
+def _pruned_through(db: Session) -> int:
+    row = db.get(SystemSetting, PRUNED_KEY)
+    value = row.value if row is not None and isinstance(row.value, dict) else {}
+    return int(value.get("last_id") or 0)
+
+
+def consumer_offset(db: Session, consumer: str) -> Optional[int]:
+    """
+    Last processed event id, or None if the consumer has never run or events it had not read
+    yet were pruned since (do a full pass first).
+    """
+    row = db.get(ChangeFeedOffset, consumer)
+    if row is None or int(row.last_id) < _pruned_through(db):
+        return None
+    return int(row.last_id)
+
+
+def feed_overlap(db: Session) -> int:
+    raw = (os.getenv("RETAILOS_CHANGE_FEED_OVERLAP") or "").strip()
+    if not raw:
+        return 0 if db.get_bind().dialect.name == "sqlite" else 1000
+    try:
+        return max(0, min(1_000_000, int(raw)))
+    except ValueError:
+        return 1000
+
+
+def read_floor(db: Session, offset: int) -> int:
+    """Exclusive lower bound for a consumer at `offset`: ids that may have committed late included."""
+    return max(0, int(offset) - feed_overlap(db))
+
+
+def latest_change_id(db: Session) -> int:
+    return int(db.execute(select(func.max(ProductChange.id))).scalar() or 0)
+
+
+def read_changes(
+    db: Session,
+    after_id: int,
+    kinds: Optional[Iterable[str]] = None,
+    supplier_id: Optional[int] = None,
+    until_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list[ProductChange]:
+    """
+    Events with after_id < id <= until_id (oldest first), optionally filtered by kind / supplier.
+    Pass `read_floor(db, offset)` as `after_id`; take `until_id` from `latest_change_id` before
+    reading and commit it as the new offset.
+    """
+    q = select(ProductChange).where(ProductChange.id > int(after_id)).order_by(ProductChange.id)
+    if until_id is not None:
+        q = q.where(ProductChange.id <= int(until_id))
+    if kinds is not None:
+        q = q.where(ProductChange.kind.in_(list(kinds)))
+    if supplier_id is not None:
+        q = q.where(ProductChange.supplier_id == int(supplier_id))
+    if limit is not None:
+        q = q.limit(int(limit))
+    return list(db.execute(q).scalars())
+
+
+def commit_offset(db: Session, consumer: str, last_id: int) -> None:
+    """Advance (never rewind) a consumer's offset; the caller commits."""
+    row = db.get(ChangeFeedOffset, consumer)
+    if row is None:
+        db.add(ChangeFeedOffset(consumer=consumer, last_id=int(last_id), updated_at=datetime.now(timezone.utc)))
+    elif int(last_id) > int(row.last_id or 0):
+        row.last_id = int(last_id)
+        row.updated_at = datetime.now(timezone.utc)
+
+
+def prune_changes(db: Session, retention_days: Optional[int] = None) -> dict:
+    """
+    Delete events older than the retention window that every consumer active within the window
+    has read (consumers idle for longer fall back to a full pass). Commits.
+    Returns {"deleted": n, "pruned_through": last deleted id}.
+    """
+    days = change_retention_days() if retention_days is None else max(0, int(retention_days))
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    horizon = db.execute(select(func.max(ProductChange.id)).where(ProductChange.created_at < cutoff)).scalar()
+    pruned = _pruned_through(db)
+    if horizon is None:
+        return {"deleted": 0, "pruned_through": pruned}
+    for offset in db.execute(select(ChangeFeedOffset)).scalars():
+        if offset.updated_at is not None and _utc(offset.updated_at) >= cutoff:
+            horizon = min(horizon, int(offset.last_id or 0))
+    if horizon <= pruned:
+        return {"deleted": 0, "pruned_through": pruned}
+
+    deleted = int(db.execute(delete(ProductChange).where(ProductChange.id <= horizon)).rowcount or 0)
+    marker = db.get(SystemSetting, PRUNED_KEY)
+    value = {"last_id": int(horizon), "at": datetime.now(timezone.utc).isoformat()}
+    if marker is None:
+        db.add(SystemSetting(key=PRUNED_KEY, value=value))
+    else:
+        marker.value = value
+    db.commit()
+    return {"deleted": deleted, "pruned_through": int(horizon)}
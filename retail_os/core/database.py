@@ -68,10 +68,17 @@ class SupplierProduct(Base):
     enrichment_error = Column(Text)  # Error reason if FAILED
     enriched_title = Column(String)  # Cleaned/enriched title
     enriched_description = Column(Text)  # Cleaned/enriched description
+    # "<mode>:<version>:<inputs digest>" of the last successful enrichment (core/enrichment_fingerprint.py)
+    enrichment_fingerprint = Column(String)
     
     # Evidence
     last_scraped_at = Column(DateTime)
     snapshot_hash = Column(String) # For Variant Drift detection
+    # Per-group hashes {"pricing", "content", "images", "stock"} (see core/field_hashes.py)
+    field_hashes = Column(JSON)
+    # Listing-tile hash at the last detail-page scrape (deep scrape skips unchanged tiles)
+    tile_fingerprint = Column(String)
+    detail_scraped_at = Column(DateTime)
     sync_status = Column(String, default="PRESENT") # PRESENT, MISSING_ONCE, REMOVED
 
     # Categorization (for scaling to 20k+ listings)
@@ -322,6 +329,54 @@ class AuditLog(Base):
         Index('ix_audit_logs_action', 'action'),
     )
 
+class AuditDailyRollup(Base):
+    """
+    One day of AuditLog rows for one (entity, action), kept after the detail rows pass the
+    retention window (see retail_os.core.audit.rollup_audit_logs).
+    """
+    __tablename__ = 'audit_daily_rollups'
+
+    id = Column(Integer, primary_key=True)
+    day = Column(String, nullable=False)  # YYYY-MM-DD (UTC)
+    entity_type = Column(String)
+    entity_id = Column(String)
+    action = Column(String)
+    events = Column(Integer, default=0)
+    first_at = Column(DateTime)
+    last_at = Column(DateTime)
+    last_value = Column(Text)             # new_value of the day's latest row
+
+    __table_args__ = (
+        UniqueConstraint('day', 'entity_type', 'entity_id', 'action', name='uix_audit_rollup_day_entity_action'),
+        Index('ix_audit_daily_rollups_entity', 'entity_type', 'entity_id'),
+    )
+
+class ProductChange(Base):
+    """
+    Append-only feed of supplier product changes (NEW, PRICE_CHANGED, CONTENT_CHANGED,
+    OUT_OF_STOCK, REMOVED). Consumers read past their own offset (retail_os.core.change_feed).
+    """
+    __tablename__ = 'product_changes'
+
+    id = Column(Integer, primary_key=True)  # monotonic (AUTOINCREMENT: ids are never reused)
+    supplier_product_id = Column(Integer, ForeignKey('supplier_products.id'), nullable=False)
+    supplier_id = Column(Integer, ForeignKey('suppliers.id'))
+    kind = Column(String, nullable=False)
+    created_at = Column(DateTime, default=_utc_now)
+
+    __table_args__ = (
+        Index('ix_product_changes_supplier_id', 'supplier_id', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+class ChangeFeedOffset(Base):
+    """Last product_changes id a consumer has processed."""
+    __tablename__ = 'change_feed_offsets'
+
+    consumer = Column(String, primary_key=True)  # e.g. "withdraw_unavailable:all"
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=_utc_now)
+
 class ResourceLock(Base):
     """Application-Level Locks for Concurrency Safety."""
     __tablename__ = 'resource_locks'
@@ -383,6 +438,150 @@ class SystemSetting(Base):
     value = Column(JSON, nullable=False)
     updated_at = Column(DateTime, default=_utc_now, onupdate=_utc_now)
 
+class ImageDownloadJob(Base):
+    """
+    Durable image download queue: one row per (supplier product, image index).
+    Upserts persist remote URLs and enqueue here; drain workers download and swap in local paths.
+    """
+    __tablename__ = 'image_download_jobs'
+
+    id = Column(Integer, primary_key=True)
+    supplier_product_id = Column(Integer, ForeignKey('supplier_products.id'), nullable=False)
+    sku = Column(String, nullable=False)           # media file stem (e.g. "ABC123", "ABC123_2")
+    image_index = Column(Integer, nullable=False)  # 1-based position in SupplierProduct.images
+    url = Column(Text, nullable=False)
+
+    status = Column(String, default="PENDING")     # PENDING, RUNNING, DONE, FAILED
+    attempts = Column(Integer, default=0)
+    local_path = Column(String)
+    last_error = Column(Text)
+    claimed_by = Column(String)
+    next_attempt_at = Column(DateTime)
+
+    created_at = Column(DateTime, default=_utc_now)
+    updated_at = Column(DateTime, default=_utc_now, onupdate=_utc_now)
+
+    __table_args__ = (
+        UniqueConstraint('supplier_product_id', 'image_index', name='uix_image_job_product_index'),
+        Index('ix_image_download_jobs_status', 'status', 'next_attempt_at'),
+    )
+
+class MediaObject(Base):
+    """
+    One stored image in the content-addressed media store (data/media/cas/ab/cd/<sha256>.jpg).
+    `sha256` is the hash of the downloaded bytes; `refcount` = product_media rows pointing here.
+    """
+    __tablename__ = 'media_objects'
+
+    sha256 = Column(String, primary_key=True)
+    path = Column(String, nullable=False)
+    bytes = Column(Integer, nullable=False, default=0)
+    width = Column(Integer)
+    height = Column(Integer)
+    format = Column(String)                        # stored format ("JPEG", or the raw format when untranscoded)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=_utc_now)
+
+class ProductMedia(Base):
+    """Media file stem (e.g. "ABC123", "ABC123_2", as passed to ImageDownloader) -> stored object."""
+    __tablename__ = 'product_media'
+
+    image_key = Column(String, primary_key=True)
+    sha256 = Column(String, ForeignKey('media_objects.sha256'), nullable=False, index=True)
+    source_url = Column(Text)
+    updated_at = Column(DateTime, default=_utc_now, onupdate=_utc_now)
+
+class MediaFile(Base):
+    """
+    Presence index of local product images: written by ImageDownloader, reconciled against disk
+    periodically (core/media_index.py). "Is this image local?" is a query here, not a stat.
+    """
+    __tablename__ = 'media_files'
+
+    image_key = Column(String, primary_key=True)   # media file stem ("ABC123", "ABC123_2")
+    sku = Column(String, nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False, default=1)
+    path = Column(String, nullable=False, index=True)  # as stored in SupplierProduct.images ("data/media/...")
+    bytes = Column(Integer, nullable=False, default=0)
+    width = Column(Integer)
+    height = Column(Integer)
+    verified_at = Column(DateTime, default=_utc_now)
+
+class CollectionIndexState(Base):
+    """
+    Per-collection refresh state for the supplier collection-membership index.
+    Collections are re-scanned on a rolling basis (stale or changed first).
+    """
+    __tablename__ = 'collection_index_state'
+
+    id = Column(Integer, primary_key=True)
+    supplier = Column(String, nullable=False)          # "ONECHEQ"
+    collection_handle = Column(String, nullable=False)
+    source_signature = Column(String)                  # supplier-reported updated_at|products_count
+    product_count = Column(Integer, default=0)
+    last_refreshed = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('supplier', 'collection_handle', name='uix_collection_index_state'),
+        Index('ix_collection_index_state_last_refreshed', 'last_refreshed'),
+    )
+
+class CollectionMembership(Base):
+    """product_handle -> collection_handle rows (one per membership)."""
+    __tablename__ = 'collection_membership'
+
+    id = Column(Integer, primary_key=True)
+    supplier = Column(String, nullable=False)
+    collection_handle = Column(String, nullable=False)
+    product_handle = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('supplier', 'collection_handle', 'product_handle', name='uix_collection_membership'),
+        Index('ix_collection_membership_product', 'supplier', 'product_handle'),
+    )
+
+class ScrapeRunSeen(Base):
+    """
+    Supplier SKUs seen by one scrape run (staging for anti-join reconciliation, see
+    retail_os.core.seen_set). Rows are written in bulk during the run and deleted when it finishes.
+    """
+    __tablename__ = 'scrape_run_seen'
+
+    run_id = Column(String, primary_key=True)
+    external_sku = Column(String, primary_key=True)
+    supplier_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=_utc_now)
+
+    __table_args__ = (
+        Index('ix_scrape_run_seen_created_at', 'created_at'),
+    )
+
+class ScrapeRun(Base):
+    """
+    Ledger of supplier scrape runs with a checkpoint cursor (see retail_os.core.scrape_runs).
+    The run id doubles as the SeenSet run_id, so a resumed run keeps the SKUs seen before the crash.
+    """
+    __tablename__ = 'scrape_runs'
+
+    id = Column(String, primary_key=True)
+    supplier_id = Column(Integer, ForeignKey('suppliers.id'), nullable=False)
+    scope = Column(String, nullable=False)          # collection handle, category URL, "categories"
+    status = Column(String, default="RUNNING")      # RUNNING, INTERRUPTED, COMPLETED, ABANDONED
+    command_id = Column(String)                     # last SystemCommand that ran it
+    params = Column(JSON)                           # run options a resume must reuse (pages, ...)
+    cursor = Column(JSON)                           # {"collection", "page", "last_sku"} / {"categories": [...]}
+    rows_done = Column(Integer, default=0)          # rows settled up to the cursor
+    rows_failed = Column(Integer, default=0)
+    attempts = Column(Integer, default=1)
+
+    started_at = Column(DateTime, default=_utc_now)
+    updated_at = Column(DateTime, default=_utc_now, onupdate=_utc_now)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_scrape_runs_supplier_scope', 'supplier_id', 'scope', 'status'),
+    )
+
 # --- Database Engine ---
 # Single source of truth database (configurable by env var)
 #
@@ -467,8 +666,13 @@ def _auto_migrate_sqlite_schema() -> None:
                 "collection_page": "INTEGER",
                 # Evidence fields used by pipeline guardrails.
                 "snapshot_hash": "VARCHAR",
+                "field_hashes": "TEXT",
+                "enrichment_fingerprint": "VARCHAR",
                 "last_scraped_at": "DATETIME",
                 "sync_status": "VARCHAR",
+                # Detail-page skip for unchanged listing tiles.
+                "tile_fingerprint": "VARCHAR",
+                "detail_scraped_at": "DATETIME",
             },
         )
 
@@ -0,0 +1,117 @@
+"""
+Enrichment input fingerprints.
+
+`SupplierProduct.enrichment_fingerprint` = "<mode>:<version>:<inputs digest>", stored when
+enrichment succeeds. The digest covers exactly what enrichment reads (title, description, specs,
+product URL), so:
+- enrich_batch skips a PENDING product whose fingerprint still matches (nothing to redo);
+- a supplier write that changes those inputs marks finished enrichment stale (PENDING);
+- a policy mode or prompt/template version change marks the supplier's rows stale in one UPDATE,
+  run once per change (the last applied mode/version per supplier is kept in SystemSetting).
+Rows enriched before fingerprints existed (NULL) are left alone until their inputs change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Optional
+
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import SupplierProduct, SystemSetting
+
+# Bump a mode's version when its output changes for the same inputs: the LLM prompt in
+# core/llm_enricher.py (AI), `_build_minimal_template` (TEMPLATE) or the heuristic builder (NONE)
+# in scripts/enrich_products.py.
+ENRICHMENT_VERSIONS = {"AI": "1", "TEMPLATE": "1", "NONE": "1"}
+
+APPLIED_KEY = "enrichment.applied_modes"  # {"<supplier_id>": "<mode>:<version>:"}
+
+
+def enrichment_inputs_digest(title: Optional[str], description: Optional[str], specs, product_url: Optional[str]) -> str:
+    raw = json.dumps(
+        [(title or "").strip(), description or "", specs if isinstance(specs, dict) else {}, product_url or ""],
+        sort_keys=True,
+        ensure_ascii=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _prefix(mode: str) -> str:
+    mode = (mode or "NONE").upper()
+    return f"{mode}:{ENRICHMENT_VERSIONS.get(mode, '0')}:"
+
+
+def enrichment_fingerprint(sp: SupplierProduct, mode: str) -> str:
+    return _prefix(mode) + enrichment_inputs_digest(sp.title, sp.description, sp.specs, sp.product_url)
+
+
+def is_enrichment_current(sp: SupplierProduct, mode: str) -> bool:
+    """True if `sp` already holds enriched copy produced from exactly its current inputs under `mode`."""
+    return bool(
+        sp.enrichment_fingerprint
+        and sp.enrichment_fingerprint == enrichment_fingerprint(sp, mode)
+        and (sp.enriched_title or "").strip()
+        and (sp.enriched_description or "").strip()
+    )
+
+
+def mark_enrichment_stale(sp: SupplierProduct) -> bool:
+    """
+    After a supplier write: flip finished enrichment back to PENDING if its inputs changed.
+    The previous enriched copy stays until enrichment runs again. Returns True if flipped.
+    """
+    if sp.id is None or sp.enrichment_status in (None, "PENDING"):
+        return False
+    fp = sp.enrichment_fingerprint
+    if fp and fp.rsplit(":", 1)[-1] == enrichment_inputs_digest(sp.title, sp.description, sp.specs, sp.product_url):
+        return False
+    sp.enrichment_status = "PENDING"
+    sp.enrichment_error = None
+    return True
+
+
+def mark_stale_for_mode(db: Session, supplier_id: int, mode: str) -> int:
+    """
+    Set-based: SUCCESS rows of a supplier enriched under another mode/version go back to PENDING.
+    The caller commits. Returns the row count.
+    """
+    sp = SupplierProduct
+    result = db.execute(
+        update(sp)
+        .where(
+            and_(
+                sp.supplier_id == int(supplier_id),
+                sp.enrichment_status == "SUCCESS",
+                sp.enrichment_fingerprint.isnot(None),
+                ~sp.enrichment_fingerprint.startswith(_prefix(mode), autoescape=True),
+            )
+        )
+        .values(enrichment_status="PENDING")
+        .execution_options(synchronize_session=False)
+    )
+    return int(result.rowcount or 0)
+
+
+def mark_stale_if_mode_changed(db: Session, supplier_id: int, mode: str) -> int:
+    """
+    `mark_stale_for_mode`, but only when `mode`/its version differs from the one last applied to
+    the supplier: the UPDATE cannot use an index, so it runs once per policy change rather than
+    on every batch. The caller commits. Returns the row count.
+    """
+    row = db.get(SystemSetting, APPLIED_KEY)
+    applied = dict(row.value) if row is not None and isinstance(row.value, dict) else {}
+    prefix = _prefix(mode)
+    if applied.get(str(supplier_id)) == prefix:
+        return 0
+    flipped = mark_stale_for_mode(db, supplier_id, mode)
+    applied[str(supplier_id)] = prefix
+    if row is None:
+        db.add(SystemSetting(key=APPLIED_KEY, value=applied))
+    else:
+        row.value = applied
+    return flipped
@@ -0,0 +1,93 @@
+"""
+Per-field-group hashes of supplier product data.
+
+`snapshot_hash` says *that* a product changed; these say *what* changed, so each downstream
+stage re-runs only when its own inputs moved:
+- pricing: cost (repricing, margin checks)
+- content: title, description, brand, condition, specs (enrichment, see core/enrichment_fingerprint.py)
+- images:  image URLs / local paths (downloads, listing photos)
+- stock:   stock level and supplier status (availability)
+
+Stored per product in `SupplierProduct.field_hashes` ({"pricing": "...", ...}).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Optional
+
+FIELD_GROUPS = ("pricing", "content", "images", "stock")
+# Groups that end up in the Trade Me listing payload: a DRY_RUN is stale when one of them moves.
+LISTING_GROUPS = ("pricing", "content", "images")
+
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def field_group_hashes(
+    *,
+    cost: Any,
+    title: Optional[str],
+    description: Optional[str] = None,
+    brand: Optional[str] = None,
+    condition: Optional[str] = None,
+    specs: Optional[dict] = None,
+    images: Optional[list] = None,
+    stock_level: Any = None,
+    status: Optional[str] = None,
+) -> dict[str, str]:
+    try:
+        price = round(float(cost), 2) if cost is not None else None
+    except (TypeError, ValueError):
+        price = None
+    return {
+        "pricing": _digest(price),
+        "content": _digest([title or "", description or "", brand or "", condition or "", specs or {}]),
+        "images": _digest([str(i) for i in (images or []) if i]),
+        "stock": _digest([stock_level, status]),
+    }
+
+
+def product_field_hashes(sp) -> dict[str, str]:
+    """Stored hashes, or (rows written before they were stored) hashes derived from the row itself."""
+    if isinstance(sp.field_hashes, dict) and sp.field_hashes:
+        return sp.field_hashes
+    return field_group_hashes(
+        cost=sp.cost_price,
+        title=sp.title,
+        description=sp.description,
+        brand=sp.brand,
+        condition=sp.condition,
+        specs=sp.specs if isinstance(sp.specs, dict) else None,
+        images=sp.images if isinstance(sp.images, list) else None,
+        stock_level=sp.stock_level,
+    )
+
+
+def changed_groups(old: Optional[dict], new: dict) -> set[str]:
+    """Groups whose hash differs; a group missing from `old` counts as changed."""
+    old = old or {}
+    return {g for g in FIELD_GROUPS if g in new and old.get(g) != new.get(g)}
+
+
+def apply_field_hashes(sp, hashes: dict[str, str]) -> set[str]:
+    """
+    Store `hashes` on `sp` (call before the row's fields are overwritten) and return the changed
+    groups. On a "content" change, writers call `mark_enrichment_stale` once the new fields are set.
+    """
+    changed = changed_groups(product_field_hashes(sp), hashes) if sp.id is not None else set(hashes)
+    sp.field_hashes = dict(hashes)
+    return changed
+
+
+def listing_inputs_changed(expected: Optional[dict], current: Optional[dict]) -> Optional[bool]:
+    """
+    Whether any listing-payload group differs between two stored hash sets.
+    None when either side has no hashes (callers fall back to `snapshot_hash`).
+    """
+    if not isinstance(expected, dict) or not isinstance(current, dict) or not expected or not current:
+        return None
+    return any(expected.get(g) != current.get(g) for g in LISTING_GROUPS)
@@ -0,0 +1,262 @@
+"""
+Durable image download queue.
+
+Upserts no longer download images inline: they store the supplier's remote URLs on the product
+and enqueue one `image_download_jobs` row per (product, image index). Drain workers
+(`ImageQueueDrainer`, run by the DRAIN_IMAGE_QUEUE command) claim jobs in batches, download with
+their own concurrency and swap the local path into `SupplierProduct.images` when done, so scrape
+throughput no longer depends on image CDN latency.
+
+Toggle with RETAILOS_IMAGE_QUEUE (default on; off = legacy inline downloads).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import CommandStatus, ImageDownloadJob, SupplierProduct, SystemCommand
+from retail_os.core.media_index import normalize_media_path, present_media_paths
+
+logger = logging.getLogger(__name__)
+
+DRAIN_COMMAND_TYPE = "DRAIN_IMAGE_QUEUE"
+
+
+def image_queue_enabled() -> bool:
+    return (os.getenv("RETAILOS_IMAGE_QUEUE", "true") or "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _image_limit() -> int:
+    limit_imgs = int(os.getenv("RETAILOS_IMAGE_LIMIT_PER_PRODUCT", "4") or "4")
+    return max(0, min(4, limit_imgs))
+
+
+def enqueue_product_images(db: Session, sp: SupplierProduct, urls: list, sku: str) -> list:
+    """
+    Queue downloads for `sp`'s images and return the list to store on `sp.images`.
+
+    Entries that are already local files are kept as-is. A remote URL whose job is already DONE
+    for the same URL is replaced by its local path; anything else stays remote and gets a
+    (re)queued job. Does not commit (runs inside the upsert transaction).
+    Local presence comes from the media_files index, one lookup per product.
+    """
+    if sp.id is None:
+        db.flush()
+    existing = {
+        j.image_index: j
+        for j in db.query(ImageDownloadJob).filter(ImageDownloadJob.supplier_product_id == sp.id).all()
+    }
+    urls = list(urls or [])[:4]
+    present = present_media_paths(
+        db, [u for u in urls if isinstance(u, str)] + [j.local_path for j in existing.values() if j.status == "DONE"]
+    )
+    limit_imgs = _image_limit()
+    out: list = []
+    for idx, url in enumerate(urls, 1):
+        if not url:
+            continue
+        if not isinstance(url, str) or normalize_media_path(url) in present or idx > limit_imgs:
+            out.append(url)
+            continue
+        job = existing.get(idx)
+        if (
+            job is not None
+            and job.url == url
+            and job.status == "DONE"
+            and job.local_path
+            and normalize_media_path(job.local_path) in present
+        ):
+            out.append(job.local_path)
+            continue
+        img_sku = f"{sku}_{idx}" if idx > 1 else sku
+        if job is None:
+            db.add(
+                ImageDownloadJob(
+                    supplier_product_id=sp.id, sku=img_sku, image_index=idx, url=url, status="PENDING", attempts=0
+                )
+            )
+        elif job.url != url or job.status not in ("PENDING", "RUNNING"):
+            job.url = url
+            job.sku = img_sku
+            job.status = "PENDING"
+            job.attempts = 0
+            job.local_path = None
+            job.last_error = None
+            job.next_attempt_at = None
+        out.append(url)
+    return out
+
+
+def pending_count(db: Session) -> int:
+    return int(db.query(ImageDownloadJob).filter(ImageDownloadJob.status == "PENDING").count())
+
+
+def ensure_drain_command(db: Session, priority: int = 40) -> bool:
+    """Enqueue a DRAIN_IMAGE_QUEUE command when work is pending and no drain is queued or running."""
+    if pending_count(db) <= 0:
+        return False
+    active = (
+        db.query(SystemCommand)
+        .filter(SystemCommand.type == DRAIN_COMMAND_TYPE)
+        .filter(SystemCommand.status.in_([CommandStatus.PENDING, CommandStatus.EXECUTING, CommandStatus.FAILED_RETRYABLE]))
+        .first()
+    )
+    if active is not None:
+        return False
+    db.add(
+        SystemCommand(
+            id=str(uuid.uuid4()),
+            type=DRAIN_COMMAND_TYPE,
+            payload={},
+            status=CommandStatus.PENDING,
+            priority=int(priority),
+        )
+    )
+    db.commit()
+    return True
+
+
+class ImageQueueDrainer:
+    """Claims queued image jobs in batches and downloads them with a bounded thread pool."""
+
+    def __init__(self, db: Session, concurrency: int | None = None, batch: int | None = None, downloader=None):
+        self.db = db
+        conc = concurrency if concurrency is not None else int(os.getenv("RETAILOS_IMAGE_QUEUE_CONCURRENCY", "16") or "16")
+        self.concurrency = max(1, min(64, int(conc)))
+        self.batch = max(1, int(batch or 200))
+        self.max_attempts = max(1, int(os.getenv("RETAILOS_IMAGE_QUEUE_MAX_ATTEMPTS", "5") or "5"))
+        self.worker_id = str(uuid.uuid4())
+        if downloader is None:
+            from retail_os.utils.image_downloader import ImageDownloader
+
+            downloader = ImageDownloader()
+        self.downloader = downloader
+
+    def reset_stale_claims(self, older_than_minutes: int = 15) -> int:
+        cutoff = _utcnow() - timedelta(minutes=int(older_than_minutes))
+        n = (
+            self.db.query(ImageDownloadJob)
+            .filter(ImageDownloadJob.status == "RUNNING")
+            .filter(ImageDownloadJob.updated_at < cutoff)
+            .update({"status": "PENDING", "claimed_by": None}, synchronize_session=False)
+        )
+        self.db.commit()
+        return int(n or 0)
+
+    def claim(self, limit: int) -> list[ImageDownloadJob]:
+        now = _utcnow()
+        ids = [
+            r[0]
+            for r in self.db.query(ImageDownloadJob.id)
+            .filter(ImageDownloadJob.status == "PENDING")
+            .filter(or_(ImageDownloadJob.next_attempt_at.is_(None), ImageDownloadJob.next_attempt_at <= now))
+            .order_by(ImageDownloadJob.id)
+            .limit(int(limit))
+            .all()
+        ]
+        if not ids:
+            return []
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"
+        # Conditional update: concurrent drainers can't claim the same row twice.
+        self.db.query(ImageDownloadJob).filter(ImageDownloadJob.id.in_(ids)).filter(
+            ImageDownloadJob.status == "PENDING"
+        ).update({"status": "RUNNING", "claimed_by": token, "updated_at": now}, synchronize_session=False)
+        self.db.commit()
+        return self.db.query(ImageDownloadJob).filter(ImageDownloadJob.claimed_by == token).all()
+
+    def _apply(self, job: ImageDownloadJob, result: dict) -> bool:
+        now = _utcnow()
+        job.attempts = int(job.attempts or 0) + 1
+        job.claimed_by = None
+        if result.get("success") and result.get("path"):
+            job.status = "DONE"
+            job.local_path = str(result["path"])
+            job.last_error = None
+            sp = self.db.get(SupplierProduct, job.supplier_product_id)
+            if sp is not None:
+                imgs = list(sp.images or [])
+                # Only swap if the product still points at the URL we downloaded.
+                if len(imgs) >= job.image_index and imgs[job.image_index - 1] == job.url:
+                    imgs[job.image_index - 1] = job.local_path
+                    sp.images = imgs
+            return True
+        job.last_error = str(result.get("error") or "download failed")[:500]
+        if job.attempts >= self.max_attempts:
+            job.status = "FAILED"
+        else:
+            job.status = "PENDING"
+            job.next_attempt_at = now + timedelta(seconds=min(3600, 30 * (2 ** (job.attempts - 1))))
+        return False
+
+    def drain(
+        self,
+        max_jobs: int | None = None,
+        max_seconds: float | None = None,
+        should_abort: Optional[Callable[[], bool]] = None,
+        progress_hook: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        t0 = time.monotonic()
+        stats = {"claimed": 0, "done": 0, "failed": 0, "reset_stale": self.reset_stale_claims()}
+
+        def _abort() -> bool:
+            try:
+                return bool(should_abort and should_abort())
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as ex:
+            while True:
+                if _abort():
+                    stats["cancelled"] = True
+                    break
+                if max_seconds is not None and (time.monotonic() - t0) >= float(max_seconds):
+                    break
+                limit = self.batch
+                if max_jobs is not None:
+                    limit = min(limit, int(max_jobs) - stats["claimed"])
+                    if limit <= 0:
+                        break
+                jobs = self.claim(limit)
+                if not jobs:
+                    break
+                stats["claimed"] += len(jobs)
+
+                results = list(
+                    ex.map(lambda j: self.downloader.download_image(j.url, j.sku, should_abort=should_abort), jobs)
+                )
+                for job, result in zip(jobs, results):
+                    if self._apply(job, result or {}):
+                        stats["done"] += 1
+                    else:
+                        stats["failed"] += 1
+                self.db.commit()
+
+                if progress_hook:
+                    try:
+                        progress_hook(
+                            {
+                                "phase": "images",
+                                "done": int(stats["done"] + stats["failed"]),
+                                "total": None,
+                                "message": f"Images: {stats['done']} downloaded, {stats['failed']} failed",
+                            }
+                        )
+                    except Exception:
+                        pass
+
+        stats["pending"] = pending_count(self.db)
+        stats["seconds"] = round(time.monotonic() - t0, 2)
+        return stats
@@ -1,8 +1,10 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from retail_os.core.database import (
     TradeMeListing, InternalProduct, SupplierProduct, 
-    SystemCommand, CommandStatus, Order, Supplier
+    SystemCommand, CommandStatus, Order, Supplier, ProductChange
 )
+from retail_os.core.change_feed import REMOVED, commit_offset, consumer_offset, read_floor
 import uuid
 import json
 
@@ -62,31 +64,25 @@ class InventoryOperations:
             
         return len(commands)
 
-    def withdraw_unavailable_items(self, supplier_id: int | None = None):
+    def withdraw_unavailable_items(self, supplier_id: int | None = None, full: bool = False):
         """
         Finds all items where SupplierProduct.sync_status == 'REMOVED'
         and queues withdrawal commands if they are currently Live.
+
+        Incremental (`full=False`): only products with a REMOVED event in the product_changes feed
+        since this consumer's last run are checked; the first run (no offset yet) sweeps all.
+        Either way the offset advances to the newest REMOVED event read, never past events this
+        sweep could not see.
         """
-        # Avoid duplicate withdraw commands for the same listing.
-        # We treat pending/executing/retryable as "active" duplicates.
-        existing_withdraw_listing_ids: set[str] = set()
-        try:
-            for c in (
-                self.session.query(SystemCommand)
-                .filter(SystemCommand.type == "WITHDRAW_LISTING")
-                .filter(SystemCommand.status.in_([CommandStatus.PENDING, CommandStatus.EXECUTING, CommandStatus.FAILED_RETRYABLE]))
-                .order_by(SystemCommand.created_at.desc())
-                .limit(2000)
-                .all()
-            ):
-                try:
-                    lid = (c.payload or {}).get("listing_id")
-                    if lid is not None:
-                        existing_withdraw_listing_ids.add(str(lid))
-                except Exception:
-                    continue
-        except Exception:
-            existing_withdraw_listing_ids = set()
+        consumer = f"withdraw_unavailable:{supplier_id or 'all'}"
+        offset = None if full else consumer_offset(self.session, consumer)
+        # Events up to `processed` (read before the sweep: a REMOVED event commits with its status
+        # change) are covered by it. `floor` re-reads ids below the offset that may have committed
+        # late (see change_feed.read_floor); re-checking them is harmless.
+        floor = read_floor(self.session, offset or 0)
+        processed = self.session.execute(
+            select(func.max(ProductChange.id)).where(ProductChange.kind == REMOVED, ProductChange.id > floor)
+        ).scalar()
 
         # Find removed supplier products that map to LIVE internal listings
         query = self.session.query(TradeMeListing)\
@@ -97,8 +93,33 @@ class InventoryOperations:
             
         if supplier_id:
             query = query.filter(SupplierProduct.supplier_id == supplier_id)
+        if offset is not None:
+            removed_since = select(ProductChange.supplier_product_id).where(
+                ProductChange.id > floor, ProductChange.id <= (processed or offset), ProductChange.kind == REMOVED
+            )
+            query = query.filter(SupplierProduct.id.in_(removed_since))
             
         targets = query.all()
+
+        # Avoid duplicate withdraw commands for the same listing.
+        # We treat pending/executing/retryable as "active" duplicates.
+        target_ids = sorted({str(l.tm_listing_id) for l in targets if l.tm_listing_id})
+        existing_withdraw_listing_ids: set[str] = set()
+        try:
+            if target_ids:
+                existing_withdraw_listing_ids = {
+                    str(lid)
+                    for (lid,) in self.session.execute(
+                        select(SystemCommand.payload["listing_id"].as_string()).where(
+                            SystemCommand.type == "WITHDRAW_LISTING",
+                            SystemCommand.status.in_([CommandStatus.PENDING, CommandStatus.EXECUTING, CommandStatus.FAILED_RETRYABLE]),
+                            SystemCommand.payload["listing_id"].as_string().in_(target_ids),
+                        )
+                    )
+                    if lid
+                }
+        except Exception:
+            existing_withdraw_listing_ids = set()
             
         commands = []
         for listing in targets:
@@ -107,6 +128,7 @@ class InventoryOperations:
                 continue
             if listing_id in existing_withdraw_listing_ids:
                 continue
+            existing_withdraw_listing_ids.add(listing_id)
             cmd = SystemCommand(
                 id=str(uuid.uuid4()),
                 type="WITHDRAW_LISTING",
@@ -118,7 +140,8 @@ class InventoryOperations:
             
         if commands:
             self.session.add_all(commands)
-            self.session.commit()
+        commit_offset(self.session, consumer, processed if processed is not None else (offset or 0))
+        self.session.commit()
             
         return len(commands)
 
@@ -37,6 +37,7 @@ class LLMEnricher:
         if not self.is_active():
             raise RuntimeError("LLM provider not configured (missing API key).")
 
+        # Bump ENRICHMENT_VERSIONS["AI"] (core/enrichment_fingerprint.py) when this prompt changes.
         prompt = f"""
         You are a premium Retail Copywriter for a high-end e-commerce store.
         
@@ -154,14 +155,10 @@ class LLMEnricher:
         # Log Token Usage (Blueprint Req)
         usage = data.get("usage", {})
         try:
-            from retail_os.dashboard.data_layer import log_audit
-            from retail_os.core.database import SessionLocal
-            db = SessionLocal()
-            log_audit(db, "AI_COST", "Enricher", "OpenAI", 
-                      old_val=None, 
-                      new_val=f"in:{usage.get('prompt_tokens')}, out:{usage.get('completion_tokens')}")
-            db.commit()
-            db.close()
+            from retail_os.core.audit import audit_event
+            # Buffered: written in bulk, not one session per call.
+            audit_event("AI_COST", "Enricher", "OpenAI", user="SYSTEM",
+                        new_value=f"in:{usage.get('prompt_tokens')}, out:{usage.get('completion_tokens')}")
         except:
             pass # Don't fail flow for logs
             
@@ -190,14 +187,9 @@ class LLMEnricher:
                 try:
                     usage = data.get("usageMetadata", {})
                     if usage:
-                        from retail_os.dashboard.data_layer import log_audit
-                        from retail_os.core.database import SessionLocal
-                        db = SessionLocal()
-                        log_audit(db, "AI_COST", "Enricher", "Gemini", 
-                                  old_val=None, 
-                                  new_val=f"in:{usage.get('promptTokenCount')}, out:{usage.get('candidatesTokenCount')}")
-                        db.commit()
-                        db.close()
+                        from retail_os.core.audit import audit_event
+                        audit_event("AI_COST", "Enricher", "Gemini", user="SYSTEM",
+                                    new_value=f"in:{usage.get('promptTokenCount')}, out:{usage.get('candidatesTokenCount')}")
                 except:
                     pass
 
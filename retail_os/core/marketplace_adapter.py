@@ -5,7 +5,6 @@ Wraps Cleaning, SEO, and Categorization into a single endpoint.
 """
 
 from typing import Dict, Any
-import os
 from retail_os.core.category_mapper import CategoryMapper
 from retail_os.utils.cleaning import clean_title_for_trademe
 from retail_os.strategy.pricing import PricingStrategy
@@ -77,23 +76,12 @@ class MarketplaceAdapter:
         # NOTE: ImageDownloader saves to data/media/<sku>.jpg (or <sku>_<n>.jpg).
         primary_img = None
         if getattr(item, "images", None):
-            from retail_os.core.database import REPO_ROOT
-            for img in item.images:
-                if not isinstance(img, str) or not img:
-                    continue
-                # 1. Try directly (absolute or relative to CWD)
-                if os.path.exists(img):
-                    primary_img = img
-                    break
-                # 2. Try relative to REPO_ROOT
-                norm = img.replace("\\", "/")
-                if "data/media/" in norm:
-                    idx = norm.index("data/media/")
-                    rel = norm[idx:]
-                    full = os.path.join(REPO_ROOT, rel)
-                    if os.path.exists(full):
-                        primary_img = full
-                        break
+            from sqlalchemy.orm import object_session
+            from retail_os.core.media_index import local_images, resolve_media_path
+
+            local = local_images(object_session(item), item.images)
+            if local:
+                primary_img = resolve_media_path(local[0])
         if primary_img:
             audit = guard.check_image(primary_img)
             is_safe = audit["is_safe"]
@@ -0,0 +1,225 @@
+"""
+Local media presence index (`media_files`).
+
+"Does this product have a local image?" used to be answered with os.path.exists probes (several
+path variants each) per product per call. Now:
+- ImageDownloader records every file it stores (`record_media_file`);
+- `reconcile_media_files` (scheduler, periodic) drops rows whose file is gone, refreshes sizes,
+  and indexes files the downloader did not record (older downloads, CAS objects);
+- callers ask `present_media_paths` / `local_images`, one indexed IN query per batch.
+
+Until the first reconcile has run the index may be incomplete, so lookups fall back to the
+filesystem probes they replace.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import REPO_ROOT, MediaFile, MediaObject, ProductMedia, SessionLocal, SystemSetting
+
+logger = logging.getLogger(__name__)
+
+RECONCILED_KEY = "media_files.reconciled_at"
+_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+_ORDINAL_RE = re.compile(r"^(.+)_(\d{1,2})$")  # "ABC123_2" (see image_queue / adapters)
+_CHUNK = 500
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def normalize_media_path(path: str) -> str:
+    """Paths under any data/media/ directory are keyed as "data/media/..." (how images are stored)."""
+    norm = str(path).replace("\\", "/")
+    idx = norm.find("data/media/")
+    return norm[idx:] if idx >= 0 else norm
+
+
+def resolve_media_path(path: str) -> str:
+    """A path that opens from here: as given, else relative to REPO_ROOT."""
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(REPO_ROOT, normalize_media_path(path))
+
+
+def split_image_key(key: str) -> tuple[str, int]:
+    m = _ORDINAL_RE.match(key)
+    return (m.group(1), int(m.group(2))) if m else (key, 1)
+
+
+def image_list(images: Any) -> list[str]:
+    """SupplierProduct.images as a list of strings (tolerates JSON strings and bare paths)."""
+    if not images:
+        return []
+    if isinstance(images, str):
+        try:
+            images = json.loads(images)
+        except Exception:
+            images = [images]
+    if not isinstance(images, list):
+        return []
+    return [i for i in images if isinstance(i, str) and i]
+
+
+def media_index_ready(db: Session) -> bool:
+    return db.get(SystemSetting, RECONCILED_KEY) is not None
+
+
+def _probe(path: str) -> bool:
+    if os.path.exists(path):
+        return True
+    norm = normalize_media_path(path)
+    return norm.startswith("data/media/") and os.path.exists(os.path.join(REPO_ROOT, norm))
+
+
+def present_media_paths(db: Optional[Session], images: Iterable[str]) -> set[str]:
+    """Normalized paths among `images` that exist locally. Remote URLs are never present."""
+    paths = {normalize_media_path(i) for i in images if isinstance(i, str) and i and not i.startswith("http")}
+    if not paths:
+        return set()
+    if db is None or not media_index_ready(db):
+        return {p for p in paths if _probe(p)}
+    found: set[str] = set()
+    ordered = sorted(paths)
+    for i in range(0, len(ordered), _CHUNK):
+        found.update(db.execute(select(MediaFile.path).where(MediaFile.path.in_(ordered[i : i + _CHUNK]))).scalars())
+    return found
+
+
+def local_images(db: Optional[Session], images: Any, present: Optional[set[str]] = None) -> list[str]:
+    """Entries of `images` that are local files, in order. Pass `present` from a batch preload."""
+    imgs = image_list(images)
+    if present is None:
+        present = present_media_paths(db, imgs)
+    return [i for i in imgs if normalize_media_path(i) in present]
+
+
+def _dimensions(path: str) -> tuple[Optional[int], Optional[int]]:
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:  # header only
+            return img.width, img.height
+    except Exception:
+        return None, None
+
+
+def _upsert(db: Session, key: str, path: str, size: int, width, height) -> None:
+    sku, ordinal = split_image_key(key)
+    row = db.get(MediaFile, key)
+    if row is None:
+        row = MediaFile(image_key=key, sku=sku, ordinal=ordinal)
+        db.add(row)
+    row.path, row.bytes, row.width, row.height = normalize_media_path(path), int(size), width, height
+    row.verified_at = _utcnow()
+
+
+def record_media_file(
+    key: str,
+    path: str,
+    size: int,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    db: Optional[Session] = None,
+) -> None:
+    """
+    Index a file the downloader just stored. With `db` the row joins the caller's transaction
+    (the caller commits); without, best effort: the reconciler catches anything missed.
+    """
+    if width is None or height is None:
+        width, height = _dimensions(resolve_media_path(path))
+    if db is not None:
+        _upsert(db, key, path, size, width, height)
+        return
+    db = SessionLocal()
+    try:
+        _upsert(db, key, path, size, width, height)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"MediaIndex: could not record {key}: {e}")
+    finally:
+        db.close()
+
+
+def forget_media_path(db: Session, path: str) -> int:
+    """Drop index rows for a file that was deleted; the caller commits."""
+    return int(db.execute(delete(MediaFile).where(MediaFile.path == normalize_media_path(path))).rowcount or 0)
+
+
+def reconcile_media_files(db: Session, media_root: Optional[str] = None) -> dict:
+    """
+    Bring `media_files` in line with disk and mark the index ready. Commits.
+    Stats each indexed file once, lists the top-level legacy <sku>.jpg files once, and indexes
+    content-addressed objects through product_media.
+    """
+    root = Path(media_root) if media_root else Path(REPO_ROOT) / "data" / "media"
+    now = _utcnow()
+    stats = {"verified": 0, "removed": 0, "added": 0}
+
+    indexed: set[str] = set()
+    for row in db.execute(select(MediaFile)).scalars().all():
+        try:
+            size = os.stat(resolve_media_path(row.path)).st_size
+        except OSError:
+            db.delete(row)
+            stats["removed"] += 1
+            continue
+        if size != row.bytes:
+            row.bytes = size
+            row.width, row.height = _dimensions(resolve_media_path(row.path))
+        row.verified_at = now
+        indexed.add(row.image_key)
+        stats["verified"] += 1
+
+    # Legacy layout: data/media/<stem>.<ext>, preferring the transcoded .jpg.
+    legacy: dict[str, os.DirEntry] = {}
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                stem, ext = os.path.splitext(entry.name)
+                if entry.name.startswith("."):
+                    continue  # in-flight temp downloads
+                if ext.lower() in _IMAGE_EXTS and entry.is_file() and stem not in indexed:
+                    if stem not in legacy or ext.lower() == ".jpg":
+                        legacy[stem] = entry
+    except FileNotFoundError:
+        pass
+    for stem, entry in legacy.items():
+        size = entry.stat().st_size
+        if size < 300:
+            continue
+        width, height = _dimensions(entry.path)
+        _upsert(db, stem, entry.path, size, width, height)
+        indexed.add(stem)
+        stats["added"] += 1
+
+    # Content-addressed objects mapped to a stem the index does not know yet.
+    for key, path, size, width, height in db.execute(
+        select(ProductMedia.image_key, MediaObject.path, MediaObject.bytes, MediaObject.width, MediaObject.height).join(
+            MediaObject, MediaObject.sha256 == ProductMedia.sha256
+        )
+    ):
+        if key in indexed or not os.path.exists(resolve_media_path(path)):
+            continue
+        _upsert(db, key, path, size, width, height)
+        stats["added"] += 1
+
+    marker = db.get(SystemSetting, RECONCILED_KEY)
+    if marker is None:
+        db.add(SystemSetting(key=RECONCILED_KEY, value={"at": now.isoformat(), **stats}))
+    else:
+        marker.value = {"at": now.isoformat(), **stats}
+    db.commit()
+    return stats
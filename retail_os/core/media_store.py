@@ -0,0 +1,267 @@
+"""
+Content-addressed local media store.
+
+A downloaded image is stored once per content hash (sha256 of the downloaded bytes) at
+data/media/cas/ab/cd/<sha256>.jpg, so a stock shot or placeholder shared by many SKUs is written
+and transcoded once. Listing uploads already dedupe on file bytes (photo_hashes), so every SKU
+pointing at the same object also reuses one Trade Me photo id.
+
+- media_objects: one row per stored object (hash, bytes, width, height, format, refcount)
+- product_media: media file stem ("ABC123", "ABC123_2") -> object hash
+
+Objects whose refcount dropped to 0 (every SKU re-pointed elsewhere) are removed by
+`gc_unreferenced_media`. RETAILOS_MEDIA_CAS=false keeps the legacy data/media/<sku>.jpg layout.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import MediaObject, ProductMedia, SessionLocal
+from retail_os.core.media_index import forget_media_path
+
+logger = logging.getLogger(__name__)
+
+MIN_IMAGE_BYTES = 300  # smaller is usually an HTML error page
+MAX_DIMENSION = 2048   # Trade Me recommended maximum
+JPEG_QUALITY = 85
+STALE_TMP_SECONDS = 3600  # untouched this long: left behind by a crashed download
+
+
+def media_cas_enabled() -> bool:
+    return (os.getenv("RETAILOS_MEDIA_CAS", "true") or "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def transcode_to_jpeg(src: Path, dst: Path) -> tuple[int, int]:
+    """Trade Me prefers JPG: RGB, at most 2048px on the long side. Raises if `src` is not an image."""
+    from PIL import Image
+
+    with Image.open(src) as img:
+        if img.mode in ("RGBA", "P", "LA", "L", "CMYK"):
+            img = img.convert("RGB")
+        if img.width > MAX_DIMENSION or img.height > MAX_DIMENSION:
+            img.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.Resampling.LANCZOS)
+        img.save(dst, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return img.width, img.height
+
+
+def _raw_format(path: Path) -> tuple[Optional[str], Optional[int], Optional[int]]:
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            return img.format, img.width, img.height
+    except Exception:
+        return (path.suffix.lstrip(".").upper() or None), None, None
+
+
+class MediaStore:
+    """Stores downloaded files by content hash and maps media file stems onto them."""
+
+    def __init__(self, base_dir="data/media"):
+        self.base_dir = Path(base_dir)
+        self.cas_dir = self.base_dir / "cas"
+        self.tmp_dir = self.cas_dir / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._sweep_tmp()
+
+    def _sweep_tmp(self) -> int:
+        """Remove stale partial downloads; in-flight ones (recently written) are left alone."""
+        cutoff = time.time() - STALE_TMP_SECONDS
+        removed = 0
+        try:
+            with os.scandir(self.tmp_dir) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file() and entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                            removed += 1
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"MediaStore: tmp sweep failed: {e}")
+        return removed
+
+    def temp_path(self, key: str, ext: str = ".jpg") -> Path:
+        """Download target for `key`; hand it to `put` once complete."""
+        return self.tmp_dir / f"{key}.{uuid.uuid4().hex[:8]}{ext}"
+
+    def object_path(self, sha256: str, ext: str = ".jpg") -> Path:
+        return self.cas_dir / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    def lookup(self, key: str, db: Optional[Session] = None) -> Optional[dict]:
+        """{"path", "size", "sha256"} for `key` if it maps to an object still on disk."""
+        own = db is None
+        db = SessionLocal() if own else db
+        try:
+            row = db.execute(
+                select(MediaObject.path, MediaObject.sha256)
+                .join(ProductMedia, ProductMedia.sha256 == MediaObject.sha256)
+                .where(ProductMedia.image_key == key)
+            ).first()
+        except Exception as e:
+            logger.debug(f"MediaStore: lookup failed for {key}: {e}")
+            return None
+        finally:
+            if own:
+                db.close()
+        if row is None:
+            return None
+        path = Path(row.path)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        return {"path": str(path), "size": size, "sha256": row.sha256} if size >= MIN_IMAGE_BYTES else None
+
+    def put(self, raw_path: Path, key: str, source_url: Optional[str] = None, db: Optional[Session] = None) -> dict:
+        """
+        Move a completed download into the store and point `key` at it.
+        Identical bytes already stored are reused without transcoding. The file is written via
+        temp + rename, so a concurrent reader never sees a partial object.
+        With `db` the media_objects / product_media rows join the caller's transaction (the caller
+        commits; a failed write rolls it back); without, they are committed here.
+        Returns {"path", "size", "sha256", "deduped", "width", "height"}.
+        """
+        raw_path = Path(raw_path)
+        sha = file_sha256(raw_path)
+        own = db is None
+        db = SessionLocal() if own else db
+        try:
+            target, meta = self._existing(sha)
+            deduped = target is not None
+            if target is None:
+                target, meta = self._write_object(raw_path, sha)
+            self._register(db, key, sha, target, target.stat().st_size, meta, source_url, commit=own)
+            if not target.exists():
+                # gc_unreferenced_media removed the object we deduped onto before `_register`
+                # referenced it again: store it anew (the row now points at a missing file).
+                target, meta = self._write_object(raw_path, sha)
+                deduped = False
+                self._register(db, key, sha, target, target.stat().st_size, meta, source_url, commit=own)
+        finally:
+            raw_path.unlink(missing_ok=True)
+            if own:
+                db.close()
+
+        size = target.stat().st_size
+        return {"path": str(target), "size": size, "sha256": sha, "deduped": deduped, "width": meta[1], "height": meta[2]}
+
+    def _existing(self, sha: str) -> tuple[Optional[Path], tuple]:
+        target = self.object_path(sha)
+        for candidate in (target, *self.cas_dir.glob(f"{sha[:2]}/{sha[2:4]}/{sha}.*")):
+            if candidate.exists() and candidate.stat().st_size >= MIN_IMAGE_BYTES:
+                return candidate, _raw_format(candidate)
+        return None, (None, None, None)
+
+    def _write_object(self, raw_path: Path, sha: str) -> tuple[Path, tuple]:
+        target = self.object_path(sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        meta: tuple[Optional[str], Optional[int], Optional[int]] = (None, None, None)
+        try:
+            width, height = transcode_to_jpeg(raw_path, tmp)
+            meta = ("JPEG", width, height)
+        except ImportError:
+            print("MediaStore: PIL not installed. Storing raw bytes.")
+        except Exception as e:
+            print(f"MediaStore: Tuning Failed ({e}). Storing raw.")
+        if meta[0] is None:
+            target = self.object_path(sha, raw_path.suffix or ".jpg")
+            meta = _raw_format(raw_path)
+            shutil.copyfile(raw_path, tmp)
+        os.replace(tmp, target)
+        return target, meta
+
+    def _register(
+        self, db: Session, key: str, sha: str, path: Path, size: int, meta, source_url: Optional[str], commit: bool
+    ) -> None:
+        # Best effort: the file is already in place, and a missing mapping only costs a re-download.
+        # On error the session is rolled back (with `db` from `put`'s caller, that is its own).
+        try:
+            fmt, width, height = meta
+            obj = db.get(MediaObject, sha)
+            if obj is None:
+                try:
+                    with db.begin_nested():
+                        db.add(MediaObject(sha256=sha, path=str(path), bytes=size, width=width, height=height, format=fmt, refcount=0))
+                except IntegrityError:
+                    pass  # another worker stored the same bytes first
+            elif obj.path != str(path):
+                obj.path, obj.bytes, obj.width, obj.height, obj.format = str(path), size, width, height, fmt
+
+            current = db.get(ProductMedia, key)
+            if current is None or current.sha256 != sha:
+                if current is None:
+                    db.add(ProductMedia(image_key=key, sha256=sha, source_url=source_url))
+                else:
+                    db.execute(
+                        update(MediaObject)
+                        .where(MediaObject.sha256 == current.sha256)
+                        .values(refcount=MediaObject.refcount - 1)
+                    )
+                    current.sha256, current.source_url = sha, source_url
+                db.execute(update(MediaObject).where(MediaObject.sha256 == sha).values(refcount=MediaObject.refcount + 1))
+            if commit:
+                db.commit()
+            else:
+                db.flush()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"MediaStore: could not register {key} -> {sha[:12]}: {e}")
+
+def gc_unreferenced_media(db: Session, limit: int = 500) -> dict:
+    """
+    Delete stored objects no product points at any more (files and rows). Commits.
+    Each row is deleted, only while still unreferenced, and committed before its file goes, so a
+    concurrent `put` deduping onto the object either keeps it alive or stores it again.
+    """
+    rows = db.execute(
+        select(MediaObject.sha256, MediaObject.path, MediaObject.bytes)
+        .where(MediaObject.refcount <= 0)
+        .order_by(MediaObject.created_at)
+        .limit(int(limit))
+    ).all()
+    removed = freed = 0
+    for sha, path, size in rows:
+        referenced = select(ProductMedia.image_key).where(ProductMedia.sha256 == sha).exists()
+        gone = db.execute(
+            delete(MediaObject).where(MediaObject.sha256 == sha, MediaObject.refcount <= 0, ~referenced)
+        ).rowcount
+        if not gone:
+            # A writer re-pointed a SKU at this object since the count was read.
+            refs = db.execute(select(func.count(ProductMedia.image_key)).where(ProductMedia.sha256 == sha)).scalar() or 0
+            db.execute(
+                update(MediaObject).where(MediaObject.sha256 == sha, MediaObject.refcount <= 0).values(refcount=int(refs))
+            )
+            db.commit()
+            continue
+        forget_media_path(db, path)
+        db.commit()
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"MediaStore: could not delete {path}: {e}")
+            continue
+        freed += int(size or 0)
+        removed += 1
+    return {"removed": removed, "bytes_freed": freed}
@@ -0,0 +1,277 @@
+"""
+Staged producer/consumer pipeline.
+
+    source -> stage 1 -> stage 2 -> ... -> stage N -> caller
+
+Each stage runs on its own worker threads and feeds the next one through a bounded queue, so
+end-to-end time tends towards the slowest stage instead of the sum of all stages, and a slow
+stage applies backpressure upstream rather than buffering without limit.
+
+Stages either map one item at a time (`fn(item) -> output | None`) or, with `batch_size`,
+receive lists (`fn(items) -> iterable of outputs`), which is how the DB writer commits in
+batches. Per-item stage errors are counted and reported through `on_error`; they never stop the
+pipeline. An exception from the source is re-raised to the caller. `cancel()` (or
+`should_abort` returning True) stops the source and unblocks every stage; `run` returns only once
+every stage thread has exited, so the caller may use a DB session the stages shared. The source
+must not use such a session: it is given a bounded grace period (it may sit in a network read).
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+_END = object()
+SOURCE_JOIN_TIMEOUT_S = 10.0  # grace period for a source stuck in a network read on shutdown
+
+
+def pipeline_setting(name: str, default: int, hi: int = 1000) -> int:
+    """Integer tuning knob RETAILOS_PIPELINE_<NAME>, clamped to 1..hi."""
+    try:
+        v = int(os.getenv(f"RETAILOS_PIPELINE_{name}", str(default)) or default)
+    except ValueError:
+        v = int(default)
+    return max(1, min(int(hi), v))
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    batch_size: int = 0          # >0: fn receives a list of up to batch_size items
+    batch_wait_s: float = 0.25   # flush a partial batch when input stays idle this long
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    busy_s: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, processed: int = 0, dropped: int = 0, errors: int = 0, busy_s: float = 0.0) -> None:
+        with self._lock:
+            self.processed += processed
+            self.dropped += dropped
+            self.errors += errors
+            self.busy_s += busy_s
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class StagedPipeline:
+    def __init__(
+        self,
+        source: Iterable,
+        stages: list[Stage],
+        queue_size: int = 256,
+        should_abort: Optional[Callable[[], bool]] = None,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None,
+    ):
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.should_abort = should_abort
+        self.on_error = on_error
+        self.stats: dict[str, StageStats] = {s.name: StageStats() for s in stages}
+        self.source_count = 0
+        self._stop = threading.Event()
+        self._source_error: BaseException | None = None
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._stop.is_set()
+
+    def cancel(self) -> None:
+        self._stop.set()
+
+    # --- queue helpers (never block forever; always honour cancellation) ---
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, timeout: float = 0.1) -> Any:
+        """Returns the next item, None on timeout, or raises PipelineCancelled."""
+        while True:
+            if self._stop.is_set():
+                raise PipelineCancelled()
+            try:
+                return q.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+    # --- threads ---
+
+    def _run_source(self, out_q: queue.Queue) -> None:
+        it = iter(self.source)
+        try:
+            for item in it:
+                if self._stop.is_set():
+                    return
+                try:
+                    if self.should_abort and bool(self.should_abort()):
+                        self._stop.set()
+                        return
+                except Exception:
+                    pass
+                self.source_count += 1
+                if not self._put(out_q, item):
+                    return
+        except BaseException as e:
+            self._source_error = e
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        self._put(out_q, _END)
+
+    def _report(self, stage: Stage, item: Any, e: Exception) -> None:
+        if self.on_error:
+            try:
+                self.on_error(stage.name, item, e)
+            except Exception:
+                pass
+
+    def _run_worker(
+        self,
+        stage: Stage,
+        in_q: queue.Queue,
+        out_q: queue.Queue,
+        done: dict,
+        done_lock: threading.Lock,
+    ) -> None:
+        stats = self.stats[stage.name]
+        batch: list = []
+
+        def _emit(out: Any) -> bool:
+            if out is None:
+                stats.add(dropped=1)
+                return True
+            return self._put(out_q, out)
+
+        def _flush() -> bool:
+            if not batch:
+                return True
+            items = list(batch)
+            batch.clear()
+            t0 = time.perf_counter()
+            try:
+                outs = list(stage.fn(items) or [])
+            except Exception as e:
+                stats.add(errors=len(items), busy_s=time.perf_counter() - t0)
+                self._report(stage, items, e)
+                return True
+            stats.add(processed=len(items), busy_s=time.perf_counter() - t0)
+            return all(_emit(o) for o in outs)
+
+        try:
+            while True:
+                item = self._get(in_q, timeout=stage.batch_wait_s if stage.batch_size else 0.1)
+                if item is None:
+                    if stage.batch_size and not _flush():
+                        return
+                    continue
+                if item is _END:
+                    # Let sibling workers see the end marker too.
+                    self._put(in_q, _END)
+                    if stage.batch_size:
+                        _flush()
+                    break
+                if stage.batch_size:
+                    batch.append(item)
+                    if len(batch) >= stage.batch_size and not _flush():
+                        return
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    out = stage.fn(item)
+                except Exception as e:
+                    stats.add(errors=1, busy_s=time.perf_counter() - t0)
+                    self._report(stage, item, e)
+                    continue
+                stats.add(processed=1, busy_s=time.perf_counter() - t0)
+                if not _emit(out):
+                    return
+        except PipelineCancelled:
+            return
+
+        with done_lock:
+            done[stage.name] += 1
+            last = done[stage.name] >= max(1, int(stage.workers))
+        if last:
+            self._put(out_q, _END)
+
+    def run(self) -> Iterator[Any]:
+        """Start all stages and yield the outputs of the last stage as they complete."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        done = {s.name: 0 for s in self.stages}
+        done_lock = threading.Lock()
+
+        self._threads = [threading.Thread(target=self._run_source, args=(queues[0],), name="pipeline-source", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            for w in range(max(1, int(stage.workers))):
+                self._threads.append(
+                    threading.Thread(
+                        target=self._run_worker,
+                        args=(stage, queues[i], queues[i + 1], done, done_lock),
+                        name=f"pipeline-{stage.name}-{w}",
+                        daemon=True,
+                    )
+                )
+        for t in self._threads:
+            t.start()
+
+        finished = False
+        try:
+            while True:
+                try:
+                    item = self._get(queues[-1])
+                except PipelineCancelled:
+                    return
+                if item is None:
+                    continue
+                if item is _END:
+                    finished = True
+                    break
+                yield item
+        finally:
+            if not finished:
+                # Cancelled, or the caller stopped consuming early: wind everything down.
+                self._stop.set()
+            source, workers = self._threads[0], self._threads[1:]
+            # A stage may be mid-call on the caller's Session (the writer finishes its batch).
+            for t in workers:
+                t.join()
+            source.join(timeout=SOURCE_JOIN_TIMEOUT_S)
+
+        if self._source_error is not None:
+            raise self._source_error
+
+    def summary(self) -> dict:
+        return {
+            "source": int(self.source_count),
+            "stages": {
+                name: {"processed": s.processed, "dropped": s.dropped, "errors": s.errors, "busy_s": round(s.busy_s, 3)}
+                for name, s in self.stats.items()
+            },
+        }
@@ -1,27 +1,58 @@
 import os
 import json
 import hashlib
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional, Callable
 from sqlalchemy.orm import Session
-from retail_os.core.database import SupplierProduct, InternalProduct, AuditLog
+from retail_os.core.audit import AuditBuffer
+from retail_os.core.change_feed import NEW, ChangeBuffer, change_kinds
+from retail_os.core.database import SupplierProduct, InternalProduct
+from retail_os.core.enrichment_fingerprint import mark_enrichment_stale
+from retail_os.core.field_hashes import apply_field_hashes, field_group_hashes
+from retail_os.core.image_queue import enqueue_product_images, image_queue_enabled
+from retail_os.core.seen_set import SeenSet
 from retail_os.core.unified_schema import UnifiedProduct
 from retail_os.utils.image_downloader import ImageDownloader
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+
+@dataclass
+class PreparedUpsert:
+    """Everything `write` needs; produced by `prepare` without touching the DB."""
+    data: UnifiedProduct
+    external_sku: str
+    internal_sku_prefix: str
+    cost: float
+    stock_level: Optional[int]
+    local_images: list
+    original_images: list
+    specs: dict
+    snapshot_hash: str
+    enqueue_images: bool = False
+    field_hashes: dict = field(default_factory=dict)
+
+
 class ProductUpserter:
     """
     Shared logic for upserting UnifiedProduct data into SupplierProduct and InternalProduct tables.
     Handles:
-    - Image downloading
-    - Snapshot hashing
+    - Image downloading (queued via image_download_jobs, or inline when RETAILOS_IMAGE_QUEUE=0)
+    - Snapshot hashing (plus per-group field hashes; changed enrichment inputs mark enrichment stale)
     - Data mapping
-    - Audit logging
+    - Audit logging (one compact PRODUCT_CHANGE diff per changed product, bulk-inserted with the batch)
+    - Change events (NEW / PRICE_CHANGED / CONTENT_CHANGED / OUT_OF_STOCK) for the product_changes feed
     - InternalProduct linking
+
+    With a `SeenSet`, written SKUs are recorded there (reconciliation anti-joins against it)
+    and unchanged rows are not touched at all; `SeenSet.finish` stamps last_scraped_at in bulk.
     """
-    def __init__(self, db: Session, supplier_id: int):
+    def __init__(self, db: Session, supplier_id: int, seen: Optional[SeenSet] = None):
         self.db = db
         self.supplier_id = supplier_id
+        self.seen = seen
+        self.audit = AuditBuffer()
+        self.changes = ChangeBuffer(supplier_id)
         self.downloader = ImageDownloader()
 
     def upsert(
@@ -32,7 +63,23 @@ class ProductUpserter:
         should_abort: Optional[Callable[[], bool]] = None, 
         progress_hook: Optional[Callable[[dict], None]] = None
     ) -> str:
-        
+        prepared = self.prepare(data, external_sku, internal_sku_prefix, should_abort=should_abort)
+        result = self.write(prepared)
+        if self.seen is not None:
+            self.seen.add([external_sku])
+        return result
+
+    def prepare(
+        self,
+        data: UnifiedProduct,
+        external_sku: str,
+        internal_sku_prefix: str,
+        should_abort: Optional[Callable[[], bool]] = None,
+    ) -> PreparedUpsert:
+        """
+        DB-free half of an upsert (field parsing, image download, snapshot hash).
+        Safe to run on several threads at once; pair with `write` / `write_batch`.
+        """
         # Parse Price
         try:
             cost = float(data["buy_now_price"])
@@ -59,7 +106,13 @@ class ProductUpserter:
         specs = data.get("specs") if isinstance(data.get("specs"), dict) else {}
         
         # PHYSICAL IMAGE DOWNLOAD
-        local_images = self._download_images(imgs, external_sku, should_abort)
+        # Queued mode keeps CDN latency out of the scrape: remote URLs are stored now and
+        # download jobs are enqueued by the writer. The hash then tracks the remote URLs.
+        enqueue_images = image_queue_enabled()
+        if enqueue_images:
+            local_images = []
+        else:
+            local_images = self._download_images(imgs, external_sku, should_abort)
         
         # Calculate Snapshot Hash
         # Include fields relevant for change detection
@@ -71,7 +124,7 @@ class ProductUpserter:
                 "condition": data.get("condition"),
                 "cost": cost,
                 "status": data.get("source_status"),
-                "images": local_images,
+                "images": imgs if enqueue_images else local_images,
                 "specs": specs,
                 "stock_level": data.get("stock_level"),
             },
@@ -79,23 +132,104 @@ class ProductUpserter:
             ensure_ascii=True,
         )
         current_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-        
+        hashes = field_group_hashes(
+            cost=cost,
+            title=data.get("title"),
+            description=data.get("description"),
+            brand=data.get("brand"),
+            condition=data.get("condition"),
+            specs=specs,
+            images=imgs if enqueue_images else local_images,
+            stock_level=data.get("stock_level"),
+            status=data.get("source_status"),
+        )
+
+        return PreparedUpsert(
+            data=data,
+            external_sku=external_sku,
+            internal_sku_prefix=internal_sku_prefix,
+            cost=cost,
+            stock_level=stock_level,
+            local_images=local_images,
+            original_images=imgs,
+            specs=specs,
+            snapshot_hash=current_hash,
+            enqueue_images=enqueue_images,
+            field_hashes=hashes,
+        )
+
+    def write(self, prepared: PreparedUpsert, commit: bool = True, sp: Optional[SupplierProduct] = None) -> str:
         # DB Logic
-        sp = self.db.query(SupplierProduct).filter_by(
-            supplier_id=self.supplier_id, 
-            external_sku=external_sku
-        ).first()
+        if sp is None:
+            sp = self.db.query(SupplierProduct).filter_by(
+                supplier_id=self.supplier_id, 
+                external_sku=prepared.external_sku
+            ).first()
         
         if not sp:
             return self._create_product(
-                data, external_sku, internal_sku_prefix, cost, stock_level, 
-                local_images, imgs, specs, current_hash
+                prepared.data, prepared.external_sku, prepared.internal_sku_prefix, prepared.cost,
+                prepared.stock_level, prepared.local_images, prepared.original_images, prepared.specs,
+                prepared.snapshot_hash, commit=commit, enqueue_images=prepared.enqueue_images,
+                field_hashes=prepared.field_hashes,
             )
         else:
             return self._update_product(
-                sp, data, cost, stock_level, local_images, imgs, specs, current_hash
+                sp, prepared.data, prepared.cost, prepared.stock_level, prepared.local_images,
+                prepared.original_images, prepared.specs, prepared.snapshot_hash, commit=commit,
+                enqueue_images=prepared.enqueue_images, field_hashes=prepared.field_hashes,
             )
 
+    def write_batch(self, batch: list[PreparedUpsert]) -> list[str]:
+        """
+        Write a batch with one lookup query and one commit.
+        If the batch commit fails, it is rolled back and retried row by row so one bad
+        row only fails itself ('failed').
+        """
+        if not batch:
+            return []
+        skus = sorted({p.external_sku for p in batch})
+        existing = {
+            sp.external_sku: sp
+            for sp in self.db.query(SupplierProduct)
+            .filter(SupplierProduct.supplier_id == self.supplier_id)
+            .filter(SupplierProduct.external_sku.in_(skus))
+            .all()
+        }
+        try:
+            results = []
+            for p in batch:
+                # `sp=None` re-queries, which also catches a row created earlier in this batch.
+                results.append(self.write(p, commit=False, sp=existing.get(p.external_sku)))
+            self._flush_side_rows()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            # The row-by-row retry records its own audit rows and change events.
+            self._clear_side_rows()
+            results = []
+            for p in batch:
+                try:
+                    results.append(self.write(p))
+                except Exception as e:
+                    self.db.rollback()
+                    self._clear_side_rows()
+                    print(f"ProductUpserter: write failed for {p.external_sku}: {e}")
+                    results.append('failed')
+        if self.seen is not None:
+            # Seen at the supplier even if our write failed: not an orphan.
+            self.seen.add(skus)
+        return results
+
+    def _flush_side_rows(self) -> None:
+        """Audit rows and change events go in the same transaction as the product writes."""
+        self.audit.flush(self.db)
+        self.changes.flush(self.db)
+
+    def _clear_side_rows(self) -> None:
+        self.audit.clear()
+        self.changes.clear()
+
     def _download_images(self, imgs: list[str], sku: str, should_abort: Optional[Callable[[], bool]]) -> list[str]:
         local_images = []
         limit_imgs = int(os.getenv("RETAILOS_IMAGE_LIMIT_PER_PRODUCT", "4") or "4")
@@ -138,7 +272,8 @@ class ProductUpserter:
     def _create_product(
         self, data: UnifiedProduct, external_sku: str, internal_prefix: str, 
         cost: float, stock_level: Optional[int], local_images: list[str], 
-        original_images: list[str], specs: dict, current_hash: str
+        original_images: list[str], specs: dict, current_hash: str, commit: bool = True,
+        enqueue_images: bool = False, field_hashes: Optional[dict] = None,
     ) -> str:
         sp = SupplierProduct(
             supplier_id=self.supplier_id,
@@ -157,10 +292,14 @@ class ProductUpserter:
             source_category=data.get("source_category"),
             source_categories=data.get("source_categories"),
             snapshot_hash=current_hash,
+            field_hashes=field_hashes or None,
             last_scraped_at=datetime.now(timezone.utc)
         )
         self.db.add(sp)
         self.db.flush()
+        if enqueue_images:
+            sp.images = enqueue_product_images(self.db, sp, original_images, external_sku)
+        self.changes.add(sp.id, [NEW])
         
         # Auto-Create Internal
         my_sku = f"{internal_prefix}-{external_sku}" if internal_prefix else external_sku
@@ -178,15 +317,20 @@ class ProductUpserter:
                 print(f"   -> Fixing Broken Link for {my_sku}: {ip.primary_supplier_product_id} -> {sp.id}")
                 ip.primary_supplier_product_id = sp.id
                 
-        self.db.commit()
+        if commit:
+            self._flush_side_rows()
+            self.db.commit()
         return 'created'
 
     def _update_product(
         self, sp: SupplierProduct, data: UnifiedProduct, cost: float, 
         stock_level: Optional[int], local_images: list[str], original_images: list[str], 
-        specs: dict, current_hash: str
+        specs: dict, current_hash: str, commit: bool = True, enqueue_images: bool = False,
+        field_hashes: Optional[dict] = None,
     ) -> str:
-        sp.last_scraped_at = datetime.now(timezone.utc)
+        if self.seen is None or sp.snapshot_hash != current_hash:
+            # Unchanged rows under a SeenSet stay untouched; finish() stamps them in one UPDATE.
+            sp.last_scraped_at = datetime.now(timezone.utc)
         # Always refresh category/ranking metadata
         sp.source_category = data.get("source_category")
         sp.source_categories = data.get("source_categories")
@@ -194,28 +338,19 @@ class ProductUpserter:
         sp.collection_page = data.get("collection_page")
         
         if sp.snapshot_hash != current_hash:
-            # Audit Logic
-            if sp.cost_price != cost:
-                self.db.add(AuditLog(
-                    entity_type="SupplierProduct",
-                    entity_id=str(sp.id),
-                    action="PRICE_CHANGE",
-                    old_value=str(sp.cost_price),
-                    new_value=str(cost),
-                    user="System",
-                    timestamp=datetime.now(timezone.utc)
-                ))
-
-            if sp.title != data["title"]:
-                self.db.add(AuditLog(
-                    entity_type="SupplierProduct",
-                    entity_id=str(sp.id),
-                    action="TITLE_CHANGE",
-                    old_value=sp.title,
-                    new_value=data["title"],
-                    user="System",
-                    timestamp=datetime.now(timezone.utc)
-                ))
+            # Audit Logic (buffered; written with the batch)
+            self.audit.diff(
+                "SupplierProduct",
+                sp.id,
+                "PRODUCT_CHANGE",
+                {"title": sp.title, "cost": sp.cost_price, "stock_level": sp.stock_level},
+                {"title": data["title"], "cost": cost, "stock_level": stock_level},
+            )
+            changed = set()
+            if field_hashes:
+                # Before the fields below are overwritten (legacy rows derive old hashes from them).
+                changed = apply_field_hashes(sp, field_hashes)
+                self.changes.add(sp.id, change_kinds(False, changed, stock_level, data.get("source_status")))
 
             # Commit Updates
             sp.title = data["title"]
@@ -224,12 +359,20 @@ class ProductUpserter:
             sp.condition = data.get("condition", "Used")
             sp.cost_price = cost
             sp.stock_level = stock_level
-            sp.images = local_images if local_images else original_images
+            if enqueue_images:
+                sp.images = enqueue_product_images(self.db, sp, original_images, sp.external_sku)
+            else:
+                sp.images = local_images if local_images else original_images
             sp.specs = specs
             sp.snapshot_hash = current_hash
+            if "content" in changed or not field_hashes:
+                mark_enrichment_stale(sp)
             
-            self.db.commit()
+            if commit:
+                self._flush_side_rows()
+                self.db.commit()
             return 'updated'
         else:
-            self.db.commit()
+            if commit:
+                self.db.commit()
             return 'unchanged'
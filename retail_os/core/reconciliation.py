@@ -1,110 +1,159 @@
 from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import DateTime, String, and_, cast, insert, literal, or_, select, update
 from sqlalchemy.orm import Session
-from retail_os.core.database import SessionLocal, SupplierProduct, TradeMeListing, SystemCommand, CommandStatus, AuditLog
+from retail_os.core.change_feed import REMOVED
+from retail_os.core.database import SessionLocal, SupplierProduct, InternalProduct, TradeMeListing, SystemCommand, CommandStatus, AuditLog, ProductChange
+from retail_os.core.seen_set import SeenSet
 import uuid
 
+WITHDRAW_REASON = "Supplier Item Removed (Missing Confirmed)"
+
+# Withdraws in these states are still going to happen; don't queue a second one.
+_ACTIVE_COMMAND_STATUSES = [CommandStatus.PENDING, CommandStatus.EXECUTING, CommandStatus.FAILED_RETRYABLE]
+
+
 class ReconciliationEngine:
     """
     Handles the 'Missing Item' lifecycle.
     Ref: Master Requirements Section 6 (Supplier URL Presence Logic).
+
+    Set-based: each transition is one INSERT ... SELECT (audit rows; REMOVED also appends
+    product_changes events) plus one UPDATE ... WHERE
+    over the supplier's rows, and confirmed removals queue their withdraws in one bulk insert,
+    all inside a single short transaction. Cost no longer grows with ORM objects per orphan.
+
+    "Seen this run" comes from a `SeenSet` (anti-join against the run's staging rows, limited to
+    the scope it covered) or, for callers without one, from last_scraped_at vs. the run start.
     """
-    
+
     def __init__(self, db: Session):
         self.db = db
 
-    def process_orphans(self, supplier_id: int, current_run_timestamp: datetime):
+    def process_orphans(
+        self,
+        supplier_id: int,
+        current_run_timestamp: Optional[datetime] = None,
+        seen: Optional[SeenSet] = None,
+    ):
         """
         Detects items not seen in the current scrape run.
+
+        PRESENT -> MISSING_ONCE -> REMOVED for in-scope items the run did not see (NULL status
+        counts as PRESENT); MISSING_ONCE/REMOVED -> PRESENT for items seen again.
+        Pass `seen` (preferred) or `current_run_timestamp` (legacy: seen = scraped since then).
+        Returns {"missing_once": n, "removed": n, "healed": n, "withdrawals": n}.
         """
         print(f"Reconciliation: Checking items for Supplier {supplier_id}...")
-        
-        # 1. Find items belonging to this supplier
-        # We check checks:
-        # A. Last Scraped < Run Start (Implies it wasn't touched this run)
-        # B. Not already Removed
-        
-        orphans = self.db.query(SupplierProduct).filter(
-            SupplierProduct.supplier_id == supplier_id,
-            SupplierProduct.last_scraped_at < current_run_timestamp,
-            SupplierProduct.sync_status != "REMOVED"
-        ).all()
-        
-        updates = 0
-        withdrawals = 0
-        
-        for sp in orphans:
-            old_status = sp.sync_status or "PRESENT"
-            
-            if old_status == "PRESENT":
-                # First Miss -> MISSING_ONCE
-                sp.sync_status = "MISSING_ONCE"
-                self._log_change(sp, "STATUS_CHANGE", "PRESENT", "MISSING_ONCE")
-                updates += 1
-                
-            elif old_status == "MISSING_ONCE":
-                # Second Miss -> REMOVED (Confirmed)
-                sp.sync_status = "REMOVED"
-                self._log_change(sp, "STATUS_CHANGE", "MISSING_ONCE", "REMOVED")
-                
-                # Trigger Withdraw Logic
-                if self._trigger_withdraw(sp):
-                    withdrawals += 1
-                updates += 1
-                
-        # 2. Check for Reappearance (Healed items)
-        # Items seen this run BUT marked as MISSING/REMOVED
-        healed = self.db.query(SupplierProduct).filter(
-            SupplierProduct.supplier_id == supplier_id,
-            SupplierProduct.last_scraped_at >= current_run_timestamp,
-            SupplierProduct.sync_status.in_(["MISSING_ONCE", "REMOVED"])
-        ).all()
-        
-        for sp in healed:
-            old = sp.sync_status
-            sp.sync_status = "PRESENT"
-            self._log_change(sp, "STATUS_CHANGE", old, "PRESENT")
-            updates += 1
-
-        self.db.commit()
+        now = datetime.now(timezone.utc)
+        sp = SupplierProduct
+        if seen is not None:
+            seen.flush()
+            unseen, seen_now = seen.unseen_clause(), seen.seen_clause()
+        elif current_run_timestamp is not None:
+            unseen = and_(sp.supplier_id == supplier_id, sp.last_scraped_at < current_run_timestamp)
+            seen_now = and_(sp.supplier_id == supplier_id, sp.last_scraped_at >= current_run_timestamp)
+        else:
+            raise ValueError("process_orphans needs a SeenSet or the run start timestamp")
+
+        try:
+            # Order matters: confirm second misses before demoting first misses, so an item
+            # moves at most one step per run.
+            to_removed = and_(unseen, sp.sync_status == "MISSING_ONCE")
+            withdrawals = self._queue_withdraws(to_removed, now)
+            removed = self._transition(to_removed, literal("MISSING_ONCE"), "REMOVED", now, event=REMOVED)
+
+            to_missing = and_(unseen, or_(sp.sync_status.is_(None), sp.sync_status == "PRESENT"))
+            missing_once = self._transition(to_missing, literal("PRESENT"), "MISSING_ONCE", now)
+
+            # Reappearance (healed items): seen this run but marked as MISSING/REMOVED.
+            to_present = and_(seen_now, sp.sync_status.in_(["MISSING_ONCE", "REMOVED"]))
+            healed = self._transition(to_present, sp.sync_status, "PRESENT", now)
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        updates = removed + missing_once + healed
         print(f"Reconciliation Complete: {updates} Status Updates, {withdrawals} Withdrawals Triggered.")
+        return {"missing_once": missing_once, "removed": removed, "healed": healed, "withdrawals": withdrawals}
 
-    def _trigger_withdraw(self, sp: SupplierProduct) -> bool:
+    def _transition(self, where, old_value, new_status: str, now: datetime, event: Optional[str] = None) -> int:
         """
-        If this product is live on Trade Me, withdraw it.
+        Audit (and, with `event`, append a product_changes event for) every SupplierProduct
+        matching `where`, then move them to `new_status`; returns the row count.
         """
-        # Find linked Internal Product -> TradeMeListing
-        ip = sp.internal_product
-        if not ip:
-            return False
-            
-        for listing in ip.listings:
-            if listing.actual_state == "Live" and listing.tm_listing_id:
-                # Create Command
-                cmd_id = str(uuid.uuid4())
-                payload = {
-                    "reason": "Supplier Item Removed (Missing Confirmed)",
-                    # Worker expects listing_id
-                    "listing_id": str(listing.tm_listing_id)
-                }
-                cmd = SystemCommand(
-                    id=cmd_id,
-                    type="WITHDRAW_LISTING", # Handler needs to support this type
-                    payload=payload,
-                    status=CommandStatus.PENDING
+        sp = SupplierProduct
+        if event is not None:
+            self.db.execute(
+                insert(ProductChange).from_select(
+                    ["supplier_product_id", "supplier_id", "kind", "created_at"],
+                    select(sp.id, sp.supplier_id, literal(event), literal(now, DateTime())).where(where),
                 )
-                self.db.add(cmd)
-                print(f"   -> AUTO-WITHDRAW Queued for {listing.tm_listing_id}")
-                return True
-        return False
-
-    def _log_change(self, sp, action, old, new):
-        log = AuditLog(
-            entity_type="SupplierProduct",
-            entity_id=str(sp.id),
-            action=action,
-            old_value=old,
-            new_value=new,
-            user="ReconciliationEngine",
-            timestamp=datetime.now(timezone.utc)
+            )
+        audit = select(
+            literal("SupplierProduct"),
+            cast(sp.id, String),
+            literal("STATUS_CHANGE"),
+            old_value,
+            literal(new_status),
+            literal("ReconciliationEngine"),
+            literal(now, DateTime()),
+        ).where(where)
+        self.db.execute(
+            insert(AuditLog).from_select(
+                ["entity_type", "entity_id", "action", "old_value", "new_value", "user", "timestamp"], audit
+            )
         )
-        self.db.add(log)
+        result = self.db.execute(
+            update(sp).where(where).values(sync_status=new_status).execution_options(synchronize_session=False)
+        )
+        return int(result.rowcount or 0)
+
+    def _queue_withdraws(self, where, now: datetime) -> int:
+        """
+        Queue WITHDRAW_LISTING for every Live listing of the products matching `where`,
+        skipping listings that already have an active withdraw. One bulk insert.
+        """
+        listing_ids = {
+            str(lid)
+            for (lid,) in self.db.execute(
+                select(TradeMeListing.tm_listing_id)
+                .join(InternalProduct, InternalProduct.id == TradeMeListing.internal_product_id)
+                .join(SupplierProduct, SupplierProduct.id == InternalProduct.primary_supplier_product_id)
+                .where(where, TradeMeListing.actual_state == "Live", TradeMeListing.tm_listing_id.isnot(None))
+                .distinct()
+            )
+            if lid
+        }
+        if not listing_ids:
+            return 0
+
+        active = {
+            str(lid)
+            for (lid,) in self.db.execute(
+                select(SystemCommand.payload["listing_id"].as_string()).where(
+                    SystemCommand.type == "WITHDRAW_LISTING",
+                    SystemCommand.status.in_(_ACTIVE_COMMAND_STATUSES),
+                )
+            )
+            if lid
+        }
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "type": "WITHDRAW_LISTING",
+                # Worker expects listing_id
+                "payload": {"reason": WITHDRAW_REASON, "listing_id": lid},
+                "status": CommandStatus.PENDING,
+                "priority": 10,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for lid in sorted(listing_ids - active)
+        ]
+        if rows:
+            self.db.execute(insert(SystemCommand), rows)
+            print(f"   -> AUTO-WITHDRAW Queued for {len(rows)} listing(s)")
+        return len(rows)
@@ -106,6 +106,8 @@ class SpectatorScheduler:
                     "per_category": False,
                     "max_categories_per_supplier": 200,
                     "batch_size": 1,
+                    # Supplier-wide runs: "auto" = incremental (watermark) + periodic full sweep.
+                    "sync_mode": "auto",
                 },
             )
             self.interval_minutes = int(cfg.get("interval_minutes") or self.interval_minutes)
@@ -160,7 +162,12 @@ class SpectatorScheduler:
                     cmd = SystemCommand(
                         id=cmd_id,
                         type="SCRAPE_SUPPLIER",
-                        payload={"supplier_id": supplier.id, "supplier_name": supplier.name, "pages": int(cfg.get("batch_size", 1))},
+                        payload={
+                            "supplier_id": supplier.id,
+                            "supplier_name": supplier.name,
+                            "pages": int(cfg.get("batch_size", 1)),
+                            "sync_mode": str(cfg.get("sync_mode") or "auto"),
+                        },
                         status=CommandStatus.PENDING,
                         priority=int(cfg.get("priority", 50)),
                     )
@@ -398,6 +405,112 @@ class SpectatorScheduler:
             session.rollback()
         finally:
             session.close()
+
+    def images_job(self):
+        """
+        Keep the image download queue draining: enqueue DRAIN_IMAGE_QUEUE when jobs are pending
+        and no drain is already queued or running. PAUSED disables.
+        """
+        session = SessionLocal()
+        try:
+            store_mode = self._get_setting(session, "store.mode", {"mode": "NORMAL"})
+            mode = str(store_mode.get("mode", "NORMAL")).upper()
+            cfg = self._get_setting(
+                session,
+                "scheduler.images",
+                {"enabled": True, "interval_minutes": 5, "priority": 40},
+            )
+            if mode in ["PAUSED"]:
+                cfg["enabled"] = False
+            if not cfg.get("enabled", True):
+                logger.info(f"SCHEDULER: images_job disabled (store_mode={mode})")
+                return
+
+            from retail_os.core.image_queue import ensure_drain_command
+
+            if ensure_drain_command(session, priority=int(cfg.get("priority", 40))):
+                logger.info("SCHEDULER: Enqueued DRAIN_IMAGE_QUEUE")
+        except Exception as e:
+            logger.error(f"SCHEDULER: images job failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
+    
+    def audit_rollup_job(self):
+        """
+        Audit retention: roll AuditLog rows older than RETAILOS_AUDIT_RETENTION_DAYS (or the
+        scheduler.audit_rollup "retention_days" setting) into daily per-entity summaries.
+        """
+        session = SessionLocal()
+        try:
+            cfg = self._get_setting(session, "scheduler.audit_rollup", {"enabled": True, "retention_days": None})
+            if not cfg.get("enabled", True):
+                logger.info("SCHEDULER: audit_rollup_job disabled")
+                return
+
+            from retail_os.core.audit import rollup_audit_logs
+
+            retention = cfg.get("retention_days")
+            result = rollup_audit_logs(session, retention_days=int(retention) if retention else None)
+            if result["rows"]:
+                logger.info(
+                    f"SCHEDULER: Rolled up {result['rows']} audit rows into {result['rollups']} daily summaries "
+                    f"({result['days']} days)"
+                )
+        except Exception as e:
+            logger.error(f"SCHEDULER: audit rollup job failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    def change_feed_prune_job(self):
+        """Drop product_changes events past RETAILOS_CHANGE_FEED_RETENTION_DAYS that consumers have read."""
+        session = SessionLocal()
+        try:
+            from retail_os.core.change_feed import prune_changes
+
+            result = prune_changes(session)
+            if result["deleted"]:
+                logger.info(
+                    f"SCHEDULER: Pruned {result['deleted']} product change events (through id {result['pruned_through']})"
+                )
+        except Exception as e:
+            logger.error(f"SCHEDULER: change feed prune job failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    def media_index_job(self):
+        """Reconcile the media_files presence index with what is actually on disk."""
+        session = SessionLocal()
+        try:
+            from retail_os.core.media_index import reconcile_media_files
+
+            result = reconcile_media_files(session)
+            logger.info(
+                f"SCHEDULER: Media index verified {result['verified']} files "
+                f"(+{result['added']} indexed, -{result['removed']} missing)"
+            )
+        except Exception as e:
+            logger.error(f"SCHEDULER: media index job failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    def media_gc_job(self):
+        """Delete content-addressed media objects no product image points at any more."""
+        session = SessionLocal()
+        try:
+            from retail_os.core.media_store import gc_unreferenced_media
+
+            result = gc_unreferenced_media(session)
+            if result["removed"]:
+                logger.info(f"SCHEDULER: Removed {result['removed']} unreferenced media objects ({result['bytes_freed']} bytes)")
+        except Exception as e:
+            logger.error(f"SCHEDULER: media gc job failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
     
     def start(self):
         """Start the scheduler"""
@@ -436,6 +549,46 @@ class SpectatorScheduler:
             name="Sync Trade Me Selling Items",
             replace_existing=True,
         )
+
+        self.scheduler.add_job(
+            self.images_job,
+            trigger=IntervalTrigger(minutes=5),
+            id="drain_images",
+            name="Drain Image Queue",
+            replace_existing=True,
+        )
+
+        self.scheduler.add_job(
+            self.audit_rollup_job,
+            trigger=IntervalTrigger(hours=6),
+            id="audit_rollup",
+            name="Roll Up Old Audit Logs",
+            replace_existing=True,
+        )
+
+        self.scheduler.add_job(
+            self.change_feed_prune_job,
+            trigger=IntervalTrigger(hours=24),
+            id="change_feed_prune",
+            name="Prune Product Change Feed",
+            replace_existing=True,
+        )
+
+        self.scheduler.add_job(
+            self.media_gc_job,
+            trigger=IntervalTrigger(hours=24),
+            id="media_gc",
+            name="Remove Unreferenced Media",
+            replace_existing=True,
+        )
+
+        self.scheduler.add_job(
+            self.media_index_job,
+            trigger=IntervalTrigger(hours=6),
+            id="media_index",
+            name="Reconcile Media Index",
+            replace_existing=True,
+        )
         
         self.scheduler.start()
         logger.info("SCHEDULER: Started successfully")
@@ -445,6 +598,9 @@ class SpectatorScheduler:
         self.enrich_job()
         self.orders_job()
         self.trademe_sync_job()
+        self.images_job()
+        self.audit_rollup_job()
+        self.media_index_job()
     
     def stop(self):
         """Stop the scheduler"""
@@ -0,0 +1,208 @@
+"""
+Resumable scrape runs.
+
+A full OneCheq products.json sweep or Noel Leeming category walk used to start again from page 1
+after a worker crash or an operator cancel. The `scrape_runs` ledger records a cursor at every
+committed write batch:
+
+- OneCheq: {"collection", "page", "last_sku"} - every row of pages <= page is settled
+- Noel Leeming: {"categories": [...]} - categories whose rows are all settled
+
+"Settled" means written, dropped by normalize or failed; rows still in the pipeline hold the cursor
+back (`RunProgress`). With `resume=True` the next run picks up the latest unfinished run for the
+same supplier and scope and continues after its cursor. The run id is also the SeenSet run_id, so
+the SKUs seen before the interruption stay staged and reconciliation (deferred until the run is
+logically complete) still sees the whole catalog. A fresh run abandons older unfinished ones.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import ScrapeRun, ScrapeRunSeen
+from retail_os.core.seen_set import STALE_RUN_HOURS, SeenSet
+
+RESUMABLE_STATUSES = ("RUNNING", "INTERRUPTED")
+
+
+class RunProgress:
+    """
+    Per source unit (page, category) row accounting, thread-safe.
+    The source thread calls `feed` per row and `seal` once a unit has yielded all its rows;
+    pipeline stages call `settle` as rows finish. A unit is complete when sealed and fully settled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._units: dict[Hashable, list[int]] = {}  # key -> [fed, settled, failed]; insertion order
+        self._sealed: set = set()
+
+    def feed(self, key: Hashable) -> None:
+        with self._lock:
+            self._units.setdefault(key, [0, 0, 0])[0] += 1
+
+    def seal(self, key: Hashable) -> None:
+        with self._lock:
+            self._units.setdefault(key, [0, 0, 0])
+            self._sealed.add(key)
+
+    def seal_all(self) -> None:
+        with self._lock:
+            self._sealed.update(self._units)
+
+    def settle(self, key: Hashable, failed: bool = False) -> None:
+        with self._lock:
+            unit = self._units.setdefault(key, [0, 0, 0])
+            unit[1] += 1
+            if failed:
+                unit[2] += 1
+
+    def _complete(self, key: Hashable) -> bool:
+        fed, settled, _ = self._units[key]
+        return key in self._sealed and settled >= fed
+
+    def completed_prefix(self) -> tuple[Optional[Hashable], int, int]:
+        """(last key of the longest complete run of units in feed order, rows, failed)."""
+        last, rows, failed = None, 0, 0
+        with self._lock:
+            for key, (fed, _settled, nfailed) in self._units.items():
+                if not self._complete(key):
+                    break
+                last, rows, failed = key, rows + fed, failed + nfailed
+        return last, rows, failed
+
+    def completed(self) -> tuple[list, int, int]:
+        """(every complete unit, rows, failed)."""
+        keys, rows, failed = [], 0, 0
+        with self._lock:
+            for key, (fed, _settled, nfailed) in self._units.items():
+                if self._complete(key):
+                    keys.append(key)
+                    rows, failed = rows + fed, failed + nfailed
+        return keys, rows, failed
+
+
+class ScrapeRunLedger:
+    """One `scrape_runs` row; see module docstring. Use `start` to open (or resume) a run."""
+
+    def __init__(self, db: Session, run: ScrapeRun, resumed: bool = False):
+        self.db = db
+        self.id = run.id
+        self.supplier_id = int(run.supplier_id)
+        self.scope = run.scope
+        self.params = dict(run.params or {})
+        self.cursor = dict(run.cursor or {})
+        # Rows settled by earlier attempts (up to the cursor); this attempt's rows add to them.
+        self.base_rows = int(run.rows_done or 0)
+        self.base_failed = int(run.rows_failed or 0)
+        self.resumed = resumed
+        self.progress = RunProgress()
+
+    @classmethod
+    def start(
+        cls,
+        db: Session,
+        supplier_id: int,
+        scope: str,
+        params: Optional[dict] = None,
+        command_id: Optional[str] = None,
+        resume: bool = False,
+    ) -> "ScrapeRunLedger":
+        """
+        Resume the latest unfinished run for (supplier, scope) when `resume` is set and its staged
+        SKUs are still retained; otherwise abandon unfinished runs and open a new one.
+        """
+        now = datetime.now(timezone.utc)
+        unfinished = (
+            db.query(ScrapeRun)
+            .filter(
+                ScrapeRun.supplier_id == int(supplier_id),
+                ScrapeRun.scope == str(scope),
+                ScrapeRun.status.in_(RESUMABLE_STATUSES),
+            )
+            .order_by(ScrapeRun.updated_at.desc())
+            .all()
+        )
+        if resume and unfinished:
+            run = unfinished[0]
+            updated = run.updated_at if run.updated_at.tzinfo else run.updated_at.replace(tzinfo=timezone.utc)
+            if updated >= now - timedelta(hours=STALE_RUN_HOURS):
+                run.status = "RUNNING"
+                run.attempts = int(run.attempts or 1) + 1
+                run.command_id = command_id or run.command_id
+                run.updated_at = now
+                db.commit()
+                print(f"ScrapeRun: resuming {run.id} ({scope}) at {run.cursor or 'the start'}")
+                return cls(db, run, resumed=True)
+            print(f"ScrapeRun: {run.id} is older than {STALE_RUN_HOURS}h; starting over.")
+
+        for old in unfinished:
+            old.status = "ABANDONED"
+            old.finished_at = now
+            db.execute(delete(ScrapeRunSeen).where(ScrapeRunSeen.run_id == old.id))
+        run = ScrapeRun(
+            id=str(uuid.uuid4()),
+            supplier_id=int(supplier_id),
+            scope=str(scope),
+            status="RUNNING",
+            command_id=command_id,
+            params=dict(params or {}),
+            cursor={},
+            started_at=now,
+            updated_at=now,
+        )
+        db.add(run)
+        db.commit()
+        return cls(db, run)
+
+    def seen_set(self, **kwargs) -> SeenSet:
+        """The run's SeenSet (run_id = ledger id); a resumed run reloads its staged SKUs."""
+        seen = SeenSet(self.db, self.supplier_id, run_id=self.id, **kwargs)
+        if self.resumed:
+            seen.restore()
+        return seen
+
+    def _set(self, **values: Any) -> None:
+        try:
+            self.db.execute(
+                update(ScrapeRun)
+                .where(ScrapeRun.id == self.id)
+                .values(updated_at=datetime.now(timezone.utc), **values)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"ScrapeRun: failed to update {self.id}: {e}")
+
+    def checkpoint(self, cursor: dict, rows: int, failed: int, seen: Optional[SeenSet] = None) -> bool:
+        """
+        Persist `cursor`; this attempt's settled `rows` / `failed` (not upserted) add to earlier
+        attempts'. `seen` is flushed first: a cursor must never get ahead of the staged SKUs.
+        Returns False when nothing was written.
+        """
+        cursor = dict(cursor)
+        if cursor == self.cursor:
+            return False
+        if seen is not None:
+            seen.flush()
+            if seen.pending:
+                return False
+        self.cursor = cursor
+        self._set(cursor=cursor, rows_done=self.base_rows + int(rows), rows_failed=self.base_failed + int(failed))
+        return True
+
+    def interrupt(self, seen: Optional[SeenSet] = None) -> None:
+        """Cancelled: keep the cursor and the staged SKUs for a later resume."""
+        if seen is not None:
+            seen.flush()
+        self._set(status="INTERRUPTED")
+
+    def complete(self) -> None:
+        self._set(status="COMPLETED", finished_at=datetime.now(timezone.utc))
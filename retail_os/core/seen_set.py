@@ -0,0 +1,181 @@
+"""
+Per-run seen sets for reconciliation.
+
+Reconciliation used to treat "last_scraped_at < run start" as "not seen this run". That forced a
+timestamp write to every seen row (even unchanged ones) and made any partial or
+collection-scoped scrape flag the rest of the catalog as missing.
+
+A `SeenSet` instead records the SKUs a run saw in the `scrape_run_seen` staging table (buffered,
+one executemany per RETAILOS_SEEN_BATCH SKUs). `ReconciliationEngine.process_orphans(..., seen=...)`
+then finds orphans with an anti-join (NOT EXISTS) limited to the scope the run covered:
+
+- scopes=None: the supplier's whole catalog (e.g. a complete OneCheq /collections/all sweep)
+- scopes=[...]: products whose source_category is one of these (collection handle, browse URL)
+- scopes=OBSERVED: the source_category values of the products the run actually saw
+
+Runs that did not page to the end of their scope (`complete=False`) skip reconciliation.
+`finish()` stamps last_scraped_at on every seen row in one UPDATE (publish freshness checks still
+read it) and deletes the run's staging rows. Runs recorded in the `scrape_runs` ledger reuse
+their ledger id as run_id and keep their staging rows across a crash (see retail_os.core.scrape_runs).
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Sequence, Union
+
+from sqlalchemy import and_, delete, exists, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from retail_os.core.database import ScrapeRun, ScrapeRunSeen, SupplierProduct
+
+OBSERVED = "observed"
+
+# Staging rows of runs that crashed before finish() are purged after this long
+# (unfinished ledger runs only once they have not been touched for as long).
+STALE_RUN_HOURS = 48
+
+
+def seen_batch_size() -> int:
+    try:
+        n = int(os.getenv("RETAILOS_SEEN_BATCH", "1000") or "1000")
+    except ValueError:
+        n = 1000
+    return max(50, min(20000, n))
+
+
+class SeenSet:
+    """SKUs seen by one scrape run of one supplier; see module docstring."""
+
+    def __init__(
+        self,
+        db: Session,
+        supplier_id: int,
+        run_id: Optional[str] = None,
+        scopes: Union[None, str, Sequence[str]] = None,
+        complete: bool = True,
+    ):
+        self.db = db
+        self.supplier_id = int(supplier_id)
+        self.run_id = str(run_id or uuid.uuid4())
+        self.scopes = scopes if scopes is None or scopes == OBSERVED else [str(s) for s in scopes if s]
+        self.complete = complete
+        self._batch = seen_batch_size()
+        self._recorded: set[str] = set()
+        self._pending: dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._recorded) + len(self._pending)
+
+    @property
+    def pending(self) -> int:
+        """SKUs added but not yet written to the staging table."""
+        return len(self._pending)
+
+    def add(self, skus: Iterable[str]) -> None:
+        """
+        Record `skus` as seen. Flushes (and commits) once RETAILOS_SEEN_BATCH SKUs are pending,
+        so call it after the caller's own writes are committed.
+        """
+        for raw in skus:
+            sku = str(raw or "").strip()
+            if sku and sku not in self._recorded:
+                self._pending[sku] = None
+                if len(self._pending) >= self._batch:
+                    self.flush()
+
+    def restore(self) -> int:
+        """Reload SKUs already staged under this run_id (resumed runs). Returns how many."""
+        self._recorded.update(
+            sku for (sku,) in self.db.execute(select(ScrapeRunSeen.external_sku).where(ScrapeRunSeen.run_id == self.run_id))
+        )
+        return len(self._recorded)
+
+    def flush(self) -> int:
+        """Insert pending SKUs in one executemany and commit. Returns rows written."""
+        if not self._pending:
+            return 0
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"run_id": self.run_id, "external_sku": sku, "supplier_id": self.supplier_id, "created_at": now}
+            for sku in self._pending
+        ]
+        try:
+            self.db.execute(insert(ScrapeRunSeen), rows)
+            self.db.commit()
+        except Exception as e:
+            # Keep them pending; the next flush (or finish) retries.
+            self.db.rollback()
+            print(f"SeenSet: failed to record {len(rows)} SKUs for run {self.run_id}: {e}")
+            return 0
+        self._recorded.update(self._pending)
+        self._pending.clear()
+        return len(rows)
+
+    def _seen_row(self):
+        return exists().where(
+            ScrapeRunSeen.run_id == self.run_id,
+            ScrapeRunSeen.external_sku == SupplierProduct.external_sku,
+        )
+
+    def _scope_clause(self):
+        if self.scopes is None:
+            return None
+        if self.scopes == OBSERVED:
+            covered = aliased(SupplierProduct)
+            observed = (
+                select(covered.source_category)
+                .join(
+                    ScrapeRunSeen,
+                    and_(ScrapeRunSeen.run_id == self.run_id, ScrapeRunSeen.external_sku == covered.external_sku),
+                )
+                .where(covered.supplier_id == self.supplier_id, covered.source_category.isnot(None))
+                .distinct()
+            )
+            return SupplierProduct.source_category.in_(observed)
+        return SupplierProduct.source_category.in_(self.scopes)
+
+    def seen_clause(self):
+        """WHERE clause: this supplier's products seen by the run."""
+        return and_(SupplierProduct.supplier_id == self.supplier_id, self._seen_row())
+
+    def unseen_clause(self):
+        """WHERE clause (anti-join): this supplier's in-scope products the run did not see."""
+        clause = and_(SupplierProduct.supplier_id == self.supplier_id, ~self._seen_row())
+        scope = self._scope_clause()
+        return clause if scope is None else and_(clause, scope)
+
+    def finish(self, stamp: bool = True) -> int:
+        """
+        Flush, stamp last_scraped_at on every seen row (one UPDATE), drop the run's staging rows
+        and any left behind by crashed runs. Returns the number of rows stamped.
+        """
+        self.flush()
+        now = datetime.now(timezone.utc)
+        stamped = 0
+        try:
+            if stamp and self._recorded:
+                result = self.db.execute(
+                    update(SupplierProduct)
+                    .where(self.seen_clause())
+                    .values(last_scraped_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                stamped = int(result.rowcount or 0)
+            cutoff = now - timedelta(hours=STALE_RUN_HOURS)
+            resumable = select(ScrapeRun.id).where(
+                ScrapeRun.status.in_(["RUNNING", "INTERRUPTED"]), ScrapeRun.updated_at >= cutoff
+            )
+            self.db.execute(
+                delete(ScrapeRunSeen).where(
+                    (ScrapeRunSeen.run_id == self.run_id)
+                    | ((ScrapeRunSeen.created_at < cutoff) & ScrapeRunSeen.run_id.not_in(resumable))
+                )
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"SeenSet: failed to finish run {self.run_id}: {e}")
+        return stamped
@@ -0,0 +1,388 @@
+"""
+Synthetic catalog generator for scale tests (10k / 100k / 500k products).
+
+Seeds a database with realistically distributed rows across the hot tables:
+SupplierProduct + InternalProduct (one per product), TradeMeListing (a share of products),
+ListingMetricSnapshot (daily view/watch snapshots per listing), Order (a share of listings),
+SystemCommand + CommandLog (operator/worker history).
+
+Every product's attributes are derived from (seed, index) alone, so the same spec can also emit a
+matching fake Shopify catalog (`write_shopify_cassette`): replaying it with
+`scripts/bench_replay.py run` makes the OneCheq sync see exactly the products in the seeded DB.
+Rows are filed under their own supplier (SYNTHETIC) so they can never be mistaken for, or merged
+into, a real catalog; seed with supplier="ONECHEQ" for a replay that updates the seeded rows.
+
+Rows are inserted with Core executemany in chunks (explicit ids continue after the current
+max id), so 500k products fit in memory and seed in minutes on SQLite.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from retail_os.core.database import (
+    CommandLog,
+    CommandStatus,
+    InternalProduct,
+    ListingMetricSnapshot,
+    ListingState,
+    Order,
+    Supplier,
+    SupplierProduct,
+    SystemCommand,
+    TradeMeListing,
+)
+
+# Shopify collections with Zipf-ish popularity (first = most products).
+COLLECTIONS = [
+    "smartphones-and-mobilephones",
+    "laptops",
+    "tools",
+    "gaming",
+    "audio",
+    "cameras",
+    "jewellery-watches",
+    "home-appliances",
+    "musical-instruments",
+    "sports-outdoors",
+    "tablets",
+    "collectables",
+]
+_COLLECTION_WEIGHTS = [1.0 / (rank + 1) ** 0.8 for rank in range(len(COLLECTIONS))]
+_BRANDS = ["Apple", "Samsung", "Sony", "DeWalt", "Makita", "Nintendo", "Canon", "Bose", "Dyson", "Garmin", "Yamaha", "HP"]
+_NOUNS = ["Phone", "Laptop", "Drill", "Console", "Headphones", "Camera", "Watch", "Vacuum", "Guitar", "Tablet", "Speaker", "Lens"]
+_CONDITIONS = (["Used"] * 70) + (["Refurbished"] * 20) + (["New"] * 10)
+_COMMAND_TYPES = [
+    ("SCRAPE_SUPPLIER", 20),
+    ("ENRICH_SUPPLIER", 15),
+    ("PUBLISH_LISTING", 30),
+    ("SYNC_SOLD_ITEMS", 10),
+    ("DRAIN_IMAGE_QUEUE", 15),
+    ("UPDATE_PRICE", 10),
+]
+_LOG_MESSAGES = [
+    "EVENT cmd_id={cmd} phase=start",
+    "Scrape: {n}/{total} upserted",
+    "HTTP_RATES host=onecheq.co.nz rps=4.5",
+    "IMAGE_QUEUE_DRAIN progress done={n}",
+    "Adapter: product {n} unchanged",
+    "EVENT cmd_id={cmd} phase=end status=SUCCEEDED",
+]
+
+
+@dataclass
+class SyntheticCatalogSpec:
+    products: int = 10_000
+    seed: int = 0
+    supplier: str = "SYNTHETIC"
+    # Share of products that have a Trade Me listing, and of those, how many are Live.
+    listed_ratio: float = 0.6
+    live_ratio: float = 0.7
+    # Daily metric snapshots per listing.
+    metric_days: int = 14
+    # Share of listings with an order.
+    order_ratio: float = 0.08
+    # Command history (default: one per 20 products) and log lines per command.
+    commands: Optional[int] = None
+    logs_per_command: int = 40
+    chunk: int = 5_000
+    now: Optional[datetime] = None
+
+    @property
+    def command_count(self) -> int:
+        return self.commands if self.commands is not None else max(1, self.products // 20)
+
+
+def synthetic_product(index: int, seed: int = 0) -> dict:
+    """Deterministic attributes for product `index` (shared by the DB seed and the fake Shopify catalog)."""
+    rng = random.Random(seed * 1_000_003 + index)
+    brand = rng.choice(_BRANDS)
+    noun = rng.choice(_NOUNS)
+    # Log-normal prices: median ~$45, long tail into the thousands.
+    price = round(min(20_000.0, max(1.0, rng.lognormvariate(3.8, 1.0))), 2)
+    n_images = rng.choices([0, 1, 2, 3, 4], weights=[3, 30, 30, 20, 17])[0]
+    handle = f"synthetic-{noun.lower()}-{index:07d}"
+    return {
+        "index": index,
+        "id": 7_000_000_000 + index,
+        "handle": handle,
+        "title": f"{brand} {noun} {rng.randint(1, 99)} {rng.choice(['Pro', 'Max', 'Lite', 'Plus', 'Mini', ''])}".strip(),
+        "brand": brand,
+        "product_type": noun,
+        "condition": rng.choice(_CONDITIONS),
+        "price": price,
+        "available": rng.random() < 0.85,
+        "collection": rng.choices(COLLECTIONS, weights=_COLLECTION_WEIGHTS)[0],
+        "images": [f"https://cdn.shopify.com/s/files/1/0000/synthetic/{handle}_{i}.jpg" for i in range(1, n_images + 1)],
+        "description": f"<p>{brand} {noun} in {rng.choice(['good', 'great', 'fair', 'excellent'])} condition.</p>",
+        "updated_days_ago": rng.randint(0, 120),
+    }
+
+
+def _shopify_json(p: dict, now: datetime) -> dict:
+    updated = (now - timedelta(days=p["updated_days_ago"])).isoformat()
+    return {
+        "id": p["id"],
+        "handle": p["handle"],
+        "title": p["title"],
+        "body_html": p["description"],
+        "vendor": f"Condition: {p['condition']}" if p["condition"] != "New" else p["brand"],
+        "product_type": p["product_type"],
+        "updated_at": updated,
+        "variants": [{"id": p["id"] + 1, "sku": f"{p['index']:07d}", "price": f"{p['price']:.2f}", "available": p["available"]}],
+        "images": [{"src": f"{src}?v=1"} for src in p["images"]],
+    }
+
+
+def _next_id(session: Session, model) -> int:
+    return int(session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _chunks(total: int, size: int) -> Iterator[range]:
+    for start in range(0, total, size):
+        yield range(start, min(total, start + size))
+
+
+def _supplier_id(session: Session, name: str) -> int:
+    supplier = session.query(Supplier).filter_by(name=name).first()
+    if supplier is None:
+        base_url = "https://onecheq.co.nz" if name == "ONECHEQ" else "https://synthetic.invalid"
+        supplier = Supplier(name=name, base_url=base_url, is_active=True)
+        session.add(supplier)
+        session.flush()
+    return int(supplier.id)
+
+
+def seed_database(
+    session: Session,
+    spec: SyntheticCatalogSpec,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> dict[str, int]:
+    """Insert the synthetic catalog described by `spec`. Returns row counts per table."""
+    now = spec.now or datetime.now(timezone.utc)
+    rng = random.Random(spec.seed)
+    supplier_id = _supplier_id(session, spec.supplier)
+    prefix = "OC" if spec.supplier == "ONECHEQ" else spec.supplier[:3]
+
+    sp_id = _next_id(session, SupplierProduct)
+    ip_id = _next_id(session, InternalProduct)
+    listing_id = _next_id(session, TradeMeListing)
+    metric_id = _next_id(session, ListingMetricSnapshot)
+    order_id = _next_id(session, Order)
+    counts = {"supplier_products": 0, "internal_products": 0, "listings": 0, "metrics": 0, "orders": 0, "commands": 0, "command_logs": 0}
+
+    for block in _chunks(spec.products, spec.chunk):
+        sps, ips, listings, metrics, orders = [], [], [], [], []
+        for i in block:
+            p = synthetic_product(i, spec.seed)
+            scraped_at = now - timedelta(hours=rng.uniform(0, 48))
+            sync_status = rng.choices(["PRESENT", "MISSING_ONCE", "REMOVED"], weights=[95, 3, 2])[0]
+            enrichment = rng.choices(["SUCCESS", "PENDING", "FAILED"], weights=[50, 45, 5])[0]
+            sps.append(
+                {
+                    "id": sp_id,
+                    "supplier_id": supplier_id,
+                    "external_sku": p["handle"],
+                    "title": p["title"],
+                    "description": p["description"],
+                    "brand": p["brand"],
+                    "condition": p["condition"],
+                    "cost_price": p["price"],
+                    "stock_level": None,
+                    "product_url": f"https://onecheq.co.nz/products/{p['handle']}",
+                    "images": p["images"],
+                    "specs": {"Vendor": p["brand"], "ProductType": p["product_type"], "Condition": p["condition"]},
+                    "enrichment_status": enrichment,
+                    "enriched_title": p["title"] if enrichment == "SUCCESS" else None,
+                    "enriched_description": p["description"] if enrichment == "SUCCESS" else None,
+                    "last_scraped_at": scraped_at,
+                    "snapshot_hash": f"{p['index']:032x}",
+                    "sync_status": sync_status,
+                    "source_category": p["collection"],
+                    "source_categories": [p["collection"]],
+                    "collection_rank": i + 1,
+                    "collection_page": i // 250 + 1,
+                }
+            )
+            ips.append({"id": ip_id, "sku": f"{prefix}-{p['handle']}", "title": p["title"], "primary_supplier_product_id": sp_id})
+
+            if rng.random() < spec.listed_ratio:
+                live = rng.random() < spec.live_ratio
+                # Heavy-tailed popularity: most listings get a handful of views, a few get thousands.
+                views = int(min(50_000, rng.paretovariate(1.3) * 5))
+                watches = int(views * rng.uniform(0.0, 0.1))
+                markup = rng.uniform(1.15, 1.6)
+                listings.append(
+                    {
+                        "id": listing_id,
+                        "internal_product_id": ip_id,
+                        "tm_listing_id": f"SYN{listing_id:09d}" if live else None,
+                        "desired_price": round(p["price"] * markup, 2),
+                        "actual_price": round(p["price"] * markup, 2),
+                        "desired_state": "Live" if live else "Withdrawn",
+                        "actual_state": "Live" if live else rng.choice(["DRY_RUN", "Withdrawn"]),
+                        "last_synced_at": now - timedelta(hours=rng.uniform(0, 72)),
+                        "lifecycle_state": rng.choices(list(ListingState), weights=[30, 25, 25, 12, 5, 3])[0],
+                        "is_locked": rng.random() < 0.02,
+                        "view_count": views,
+                        "watch_count": watches,
+                        "category_id": f"0{rng.randint(1000, 9999)}",
+                    }
+                )
+                for day in range(spec.metric_days):
+                    frac = (day + 1) / spec.metric_days
+                    metrics.append(
+                        {
+                            "id": metric_id,
+                            "listing_id": listing_id,
+                            "captured_at": now - timedelta(days=spec.metric_days - 1 - day),
+                            "view_count": int(views * frac),
+                            "watch_count": int(watches * frac),
+                            "is_sold": False,
+                        }
+                    )
+                    metric_id += 1
+                if rng.random() < spec.order_ratio:
+                    sold = now - timedelta(days=rng.uniform(0, 60))
+                    shipped = rng.random() < 0.8
+                    orders.append(
+                        {
+                            "id": order_id,
+                            "tm_order_ref": f"SYN-ORD-{order_id:09d}",
+                            "tm_listing_id": listing_id,
+                            "sold_price": round(p["price"] * markup, 2),
+                            "sold_date": sold,
+                            "buyer_name": f"Buyer {order_id}",
+                            "buyer_email": f"buyer{order_id}@example.invalid",
+                            "shipping_address": "1 Synthetic Street, Auckland",
+                            "order_status": rng.choices(["CONFIRMED", "PENDING", "CANCELLED"], weights=[85, 10, 5])[0],
+                            "payment_status": "PAID" if shipped else "PENDING",
+                            "fulfillment_status": "SHIPPED" if shipped else "PENDING",
+                            "shipped_date": sold + timedelta(days=1) if shipped else None,
+                            "created_at": sold,
+                            "updated_at": sold,
+                        }
+                    )
+                    order_id += 1
+                listing_id += 1
+            sp_id += 1
+            ip_id += 1
+
+        for model, rows, key in (
+            (SupplierProduct, sps, "supplier_products"),
+            (InternalProduct, ips, "internal_products"),
+            (TradeMeListing, listings, "listings"),
+            (ListingMetricSnapshot, metrics, "metrics"),
+            (Order, orders, "orders"),
+        ):
+            if rows:
+                session.execute(model.__table__.insert(), rows)
+                counts[key] += len(rows)
+        session.commit()
+        if progress:
+            progress("products", block.stop, spec.products)
+
+    types = [t for t, _ in _COMMAND_TYPES]
+    weights = [w for _, w in _COMMAND_TYPES]
+    for block in _chunks(spec.command_count, max(1, spec.chunk // max(1, spec.logs_per_command))):
+        commands, logs = [], []
+        for _ in block:
+            cmd_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            created = now - timedelta(minutes=rng.uniform(0, 60 * 24 * 30))
+            # History only: never PENDING/retryable, or a running worker would pick the rows up.
+            status = rng.choices(
+                [CommandStatus.SUCCEEDED, CommandStatus.FAILED_FATAL, CommandStatus.HUMAN_REQUIRED, CommandStatus.CANCELLED],
+                weights=[90, 5, 2, 3],
+            )[0]
+            commands.append(
+                {
+                    "id": cmd_id,
+                    "type": rng.choices(types, weights=weights)[0],
+                    "payload": {"supplier_name": spec.supplier, "synthetic": True},
+                    "status": status,
+                    "priority": rng.choice([10, 40, 50, 60]),
+                    "attempts": 1,
+                    "last_error": "synthetic failure" if status == CommandStatus.FAILED_FATAL else None,
+                    "created_at": created,
+                    "updated_at": created + timedelta(seconds=rng.uniform(1, 900)),
+                }
+            )
+            n_logs = max(1, int(rng.expovariate(1.0 / max(1, spec.logs_per_command))))
+            for n in range(n_logs):
+                logs.append(
+                    {
+                        "command_id": cmd_id,
+                        "created_at": created + timedelta(seconds=n),
+                        "level": "ERROR" if rng.random() < 0.01 else "INFO",
+                        "logger": "retail_os.worker",
+                        "message": rng.choice(_LOG_MESSAGES).format(cmd=cmd_id, n=n, total=n_logs),
+                    }
+                )
+        session.execute(SystemCommand.__table__.insert(), commands)
+        session.execute(CommandLog.__table__.insert(), logs)
+        session.commit()
+        counts["commands"] += len(commands)
+        counts["command_logs"] += len(logs)
+        if progress:
+            progress("commands", counts["commands"], spec.command_count)
+
+    return counts
+
+
+def shopify_pages(products: list[dict], now: datetime, page_size: int = 250) -> Iterator[tuple[int, dict]]:
+    """`(page, products.json body)` pages for `products`, ending with Shopify's empty page."""
+    pages = max(1, math.ceil(len(products) / page_size))
+    for page in range(1, pages + 2):
+        chunk = products[(page - 1) * page_size : page * page_size]
+        yield page, {"products": [_shopify_json(p, now) for p in chunk]}
+
+
+def write_shopify_cassette(
+    directory: str,
+    spec: SyntheticCatalogSpec,
+    base_url: str = "https://onecheq.co.nz",
+    page_size: int = 250,
+    latency_ms: float = 150.0,
+) -> int:
+    """
+    Write the spec's catalog as a replayable cassette (see retail_os.utils.http_cassette):
+    collections.json, /collections/all/products.json and per-collection products.json pages.
+    Returns the number of responses written.
+    """
+    from retail_os.utils.http_cassette import Cassette
+
+    now = spec.now or datetime.now(timezone.utc)
+    cassette = Cassette(directory)
+    headers = {"content-type": "application/json; charset=utf-8"}
+    base = base_url.rstrip("/")
+    products = [synthetic_product(i, spec.seed) for i in range(spec.products)]
+    by_collection: dict[str, list[dict]] = {c: [] for c in COLLECTIONS}
+    for p in products:
+        by_collection[p["collection"]].append(p)
+
+    written = 0
+
+    def _put(url: str, body: dict) -> None:
+        nonlocal written
+        cassette.record("GET", url, 200, headers, json.dumps(body).encode("utf-8"), latency_ms / 1000.0)
+        written += 1
+
+    collections = [
+        {"id": 9_000 + n, "handle": c, "title": c.replace("-", " ").title(), "products_count": len(by_collection[c]), "updated_at": now.isoformat()}
+        for n, c in enumerate(COLLECTIONS)
+    ]
+    _put(f"{base}/collections.json?limit=250&page=1", {"collections": collections})
+    _put(f"{base}/collections.json?limit=250&page=2", {"collections": []})
+    for handle, members in [("all", products)] + list(by_collection.items()):
+        for page, body in shopify_pages(members, now, page_size):
+            _put(f"{base}/collections/{handle}/products.json?limit={page_size}&page={page}", body)
+    return written
@@ -95,11 +95,10 @@ class TrustEngine:
                 blockers.append("Placeholder Image Detected")
                 breakdown["Images"] = "FAILED (Placeholder)"
             else:
-                # Physical verification for local images
-                import os
-                physical_verified = False
-                if os.path.exists(img_path):
-                    physical_verified = True
+                # Physical verification for local images (media_files index)
+                from retail_os.core.media_index import present_media_paths
+
+                physical_verified = bool(present_media_paths(self.db, [str(img_path)]))
                 
                 if not physical_verified and any('data/media' in str(img) for img in sp.images):
                     # Local path expected but file missing
@@ -78,6 +78,9 @@ class UnifiedProduct(TypedDict, total=False):
     collection_rank: int
     collection_page: int
 
+    # Incremental sync (OneCheq Shopify updated_at)
+    source_updated_at: str
+
 def normalize_noel_leeming_row(nl_row: dict) -> UnifiedProduct:
     """Convert Noel Leeming V1 scraper raw output to UnifiedProduct."""
     price = str(nl_row.get("price", 0.0))
@@ -154,5 +157,6 @@ def normalize_onecheq_row(oc_row: dict) -> UnifiedProduct:
         # Extra fields (passed through for Adapter)
         "collection_rank": oc_row.get("collection_rank"),
         "collection_page": oc_row.get("collection_page"),
+        "source_updated_at": oc_row.get("source_updated_at"),
     }
 
@@ -10,6 +10,7 @@ from retail_os.core.trust import TrustEngine, TrustReport
 from retail_os.strategy.policy import PolicyEngine
 from retail_os.strategy.pricing import PricingStrategy
 from retail_os.core.category_mapper import CategoryMapper
+from retail_os.core.media_index import local_images
 import json
 
 class LaunchLock:
@@ -48,19 +49,8 @@ class LaunchLock:
         if not (sp.enriched_description or "").strip():
             raise ValueError("Missing enriched description (run enrichment)")
 
-        # Require at least one local image file.
-        imgs = sp.images or []
-        if isinstance(imgs, str):
-            try:
-                imgs = json.loads(imgs)
-            except Exception:
-                imgs = [imgs]
-        has_local = False
-        for img in imgs:
-            if isinstance(img, str) and os.path.exists(img):
-                has_local = True
-                break
-        if not has_local:
+        # Require at least one local image file (media_files index).
+        if not local_images(self.session, sp.images):
             raise ValueError("Missing images: no local product image downloaded (blocked)")
 
         # Require mappable category.
@@ -4,20 +4,24 @@ from sqlalchemy.orm import Session
 from retail_os.core.database import (
     SupplierProduct, InternalProduct, TradeMeListing, 
     JobStatus, Order, SystemCommand, CommandStatus,
-    AuditLog
 )
+from retail_os.core.audit import AuditBuffer
 
 def log_audit(session, action, entity_type, entity_id, old_val=None, new_val=None):
-    """Helper to write audit log entry."""
-    entry = AuditLog(
-        action=action,
-        entity_type=entity_type,
-        entity_id=str(entity_id),
+    """
+    Helper to write audit log entry, through the same AuditBuffer insert path as the adapters.
+    Flushed into `session` right away: the row commits (or rolls back) with the caller's change.
+    """
+    buf = AuditBuffer()
+    buf.record(
+        entity_type,
+        entity_id,
+        action,
         old_value=str(old_val) if old_val else None,
         new_value=str(new_val) if new_val else None,
-        user="SYSTEM"
+        user="SYSTEM",
     )
-    session.add(entry)
+    buf.flush(session)
 
 # === VALIDATOR RELOCATION (User Request) ===
 from retail_os.core.validator import LaunchLock as _LaunchLock
@@ -1,5 +1,5 @@
 import re
-import httpx
+from retail_os.utils.http_clients import get_http_client
 from typing import List, Tuple, Dict
 
 def sanitize_description(raw_text: str) -> str:
@@ -52,7 +52,7 @@ def verify_images(image_urls: List[str]) -> Tuple[bool, List[Dict]]:
     results = []
     all_ok = True
     
-    client = httpx.Client(timeout=5.0)
+    client = get_http_client("probe")
     
     for url in image_urls:
         try:
@@ -75,6 +75,5 @@ def verify_images(image_urls: List[str]) -> Tuple[bool, List[Dict]]:
         except Exception as e:
             results.append({"status": "EXCEPTION", "url": url, "error": str(e)})
             all_ok = False
-            
-    client.close()
+
     return all_ok, results
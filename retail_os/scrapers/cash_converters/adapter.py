@@ -12,7 +12,11 @@ from datetime import datetime, timezone
 import hashlib
 import json
 
+from retail_os.core.audit import AuditBuffer
+from retail_os.core.change_feed import NEW, ChangeBuffer, change_kinds
 from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, InternalProduct
+from retail_os.core.enrichment_fingerprint import mark_enrichment_stale
+from retail_os.core.field_hashes import apply_field_hashes, field_group_hashes
 from retail_os.utils.seo import build_seo_description
 
 class CashConvertersAdapter:
@@ -32,6 +36,8 @@ class CashConvertersAdapter:
             self.db.add(supplier)
             self.db.commit()
         self.supplier_id = supplier.id
+        self.audit = AuditBuffer()
+        self.changes = ChangeBuffer(self.supplier_id)
 
     def normalize_row(self, raw: dict) -> dict:
         """
@@ -59,25 +65,21 @@ class CashConvertersAdapter:
         browse_url: str = "https://shop.cashconverters.co.nz/Browse/R160787-R160789/North_Island-Auckland",
     ):
         print(f"CC Adapter: Starting Sync for {self.supplier_name}...")
-        sync_start_time = datetime.now(timezone.utc)
         
         # 1. Discover product URLs
-        from scripts.discover_category import discover_cash_converters_urls
-        from retail_os.scrapers.cash_converters.scraper import scrape_single_item
+        from scripts.discover_category import discover_cash_converters
+        from retail_os.scrapers.cash_converters.scraper import scrape_items
+        from retail_os.core.seen_set import SeenSet
         
-        urls = discover_cash_converters_urls(browse_url, max_pages=pages)
-        enhanced_items = []
-        for url in urls:
-            try:
-                item = scrape_single_item(url)
-                if item:
-                    enhanced_items.append(item)
-            except Exception as e:
-                print(f"CC scrape failed for {url}: {e}")
+        urls, reached_end = discover_cash_converters(browse_url, max_pages=pages)
+        enhanced_items = list(scrape_items(urls))
         
         print(f"CC Adapter: Got {len(enhanced_items)} items with deep extraction. Processing...")
         
         count_updated = 0
+        # Products are filed under the browse URL. Only a browse that ran past its last page saw
+        # all of them; one cut short by `pages` (or a failed page) covers only part of it.
+        seen = SeenSet(self.db, self.supplier_id, scopes=[browse_url], complete=reached_end)
         
         for item in enhanced_items:
             try:
@@ -93,11 +95,15 @@ class CashConvertersAdapter:
                 unified["description"] = build_seo_description(unified)
                     
                 # 4. Write to DB
-                self._upsert_product(unified)
+                self._upsert_product(unified, seen=seen)
                 count_updated += 1
                 
             except Exception as e:
+                self.db.rollback()
+                self.audit.clear()
+                self.changes.clear()
                 print(f"CC Adapter Error on {item.get('source_id')}: {e}")
+            seen.add([self._supplier_sku(item.get("source_id"))])
                 
         print(f"CC Adapter: Sync Complete. Processed {count_updated} items.")
         
@@ -107,26 +113,34 @@ class CashConvertersAdapter:
         
         # Step 2D: Safety Rails
         from retail_os.core.safety import SafetyGuard
-        failed_count = len(enhanced_items) - count_updated
+        # Listings whose item page failed to scrape were not seen either.
+        failed_count = len(urls) - count_updated
         
-        if SafetyGuard.is_safe_to_reconcile(len(enhanced_items), failed_count):
-             engine.process_orphans(self.supplier_id, sync_start_time)
+        if not seen.complete:
+             print(f"CC Adapter: Browse stopped before its last page ({pages} page(s)); skipping reconciliation.")
+        elif SafetyGuard.is_safe_to_reconcile(len(urls), failed_count):
+             engine.process_orphans(self.supplier_id, seen=seen)
         else:
              print("CC Adapter: Skipping Reconciliation due to Safety Guard.")
+        seen.finish()
         
         self.db.close()
 
-    def _upsert_product(self, data: dict):
+    @staticmethod
+    def _supplier_sku(sku) -> str:
+        # Supplier-native SKU should not include our prefix.
+        if isinstance(sku, str) and sku.startswith("CC-"):
+            return sku.replace("CC-", "", 1)
+        return sku
+
+    def _upsert_product(self, data: dict, seen=None):
         # Import downloader
         from retail_os.utils.image_downloader import ImageDownloader
         downloader = ImageDownloader()
         
         # Map Unified -> DB
         sku = data["source_listing_id"]
-        # Supplier-native SKU should not include our prefix.
-        supplier_sku = sku
-        if isinstance(supplier_sku, str) and supplier_sku.startswith("CC-"):
-            supplier_sku = supplier_sku.replace("CC-", "", 1)
+        supplier_sku = self._supplier_sku(sku)
         
         # Parse Price
         try:
@@ -163,6 +177,17 @@ class CashConvertersAdapter:
             ensure_ascii=True,
         )
         current_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        field_hashes = field_group_hashes(
+            cost=cost,
+            title=data.get("title"),
+            description=data.get("description"),
+            brand=data.get("brand"),
+            condition=data.get("condition"),
+            specs=data.get("specs") or {},
+            images=local_images,
+            stock_level=data.get("stock_level", 1),
+            status=data.get("source_status"),
+        )
         
         # DB Logic
         sp = self.db.query(SupplierProduct).filter_by(
@@ -186,10 +211,12 @@ class CashConvertersAdapter:
                 specs=data.get("specs", {}),
                 source_category=data.get("source_category"),
                 snapshot_hash=current_hash,
+                field_hashes=field_hashes,
                 last_scraped_at=datetime.now(timezone.utc)
             )
             self.db.add(sp)
             self.db.flush()
+            self.changes.add(sp.id, [NEW])
             
             # Auto-Create Internal
             # Prefix for Internal SKU
@@ -204,39 +231,23 @@ class CashConvertersAdapter:
                 self.db.add(ip)
         else:
             # UPDATE
-            sp.last_scraped_at = datetime.now(timezone.utc)
+            if seen is None or sp.snapshot_hash != current_hash:
+                # Unchanged rows under a SeenSet stay untouched; finish() stamps them in one UPDATE.
+                sp.last_scraped_at = datetime.now(timezone.utc)
             # Always refresh category metadata even if content snapshot is unchanged.
             sp.source_category = data.get("source_category")
             if sp.snapshot_hash != current_hash:
-                # Audit Logic
-                from retail_os.core.database import AuditLog
-                
-                # Check Price Change
-                if sp.cost_price != cost:
-                    log = AuditLog(
-                        entity_type="SupplierProduct",
-                        entity_id=str(sp.id),
-                        action="PRICE_CHANGE",
-                        old_value=str(sp.cost_price),
-                        new_value=str(cost),
-                        user="System",
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                    self.db.add(log)
+                # Audit Logic (compact diff, written with this product's commit)
+                if self.audit.diff(
+                    "SupplierProduct",
+                    sp.id,
+                    "PRODUCT_CHANGE",
+                    {"title": sp.title, "cost": sp.cost_price},
+                    {"title": data["title"], "cost": cost},
+                ) and sp.cost_price != cost:
                     print(f"   -> Audited Price Change: {sp.cost_price} -> {cost}")
-
-                # Check Title Change
-                if sp.title != data["title"]:
-                    log = AuditLog(
-                        entity_type="SupplierProduct",
-                        entity_id=str(sp.id),
-                        action="TITLE_CHANGE",
-                        old_value=sp.title,
-                        new_value=data["title"],
-                        user="System",
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                    self.db.add(log)
+                changed = apply_field_hashes(sp, field_hashes)
+                self.changes.add(sp.id, change_kinds(False, changed, data.get("stock_level", 1), data.get("source_status")))
 
                 sp.title = data["title"]
                 sp.description = data.get("description", "")
@@ -246,13 +257,18 @@ class CashConvertersAdapter:
                 sp.images = local_images if local_images else imgs  # Prefer local
                 sp.specs = data.get("specs", {})
                 sp.snapshot_hash = current_hash
+                if "content" in changed:
+                    mark_enrichment_stale(sp)
                 
+                self.audit.flush(self.db)
+                self.changes.flush(self.db)
                 self.db.commit()
                 return 'updated'
             else:
                 self.db.commit()
                 return 'unchanged'
                 
+        self.changes.flush(self.db)
         self.db.commit()
         return 'created'
 
@@ -2,9 +2,17 @@
 Cash Converters Scraper - Production Ready
 Uses Selectolax with proven extraction logic from extract_clean_cc.py
 """
+import os
 import subprocess
 import re
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterator, List
+
+import httpx
+
+from retail_os.utils.http_clients import get_http_client
+from retail_os.utils.http_throttle import GlobalHTTPThrottle
+from retail_os.utils.parse_pool import parse_in_pool
 
 try:
     from selectolax.parser import HTMLParser
@@ -130,27 +138,68 @@ def extract_prices(doc: HTMLParser):
     
     return current, buy_now
 
-# ========== CURL FETCHER ==========
+# ========== FETCHERS ==========
+
+_CC_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+
+def fetch_html(url: str) -> Optional[str]:
+    """
+    GET a Cash Converters page (browse or item) over the pooled keep-alive client, throttled
+    and with its status fed back. curl is only the fallback for when the client itself is
+    refused (connection error or 403, e.g. a bot filter keyed on the TLS handshake).
+    """
+    try:
+        with GlobalHTTPThrottle.request(url):
+            r = get_http_client().get(url, headers=_CC_HEADERS)
+        GlobalHTTPThrottle.feedback(url, r.status_code, r.headers)
+    except httpx.HTTPError as e:
+        print(f"CC fetch failed ({e}); trying curl")
+        return get_html_via_curl(url)
+    if r.status_code == 403:
+        return get_html_via_curl(url)
+    if r.status_code >= 400:
+        print(f"CC fetch: HTTP {r.status_code} for {url}")
+        return None
+    return r.text
+
 
 def get_html_via_curl(url: str) -> str:
-    """Fetch HTML using curl with exact User-Agent from extract_clean_cc.py."""
+    """
+    Fetch HTML using curl with exact User-Agent from extract_clean_cc.py.
+    Item pages are fetched concurrently (scrape_items), so every fetch goes through
+    GlobalHTTPThrottle and reports its status back: 429/503 slow the whole host down.
+    """
     try:
-        result = subprocess.run(
-            [
-                'curl',
-                '-s',
-                '-L',
-                '-H', 'User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
-                url
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        return result.stdout if result.returncode == 0 else None
+        with GlobalHTTPThrottle.request(url):
+            result = subprocess.run(
+                [
+                    'curl',
+                    '-s',
+                    '-L',
+                    '-w', '\n%{http_code}',
+                    '-H', 'User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+                    url
+                ],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
     except Exception as e:
         print(f"CURL Error: {e}")
         return None
+    if result.returncode != 0:
+        return None
+    body, _, status = result.stdout.rpartition("\n")
+    code = int(status) if status.strip().isdigit() else None
+    GlobalHTTPThrottle.feedback(url, code)
+    if code is None or code >= 400:
+        print(f"CURL: HTTP {status.strip() or '?'} for {url}")
+        return None
+    return body
 
 # ========== MAIN SCRAPER ==========
 
@@ -164,17 +213,12 @@ def scrape_single_item(url: str) -> Optional[Dict]:
     Scrapes a SINGLE item URL using Selectolax.
     Returns dict with data OR None if scraping fails.
     NO MOCKS. NO PLACEHOLDERS.
+    Parsing runs in the shared parse pool (RETAILOS_PARSE_WORKERS), off the fetching thread.
     """
     print(f"Scraper: Single Fetch '{url}'...")
     
-    # Extract ID from URL
-    item_id = "UNKNOWN"
-    match = re.search(r'/Details/(\d+)', url)  # Made slug optional
-    if match:
-        item_id = match.group(1)
-    
     # Fetch HTML
-    html = get_html_via_curl(url)
+    html = fetch_html(url)
     
     if not html:
         print(f"ERROR: Failed to fetch HTML from {url}")
@@ -184,6 +228,42 @@ def scrape_single_item(url: str) -> Optional[Dict]:
         print("ERROR: Selectolax not available")
         return None
     
+    return parse_in_pool(parse_item_html, html, url)
+
+
+def scrape_items(urls: List[str], concurrency: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Fetch item pages on `concurrency` threads (pooled HTTP client) while the parse pool parses
+    the bodies already fetched. Yields parsed items in input order; failures are logged and skipped.
+    """
+    if concurrency is None:
+        try:
+            concurrency = int(os.getenv("RETAILOS_CC_CONCURRENCY", "4") or 4)
+        except ValueError:
+            concurrency = 4
+    concurrency = max(1, min(16, int(concurrency)))
+
+    def _scrape(url: str) -> Optional[Dict]:
+        try:
+            return scrape_single_item(url)
+        except Exception as e:
+            print(f"CC scrape failed for {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for item in ex.map(_scrape, urls):
+            if item:
+                yield item
+
+
+def parse_item_html(html: str, url: str) -> Dict:
+    """Parse a Cash Converters item page into the scraper row dict (runs in the parse pool)."""
+    # Extract ID from URL
+    item_id = "UNKNOWN"
+    match = re.search(r'/Details/(\d+)', url)  # Made slug optional
+    if match:
+        item_id = match.group(1)
+    
     # Parse with Selectolax
     doc = HTMLParser(html)
     
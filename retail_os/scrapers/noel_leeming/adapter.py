@@ -9,17 +9,109 @@ if _REPO_ROOT not in sys.path:
 
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 
+from retail_os.core.change_feed import NEW, ChangeBuffer, change_kinds
 from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, InternalProduct
+from retail_os.core.enrichment_fingerprint import mark_enrichment_stale
+from retail_os.core.field_hashes import apply_field_hashes, field_group_hashes
+from retail_os.core.image_queue import enqueue_product_images, image_queue_enabled
+from retail_os.core.seen_set import OBSERVED, SeenSet
 from retail_os.core.unified_schema import normalize_noel_leeming_row
 from retail_os.scrapers.noel_leeming.scraper import scrape_category
 from retail_os.utils.seo import build_seo_description
 
+def category_workers() -> int:
+    """Categories crawled at once (RETAILOS_NL_CATEGORY_WORKERS, default 4)."""
+    try:
+        n = int(os.getenv("RETAILOS_NL_CATEGORY_WORKERS", "4") or "4")
+    except ValueError:
+        n = 4
+    return max(1, min(16, n))
+
+
+def iter_category_rows(
+    categories: list[str],
+    workers: int | None = None,
+    should_abort=None,
+    on_category_done=None,
+    on_category_partial=None,
+    **scrape_kwargs,
+):
+    """
+    Crawl `categories` concurrently and yield `(row, category_url)` as each category finishes.
+
+    Listing pages go over HTTP (host rate capped by GlobalHTTPThrottle) and Selenium fallbacks
+    check drivers out of the shared pool, so `workers` only bounds how many categories are in
+    flight. A SKU listed under several categories is yielded once per "winning" category: the
+    one latest in `categories` (the most specific, as the sequential crawl used to leave it).
+    `on_category_done(cat_url)` is called once every row of a fully crawled category is yielded;
+    `on_category_partial(cat_url)` first, when that crawl stopped short of the category's last
+    page (page limit, unreadable pages).
+    """
+    workers = workers or category_workers()
+    seen: dict[str, int] = {}
+
+    def _aborted() -> bool:
+        try:
+            return bool(should_abort and should_abort())
+        except Exception:
+            return False
+
+    def _scrape(cat_url: str):
+        coverage: dict = {}
+        if _aborted():
+            return [], coverage
+        rows = scrape_category(category_url=cat_url, should_abort=should_abort, coverage=coverage, **scrape_kwargs)
+        return rows, coverage
+
+    ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nl-category")
+    futures: dict = {}
+    try:
+        futures = {ex.submit(_scrape, url): (idx, url) for idx, url in enumerate(categories)}
+        done = 0
+        for fut in as_completed(futures):
+            idx, cat_url = futures[fut]
+            done += 1
+            try:
+                raw_rows, coverage = fut.result()
+            except Exception as e:
+                print(f"NL Adapter: Failed category {cat_url}: {e}")
+                continue
+            dupes = 0
+            for row in raw_rows:
+                sku = str(row.get("source_listing_id") or "")
+                if sku:
+                    if seen.get(sku, -1) > idx:
+                        dupes += 1
+                        continue
+                    seen[sku] = idx
+                yield row, cat_url
+            print(
+                f"NL Adapter: Category {done}/{len(categories)} scraped {len(raw_rows)} rows "
+                f"({dupes} already seen) from {cat_url}."
+            )
+            if _aborted():
+                # The crawl may have stopped mid-category: do not report it as done.
+                print("NL Adapter: Aborted by operator.")
+                return
+            if not coverage.get("complete") and on_category_partial is not None:
+                on_category_partial(cat_url)
+            if on_category_done is not None:
+                on_category_done(cat_url)
+    finally:
+        # Early close (abort, pipeline failure): drop queued categories, let in-flight ones finish.
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
 class NoelLeemingAdapter:
     """
     Adapter for Noel Leeming.
     """
+
+    # SKUs seen by the current run (reconciliation anti-joins against it); set per run.
+    seen: SeenSet | None = None
     
     def __init__(self):
         self.supplier_name = "NOEL_LEEMING"
@@ -32,6 +124,8 @@ class NoelLeemingAdapter:
             self.db.add(supplier)
             self.db.commit()
         self.supplier_id = supplier.id
+        # product_changes events, inserted with each product commit
+        self.changes = ChangeBuffer(self.supplier_id)
 
     def run_sync(
         self,
@@ -42,7 +136,13 @@ class NoelLeemingAdapter:
         cmd_id: str | None = None,
         progress_hook=None,
         should_abort=None,
+        resume: bool = False,
     ) -> None:
+        """
+        The multi-category walk (no `category_url`) is recorded in the scrape_runs ledger with the
+        categories completed so far; `resume=True` continues the last interrupted walk with the
+        remaining ones (see retail_os.core.scrape_runs).
+        """
         
         # If specific URL provided, just single-shot it (legacy behavior)
         if category_url:
@@ -100,51 +200,88 @@ class NoelLeemingAdapter:
              "https://www.noelleeming.co.nz/c/smarthome",
         ]
 
-        print(f"NL Adapter: Starting Multi-Category Sync for {self.supplier_name} ({len(DEFAULT_CATEGORIES)} categories)")
-        sync_start_time = datetime.now(timezone.utc)
-        
-        total_scraped = 0
-        total_updated = 0
-        
-        for idx, cat_url in enumerate(DEFAULT_CATEGORIES, 1):
-             try:
-                if should_abort and bool(should_abort()):
-                    print("NL Adapter: Aborted by operator.")
-                    break
-                
-                print(f"\n>>> Category {idx}/{len(DEFAULT_CATEGORIES)}: {cat_url}")
-                
-                # Check cancellation again before starting a big scrape block
-                if should_abort and bool(should_abort()):
-                    break
-
-                scraped, updated = self._scrape_single_category(
-                    pages=pages,
-                    category_url=cat_url,
-                    deep_scrape=deep_scrape,
-                    headless=headless,
-                    cmd_id=cmd_id,
-                    progress_hook=progress_hook,
-                    should_abort=should_abort,
-                    skip_reconciliation=True # Defer reconciliation until the very end
-                )
-                total_scraped += scraped
-                total_updated += updated
-                
-             except Exception as e:
-                 print(f"NL Adapter: Failed category {cat_url}: {e}")
-
-        # Final Reconciliation across ALL categories scraped
-        # Use sync_start_time from the *start* of the loop.
-        # Anything not seen in any category since sync_start_time is likely dropped (or just not in these top 5).
-        # NOTE: Be careful with "Scrape Everything" vs "Partial Scrape". 
-        # If we only scraped 5 categories, we shouldn't delete items from other categories (e.g. Cameras).
-        # The SafetyGuard protects us here (if <10% dropped, proceed). 
-        # But if we have 5000 items and only scrape 200, SafetyGuard will block reconciliation (Correctly).
+        from retail_os.core.scrape_runs import ScrapeRunLedger
+
+        ledger = ScrapeRunLedger.start(
+            self.db,
+            self.supplier_id,
+            "categories",
+            params={"pages": pages, "deep_scrape": bool(deep_scrape)},
+            command_id=cmd_id,
+            resume=resume,
+        )
+        done_categories = list(ledger.cursor.get("categories") or [])
+        # Categories crawled short of their last page (by earlier attempts too).
+        partial = set(ledger.cursor.get("partial") or []) & set(done_categories)
+        if ledger.resumed:
+            pages = int(ledger.params.get("pages") or 0)
+            deep_scrape = bool(ledger.params.get("deep_scrape", deep_scrape))
+        categories = [c for c in DEFAULT_CATEGORIES if c not in set(done_categories)]
+
+        print(
+            f"NL Adapter: Starting Multi-Category Sync for {self.supplier_name} "
+            f"({len(categories)} of {len(DEFAULT_CATEGORIES)} categories, {category_workers()} at a time)"
+        )
+        # Products are filed under their GTM category, not the crawl URL, so the run vouches for
+        # the categories it actually observed. Whether it saw all of them is known after the crawl.
+        self.seen = ledger.seen_set(scopes=OBSERVED, complete=False)
+        progress = ledger.progress
+
+        def _checkpoint(batch: list[dict]) -> None:
+            keys, rows, failed = progress.completed()
+            ledger.checkpoint(
+                {"categories": done_categories + keys, "partial": sorted(partial & set(done_categories + keys))},
+                rows,
+                failed,
+                seen=self.seen,
+            )
+
+        # Categories are crawled in parallel and stream into the pipeline as they complete.
+        rows = iter_category_rows(
+            categories,
+            should_abort=should_abort,
+            on_category_done=progress.seal,
+            on_category_partial=partial.add,
+            headless=headless,
+            max_pages=pages,
+            deep_scrape=deep_scrape,
+            cmd_id=cmd_id,
+            progress_hook=progress_hook,
+            known_details=self._load_known_details() if deep_scrape else None,
+        )
+
+        total_scraped, total_updated = self._sync_rows(
+            rows,
+            cmd_id=cmd_id,
+            progress_hook=progress_hook,
+            should_abort=should_abort,
+            progress=progress,
+            on_batch_written=_checkpoint,
+        )
+        try:
+            if should_abort and bool(should_abort()):
+                # Keep the completed categories and staged SKUs for SCRAPE_SUPPLIER resume=true.
+                ledger.interrupt(self.seen)
+                self.seen = None
+                return
+        except Exception:
+            pass
+        # A resumed walk is judged on the whole run, earlier attempts included.
+        total_scraped += ledger.base_rows
+        total_updated += ledger.base_rows - ledger.base_failed
+
+        # Final Reconciliation across ALL categories scraped.
+        # Only categories this run observed are in scope, so products filed under categories
+        # outside the crawl list (e.g. Cameras) are never flagged by it. A category cut short
+        # (page limit below its page count, unreadable pages) would make the rest look missing.
+        self.seen.complete = not partial
+        if partial:
+            print(f"NL Adapter: {len(partial)} categories not crawled to their last page.")
         
         print(f"\nNL Adapter: Multi-Category Sync Complete. Total Scraped: {total_scraped}, Total Updated: {total_updated}")
         
-        self._perform_reconciliation(total_scraped, total_updated, sync_start_time)
+        self._perform_reconciliation(total_scraped, total_updated)
+        ledger.complete()
         self.db.close()
 
     def _scrape_single_category(
@@ -162,8 +299,10 @@ class NoelLeemingAdapter:
         Helper: Scrapes one category, returns (count_scraped, count_updated).
         """
         print(f"NL Adapter: Starting Category Sync: {category_url}")
-        sync_start_time = datetime.now(timezone.utc)
-        
+        if self.seen is None:
+            self.seen = SeenSet(self.db, self.supplier_id, scopes=OBSERVED, complete=False)
+        coverage: dict = {}
+
         # 1. Scrape category pages (Selenium)
         raw_rows = scrape_category(
             headless=headless,
@@ -173,91 +312,197 @@ class NoelLeemingAdapter:
             cmd_id=cmd_id,
             progress_hook=progress_hook,
             should_abort=should_abort,
+            known_details=self._load_known_details() if deep_scrape else None,
+            coverage=coverage,
         )
+        self.seen.complete = bool(coverage.get("complete"))
 
         print(f"NL Adapter: Scraped {len(raw_rows)} rows. Normalizing/upserting...")
 
-        count_updated = 0
-        for row in raw_rows:
-            try:
-                if should_abort and bool(should_abort()):
-                    return len(raw_rows), count_updated
-            except Exception:
-                pass
-            try:
-                unified = normalize_noel_leeming_row(row)
-
-                # Build adapter-friendly dict
-                data = {
-                    "source_listing_id": unified.get("source_listing_id"),
-                    "title": unified.get("title"),
-                    "description": unified.get("description"),
-                    "buy_now_price": unified.get("buy_now_price"),
-                    "source_url": unified.get("source_url"),
-                    "source_status": unified.get("source_status", "Active"),
-                    "images": [p for p in [unified.get("photo1"), unified.get("photo2"), unified.get("photo3"), unified.get("photo4")] if p],
-                    "stock_level": None,  # NL does not expose reliable quantity; keep null
-                    "specs": row.get("specs", {}), 
-                    # Category partitioning (prefer GTM category; fallback to configured category URL)
-                    "source_category": unified.get("source_category") or category_url,
-                }
-
-                if not data["source_listing_id"] or not data["title"]:
-                    continue
+        _scraped, count_updated = self._sync_rows(
+            ((row, category_url) for row in raw_rows),
+            cmd_id=cmd_id,
+            progress_hook=progress_hook,
+            should_abort=should_abort,
+            total=len(raw_rows),
+        )
+        try:
+            if should_abort and bool(should_abort()):
+                if not skip_reconciliation:
+                    self._finish_seen()
+                return len(raw_rows), count_updated
+        except Exception:
+            pass
 
-                # SEO enhancement (safe, deterministic)
-                data["description"] = build_seo_description(
-                    {"title": data["title"], "description": data["description"], "specs": data.get("specs", {})}
-                )
+        print(f"NL Adapter: Category Sync Complete. Processed {count_updated} items.")
 
-                self._upsert_product(data, should_abort=should_abort)
-                count_updated += 1
-            except Exception as e:
-                print(f"NL Adapter: row failed: {e}")
+        if not skip_reconciliation:
+            self._perform_reconciliation(len(raw_rows), count_updated)
+            self.db.close() # Only close if we own the lifecycle (single run)
+            
+        return len(raw_rows), count_updated
+
+    def _perform_reconciliation(self, scraped_count, updated_count):
+        # 2. Reconciliation (safe)
+        from retail_os.core.reconciliation import ReconciliationEngine
+        from retail_os.core.safety import SafetyGuard
+
+        failed_count = scraped_count - updated_count
+        if self.seen is None or not self.seen.complete:
+            print("NL Adapter: Partial scrape (not every page of the category); skipping reconciliation.")
+        elif SafetyGuard.is_safe_to_reconcile(scraped_count, failed_count):
+            ReconciliationEngine(self.db).process_orphans(self.supplier_id, seen=self.seen)
+        else:
+            print("NL Adapter: Skipping reconciliation (SafetyGuard).")
+        self._finish_seen()
+
+    def _finish_seen(self) -> None:
+        """Stamp last_scraped_at on everything the run saw and drop its staging rows."""
+        if self.seen is not None:
+            self.seen.finish()
+            self.seen = None
+        
+    def _row_to_data(self, row: dict, category_url: str) -> dict | None:
+        unified = normalize_noel_leeming_row(row)
+
+        # Build adapter-friendly dict
+        data = {
+            "source_listing_id": unified.get("source_listing_id"),
+            "title": unified.get("title"),
+            "description": unified.get("description"),
+            "buy_now_price": unified.get("buy_now_price"),
+            "source_url": unified.get("source_url"),
+            "source_status": unified.get("source_status", "Active"),
+            "images": [p for p in [unified.get("photo1"), unified.get("photo2"), unified.get("photo3"), unified.get("photo4")] if p],
+            "stock_level": None,  # NL does not expose reliable quantity; keep null
+            "specs": row.get("specs", {}), 
+            # Category partitioning (prefer GTM category; fallback to configured category URL)
+            "source_category": unified.get("source_category") or category_url,
+            # Set only when this run actually loaded the detail page (see _write_product).
+            "tile_fingerprint": row.get("tile_fingerprint") if row.get("detail_scraped") else None,
+        }
+
+        if not data["source_listing_id"] or not data["title"]:
+            return None
+
+        # SEO enhancement (safe, deterministic). A reused detail scrape carries the stored result:
+        # rebuilding it from the tile text would change the content hash of an unchanged product.
+        data["description"] = row.get("seo_description") or build_seo_description(
+            {"title": data["title"], "description": data["description"], "specs": data.get("specs", {})}
+        )
+        return data
+
+    def _sync_rows(
+        self,
+        rows,
+        cmd_id=None,
+        progress_hook=None,
+        should_abort=None,
+        total: int | None = None,
+        progress=None,
+        on_batch_written=None,
+    ) -> tuple[int, int]:
+        """
+        Normalize -> prepare (images + hash) -> batched DB write over `(row, category_url)` pairs.
+        Stages run concurrently with bounded queues (see retail_os.core.pipeline).
+        With a `RunProgress`, each pair is fed under its category URL and settled when it leaves
+        the pipeline; `on_batch_written(batch)` runs after every committed write batch.
+        Returns (count_scraped, count_updated).
+        """
+        from retail_os.core.pipeline import Stage, StagedPipeline, pipeline_setting
+
+        current = {"category": ""}
+
+        def _feed(pairs):
+            for pair in pairs:
+                progress.feed(pair[1])
+                yield pair
+
+        def _settle(item, failed: bool = True) -> None:
+            if progress is None:
+                return
+            if isinstance(item, tuple):
+                progress.settle(item[1], failed=failed)
+            elif isinstance(item, dict):
+                data = item.get("data") if "data" in item and "sku" in item else item
+                progress.settle((data or {}).get("crawl_category"), failed=failed)
+
+        def _normalize(pair):
+            row, cat_url = pair
+            current["category"] = cat_url
+            data = self._row_to_data(row, cat_url)
+            if data is None:
+                _settle(pair)
+                return None
+            data["crawl_category"] = cat_url
+            return data
+
+        def _prepare(data: dict):
+            return self._prepare_product(data, should_abort=should_abort)
+
+        def _write(batch: list[dict]) -> list[str]:
+            results = self._write_batch(batch)
+            if progress is not None:
+                for p, result in zip(batch, results):
+                    _settle(p, failed=result == "failed")
+            if on_batch_written is not None:
+                on_batch_written(batch)
+            return results
+
+        def _on_error(stage: str, item, e: Exception) -> None:
+            print(f"NL Adapter: row failed (stage={stage}): {e}")
+            for one in item if isinstance(item, list) else [item]:
+                _settle(one)
+
+        pipeline = StagedPipeline(
+            _feed(rows) if progress is not None else rows,
+            [
+                Stage("normalize", _normalize, workers=pipeline_setting("NORMALIZE_WORKERS", 2)),
+                Stage("prepare", _prepare, workers=pipeline_setting("PREPARE_WORKERS", 4)),
+                Stage("write", _write, workers=1, batch_size=pipeline_setting("WRITE_BATCH", 50)),
+            ],
+            queue_size=pipeline_setting("QUEUE_SIZE", 256),
+            should_abort=should_abort,
+            on_error=_on_error,
+        )
+
+        count_updated = 0
+        for result in pipeline.run():
+            if result == "failed":
+                continue
+            count_updated += 1
 
             # Best-effort progress
             try:
                 if progress_hook and cmd_id and (count_updated % 25 == 0):
+                    cat = (current["category"] or "").split("/")[-1]
                     progress_hook(
                         {
                             "phase": "scrape",
                             "supplier": "NOEL_LEEMING",
                             "done": int(count_updated),
-                            "total": int(len(raw_rows)),
-                            "message": f"Scrape: {count_updated}/{len(raw_rows)} upserted ({category_url.split('/')[-1]})",
+                            "total": int(total) if total is not None else None,
+                            "message": (
+                                f"Scrape: {count_updated}/{total} upserted ({cat})"
+                                if total is not None
+                                else f"Scrape: {count_updated} upserted ({cat})"
+                            ),
                         }
                     )
             except Exception:
                 pass
 
-        print(f"NL Adapter: Category Sync Complete. Processed {count_updated} items.")
+        return pipeline.source_count, count_updated
 
-        if not skip_reconciliation:
-            self._perform_reconciliation(len(raw_rows), count_updated, sync_start_time)
-            self.db.close() # Only close if we own the lifecycle (single run)
-            
-        return len(raw_rows), count_updated
-
-    def _perform_reconciliation(self, scraped_count, updated_count, start_time):
-        # 2. Reconciliation (safe)
-        from retail_os.core.reconciliation import ReconciliationEngine
-        from retail_os.core.safety import SafetyGuard
-
-        failed_count = scraped_count - updated_count
-        if SafetyGuard.is_safe_to_reconcile(scraped_count, failed_count):
-            ReconciliationEngine(self.db).process_orphans(self.supplier_id, start_time)
-        else:
-            print("NL Adapter: Skipping reconciliation (SafetyGuard).")
-        
     def _upsert_product(self, data: dict, should_abort=None) -> str:
         """
         Upserts a product into the database.
         Returns: 'created', 'updated', or 'unchanged'
         """
-        # Import downloader
-        from retail_os.utils.image_downloader import ImageDownloader
-        downloader = ImageDownloader()
-        
+        return self._write_product(self._prepare_product(data, should_abort=should_abort))
+
+    def _prepare_product(self, data: dict, should_abort=None) -> dict:
+        """DB-free half of the upsert: price parse, images, snapshot hash."""
         # Map Unified -> DB
         sku = data["source_listing_id"]
         
@@ -268,7 +513,46 @@ class NoelLeemingAdapter:
             cost = 0.0
             
         imgs = data.get("images", [])
+
+        # Queued mode keeps remote URLs now; the writer enqueues download jobs.
+        # Local media already written by the Selenium scraper counts as-is either way.
+        enqueue_images = image_queue_enabled()
+        if enqueue_images:
+            local_images = [raw for raw in list(imgs or [])[:4] if isinstance(raw, str) and raw and os.path.exists(raw)]
+        else:
+            local_images = self._download_images(sku, imgs, should_abort=should_abort)
         
+        # Calculate Snapshot Hash
+        hashed_images = imgs if enqueue_images else local_images
+        content = f"{data['title']}|{cost}|{data['source_status']}|{hashed_images}"
+        current_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        field_hashes = field_group_hashes(
+            cost=cost,
+            title=data.get("title"),
+            description=data.get("description"),
+            specs=data.get("specs") or {},
+            images=hashed_images,
+            stock_level=data.get("stock_level", 1),
+            status=data.get("source_status"),
+        )
+
+        return {
+            "data": data,
+            "sku": sku,
+            "cost": cost,
+            "imgs": imgs,
+            "local_images": local_images,
+            "hash": current_hash,
+            "field_hashes": field_hashes,
+            "enqueue_images": enqueue_images,
+        }
+
+    def _download_images(self, sku: str, imgs: list, should_abort=None) -> list:
+        """Inline image download (RETAILOS_IMAGE_QUEUE=0)."""
+        # Import downloader
+        from retail_os.utils.image_downloader import ImageDownloader
+        downloader = ImageDownloader()
+
         # DOWNLOADING
         local_images = []
         try:
@@ -315,16 +599,86 @@ class NoelLeemingAdapter:
                 result = downloader.download_image(img_url, img_sku, should_abort=should_abort)
                 if result.get("success"):
                     local_images.append(result.get("path"))
-        
-        # Calculate Snapshot Hash
-        content = f"{data['title']}|{cost}|{data['source_status']}|{local_images}"
-        current_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-        
+        return local_images
+
+    def _write_batch(self, batch: list[dict]) -> list[str]:
+        """One lookup query + one commit per batch; falls back to row-by-row on failure."""
+        if not batch:
+            return []
+        skus = sorted({p["sku"] for p in batch})
+        existing = {
+            sp.external_sku: sp
+            for sp in self.db.query(SupplierProduct)
+            .filter(SupplierProduct.supplier_id == self.supplier_id)
+            .filter(SupplierProduct.external_sku.in_(skus))
+            .all()
+        }
+        try:
+            results = [self._write_product(p, commit=False, sp=existing.get(p["sku"])) for p in batch]
+            self.changes.flush(self.db)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.changes.clear()
+            results = []
+            for p in batch:
+                try:
+                    results.append(self._write_product(p))
+                except Exception as e:
+                    self.db.rollback()
+                    self.changes.clear()
+                    print(f"NL Adapter: row failed: {e}")
+                    results.append("failed")
+        if self.seen is not None:
+            self.seen.add(skus)
+        return results
+
+    @staticmethod
+    def _record_detail_scrape(sp: SupplierProduct, data: dict) -> None:
+        if data.get("tile_fingerprint"):
+            sp.tile_fingerprint = data["tile_fingerprint"]
+            sp.detail_scraped_at = datetime.now(timezone.utc)
+
+    def _load_known_details(self) -> dict[str, dict]:
+        """Tile fingerprints + stored detail data from earlier deep scrapes, keyed by SKU."""
+        rows = (
+            self.db.query(
+                SupplierProduct.external_sku,
+                SupplierProduct.tile_fingerprint,
+                SupplierProduct.detail_scraped_at,
+                SupplierProduct.images,
+                SupplierProduct.specs,
+                SupplierProduct.description,
+            )
+            .filter(SupplierProduct.supplier_id == self.supplier_id)
+            .filter(SupplierProduct.tile_fingerprint.isnot(None))
+            .all()
+        )
+        return {
+            sku: {
+                "tile_fingerprint": fp,
+                "detail_scraped_at": at,
+                "images": images or [],
+                "specs": specs or {},
+                "description": description,
+            }
+            for sku, fp, at, images, specs, description in rows
+        }
+
+    def _write_product(self, prepared: dict, commit: bool = True, sp: SupplierProduct | None = None) -> str:
+        data = prepared["data"]
+        sku = prepared["sku"]
+        cost = prepared["cost"]
+        imgs = prepared["imgs"]
+        local_images = prepared["local_images"]
+        current_hash = prepared["hash"]
+
         # DB Logic
-        sp = self.db.query(SupplierProduct).filter_by(
-            supplier_id=self.supplier_id, 
-            external_sku=sku
-        ).first()
+        if sp is None:
+            sp = self.db.query(SupplierProduct).filter_by(
+                supplier_id=self.supplier_id, 
+                external_sku=sku
+            ).first()
         
         if not sp:
             # CREATE
@@ -340,10 +694,15 @@ class NoelLeemingAdapter:
                 specs=data.get("specs", {}),
                 source_category=data.get("source_category"),
                 snapshot_hash=current_hash,
+                field_hashes=prepared.get("field_hashes"),
                 last_scraped_at=datetime.now(timezone.utc)
             )
+            self._record_detail_scrape(sp, data)
             self.db.add(sp)
             self.db.flush()
+            if prepared.get("enqueue_images"):
+                sp.images = enqueue_product_images(self.db, sp, imgs, sku)
+            self.changes.add(sp.id, [NEW])
             
             # Auto-Create Internal
             my_sku = f"NL-{sku}"
@@ -356,27 +715,46 @@ class NoelLeemingAdapter:
                 )
                 self.db.add(ip)
             
-            self.db.commit()
+            if commit:
+                self.changes.flush(self.db)
+                self.db.commit()
             return 'created'
             
         else:
             # UPDATE
-            sp.last_scraped_at = datetime.now(timezone.utc)
+            if self.seen is None or sp.snapshot_hash != current_hash:
+                # Unchanged rows under a SeenSet stay untouched; finish() stamps them in one UPDATE.
+                sp.last_scraped_at = datetime.now(timezone.utc)
             # Always refresh category metadata even if snapshot is unchanged.
             sp.source_category = data.get("source_category")
+            self._record_detail_scrape(sp, data)
             if sp.snapshot_hash != current_hash:
                 # Audit Logic would go here
-                
+                changed = set()
+                if prepared.get("field_hashes"):
+                    changed = apply_field_hashes(sp, prepared["field_hashes"])
+                    self.changes.add(
+                        sp.id, change_kinds(False, changed, data.get("stock_level", 1), data.get("source_status"))
+                    )
+
                 sp.title = data["title"]
                 sp.cost_price = cost
-                sp.images = local_images if local_images else imgs
+                if prepared.get("enqueue_images"):
+                    sp.images = enqueue_product_images(self.db, sp, imgs, sku)
+                else:
+                    sp.images = local_images if local_images else imgs
                 sp.specs = data.get("specs", {})
                 sp.snapshot_hash = current_hash
+                if "content" in changed or not prepared.get("field_hashes"):
+                    mark_enrichment_stale(sp)
                 
-                self.db.commit()
+                if commit:
+                    self.changes.flush(self.db)
+                    self.db.commit()
                 return 'updated'
             else:
-                self.db.commit()
+                if commit:
+                    self.db.commit()
                 return 'unchanged'
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+"""
+Noel Leeming network fast path.
+
+The category grid is server-rendered (Salesforce Commerce Cloud): every `div.product-tile` already
+carries its `data-gtm-product` JSON in the HTML, and the "more results" button points at the
+`Search-UpdateGrid` controller that returns the next slice of tiles as an HTML fragment. Fetching
+those directly with httpx and parsing them with the same `extract_products_from_html` the Selenium
+path uses avoids the browser entirely for listing pages (no page-load waits, no scroll passes).
+
+Pages that fail here (HTTP errors, bot challenges, empty grids) are reported back so
+`scrape_category` can fetch just those pages with Selenium.
+
+Toggle with RETAILOS_NL_FAST_PATH (default on).
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import httpx
+from selectolax.parser import HTMLParser
+
+from retail_os.utils.http_clients import get_http_client
+from retail_os.utils.http_throttle import GlobalHTTPThrottle
+
+logger = logging.getLogger(__name__)
+
+GRID_PAGE_SIZE = 32
+
+_GRID_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-NZ,en;q=0.9",
+}
+
+
+def grid_concurrency() -> int:
+    """Listing pages fetched at once per category (host rate still capped by GlobalHTTPThrottle)."""
+    try:
+        n = int(os.getenv("RETAILOS_NL_GRID_CONCURRENCY", "4") or "4")
+    except ValueError:
+        n = 4
+    return max(1, min(16, n))
+
+
+def fast_path_enabled() -> bool:
+    return (os.getenv("RETAILOS_NL_FAST_PATH", "true") or "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def nl_http_client() -> tuple[httpx.Client, bool]:
+    """
+    Client for NL page fetches: the shared pooled client, or a dedicated one when
+    NOEL_LEEMING_PROXY is set. Returns (client, owned) - close it only when `owned`.
+    """
+    proxy = (os.getenv("NOEL_LEEMING_PROXY") or "").strip()
+    if proxy:
+        return httpx.Client(proxy=proxy, follow_redirects=True, timeout=20.0), True
+    return get_http_client(), False
+
+
+def with_query(url: str, **params) -> str:
+    """`url` with `params` set (replacing existing keys), e.g. start/sz for grid paging."""
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in params]
+    query.extend((k, str(v)) for k, v in params.items())
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def find_update_grid_url(page_html: str, base_url: str) -> Optional[str]:
+    """The `Search-UpdateGrid` endpoint advertised by the grid's "more results" control, if any."""
+    tree = HTMLParser(page_html)
+    for node in tree.css("[data-url]"):
+        raw = node.attributes.get("data-url") or ""
+        if "Search-UpdateGrid" in raw:
+            return urljoin(base_url, html_lib.unescape(raw))
+    return None
+
+
+def parse_total_pages(page_html: str) -> Optional[int]:
+    """Page count from the `gep-search-pagination pages="[...]"` attribute (same source as Selenium)."""
+    tree = HTMLParser(page_html)
+    node = tree.css_first("gep-search-pagination")
+    if node is None:
+        return None
+    raw = node.attributes.get("pages")
+    if not raw:
+        return None
+    try:
+        pages = json.loads(html_lib.unescape(raw))
+        return max(int(p["page"]) for p in pages) or None
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def grid_page_url(category_url: str, page_num: int, update_grid_url: Optional[str] = None, sz: int = GRID_PAGE_SIZE) -> str:
+    start = (int(page_num) - 1) * int(sz)
+    if update_grid_url and page_num > 1:
+        return with_query(update_grid_url, start=start, sz=sz)
+    if page_num <= 1:
+        return category_url
+    return with_query(category_url, start=start, sz=sz)
+
+
+def fetch_grid_html(url: str, client: httpx.Client) -> Optional[str]:
+    """GET one grid page; None when the site refuses it (caller falls back to Selenium)."""
+    try:
+        with GlobalHTTPThrottle.request(url):
+            r = client.get(url, headers=_GRID_HEADERS)
+        GlobalHTTPThrottle.feedback(url, r.status_code, r.headers)
+    except httpx.HTTPError as e:
+        logger.info(f"NL_GRID_FETCH_ERROR url={url} error={e}")
+        return None
+    if r.status_code != 200:
+        logger.info(f"NL_GRID_FETCH_STATUS url={url} status={r.status_code}")
+        return None
+    return r.text
+
+
+@dataclass
+class GridScrapeResult:
+    pages: dict[int, list[dict]] = field(default_factory=dict)
+    failed_pages: list[int] = field(default_factory=list)
+    total_pages: Optional[int] = None
+    # Pages 1..total_pages are the whole category (not cut short by max_pages, or by an abort or
+    # failed fetch while walking a grid of unknown length). Pages that failed are not in `pages`.
+    exhausted: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """False when even page 1 failed: the whole category needs Selenium."""
+        return 1 in self.pages
+
+
+def _fetch_page(category_url: str, update_grid_url: Optional[str], page_num: int, client: httpx.Client) -> list[dict]:
+    from retail_os.scrapers.noel_leeming.scraper import extract_products_from_html
+
+    page_html = fetch_grid_html(grid_page_url(category_url, page_num, update_grid_url), client)
+    return extract_products_from_html(page_html, page_num, 1) if page_html else []
+
+
+def _fetch_known_pages(result, category_url, update_grid_url, page_nums, client, should_abort, on_page, limit) -> None:
+    """Page count known up front: fetch the remaining pages concurrently."""
+
+    def _one(page_num: int):
+        try:
+            if should_abort and bool(should_abort()):
+                return page_num, None
+        except Exception:
+            pass
+        return page_num, _fetch_page(category_url, update_grid_url, page_num, client)
+
+    done = 1
+    with ThreadPoolExecutor(max_workers=grid_concurrency(), thread_name_prefix="nl-grid") as ex:
+        for page_num, page_products in ex.map(_one, page_nums):
+            if page_products is None:
+                continue
+            if page_products:
+                result.pages[page_num] = page_products
+            else:
+                result.failed_pages.append(page_num)
+            done += 1
+            if on_page:
+                on_page(done, limit)
+
+
+def _fetch_until_exhausted(result, category_url, update_grid_url, limit, client, should_abort, on_page) -> bool:
+    """
+    Unknown page count: walk pages in order until the grid runs dry or repeats itself.
+    Returns True when the end of the grid was reached (False: limit, abort or failed fetch).
+    """
+    from retail_os.scrapers.noel_leeming.scraper import extract_products_from_html
+
+    seen = {p["source_listing_id"] for p in result.pages[1]}
+    for page_num in range(2, limit + 1):
+        try:
+            if should_abort and bool(should_abort()):
+                return False
+        except Exception:
+            pass
+        page_html = fetch_grid_html(grid_page_url(category_url, page_num, update_grid_url), client)
+        if page_html is None:
+            return False
+        page_products = extract_products_from_html(page_html, page_num, 1)
+        new_ids = {p["source_listing_id"] for p in page_products} - seen
+        if not new_ids:
+            # Empty page, or the grid ignored `start` and served page 1 again: end of grid.
+            return True
+        seen |= new_ids
+        result.pages[page_num] = page_products
+        if on_page:
+            on_page(page_num, limit)
+    return False
+
+
+def scrape_category_grid(
+    category_url: str,
+    max_pages: Optional[int] = None,
+    client: Optional[httpx.Client] = None,
+    should_abort: Optional[Callable[[], bool]] = None,
+    on_page: Optional[Callable[[int, int], None]] = None,
+) -> GridScrapeResult:
+    """
+    Fetch and parse a category's listing pages over plain HTTP.
+    Ranks in the returned rows are page-local; `scrape_category` renumbers them overall.
+    """
+    from retail_os.scrapers.noel_leeming.scraper import extract_products_from_html
+
+    result = GridScrapeResult()
+    owned = False
+    if client is None:
+        client, owned = nl_http_client()
+    try:
+        first = fetch_grid_html(category_url, client)
+        products = extract_products_from_html(first, 1, 1) if first else []
+        if not products:
+            result.failed_pages.append(1)
+            return result
+        result.pages[1] = products
+
+        update_grid_url = find_update_grid_url(first, category_url)
+        total_pages = parse_total_pages(first)
+        result.total_pages = total_pages
+        limit = total_pages or 999
+        if max_pages:
+            limit = min(limit, int(max_pages))
+        if on_page:
+            on_page(1, limit)
+
+        if total_pages is not None:
+            _fetch_known_pages(result, category_url, update_grid_url, range(2, limit + 1), client, should_abort, on_page, limit)
+            result.exhausted = limit >= total_pages
+        else:
+            result.exhausted = _fetch_until_exhausted(
+                result, category_url, update_grid_url, limit, client, should_abort, on_page
+            )
+        if result.total_pages is None:
+            result.total_pages = max(result.pages)
+        return result
+    finally:
+        if owned:
+            client.close()
@@ -4,12 +4,16 @@ Extracts product data including high-res images using Selenium.
 """
 import time
 import json
+import hashlib
 import re
 import sys
 import os
 import shutil
 import threading
 import queue
+import atexit
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import urljoin
 from typing import List, Dict, Optional
@@ -27,6 +31,15 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import httpx
 
+from retail_os.scrapers.noel_leeming.grid import (
+    GRID_PAGE_SIZE,
+    fast_path_enabled,
+    nl_http_client,
+    scrape_category_grid,
+    with_query,
+)
+from retail_os.utils.http_throttle import GlobalHTTPThrottle
+
 # Try to use webdriver-manager
 try:
     from webdriver_manager.chrome import ChromeDriverManager
@@ -120,7 +133,13 @@ def scrape_product_detail(driver, url: str) -> Dict[str, any]:
             print(f"      [DETAIL] Wait timeout or element not found: {wait_err}")
             # Continue anyway - page might have loaded
         
-        time.sleep(1) # Extra settling
+        # Product JSON-LD is what we parse; wait for it rather than sleeping.
+        try:
+            WebDriverWait(driver, 3).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'script[type="application/ld+json"]'))
+            )
+        except Exception:
+            pass
         
         print(f"      [DETAIL] Getting page source...")
         # Get Source
@@ -407,6 +426,48 @@ def clear_webdriver_cache():
     except Exception:
         pass
 
+_BLOCKED_IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*/dw/image/*"]
+_BLOCKED_FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+_BLOCKED_ANALYTICS_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*nr-data.net*",
+    "*bat.bing.com*",
+    "*analytics.tiktok.com*",
+]
+
+
+def _apply_resource_blocking(driver, allow_images: bool = False) -> None:
+    """
+    Block images, fonts and analytics at the network layer (CDP Network.setBlockedURLs).
+    Pages only need their HTML for extraction. RETAILOS_NL_BLOCK_RESOURCES=false disables.
+    """
+    if (os.getenv("RETAILOS_NL_BLOCK_RESOURCES", "true") or "true").strip().lower() not in ("1", "true", "yes", "on"):
+        return
+    patterns = _BLOCKED_FONT_PATTERNS + _BLOCKED_ANALYTICS_PATTERNS
+    if not allow_images:
+        patterns = _BLOCKED_IMAGE_PATTERNS + patterns
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception:
+        pass
+
+
+@contextmanager
+def browser_images_allowed(driver):
+    """Lift the image block while the browser session downloads images via fetch()."""
+    _apply_resource_blocking(driver, allow_images=True)
+    try:
+        yield
+    finally:
+        _apply_resource_blocking(driver)
+
+
 def setup_driver(headless: bool = True, timeout: int = 30):
     """Setup Chrome WebDriver."""
     options = Options()
@@ -418,6 +479,8 @@ def setup_driver(headless: bool = True, timeout: int = 30):
     options.add_argument("--window-size=1920,1080")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     options.add_argument("--disable-blink-features=AutomationControlled")
+    # Tiles and product JSON are server-rendered: don't wait for every subresource.
+    options.page_load_strategy = "eager"
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
 
@@ -447,58 +510,200 @@ def setup_driver(headless: bool = True, timeout: int = 30):
         driver = webdriver.Chrome(options=options)
         
     driver.set_page_load_timeout(60)
-    driver.implicitly_wait(10)
+    # Explicit WebDriverWaits only: an implicit wait turns every empty find_elements into a stall.
+    driver.implicitly_wait(0)
+    _apply_resource_blocking(driver)
     return driver
 
 class WebDriverPool:
-    """Pool of WebDriver instances for concurrent scraping."""
-    
-    def __init__(self, max_drivers: int = 2, headless: bool = True):  # Reduced from 4 to 2
-        self.max_drivers = max_drivers
+    """
+    Warm pool of Chrome drivers shared across pages, categories and commands.
+
+    Drivers are started on demand (up to `max_drivers`), health-checked on checkout, recycled
+    after `recycle_after` pages to cap Chrome's memory growth, and quit after `idle_s` seconds
+    without use so an idle worker doesn't keep browsers around.
+    """
+
+    def __init__(self, max_drivers: int = 2, headless: bool = True, recycle_after: int | None = None, idle_s: float | None = None):
+        self.max_drivers = max(1, int(max_drivers))
         self.headless = headless
-        self.pool = queue.Queue(maxsize=max_drivers)
+        if recycle_after is None:
+            recycle_after = int(os.getenv("RETAILOS_NL_DRIVER_RECYCLE_PAGES", "50") or "50")
+        self.recycle_after = max(1, int(recycle_after))
+        if idle_s is None:
+            idle_s = float(os.getenv("RETAILOS_NL_DRIVER_IDLE_S", "300") or "300")
+        self.idle_s = max(0.0, float(idle_s))
+        self.pool = queue.Queue()
         self.active_drivers = []
         self.lock = threading.Lock()
-        
-        # PRE-CREATE all drivers to avoid race conditions
-        print(f"  Initializing WebDriver pool with {max_drivers} drivers...")
-        for i in range(max_drivers):
+        self._size = 0  # drivers alive or being started
+        self._uses: dict[int, int] = {}
+        self._idle_timer: threading.Timer | None = None
+        self.closed = False
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _discard(self, driver) -> None:
+        with self.lock:
+            if driver in self.active_drivers:
+                self.active_drivers.remove(driver)
+                self._size -= 1
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _cancel_idle_timer(self) -> None:
+        with self.lock:
+            timer, self._idle_timer = self._idle_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def get(self, timeout: float | None = None):
+        """Check out a healthy driver, starting one if the pool has room (blocks otherwise)."""
+        self._cancel_idle_timer()
+        while True:
             try:
-                driver = setup_driver(headless=self.headless)
-                self.active_drivers.append(driver)
-                self.pool.put(driver)
-                print(f"  Driver {i+1}/{max_drivers} initialized")
-            except Exception as e:
-                print(f"  Failed to initialize driver {i+1}: {e}")
-                # Continue with fewer drivers if some fail
+                driver = self.pool.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    if self.closed:
+                        raise RuntimeError("WebDriverPool is shut down")
+                    can_start = self._size < self.max_drivers
+                    if can_start:
+                        self._size += 1
+                if can_start:
+                    try:
+                        driver = setup_driver(headless=self.headless)
+                    except Exception:
+                        with self.lock:
+                            self._size -= 1
+                        raise
+                    with self.lock:
+                        self.active_drivers.append(driver)
+                        self._uses[id(driver)] = 0
+                    print(f"  WebDriver pool: started driver {len(self.active_drivers)}/{self.max_drivers}")
+                    return driver
+                driver = self.pool.get(timeout=timeout)
+            if self._healthy(driver):
+                return driver
+            print("  WebDriver pool: replacing unresponsive driver")
+            self._discard(driver)
+
+    def release(self, driver, pages: int = 1):
+        """Return a driver after `pages` page loads; recycles it once it has served `recycle_after`."""
+        if not driver:
+            return
+        with self.lock:
+            uses = self._uses.get(id(driver), 0) + max(0, int(pages))
+            self._uses[id(driver)] = uses
+            retire = self.closed or uses >= self.recycle_after
+        if retire:
+            self._discard(driver)
+            return
+        self.pool.put(driver)
+        with self.lock:
+            all_idle = self.pool.qsize() >= len(self.active_drivers)
+            if all_idle and self.idle_s > 0 and self._idle_timer is None and not self.closed:
+                self._idle_timer = threading.Timer(self.idle_s, self._quit_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def _quit_idle(self) -> None:
+        with self.lock:
+            self._idle_timer = None
+        while True:
+            try:
+                driver = self.pool.get_nowait()
+            except queue.Empty:
                 break
-    
-    def get(self):
-        """Get a driver from the pool (blocks until one is available)."""
-        # This will block until a driver is available
-        driver = self.pool.get()
-        return driver
-    
-    def release(self, driver):
-        """Return a driver to the pool."""
-        if driver:
-            self.pool.put(driver)
-    
+            self._discard(driver)
+
     def shutdown(self):
         """Quit all drivers in the pool."""
+        self._cancel_idle_timer()
         with self.lock:
-            for driver in self.active_drivers:
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
+            self.closed = True
+            drivers = list(self.active_drivers)
             self.active_drivers.clear()
-            # Clear the queue
-            while not self.pool.empty():
-                try:
-                    self.pool.get_nowait()
-                except queue.Empty:
-                    break
+            self._uses.clear()
+            self._size = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        # Clear the queue
+        while not self.pool.empty():
+            try:
+                self.pool.get_nowait()
+            except queue.Empty:
+                break
+
+
+_shared_pool: WebDriverPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool(headless: bool = True) -> WebDriverPool:
+    """Process-wide warm pool (RETAILOS_NL_CONCURRENT_WORKERS drivers, max 4)."""
+    global _shared_pool
+    with _shared_pool_lock:
+        pool = _shared_pool
+        if pool is None or pool.closed or pool.headless != headless:
+            if pool is not None:
+                pool.shutdown()
+            pool_size = int(os.getenv("RETAILOS_NL_CONCURRENT_WORKERS", "2") or "2")
+            pool_size = max(1, min(4, pool_size))  # Limit to max 4
+            pool = WebDriverPool(max_drivers=pool_size, headless=headless)
+            _shared_pool = pool
+        return pool
+
+
+def shutdown_driver_pool() -> None:
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_driver_pool)
+
+
+def _wait_for_tiles(driver, expected: int = GRID_PAGE_SIZE, timeout: float | None = None) -> int:
+    """
+    Scroll to trigger lazy tiles and wait until the grid has `expected` tiles or stops growing
+    (short last pages). Returns the tile count.
+    """
+    if timeout is None:
+        timeout = float(os.getenv("RETAILOS_NL_TILE_WAIT_S", "5") or "5")
+    state = {"count": -1, "stable": 0}
+
+    def _ready(d):
+        d.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        n = len(d.find_elements(By.CSS_SELECTOR, "div.product-tile"))
+        if n >= expected:
+            state["count"] = n
+            return True
+        if n == state["count"]:
+            state["stable"] += 1
+        else:
+            state["count"], state["stable"] = n, 0
+        return n > 0 and state["stable"] >= 3
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(_ready)
+    except TimeoutException:
+        pass
+    driver.execute_script("window.scrollTo(0, 0);")
+    return max(0, state["count"])
 
 def wait_for_products(driver, timeout: int = 30):
     """Wait for product tiles to load."""
@@ -530,6 +735,37 @@ def get_pagination_info(driver):
         pass
     return 1
 
+def _tile_badges(tile) -> list[str]:
+    """Stock/promo badges on a listing tile (badge icons and availability labels)."""
+    badges = []
+    for node in tile.css("[class*=badge], [class*=availability], [class*=stock]"):
+        label = node.attributes.get("src") or node.attributes.get("alt") or node.text(strip=True)
+        if label:
+            badges.append(label)
+    return sorted(badges)
+
+
+def tile_fingerprint(product: dict, badges: list[str] | None = None) -> str:
+    """
+    Hash of the listing-tile data a detail page is expected to track (title, price, image,
+    identifiers, badges). Deep scrape only revisits a detail page when this changes.
+    """
+    content = json.dumps(
+        {
+            "title": product.get("title") or "",
+            "price": str(product.get("price") or ""),
+            "brand": product.get("brand") or "",
+            "ean": product.get("ean") or "",
+            "url": product.get("url") or "",
+            "image": product.get("image_url") or "",
+            "badges": badges or [],
+        },
+        sort_keys=True,
+        ensure_ascii=True,
+    )
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
 def extract_products_from_html(html: str, page_num: int = 1, overall_rank_start: int = 1) -> list[dict]:
     """Extract product data using selectolax."""
     tree = HTMLParser(html)
@@ -572,7 +808,7 @@ def extract_products_from_html(html: str, page_num: int = 1, overall_rank_start:
                     break
 
             if product_id and title:
-                products.append({
+                product = {
                     "source_listing_id": product_id,
                     "title": title,
                     "price": price,
@@ -587,43 +823,26 @@ def extract_products_from_html(html: str, page_num: int = 1, overall_rank_start:
                     "noel_leeming_rank": overall_rank_start + idx,
                     "page_number": page_num,
                     "page_position": idx + 1
-                })
+                }
+                product["tile_fingerprint"] = tile_fingerprint(product, _tile_badges(tile))
+                products.append(product)
         except Exception:
             continue
             
     return products
 
-def scrape_category(
-    headless: bool = True,
-    max_pages: int = None,
-    category_url: str = None,
-    deep_scrape: bool = False,
-    cmd_id: str | None = None,
-    progress_hook=None,
-    should_abort=None,
-):
+def _nl_preflight() -> None:
     """
-    Scrape a category using Selenium.
-    deep_scrape: If True, visits every product URL to get more images (SLOW).
+    Fast preflight: if the site is returning 403 from this environment, Selenium will just spin and time out.
+    This is NOT a mock — it's a real network check to fail fast with a clear diagnosis.
     """
-    if not category_url:
-        category_url = DEFAULT_CATEGORY_URL
-
-    # Fast preflight: if the site is returning 403 from this environment, Selenium will just spin and time out.
-    # This is NOT a mock — it's a real network check to fail fast with a clear diagnosis.
     try:
-        proxy = os.getenv("NOEL_LEEMING_PROXY") or os.getenv("HTTPS_PROXY") or os.getenv("HTTP_PROXY")
-        proxies = None
-        if proxy:
-            # httpx expects a dict mapping scheme->proxy URL
-            proxies = {"http://": proxy, "https://": proxy}
-        r = httpx.get(
-            BASE_URL,
-            follow_redirects=True,
-            timeout=10.0,
-            headers={"User-Agent": "Mozilla/5.0"},
-            proxies=proxies,
-        )
+        client, owned = nl_http_client()
+        try:
+            r = client.get(BASE_URL, timeout=10.0, headers={"User-Agent": "Mozilla/5.0"})
+        finally:
+            if owned:
+                client.close()
         if r.status_code == 403:
             raise RuntimeError(
                 "Noel Leeming blocked this environment (HTTP 403). "
@@ -634,276 +853,447 @@ def scrape_category(
     except Exception:
         # If preflight fails for transient reasons, continue to Selenium attempt.
         pass
-    
-    print(f"Starting Selenium WebDriver (headless={headless})...")
-    driver = setup_driver(headless=headless)
-    
-    all_products = []
-    seen_ids = set()
-    
-    # Track overall rank across pages
-    # NOTE: This variable must persist across pages
-    overall_rank_persistent = 1
-    
+
+
+def _scrape_page_selenium(driver, category_url: str, page_num: int, should_abort=None) -> list[dict] | None:
+    """
+    Load one grid page in the browser and extract its tiles (ranks are page-local).
+    Returns None when the page never rendered products.
+    """
+    if page_num > 1:
+        page_url = with_query(category_url, start=(page_num - 1) * GRID_PAGE_SIZE)
+        with GlobalHTTPThrottle.request(page_url):
+            driver.get(page_url)
+        if not wait_for_products(driver, timeout=15):
+            return None
+
+    _wait_for_tiles(driver)
+
+    # Extract Listing Data first
+    html = driver.page_source
+    page_products = extract_products_from_html(html, page_num, 1)
+
+    # Best-effort: download the tile image via the browser session (avoids 403 on demandware images).
+    # This keeps NL usable in the operator flow without needing deep_scrape.
     try:
-        print(f"\nNavigating to: {category_url}")
-        driver.get(category_url)
-        
-        if not wait_for_products(driver):
-            return []
-        
-        time.sleep(2)
-        total_pages = get_pagination_info(driver) or 5
-        print(f"Detected {total_pages} pages")
-        
-        if max_pages:
-            total_pages = min(total_pages, max_pages)
-        
-        import logging
-        log = logging.getLogger(__name__)
+        dl = (os.getenv("RETAILOS_NL_BROWSER_IMAGE_DOWNLOAD", "true") or "true").lower() in ("1", "true", "yes", "on")
+        per_page = int(os.getenv("RETAILOS_NL_BROWSER_IMAGE_DOWNLOAD_PER_PAGE", "32") or "32")
+        per_page = max(0, min(64, per_page))
+        if dl and per_page and page_products:
+            with browser_images_allowed(driver):
+                for i, p in enumerate(page_products[:per_page], 0):
+                    try:
+                        if should_abort and bool(should_abort()):
+                            return page_products
+                    except Exception:
+                        pass
+                    img = (p or {}).get("photo1") or ""
+                    pid = str((p or {}).get("source_listing_id") or "").strip()
+                    if not pid or not img or not isinstance(img, str):
+                        continue
+                    if not img.startswith("http"):
+                        continue
+                    if "noelleeming.co.nz/dw/image/" not in img:
+                        continue
+                    b = _fetch_bytes_via_selenium(driver, img)
+                    if not b:
+                        continue
+                    try:
+                        local = _save_media_bytes(f"NL-{pid}.jpg", b)
+                        p["photo1"] = local
+                    except Exception:
+                        pass
+    except Exception:
+        pass
+    return page_products
 
-        for page_num in range(1, total_pages + 1):
-            try:
-                if should_abort and bool(should_abort()):
-                    return all_products
-            except Exception:
-                pass
-            print(f"--- Page {page_num}/{total_pages} ---")
-            try:
-                if cmd_id:
-                    log.info(f"NOEL_LEEMING_PAGE cmd_id={cmd_id} page={page_num} total_pages={total_pages}")
-            except Exception:
-                pass
-            try:
-                if progress_hook and cmd_id:
-                    progress_hook(
-                        {
-                            "phase": "scrape",
-                            "supplier": "NOEL_LEEMING",
-                            "done": int(page_num - 1),
-                            "total": int(total_pages),
-                            "message": f"Scraping NL pages: {page_num}/{total_pages}",
-                        }
-                    )
-            except Exception:
-                pass
-            
-            # Navigate if needed
-            if page_num > 1:
-                page_url = f"{category_url}&start={(page_num-1)*32}"
-                driver.get(page_url)
-                if not wait_for_products(driver, timeout=15):
+
+def _scrape_pages_selenium(
+    driver_pool: "WebDriverPool",
+    category_url: str,
+    page_nums: list[int],
+    on_page=None,
+    should_abort=None,
+) -> dict[int, list[dict]]:
+    """
+    Shard `page_nums` across up to `driver_pool.max_drivers` browsers (one checked-out driver per
+    thread). Pages that never rendered are left out of the result.
+    """
+    todo: "queue.Queue[int]" = queue.Queue()
+    for page_num in page_nums:
+        todo.put(page_num)
+    out: dict[int, list[dict]] = {}
+    out_lock = threading.Lock()
+
+    def _worker() -> None:
+        driver = driver_pool.get()
+        loads = 0
+        try:
+            while True:
+                try:
+                    if should_abort and bool(should_abort()):
+                        return
+                except Exception:
+                    pass
+                try:
+                    page_num = todo.get_nowait()
+                except queue.Empty:
+                    return
+                if on_page:
+                    on_page(page_num)
+                page_products = _scrape_page_selenium(driver, category_url, page_num, should_abort=should_abort)
+                loads += 1
+                if page_products is None:
                     continue
-                time.sleep(2)
-            
-            # Scroll
-            for _ in range(5):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
-                tiles = driver.find_elements(By.CSS_SELECTOR, "div.product-tile")
-                if len(tiles) >= 32:
-                    break
-            
-            driver.execute_script("window.scrollTo(0, 0);")
-            
-            # Extract Listing Data first
-            html = driver.page_source
-            page_products = extract_products_from_html(html, page_num, overall_rank_persistent)
+                with out_lock:
+                    out[page_num] = page_products
+                print(f"  Page {page_num}: extracted {len(page_products)} products")
+        finally:
+            driver_pool.release(driver, pages=loads)
+
+    n = max(1, min(len(page_nums), driver_pool.max_drivers))
+    if n == 1:
+        _worker()
+        return out
+    threads = [threading.Thread(target=_worker, name=f"nl-page-{i}", daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def detail_max_age() -> timedelta:
+    """How long a detail scrape stays valid while the tile is unchanged (RETAILOS_NL_DETAIL_MAX_AGE_HOURS)."""
+    try:
+        hours = float(os.getenv("RETAILOS_NL_DETAIL_MAX_AGE_HOURS", "168") or "168")
+    except ValueError:
+        hours = 168.0
+    return timedelta(hours=max(0.0, hours))
+
+
+def _reuse_known_details(page_products: list[dict], known_details: dict[str, dict]) -> list[dict]:
+    """
+    Copy stored detail data (images/specs, and the stored description as `seo_description`) onto
+    products whose tile fingerprint is unchanged and whose last detail scrape is recent enough.
+    Returns the products that still need a detail page.
+    """
+    cutoff = datetime.now(timezone.utc) - detail_max_age()
+    to_fetch = []
+    for p in page_products:
+        known = known_details.get(str(p.get("source_listing_id") or ""))
+        scraped_at = (known or {}).get("detail_scraped_at")
+        if scraped_at is not None and scraped_at.tzinfo is None:
+            scraped_at = scraped_at.replace(tzinfo=timezone.utc)
+        if (
+            not known
+            or not p.get("tile_fingerprint")
+            or known.get("tile_fingerprint") != p["tile_fingerprint"]
+            or scraped_at is None
+            or scraped_at < cutoff
+        ):
+            to_fetch.append(p)
+            continue
+        for i, img in enumerate(list(known.get("images") or [])[:4], 1):
+            p[f"photo{i}"] = img
+        if known.get("specs"):
+            p["specs"] = known["specs"]
+        if known.get("description"):
+            p["seo_description"] = known["description"]
+        p["detail_reused"] = True
+    return to_fetch
+
 
-            # Best-effort: download the tile image via the browser session (avoids 403 on demandware images).
-            # This keeps NL usable in the operator flow without needing deep_scrape.
+def _deep_scrape_products(page_products: list[dict], headless: bool, should_abort=None, known_details: dict | None = None) -> int:
+    """
+    Deep Scrape for High Res Images using Selenium (CONCURRENT). Updates `page_products` in place.
+    Products whose tile is unchanged since a recent detail scrape reuse `known_details` instead;
+    returns how many detail pages were skipped that way.
+    """
+    all_products = page_products
+    page_products = _reuse_known_details(all_products, known_details) if known_details else list(all_products)
+    skipped = len(all_products) - len(page_products)
+    if skipped:
+        print(f"  Deep scrape: {skipped} detail pages skipped (tile unchanged)")
+    if not page_products:
+        return skipped
+    print(f"  Deep scraping {len(page_products)} items for images...")
+
+    # Shared warm pool: drivers stay up between pages and categories.
+    driver_pool = get_driver_pool(headless=headless)
+
+    def scrape_product_worker(product_dict):
+        """Worker function to scrape a single product detail."""
+        pool_driver = None
+        try:
+            print(f"    Starting: {product_dict.get('title', 'unknown')[:50]}")
+
+            # Check abort flag
+            if should_abort and bool(should_abort()):
+                return product_dict
+
+            if not product_dict.get("url"):
+                return product_dict
+
+            # Get a driver from the pool
+            pool_driver = driver_pool.get()
+
+            # Scrape the detail page with timeout handling
             try:
+                details = scrape_product_detail(pool_driver, product_dict["url"])
+            except Exception as detail_error:
+                # Log timeout or other errors but don't crash
+                error_msg = str(detail_error)
+                if "timeout" in error_msg.lower() or "renderer" in error_msg.lower():
+                    print(f"  Timeout scraping {product_dict.get('url', 'unknown')}, skipping...")
+                else:
+                    print(f"  Error scraping detail: {error_msg}")
+                return product_dict
+
+            if details["images"]:
+                # Prefer browser-session downloads for NL images (requests often 403).
+                limit_imgs = int(os.getenv("RETAILOS_NL_IMAGE_LIMIT_PER_PRODUCT", "2") or "2")
+                limit_imgs = max(0, min(4, limit_imgs))
                 dl = (os.getenv("RETAILOS_NL_BROWSER_IMAGE_DOWNLOAD", "true") or "true").lower() in ("1", "true", "yes", "on")
-                per_page = int(os.getenv("RETAILOS_NL_BROWSER_IMAGE_DOWNLOAD_PER_PAGE", "32") or "32")
-                per_page = max(0, min(64, per_page))
-                if dl and per_page:
-                    for i, p in enumerate(page_products[:per_page], 0):
-                        try:
-                            if should_abort and bool(should_abort()):
-                                return all_products
-                        except Exception:
-                            pass
-                        img = (p or {}).get("photo1") or ""
-                        pid = str((p or {}).get("source_listing_id") or "").strip()
-                        if not pid or not img or not isinstance(img, str):
-                            continue
-                        if not img.startswith("http"):
-                            continue
-                        if "noelleeming.co.nz/dw/image/" not in img:
+
+                with browser_images_allowed(pool_driver):
+                    for i, img in enumerate(details["images"][: max(1, limit_imgs)], 0):
+                        if not img:
                             continue
-                        b = _fetch_bytes_via_selenium(driver, img)
-                        if not b:
+                        # Default to remote URL
+                        product_dict[f"photo{i+1}"] = img
+                        if not dl:
                             continue
-                        try:
-                            local = _save_media_bytes(f"NL-{pid}.jpg", b)
-                            p["photo1"] = local
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-            
-            # Count how many NEW products we found to update rank counter
-            new_this_page = 0
-            for p in page_products:
-                if p['source_listing_id'] not in seen_ids:
-                    seen_ids.add(p['source_listing_id'])
-                    new_this_page += 1
-            
-            # Update rank for next page (add NEW items found, assuming sequential)
-            # Actually extract_products uses overall_rank_persistent as start.
-            # We need to increment it by the number of items on THIS page (regardless of whether we've seen them before? 
-            # No, if we've seen them, rank is dubious. But usually pagination is distinct.
-            # We'll increment by len(page_products) to be safe for next page.
-            overall_rank_persistent += len(page_products)
-            
-            # Deep Scrape for High Res Images using Selenium (CONCURRENT)
-            if deep_scrape:
-                print(f"  Deep scraping {len(page_products)} items for images...")
-                
-                # Create a worker pool if not already created
-                if not hasattr(scrape_category, '_driver_pool'):
-                    # Reduced default from 4 to 2 to prevent Selenium timeouts
-                    pool_size = int(os.getenv("RETAILOS_NL_CONCURRENT_WORKERS", "2") or "2")
-                    pool_size = max(1, min(4, pool_size))  # Limit to max 4
-                    scrape_category._driver_pool = WebDriverPool(max_drivers=pool_size, headless=headless)
-                
-                driver_pool = scrape_category._driver_pool
-                
-                def scrape_product_worker(product_dict):
-                    """Worker function to scrape a single product detail."""
-                    pool_driver = None
-                    try:
-                        print(f"    Starting: {product_dict.get('title', 'unknown')[:50]}")
-                        
-                        # Check abort flag
-                        if should_abort and bool(should_abort()):
-                            return product_dict
-                        
-                        if not product_dict.get("url"):
-                            return product_dict
-                        
-                        # Get a driver from the pool
-                        pool_driver = driver_pool.get()
-                        
-                        # Scrape the detail page with timeout handling
-                        try:
-                            details = scrape_product_detail(pool_driver, product_dict["url"])
-                        except Exception as detail_error:
-                            # Log timeout or other errors but don't crash
-                            error_msg = str(detail_error)
-                            if "timeout" in error_msg.lower() or "renderer" in error_msg.lower():
-                                print(f"  Timeout scraping {product_dict.get('url', 'unknown')}, skipping...")
-                            else:
-                                print(f"  Error scraping detail: {error_msg}")
-                            return product_dict
-                        
-                        if details["images"]:
-                            # Prefer browser-session downloads for NL images (requests often 403).
-                            limit_imgs = int(os.getenv("RETAILOS_NL_IMAGE_LIMIT_PER_PRODUCT", "2") or "2")
-                            limit_imgs = max(0, min(4, limit_imgs))
-                            dl = (os.getenv("RETAILOS_NL_BROWSER_IMAGE_DOWNLOAD", "true") or "true").lower() in ("1", "true", "yes", "on")
-
-                            for i, img in enumerate(details["images"][: max(1, limit_imgs)], 0):
-                                if not img:
-                                    continue
-                                # Default to remote URL
-                                product_dict[f"photo{i+1}"] = img
-                                if not dl:
-                                    continue
-                                b = _fetch_bytes_via_selenium(pool_driver, img)
-                                if b:
-                                    pid = str(product_dict.get("source_listing_id") or "").strip() or "NL"
-                                    fn = f"NL-{pid}.jpg" if i == 0 else f"NL-{pid}_{i+1}.jpg"
-                                    try:
-                                        local = _save_media_bytes(fn, b)
-                                        product_dict[f"photo{i+1}"] = local
-                                    except Exception:
-                                        # leave remote URL
-                                        pass
-                        if details["description"] and len(details["description"]) > len(product_dict.get("title", "")):
-                             product_dict["description"] = details["description"]
-                        if details.get("specs"):
-                             product_dict["specs"] = details["specs"]
-                        
-                        return product_dict
-                    except Exception as e:
-                        print(f"  Error in worker for {product_dict.get('url', 'unknown')}: {e}")
-                        return product_dict
-                    finally:
-                        # Always release the driver back to the pool
-                        if pool_driver:
-                            driver_pool.release(pool_driver)
-                
-                # Process products concurrently
-                # Reduced to 1 to isolate crash issue
-                max_workers = int(os.getenv("RETAILOS_NL_CONCURRENT_WORKERS", "1") or "1")
-                max_workers = max(1, min(4, max_workers))  # Limit to max 4
-                
-                print(f"  Processing {len(page_products)} products with {max_workers} workers...")
-                
-                try:
-                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                        # Submit all tasks
-                        futures = {executor.submit(scrape_product_worker, p): p for p in page_products}
-                        
-                        # Collect results
-                        completed = 0
-                        for future in as_completed(futures):
+                        b = _fetch_bytes_via_selenium(pool_driver, img)
+                        if b:
+                            pid = str(product_dict.get("source_listing_id") or "").strip() or "NL"
+                            fn = f"NL-{pid}.jpg" if i == 0 else f"NL-{pid}_{i+1}.jpg"
                             try:
-                                result = future.result(timeout=120)  # 2 minute timeout per product
-                                if result:
-                                    # Find the original product in page_products and update it
-                                    # This assumes product objects are mutable and can be updated in place
-                                    # Or, if they are replaced, we need to find the index.
-                                    # For simplicity, assuming the worker modifies the dict in place,
-                                    # or we can re-assign if the worker returns a new dict.
-                                    # The original code didn't explicitly re-assign, implying in-place modification.
-                                    # If `result` is a new dict, we need to find the original `p` and replace it.
-                                    # Given the worker returns `product_dict`, it's likely the same object.
-                                    # The instruction's `products[products.index(futures[future])] = result`
-                                    # implies replacement. Let's adapt to `page_products`.
-                                    original_product = futures[future]
-                                    if original_product in page_products:
-                                        idx = page_products.index(original_product)
-                                        page_products[idx] = result # Replace with potentially updated result
-                                completed += 1
-                                if completed % 10 == 0:
-                                    print(f"    Progress: {completed}/{len(page_products)} products scraped")
-                            except TimeoutError:
-                                print(f"    TIMEOUT: Product scraping took too long, skipping...")
-                            except Exception as e:
-                                print(f"    ERROR in future: {type(e).__name__}: {str(e)}")
-                                import traceback
-                                traceback.print_exc()
-                    
-                    print(f"  Completed scraping {len(page_products)} products")
-                    
+                                local = _save_media_bytes(fn, b)
+                                product_dict[f"photo{i+1}"] = local
+                            except Exception:
+                                # leave remote URL
+                                pass
+            if details["description"] and len(details["description"]) > len(product_dict.get("title", "")):
+                 product_dict["description"] = details["description"]
+            if details.get("specs"):
+                 product_dict["specs"] = details["specs"]
+            product_dict["detail_scraped"] = True
+
+            return product_dict
+        except Exception as e:
+            print(f"  Error in worker for {product_dict.get('url', 'unknown')}: {e}")
+            return product_dict
+        finally:
+            # Always release the driver back to the pool
+            if pool_driver:
+                driver_pool.release(pool_driver)
+
+    # Process products concurrently
+    # Reduced to 1 to isolate crash issue
+    max_workers = int(os.getenv("RETAILOS_NL_CONCURRENT_WORKERS", "1") or "1")
+    max_workers = max(1, min(4, max_workers))  # Limit to max 4
+
+    print(f"  Processing {len(page_products)} products with {max_workers} workers...")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit all tasks
+            futures = {executor.submit(scrape_product_worker, p): p for p in page_products}
+
+            # Collect results
+            completed = 0
+            for future in as_completed(futures):
+                try:
+                    result = future.result(timeout=120)  # 2 minute timeout per product
+                    if result:
+                        # Find the original product in page_products and update it
+                        # This assumes product objects are mutable and can be updated in place
+                        # Or, if they are replaced, we need to find the index.
+                        # For simplicity, assuming the worker modifies the dict in place,
+                        # or we can re-assign if the worker returns a new dict.
+                        # The original code didn't explicitly re-assign, implying in-place modification.
+                        # If `result` is a new dict, we need to find the original `p` and replace it.
+                        # Given the worker returns `product_dict`, it's likely the same object.
+                        # The instruction's `products[products.index(futures[future])] = result`
+                        # implies replacement. Let's adapt to `page_products`.
+                        original_product = futures[future]
+                        if original_product in page_products:
+                            idx = page_products.index(original_product)
+                            page_products[idx] = result # Replace with potentially updated result
+                    completed += 1
+                    if completed % 10 == 0:
+                        print(f"    Progress: {completed}/{len(page_products)} products scraped")
+                except TimeoutError:
+                    print(f"    TIMEOUT: Product scraping took too long, skipping...")
                 except Exception as e:
-                    print(f"  CRITICAL ERROR in ThreadPoolExecutor: {type(e).__name__}: {str(e)}")
+                    print(f"    ERROR in future: {type(e).__name__}: {str(e)}")
                     import traceback
                     traceback.print_exc()
-                    # Don't crash - continue with whatever we have
-                
-                finally:
-                    # Always cleanup the driver pool
-                    try:
-                        driver_pool.shutdown()
-                        print(f"  WebDriver pool shut down successfully")
-                    except Exception as e:
-                        print(f"  Error shutting down pool: {e}")
-            
-            print(f"  Extracted {len(page_products)} products")
-            all_products.extend(page_products)
-            
-    finally:
-        driver.quit()
-        # Shutdown the driver pool if it was created
-        if hasattr(scrape_category, '_driver_pool'):
-            scrape_category._driver_pool.shutdown()
-            delattr(scrape_category, '_driver_pool')
 
-        
-    return all_products
+        print(f"  Completed scraping {len(page_products)} products")
+
+    except Exception as e:
+        print(f"  CRITICAL ERROR in ThreadPoolExecutor: {type(e).__name__}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        # Don't crash - continue with whatever we have
+    return skipped
+
+
+def _renumber_ranks(pages: dict[int, list[dict]]) -> list[dict]:
+    """Flatten pages in order and assign the overall category rank (continuous across pages)."""
+    out: list[dict] = []
+    rank = 1
+    for page_num in sorted(pages):
+        page_products = pages[page_num]
+        for idx, p in enumerate(page_products):
+            p["noel_leeming_rank"] = rank + idx
+            p["page_number"] = page_num
+            p["page_position"] = idx + 1
+        rank += len(page_products)
+        out.extend(page_products)
+    return out
+
+
+def scrape_category(
+    headless: bool = True,
+    max_pages: int = None,
+    category_url: str = None,
+    deep_scrape: bool = False,
+    cmd_id: str | None = None,
+    progress_hook=None,
+    should_abort=None,
+    known_details: dict | None = None,
+    coverage: dict | None = None,
+):
+    """
+    Scrape a category: listing pages over plain HTTP (see `grid.py`), Selenium only for pages
+    the fast path could not read (or for the whole category when page 1 fails).
+    deep_scrape: If True, visits every product URL to get more images (SLOW, always Selenium).
+    known_details: {sku: {tile_fingerprint, detail_scraped_at, images, specs}} from the last
+    deep scrape; detail pages are skipped for SKUs whose tile has not changed since.
+    coverage: filled with {"last_page", "complete"}; complete means every page up to the
+    category's last one was read (reconciliation may then trust the rows as the whole category).
+    """
+    if not category_url:
+        category_url = DEFAULT_CATEGORY_URL
+    if coverage is None:
+        coverage = {}
+    coverage.update(last_page=None, complete=False)
+
+    _nl_preflight()
+
+    import logging
+    log = logging.getLogger(__name__)
+
+    def _page_progress(page_num: int, total_pages: int) -> None:
+        print(f"--- Page {page_num}/{total_pages} ---")
+        try:
+            if cmd_id:
+                log.info(f"NOEL_LEEMING_PAGE cmd_id={cmd_id} page={page_num} total_pages={total_pages}")
+        except Exception:
+            pass
+        try:
+            if progress_hook and cmd_id:
+                progress_hook(
+                    {
+                        "phase": "scrape",
+                        "supplier": "NOEL_LEEMING",
+                        "done": int(page_num - 1),
+                        "total": int(total_pages),
+                        "message": f"Scraping NL pages: {page_num}/{total_pages}",
+                    }
+                )
+        except Exception:
+            pass
+
+    def _aborted() -> bool:
+        try:
+            return bool(should_abort and should_abort())
+        except Exception:
+            return False
+
+    pages: dict[int, list[dict]] = {}
+    # None = fast path unavailable: Selenium reads every page.
+    selenium_pages: list[int] | None = None
+    # The category's real last page, once known and within max_pages.
+    last_page: int | None = None
+    if fast_path_enabled():
+        grid = scrape_category_grid(category_url, max_pages, should_abort=should_abort, on_page=_page_progress)
+        if grid.ok:
+            pages.update(grid.pages)
+            last_page = grid.total_pages if grid.exhausted else None
+            selenium_pages = list(grid.failed_pages)
+            print(f"NL fast path: {len(grid.pages)} pages over HTTP, {len(selenium_pages)} need Selenium")
+        else:
+            print("NL fast path unavailable for this category; using Selenium")
+        try:
+            if cmd_id:
+                log.info(
+                    f"NOEL_LEEMING_FAST_PATH cmd_id={cmd_id} ok={grid.ok} pages={len(grid.pages)} "
+                    f"fallback_pages={len(grid.failed_pages) if grid.ok else 'all'}"
+                )
+        except Exception:
+            pass
+        if _aborted():
+            return _renumber_ranks(pages)
+
+    if selenium_pages is None or selenium_pages:
+        print(f"Checking out warm WebDriver (headless={headless})...")
+        driver_pool = get_driver_pool(headless=headless)
+        if selenium_pages is None:
+            driver = driver_pool.get()
+            try:
+                print(f"\nNavigating to: {category_url}")
+                with GlobalHTTPThrottle.request(category_url):
+                    driver.get(category_url)
+
+                if not wait_for_products(driver):
+                    return []
+
+                detected = get_pagination_info(driver)
+                total_pages = detected or 5
+                print(f"Detected {total_pages} pages")
+                if detected and (not max_pages or max_pages >= detected):
+                    last_page = detected
+
+                if max_pages:
+                    total_pages = min(total_pages, max_pages)
+                _page_progress(1, total_pages)
+                page_products = _scrape_page_selenium(driver, category_url, 1, should_abort=should_abort)
+                if page_products is not None:
+                    pages[1] = page_products
+                    print(f"  Extracted {len(page_products)} products")
+            finally:
+                driver_pool.release(driver, pages=1)
+            selenium_pages = list(range(2, total_pages + 1))
+            total_for_progress = total_pages
+        else:
+            total_for_progress = max(list(pages) + selenium_pages)
+
+        # Remaining pages are spread across the pool's browsers.
+        if selenium_pages and not _aborted():
+            pages.update(
+                _scrape_pages_selenium(
+                    driver_pool,
+                    category_url,
+                    selenium_pages,
+                    on_page=lambda n: _page_progress(n, total_for_progress),
+                    should_abort=should_abort,
+                )
+            )
+
+    if last_page is not None and not _aborted():
+        coverage.update(last_page=last_page, complete=all(n in pages for n in range(1, last_page + 1)))
+
+    if deep_scrape:
+        for page_num in sorted(pages):
+            if _aborted():
+                break
+            _deep_scrape_products(pages[page_num], headless, should_abort=should_abort, known_details=known_details)
+
+    return _renumber_ranks(pages)
 
 if __name__ == "__main__":
     # Test run
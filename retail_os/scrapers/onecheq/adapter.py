@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 
 # NOTE: uses root logging configured by worker/uvicorn.
 import logging
@@ -9,11 +10,11 @@ _REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..",
 if _REPO_ROOT not in sys.path:
     sys.path.insert(0, _REPO_ROOT)
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List
 from sqlalchemy.orm import Session
-from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, InternalProduct
-from retail_os.scrapers.onecheq.scraper import scrape_onecheq
+from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, InternalProduct, SystemSetting
+from retail_os.scrapers.onecheq.scraper import scrape_onecheq, parse_shopify_timestamp
 from retail_os.core.unified_schema import normalize_onecheq_row, UnifiedProduct
 from retail_os.utils.seo import build_seo_description
 import hashlib
@@ -38,6 +39,49 @@ class OneCheqAdapter:
             self.db.commit()
         self.supplier_id = supplier.id
 
+    # --- Incremental sync state (SystemSetting: supplier.sync_state.<id>) ---
+
+    def _sync_state_key(self) -> str:
+        return f"supplier.sync_state.{int(self.supplier_id)}"
+
+    def _load_sync_state(self) -> dict:
+        row = self.db.query(SystemSetting).filter(SystemSetting.key == self._sync_state_key()).first()
+        return dict(row.value) if row and isinstance(row.value, dict) else {}
+
+    def _save_sync_state(self, **updates) -> None:
+        row = self.db.query(SystemSetting).filter(SystemSetting.key == self._sync_state_key()).first()
+        state = dict(row.value) if row and isinstance(row.value, dict) else {}
+        state.update(updates)
+        if row is None:
+            self.db.add(SystemSetting(key=self._sync_state_key(), value=state))
+        else:
+            row.value = state
+        self.db.commit()
+
+    def _resolve_sync_mode(self, sync_mode: str, collection: str) -> tuple[str, datetime | None]:
+        """
+        Returns (mode, watermark) where mode is "full" or "incremental".
+        "auto" runs incremental against the stored watermark, but falls back to a full sweep
+        when there is no watermark yet or the last full sweep is older than
+        RETAILOS_ONECHEQ_FULL_SWEEP_HOURS (reconciliation needs a complete catalog view).
+        """
+        mode = (sync_mode or "full").strip().lower()
+        if mode not in ("auto", "incremental"):
+            return "full", None
+        if collection != "all" or (os.getenv("RETAILOS_ONECHEQ_SOURCE", "json") or "json").strip().lower() != "json":
+            return "full", None
+
+        state = self._load_sync_state()
+        watermark = parse_shopify_timestamp(state.get("watermark"))
+        if watermark is None:
+            return "full", None
+        if mode == "auto":
+            sweep_hours = float(os.getenv("RETAILOS_ONECHEQ_FULL_SWEEP_HOURS", "24") or "24")
+            last_full = parse_shopify_timestamp(state.get("last_full_sweep_at"))
+            if last_full is None or (datetime.now(timezone.utc) - last_full) > timedelta(hours=sweep_hours):
+                return "full", None
+        return "incremental", watermark
+
     def run_sync(
         self,
         pages: int = 1,
@@ -46,85 +90,225 @@ class OneCheqAdapter:
         progress_every: int = 100,
         progress_hook=None,
         should_abort=None,
+        sync_mode: str = "full",
+        resume: bool = False,
     ):
+        """
+        sync_mode:
+        - "full": scrape everything in scope, then reconcile (default)
+        - "incremental": only products updated since the stored watermark; no reconciliation
+        - "auto": incremental, with a scheduled full sweep (RETAILOS_ONECHEQ_FULL_SWEEP_HOURS)
+
+        Full JSON sweeps are recorded in the scrape_runs ledger with a page cursor per committed
+        batch; `resume=True` continues the last interrupted sweep of this collection after its
+        cursor (see retail_os.core.scrape_runs).
+        """
         if pages <= 0:
             print(f"Adapter: [WARNING] UNLIMITED SYNC REQUESTED for {self.supplier_name}", file=sys.stderr)
             pages = 0  # Passes through to scraper's <=0 logic
-            
-        print(f"Adapter: Starting Sync for {self.supplier_name} (Pages={'UNLIMITED' if pages == 0 else pages}, Collection={collection})...")
+
+        mode, watermark = self._resolve_sync_mode(sync_mode, collection)
+        if mode == "incremental" or (str(sync_mode).lower() == "auto" and collection == "all"):
+            # Incremental paging stops on its own at the watermark; scheduled sweeps must cover
+            # the whole catalog to be usable for reconciliation.
+            pages = 0
+
+        json_mode = (os.getenv("RETAILOS_ONECHEQ_SOURCE", "json") or "json").strip().lower() == "json"
+        ledger = None
+        start_page = None
+        fetch_pages = pages
+        if mode == "full" and json_mode:
+            from retail_os.core.scrape_runs import ScrapeRunLedger
+
+            ledger = ScrapeRunLedger.start(
+                self.db, self.supplier_id, collection, params={"pages": pages}, command_id=cmd_id, resume=resume
+            )
+            if ledger.resumed:
+                # Same page budget as the interrupted run, minus the pages it already settled.
+                pages = int(ledger.params.get("pages") or 0)
+                done_page = int(ledger.cursor.get("page") or 0)
+                start_page = done_page + 1 if done_page else None
+                fetch_pages = max(0, pages - done_page) if pages else 0
+        elif resume:
+            print("Adapter: resume only applies to full JSON sweeps; starting from the first page.")
+
+        print(f"Adapter: Starting Sync for {self.supplier_name} (Pages={'UNLIMITED' if pages == 0 else pages}, Collection={collection}, Mode={mode})...")
         sync_start_time = datetime.now(timezone.utc)
         t0 = datetime.now(timezone.utc)
+
+        log = logging.getLogger(__name__)
+        if cmd_id:
+            try:
+                log.info(
+                    f"SCRAPE_MODE cmd_id={cmd_id} supplier=ONECHEQ mode={mode} "
+                    f"watermark={watermark.isoformat() if watermark else None}"
+                )
+            except Exception:
+                pass
         
         # 1. Get Raw Data
         concurrency = int(os.getenv("RETAILOS_ONECHEQ_CONCURRENCY", "1"))  # Reduced from 4 to 1 to prevent 429s
-        raw_items_gen = scrape_onecheq(limit_pages=pages, collection=collection, concurrency=concurrency, cmd_id=cmd_id)
+        if pages and not fetch_pages:
+            # Resumed after the last budgeted page was settled: only the wrap-up is left.
+            raw_items_gen = iter(())
+        else:
+            raw_items_gen = scrape_onecheq(
+                limit_pages=fetch_pages,
+                collection=collection,
+                concurrency=concurrency,
+                cmd_id=cmd_id,
+                updated_since=watermark,
+                start_page=start_page,
+            )
         print(f"Adapter: Starting processing stream from scraper...")
         
         count_updated = 0
         
         count_total_scraped = 0
+        # Watermark inputs: only rows that reached the DB advance it; a row that failed caps it so
+        # the next incremental run fetches that row again.
+        watermark_lock = threading.Lock()
+        max_written_at: datetime | None = None
+        min_failed_at: datetime | None = None
 
-        log = logging.getLogger(__name__)
         if progress_every <= 0:
             progress_every = 0
 
         # Best-effort total estimate for progress bars (honest: omit when unknown).
         total_estimate = None
         try:
-            if pages and int(pages) > 0:
+            if fetch_pages and int(fetch_pages) > 0:
                 json_limit = int(os.getenv("RETAILOS_ONECHEQ_JSON_LIMIT", "250") or "250")
                 json_limit = max(1, min(250, json_limit))
-                total_estimate = int(pages) * int(json_limit)
+                total_estimate = int(fetch_pages) * int(json_limit)
         except Exception:
             total_estimate = None
         
-        for item in raw_items_gen:
-            # Cooperative cancellation: allow the operator to cancel long runs.
-            try:
-                if should_abort and bool(should_abort()):
-                    if cmd_id:
-                        log.info(f"SCRAPE_ABORT cmd_id={cmd_id} supplier=ONECHEQ reason=CANCELLED_BY_OPERATOR")
-                    return
-            except Exception:
-                # Never crash the scraper due to cancellation check failures.
-                pass
+        from retail_os.core.pipeline import Stage, StagedPipeline, pipeline_setting
+        from retail_os.core.product_upserter import PreparedUpsert, ProductUpserter
+        from retail_os.core.seen_set import SeenSet
 
-            count_total_scraped += 1
-            try:
-                # 2. Normalize (Unified Schema)
-                unified: UnifiedProduct = normalize_onecheq_row(item)
-
-                # Category/collection partitioning (critical for 20k+ scale)
-                # Preserve traversal context and/or derived membership from scraper.
-                # - For /collections/all, the scraper derives a primary source_category from membership.
-                # - For scoped runs, primary source_category remains the collection handle.
-                unified["source_category"] = (item.get("source_category") or collection) if isinstance(item, dict) else collection
-                if isinstance(item, dict) and item.get("source_categories") is not None:
-                    unified["source_categories"] = item.get("source_categories")
+        # Reconciliation anti-joins against the SKUs this run saw; a collection-scoped run only
+        # vouches for products filed under that collection.
+        scopes = None if collection == "all" else [collection]
+        seen = ledger.seen_set(scopes=scopes) if ledger else SeenSet(self.db, self.supplier_id, scopes=scopes)
+        upserter = ProductUpserter(self.db, self.supplier_id, seen=seen)
+        progress = ledger.progress if ledger else None
+
+        def _settle(obj, failed: bool = False) -> None:
+            # A row left the pipeline (written, dropped or failed); its page may now be complete.
+            if progress is not None:
+                data = obj.data if isinstance(obj, PreparedUpsert) else obj
+                progress.settle(data.get("collection_page") if isinstance(data, dict) else None, failed=failed)
+
+        def _note_updated_at(obj, failed: bool) -> None:
+            nonlocal max_written_at, min_failed_at
+            data = obj.data if isinstance(obj, PreparedUpsert) else obj
+            ts = parse_shopify_timestamp(data.get("source_updated_at")) if isinstance(data, dict) else None
+            if ts is None:
+                return
+            with watermark_lock:
+                if failed:
+                    min_failed_at = ts if min_failed_at is None else min(min_failed_at, ts)
                 else:
-                    unified["source_categories"] = [collection] if collection else []
-                
-                # 3. Validation
-                if not unified["source_listing_id"] or not unified["title"]:
-                    continue
-
-                # 3.5 Keep supplier description raw.
-                # MarketplaceAdapter/enrichment is responsible for producing listing-grade copy.
-                # Pre-formatting here causes double-formatting and degraded output.
-                
-                # 3.6 Add ranking metadata
-                unified["collection_rank"] = item.get("collection_rank")
-                unified["collection_page"] = item.get("collection_page")
-                    
-                # 4. Write to DB
-                self._upsert_product(unified, should_abort=should_abort, cmd_id=cmd_id, progress_hook=progress_hook)
+                    max_written_at = ts if max_written_at is None else max(max_written_at, ts)
+
+        def _fetch():
+            # Runs on the pipeline's source thread (network fetch + page progress).
+            last_page = None
+            for item in raw_items_gen:
+                if isinstance(item, dict):
+                    if progress is not None:
+                        page = item.get("collection_page")
+                        if last_page is not None and page != last_page:
+                            progress.seal(last_page)
+                        last_page = page
+                        progress.feed(page)
+                yield item
+            if progress is not None:
+                progress.seal_all()
+
+        def _normalize(item):
+            # 2. Normalize (Unified Schema)
+            unified: UnifiedProduct = normalize_onecheq_row(item)
+
+            # Category/collection partitioning (critical for 20k+ scale)
+            # Preserve traversal context and/or derived membership from scraper.
+            # - For /collections/all, the scraper derives a primary source_category from membership.
+            # - For scoped runs, primary source_category remains the collection handle.
+            unified["source_category"] = (item.get("source_category") or collection) if isinstance(item, dict) else collection
+            if isinstance(item, dict) and item.get("source_categories") is not None:
+                unified["source_categories"] = item.get("source_categories")
+            else:
+                unified["source_categories"] = [collection] if collection else []
+
+            # 3. Validation
+            if not unified["source_listing_id"] or not unified["title"]:
+                _settle(item, failed=True)
+                return None
+
+            # 3.5 Keep supplier description raw.
+            # MarketplaceAdapter/enrichment is responsible for producing listing-grade copy.
+            # Pre-formatting here causes double-formatting and degraded output.
+
+            # 3.6 Add ranking metadata
+            unified["collection_rank"] = item.get("collection_rank")
+            unified["collection_page"] = item.get("collection_page")
+            unified["source_updated_at"] = item.get("source_updated_at")
+            return unified
+
+        def _prepare(unified: UnifiedProduct):
+            # Images + snapshot hash (no DB), several products at once.
+            return upserter.prepare(
+                unified, self._supplier_sku(unified), internal_sku_prefix="OC", should_abort=should_abort
+            )
+
+        def _on_error(stage: str, item, e: Exception) -> None:
+            ref = item.get("source_id") if isinstance(item, dict) else getattr(item, "external_sku", None)
+            print(f"Adapter Error on {ref} (stage={stage}): {e}")
+            for row in item if isinstance(item, list) else [item]:
+                _settle(row, failed=True)
+                _note_updated_at(row, failed=True)
+
+        def _write(batch: list[PreparedUpsert]) -> list[str]:
+            results = upserter.write_batch(batch)
+            for p, result in zip(batch, results):
+                _note_updated_at(p, failed=result == "failed")
+            if ledger is not None:
+                for p, result in zip(batch, results):
+                    _settle(p, failed=result == "failed")
+                page, rows, failed = progress.completed_prefix()
+                if page is not None and page != ledger.cursor.get("page"):
+                    ledger.checkpoint(
+                        {"collection": collection, "page": page, "last_sku": batch[-1].external_sku},
+                        rows,
+                        failed,
+                        seen=seen,
+                    )
+            return results
+
+        # 4. Write to DB: fetch -> normalize -> prepare -> batched writer, bounded queues in between.
+        pipeline = StagedPipeline(
+            _fetch(),
+            [
+                Stage("normalize", _normalize, workers=pipeline_setting("NORMALIZE_WORKERS", 2)),
+                Stage("prepare", _prepare, workers=pipeline_setting("PREPARE_WORKERS", 4)),
+                Stage("write", _write, workers=1, batch_size=pipeline_setting("WRITE_BATCH", 50)),
+            ],
+            queue_size=pipeline_setting("QUEUE_SIZE", 256),
+            should_abort=should_abort,
+            on_error=_on_error,
+        )
+
+        next_progress_at = int(progress_every) if progress_every else 0
+        for result in pipeline.run():
+            count_total_scraped = pipeline.source_count
+            if result != "failed":
                 count_updated += 1
-                
-            except Exception as e:
-                print(f"Adapter Error on {item.get('source_id')}: {e}")
 
             # Emit periodic progress for operator visibility (cmd_id-tagged so UI can tail it).
-            if cmd_id and progress_every and (count_total_scraped % int(progress_every) == 0):
+            if cmd_id and next_progress_at and count_total_scraped >= next_progress_at:
+                next_progress_at = (count_total_scraped // int(progress_every) + 1) * int(progress_every)
                 try:
                     msg = (
                         f"SCRAPE_PROGRESS cmd_id={cmd_id} supplier=ONECHEQ collection={collection} "
@@ -160,7 +344,27 @@ class OneCheqAdapter:
                         )
                 except Exception:
                     pass
-                
+
+        count_total_scraped = pipeline.source_count
+        if pipeline.cancelled:
+            # Cooperative cancellation: the operator cancelled a long run.
+            if cmd_id:
+                try:
+                    log.info(f"SCRAPE_ABORT cmd_id={cmd_id} supplier=ONECHEQ reason=CANCELLED_BY_OPERATOR")
+                except Exception:
+                    pass
+            if ledger is not None:
+                # Keep the cursor and staged SKUs; SCRAPE_SUPPLIER with resume=true continues.
+                ledger.interrupt(seen)
+            else:
+                seen.finish()
+            return
+        if cmd_id:
+            try:
+                log.info(f"SCRAPE_PIPELINE cmd_id={cmd_id} supplier=ONECHEQ summary={json.dumps(pipeline.summary(), sort_keys=True)}")
+            except Exception:
+                pass
+
         print(f"Adapter: Sync Complete. Scraped {count_total_scraped}, Processed {count_updated} items.")
 
         # Final progress update
@@ -191,6 +395,40 @@ class OneCheqAdapter:
             except Exception:
                 pass
         
+        # 4.5 Advance the incremental watermark (only after a run that saw everything it asked for).
+        max_updated_at = watermark
+        if max_written_at is not None and (max_updated_at is None or max_written_at > max_updated_at):
+            max_updated_at = max_written_at
+        if min_failed_at is not None:
+            # Incremental pages keep rows updated strictly after the watermark.
+            cap = min_failed_at - timedelta(microseconds=1)
+            if max_updated_at is None or cap < max_updated_at:
+                max_updated_at = cap
+        try:
+            if mode == "incremental":
+                self._save_sync_state(
+                    watermark=max_updated_at.isoformat() if max_updated_at else None,
+                    last_incremental_at=sync_start_time.isoformat(),
+                )
+            elif collection == "all" and (
+                pages == 0 or (total_estimate is not None and count_total_scraped < total_estimate)
+            ):
+                self._save_sync_state(
+                    watermark=max_updated_at.isoformat() if max_updated_at else None,
+                    last_full_sweep_at=sync_start_time.isoformat(),
+                )
+        except Exception as e:
+            self.db.rollback()
+            print(f"Adapter: Failed to persist sync state: {e}")
+
+        if mode == "incremental":
+            # Unchanged products are not visited, so "not seen" does not mean "removed".
+            # Removals are reconciled by the scheduled full sweep.
+            print("Adapter: Incremental run; reconciliation deferred to the next full sweep.")
+            seen.finish()
+            self.db.close()
+            return
+
         # 5. Reconciliation (Handling Removals)
         from retail_os.core.reconciliation import ReconciliationEngine
         engine = ReconciliationEngine(self.db)
@@ -198,25 +436,43 @@ class OneCheqAdapter:
         # Step 2D: Safety Rails
         from retail_os.core.safety import SafetyGuard
         failed_count = count_total_scraped - count_updated
+        if ledger is not None:
+            # A resumed run is judged on the whole run, earlier attempts included.
+            count_total_scraped += ledger.base_rows
+            count_updated += ledger.base_rows - ledger.base_failed
+            failed_count += ledger.base_failed
         
         # Safety Guard
         scrape_health_pct = (count_updated / count_total_scraped * 100) if count_total_scraped > 0 else 0
         print(f"SafetyGuard: Scrape Health = {scrape_health_pct:.1f}% ({count_updated}/{count_total_scraped})")
         
-        if SafetyGuard.is_safe_to_reconcile(count_total_scraped, failed_count):
-            # Fix: Check against sync_start_time. Any item not updated in this run is an orphan.
-            engine.process_orphans(self.supplier_id, sync_start_time)
+        # A page-limited run that stopped before the end of its scope saw only part of it:
+        # everything past the last page would look missing.
+        seen.complete = pages == 0 or (
+            json_mode and total_estimate is not None and pipeline.source_count < total_estimate
+        )
+
+        if not seen.complete:
+            print(f"Adapter: Partial scrape ({pages} page(s) of {collection}); skipping reconciliation.")
+        elif SafetyGuard.is_safe_to_reconcile(count_total_scraped, failed_count):
+            # Any in-scope item this run did not see is an orphan.
+            engine.process_orphans(self.supplier_id, seen=seen)
         else:
             print("Adapter: Skipping Reconciliation due to Safety Guard.")
+        seen.finish()
+        if ledger is not None:
+            ledger.complete()
         self.db.close()
 
-    def _upsert_product(self, data: UnifiedProduct, should_abort=None, cmd_id: str | None = None, progress_hook=None):
+    @staticmethod
+    def _supplier_sku(data: UnifiedProduct) -> str:
         # Supplier-native SKU should not include our prefix.
-        sku = data["source_listing_id"]
-        supplier_sku = sku
+        supplier_sku = data["source_listing_id"]
         if isinstance(supplier_sku, str) and supplier_sku.startswith("OC-"):
             supplier_sku = supplier_sku.replace("OC-", "", 1)
+        return supplier_sku
 
+    def _upsert_product(self, data: UnifiedProduct, should_abort=None, cmd_id: str | None = None, progress_hook=None):
         # Delegate to shared upserter
         # OneCheq uses "OC" as internal prefix.
         from retail_os.core.product_upserter import ProductUpserter
@@ -224,7 +480,7 @@ class OneCheqAdapter:
         
         return upserter.upsert(
             data=data,
-            external_sku=supplier_sku,
+            external_sku=self._supplier_sku(data),
             internal_sku_prefix="OC",
             should_abort=should_abort,
             progress_hook=progress_hook
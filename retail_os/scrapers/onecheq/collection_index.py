@@ -0,0 +1,236 @@
+"""
+OneCheq collection-membership index (DB-backed).
+
+Maps product_handle -> [collection_handle...] so a /collections/all scrape can still derive an
+accurate source_category. Rows live in `collection_membership`; per-collection refresh state
+(last_refreshed, product_count, supplier signature) lives in `collection_index_state`.
+
+Refresh is rolling: each scrape re-scans only new/changed collections plus the stalest ones,
+up to a per-run budget, instead of re-crawling every collection when a TTL lapses. Lookups are
+by handle (one page of products at a time), so the full map is never loaded into memory.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import httpx
+from sqlalchemy import delete, insert
+
+from retail_os.core.database import CollectionIndexState, CollectionMembership, SessionLocal
+from retail_os.scrapers.onecheq.scraper import (
+    _fetch_json_with_retries,
+    _fetch_parsed_with_retries,
+    _json_dict,
+    _shopify_collections_json_url,
+    _shopify_products_json_url,
+)
+from retail_os.utils.http_cache import HTTPCache
+
+SUPPLIER = "ONECHEQ"
+
+log = logging.getLogger(__name__)
+
+
+def _sort_handles(handles: Iterable[str]) -> list[str]:
+    # Most specific (longest) collection first; matches _choose_primary_collection.
+    return sorted(set(handles), key=lambda x: (-len(x), x.lower()))
+
+
+class CollectionMembershipIndex:
+    """Handle lookups against `collection_membership`."""
+
+    def __init__(self, db=None, supplier: str = SUPPLIER):
+        self._db = db
+        self.supplier = supplier
+
+    def lookup_many(self, product_handles: Iterable[str]) -> dict[str, list[str]]:
+        handles = sorted({h for h in product_handles if h})
+        if not handles:
+            return {}
+        db = self._db or SessionLocal()
+        try:
+            out: dict[str, list[str]] = {}
+            # Stay well under SQLite's bound-parameter limit.
+            for i in range(0, len(handles), 500):
+                chunk = handles[i : i + 500]
+                rows = (
+                    db.query(CollectionMembership.product_handle, CollectionMembership.collection_handle)
+                    .filter(CollectionMembership.supplier == self.supplier)
+                    .filter(CollectionMembership.product_handle.in_(chunk))
+                    .all()
+                )
+                for ph, ch in rows:
+                    out.setdefault(ph, []).append(ch)
+            return {k: _sort_handles(v) for k, v in out.items()}
+        finally:
+            if self._db is None:
+                db.close()
+
+    def get(self, product_handle: str, default=None):
+        return self.lookup_many([product_handle]).get(product_handle, default)
+
+
+def _list_collections(client: httpx.Client, cache: HTTPCache | None) -> dict[str, str]:
+    """collection_handle -> signature (supplier updated_at|products_count)."""
+    out: dict[str, str] = {}
+    page = 1
+    limit = 250
+    max_collections = int(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_MAX_COLLECTIONS", "2000") or "2000")
+    while True:
+        data = _fetch_json_with_retries(_shopify_collections_json_url(page=page, limit=limit), client=client, cache=cache)
+        cols = data.get("collections") if isinstance(data, dict) else None
+        if not cols or not isinstance(cols, list):
+            break
+        for c in cols:
+            if isinstance(c, dict) and (c.get("handle") or "").strip():
+                out[str(c["handle"]).strip()] = f"{c.get('updated_at') or ''}|{c.get('products_count') or ''}"
+        if len(out) >= max_collections:
+            break
+        if len(cols) < limit:
+            break
+        page += 1
+    return dict(sorted(out.items())[:max_collections])
+
+
+def _page_handles(body: bytes) -> list:
+    # Only the handles are needed (and cached); one entry per product keeps the page length.
+    prods = _json_dict(body).get("products")
+    if not isinstance(prods, list):
+        return []
+    return [str(pr.get("handle") or "") if isinstance(pr, dict) else "" for pr in prods]
+
+
+def _scan_collection(handle: str, client: httpx.Client, cache: HTTPCache | None) -> list[str]:
+    products: list[str] = []
+    p = 1
+    while True:
+        url = _shopify_products_json_url(collection=handle, page=p, limit=250)
+        page_handles = _fetch_parsed_with_retries(
+            url, client, _page_handles, headers={"Accept": "application/json"}, cache=cache
+        )
+        if not page_handles:
+            break
+        products.extend(h for h in page_handles if h)
+        if len(page_handles) < 250:
+            break
+        p += 1
+    return sorted(set(products))
+
+
+def refresh_onecheq_collection_index(client: httpx.Client, cmd_id: str | None = None, db=None) -> dict:
+    """
+    Rolling refresh of the collection-membership index.
+
+    Picks, in order: collections never scanned, collections whose supplier signature changed,
+    then collections older than RETAILOS_ONECHEQ_COLLECTION_INDEX_TTL_HOURS (stalest first),
+    capped at RETAILOS_ONECHEQ_COLLECTION_INDEX_REFRESH_BUDGET per call (0 = no cap).
+    Collections that disappeared from collections.json are dropped.
+    """
+    ttl_hours = float(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_TTL_HOURS", "24") or "24")
+    budget = int(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_REFRESH_BUDGET", "40") or "40")
+    conc = int(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_CONCURRENCY", "2") or "2")
+    conc = max(1, min(8, conc))
+
+    cache = HTTPCache.default()
+    own_db = db is None
+    db = db or SessionLocal()
+    try:
+        listed = _list_collections(client, cache)
+        states = {s.collection_handle: s for s in db.query(CollectionIndexState).filter(CollectionIndexState.supplier == SUPPLIER).all()}
+
+        removed = [h for h in states if h not in listed]
+        if removed:
+            db.execute(
+                delete(CollectionMembership)
+                .where(CollectionMembership.supplier == SUPPLIER)
+                .where(CollectionMembership.collection_handle.in_(removed))
+            )
+            db.execute(
+                delete(CollectionIndexState)
+                .where(CollectionIndexState.supplier == SUPPLIER)
+                .where(CollectionIndexState.collection_handle.in_(removed))
+            )
+            db.commit()
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        stale_before = now - timedelta(hours=ttl_hours)
+        new, changed, stale = [], [], []
+        for handle, sig in listed.items():
+            st = states.get(handle)
+            if st is None or st.last_refreshed is None:
+                new.append(handle)
+            elif (st.source_signature or "") != sig:
+                changed.append(handle)
+            elif st.last_refreshed < stale_before:
+                stale.append(handle)
+        stale.sort(key=lambda h: states[h].last_refreshed)
+        todo = new + changed + stale
+        if budget > 0:
+            todo = todo[:budget]
+
+        if cmd_id and todo:
+            log.info(
+                f"COLLECTION_INDEX_REFRESH_START cmd_id={cmd_id} supplier={SUPPLIER} "
+                f"collections={len(listed)} new={len(new)} changed={len(changed)} stale={len(stale)} refreshing={len(todo)}"
+            )
+
+        refreshed = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=min(conc, max(1, len(todo)))) as ex:
+            futs = {ex.submit(_scan_collection, h, client, cache): h for h in todo}
+            for fut in as_completed(futs):
+                handle = futs[fut]
+                try:
+                    prods = fut.result()
+                except Exception as e:
+                    failed += 1
+                    log.warning(f"COLLECTION_INDEX_SCAN_FAILED supplier={SUPPLIER} collection={handle} error={str(e)[:200]}")
+                    continue
+
+                db.execute(
+                    delete(CollectionMembership)
+                    .where(CollectionMembership.supplier == SUPPLIER)
+                    .where(CollectionMembership.collection_handle == handle)
+                )
+                if prods:
+                    db.execute(
+                        insert(CollectionMembership),
+                        [{"supplier": SUPPLIER, "collection_handle": handle, "product_handle": ph} for ph in prods],
+                    )
+                st = states.get(handle)
+                if st is None:
+                    st = CollectionIndexState(supplier=SUPPLIER, collection_handle=handle)
+                    db.add(st)
+                    states[handle] = st
+                st.source_signature = listed[handle]
+                st.product_count = len(prods)
+                st.last_refreshed = datetime.now(timezone.utc).replace(tzinfo=None)
+                db.commit()
+                refreshed += 1
+                if cmd_id and (refreshed % 25 == 0):
+                    log.info(f"COLLECTION_INDEX_PROGRESS cmd_id={cmd_id} supplier={SUPPLIER} refreshed={refreshed}/{len(todo)}")
+
+        stats = {
+            "collections": len(listed),
+            "refreshed": refreshed,
+            "failed": failed,
+            "removed": len(removed),
+            "pending": max(0, len(new) + len(changed) + len(stale) - refreshed),
+        }
+        if cmd_id:
+            log.info(
+                f"COLLECTION_INDEX_DONE cmd_id={cmd_id} supplier={SUPPLIER} collections={stats['collections']} "
+                f"refreshed={refreshed} failed={failed} removed={stats['removed']} pending={stats['pending']}"
+            )
+        return stats
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_db:
+            db.close()
@@ -7,13 +7,25 @@ import re
 import json
 import time
 import os
+import queue
+import asyncio
+import threading
 import html as _html
-from typing import Optional, Dict, List
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from selectolax.parser import HTMLParser
 import httpx
 
+from retail_os.utils.http_cache import HTTPCache
+from retail_os.utils.http_cassette import async_cassette_transport
+from retail_os.utils.http_clients import get_http_client
 from retail_os.utils.http_throttle import GlobalHTTPThrottle
+from retail_os.utils.parse_pool import parse_in_pool
+
+# Catalog endpoints (products.json / collections.json) are resolved against this base.
+# Overridable so benchmarks and replays can point the scraper at a local server.
+ONECHEQ_BASE_URL = (os.getenv("RETAILOS_ONECHEQ_BASE_URL") or "https://onecheq.co.nz").rstrip("/")
 
 
 def _fmt_secs(secs: float) -> str:
@@ -26,25 +38,25 @@ def _fmt_secs(secs: float) -> str:
     return f"{m}m{s:02d}s"
 
 
+_HTML_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-NZ,en;q=0.9",
+}
+
+
 def get_html_via_httpx(url: str, client: Optional[httpx.Client] = None) -> Optional[str]:
     """Fetch HTML using httpx with proper headers."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-NZ,en;q=0.9",
-    }
+    headers = dict(_HTML_HEADERS)
 
     # Real retry/backoff for transient supplier instability (503/429/timeouts).
     # This is not a mock: it just makes the scraper resilient to real-world flakiness.
     for attempt in range(1, 5):
         try:
-            if client is None:
-                with httpx.Client(headers=headers, follow_redirects=True, timeout=20.0) as c:
-                    with GlobalHTTPThrottle.request(url):
-                        response = c.get(url)
-            else:
-                with GlobalHTTPThrottle.request(url):
-                    response = client.get(url, headers=headers)
+            c = client if client is not None else get_http_client()
+            with GlobalHTTPThrottle.request(url):
+                response = c.get(url, headers=headers)
+            GlobalHTTPThrottle.feedback(url, response.status_code, response.headers)
 
             if response.status_code in (429, 503, 502, 504):
                 raise httpx.HTTPStatusError(
@@ -156,15 +168,42 @@ def extract_onecheq_id(url: str) -> str:
     return "UNKNOWN"
 
 
+def _collection_page_product_urls(html: str) -> list[str]:
+    """Canonical product URLs linked from one collection page."""
+    doc = HTMLParser(html)
+
+    # Find product links - Shopify typically uses product-card or similar classes
+    product_links = doc.css("a[href*='/products/']")
+
+    page_products = set()
+    for link in product_links:
+        href = link.attributes.get('href', '')
+        if '/products/' in href:
+            # Build full URL
+            if href.startswith('http'):
+                full_url = href
+            elif href.startswith('/'):
+                full_url = f"https://onecheq.co.nz{href}"
+            else:
+                full_url = f"https://onecheq.co.nz/{href}"
+
+            # Remove query params and fragments
+            full_url = full_url.split('?')[0].split('#')[0]
+            page_products.add(full_url)
+    return sorted(page_products)
+
+
 def discover_products_from_collection(
     collection_url: str,
     max_pages: int = 5,
     client: Optional[httpx.Client] = None,
     max_products: Optional[int] = None,
+    cache: HTTPCache | None = None,
 ) -> List[str]:
     """
     Discover all product URLs from a collection page.
     OneCheq uses Shopify pagination: ?page=N
+    With a cache (and a client) page fetches are conditional and unchanged pages are not re-parsed.
     """
     print(f"Discovering products from: {collection_url}")
     product_urls: set[str] = set()
@@ -173,32 +212,27 @@ def discover_products_from_collection(
     for page_num in range(1, max_pages + 1):
         page_url = f"{collection_url}?page={page_num}"
         print(f"  Fetching page {page_num}...")
-        
-        html = get_html_via_httpx(page_url, client=client)
-        if not html:
-            print(f"  Failed to fetch page {page_num}")
-            break
-        
-        doc = HTMLParser(html)
-        
-        # Find product links - Shopify typically uses product-card or similar classes
-        product_links = doc.css("a[href*='/products/']")
-        
-        page_products = set()
-        for link in product_links:
-            href = link.attributes.get('href', '')
-            if '/products/' in href:
-                # Build full URL
-                if href.startswith('http'):
-                    full_url = href
-                elif href.startswith('/'):
-                    full_url = f"https://onecheq.co.nz{href}"
-                else:
-                    full_url = f"https://onecheq.co.nz/{href}"
-                
-                # Remove query params and fragments
-                full_url = full_url.split('?')[0].split('#')[0]
-                page_products.add(full_url)
+
+        if cache is not None and client is not None:
+            try:
+                page_products = set(
+                    _fetch_parsed_with_retries(
+                        page_url,
+                        client,
+                        lambda body: _collection_page_product_urls(body.decode("utf-8", errors="replace")),
+                        headers=_HTML_HEADERS,
+                        cache=cache,
+                    )
+                )
+            except Exception as e:
+                print(f"  Failed to fetch page {page_num}: {e}")
+                break
+        else:
+            html = get_html_via_httpx(page_url, client=client)
+            if not html:
+                print(f"  Failed to fetch page {page_num}")
+                break
+            page_products = set(_collection_page_product_urls(html))
         
         if not page_products:
             print(f"  No products found on page {page_num}, stopping pagination")
@@ -234,33 +268,76 @@ def _strip_html(s: str) -> str:
     return norm_ws(text)
 
 
-def _shopify_products_json_url(collection: str, page: int, limit: int = 250) -> str:
+def _shopify_products_json_url(collection: str, page: int, limit: int = 250, sort_by: str | None = None) -> str:
+    sort_q = f"&sort_by={sort_by}" if sort_by else ""
     if collection == "all":
-        return f"https://onecheq.co.nz/collections/all/products.json?limit={int(limit)}&page={int(page)}"
-    return f"https://onecheq.co.nz/collections/{collection}/products.json?limit={int(limit)}&page={int(page)}"
+        return f"{ONECHEQ_BASE_URL}/collections/all/products.json?limit={int(limit)}&page={int(page)}{sort_q}"
+    return f"{ONECHEQ_BASE_URL}/collections/{collection}/products.json?limit={int(limit)}&page={int(page)}{sort_q}"
+
+
+def parse_shopify_timestamp(raw) -> datetime | None:
+    """Parse Shopify ISO timestamps (e.g. 2025-03-01T10:00:00+13:00) into aware UTC datetimes."""
+    if not raw or not isinstance(raw, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
 
 
 def _shopify_collections_json_url(page: int, limit: int = 250) -> str:
-    return f"https://onecheq.co.nz/collections.json?limit={int(limit)}&page={int(page)}"
+    return f"{ONECHEQ_BASE_URL}/collections.json?limit={int(limit)}&page={int(page)}"
 
 
-def _fetch_json_with_retries(url: str, client: httpx.Client, attempts: int = 4) -> dict:
+def _fetch_parsed_with_retries(
+    url: str,
+    client: httpx.Client,
+    parse,
+    headers: dict | None = None,
+    attempts: int = 4,
+    cache: HTTPCache | None = None,
+):
+    """
+    GET `url` and return `parse(body_bytes)`.
+    With a cache, the request is conditional and a 304 / unchanged body returns the cached
+    parse result without calling `parse` at all.
+    """
     last_err: Exception | None = None
     for attempt in range(1, attempts + 1):
         try:
+            req_headers = dict(headers or {})
+            if cache is not None:
+                req_headers.update(cache.conditional_headers(url))
             with GlobalHTTPThrottle.request(url):
-                r = client.get(url, headers={"Accept": "application/json"})
+                r = client.get(url, headers=req_headers)
+            GlobalHTTPThrottle.feedback(url, r.status_code, r.headers)
             if r.status_code in (429, 503, 502, 504):
                 raise httpx.HTTPStatusError(f"{r.status_code} from supplier", request=r.request, response=r)
+            if cache is not None:
+                if r.status_code != 304:
+                    r.raise_for_status()
+                return cache.resolve(url, r, parse)
             r.raise_for_status()
-            data = r.json()
-            if isinstance(data, dict):
-                return data
-            return {}
+            return parse(r.content)
         except Exception as e:
             last_err = e
-            time.sleep(min(8.0, 0.7 * (2 ** (attempt - 1))))
-    raise RuntimeError(f"Failed to fetch JSON: {url} ({last_err})")
+            if attempt < attempts:
+                time.sleep(min(8.0, 0.7 * (2 ** (attempt - 1))))
+    raise RuntimeError(f"Failed to fetch: {url} ({last_err})")
+
+
+def _json_dict(body: bytes) -> dict:
+    data = json.loads(body)
+    return data if isinstance(data, dict) else {}
+
+
+def _fetch_json_with_retries(url: str, client: httpx.Client, attempts: int = 4, cache: HTTPCache | None = None) -> dict:
+    return _fetch_parsed_with_retries(
+        url, client, _json_dict, headers={"Accept": "application/json"}, attempts=attempts, cache=cache
+    )
 
 
 def _choose_primary_collection(handles: list[str]) -> str:
@@ -269,113 +346,318 @@ def _choose_primary_collection(handles: list[str]) -> str:
     return hs[0] if hs else "all"
 
 
-def build_onecheq_collection_index(client: httpx.Client, cmd_id: str | None = None) -> dict[str, list[str]]:
-    """
-    Build mapping: product_handle -> [collection_handle...]
-    Used to derive an accurate source_category even when scraping /collections/all.
-    """
-    import logging
-    from pathlib import Path
+def _shopify_product_to_row(
+    p: dict,
+    collection: str,
+    membership_index: dict[str, list[str]] | None,
+    rank: int,
+    page: int,
+) -> Optional[Dict]:
+    """Map one Shopify products.json entry to the scraper row shape (None when unusable)."""
+    handle = (p or {}).get("handle") or ""
+    if not handle:
+        return None
 
-    log = logging.getLogger(__name__)
-    cache_dir = Path("data") / "cache"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_path = cache_dir / "onecheq_collection_index.json"
-    ttl_hours = float(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_TTL_HOURS", "24") or "24")
+    title = norm_ws((p or {}).get("title") or "") or handle
+    desc = _strip_html((p or {}).get("body_html") or "") or title
 
-    # Cache load
+    vendor = norm_ws((p or {}).get("vendor") or "")
+    product_type = norm_ws((p or {}).get("product_type") or "")
+
+    # OneCheq encodes condition inside vendor sometimes: "Condition: New"
+    condition = "Used"
+    brand = vendor
+    m = re.search(r"condition\s*:\s*(new|used|refurbished)", vendor, re.I)
+    if m:
+        condition = m.group(1).capitalize()
+        brand = ""
+
+    variants = (p or {}).get("variants") or []
+    price = 0.0
+    available = False
+    supplier_lot = ""
     try:
-        if cache_path.exists():
-            raw = json.loads(cache_path.read_text(encoding="utf-8"))
-            built_at = float(raw.get("built_at_unix") or 0.0)
-            if built_at:
-                age_h = (time.time() - built_at) / 3600.0
-                if age_h <= ttl_hours and isinstance(raw.get("index"), dict):
-                    return {str(k): list(v) for k, v in raw["index"].items()}
+        if variants and isinstance(variants, list):
+            v0 = variants[0] or {}
+            price = float(str(v0.get("price") or "0").replace(",", ""))
+            available = bool(v0.get("available", False))
+            supplier_lot = normalize_sku(str(v0.get("sku") or v0.get("id") or ""))  # best-effort
+    except Exception:
+        price = 0.0
+
+    imgs = []
+    for im in (p or {}).get("images") or []:
+        if isinstance(im, dict):
+            src = (im.get("src") or "").strip()
+            if src:
+                imgs.append(src.split("?")[0])
+        elif isinstance(im, str):
+            imgs.append(im.split("?")[0])
+    imgs = [x for x in imgs if x][:4]
+
+    specs = {}
+    if brand:
+        specs["Vendor"] = brand
+    if product_type:
+        specs["ProductType"] = product_type
+    if supplier_lot:
+        lot = supplier_lot
+        if lot.isdigit() and lot.startswith("0"):
+            lot = f"LOT{lot}"
+        specs["SupplierLot"] = lot
+    specs["Condition"] = condition
+
+    # Category membership (fix for /collections/all correctness):
+    # - collection != all: preserve traversal context
+    # - collection == all: derive from collection membership index
+    source_categories: list[str] = []
+    primary_source_category = collection
+    try:
+        if collection != "all":
+            source_categories = [collection]
+            primary_source_category = collection
+        else:
+            cats = (membership_index or {}).get(handle) or []
+            source_categories = list(cats)
+            primary_source_category = _choose_primary_collection(cats)
     except Exception:
-        pass
+        source_categories = [collection]
+        primary_source_category = collection
+
+    return {
+        "source_id": f"OC-{handle}",
+        "source_url": f"https://onecheq.co.nz/products/{handle}",
+        "title": title,
+        "description": desc,
+        "brand": brand,
+        "condition": condition,
+        "buy_now_price": price,
+        # Quantity is not reliably exposed by OneCheq (Shopify JSON). Keep null and use source_status.
+        "stock_level": None,
+        "photo1": imgs[0] if len(imgs) > 0 else None,
+        "photo2": imgs[1] if len(imgs) > 1 else None,
+        "photo3": imgs[2] if len(imgs) > 2 else None,
+        "photo4": imgs[3] if len(imgs) > 3 else None,
+        "source_status": "Available" if available else "Sold",
+        "specs": specs,
+        "sku": handle,
+        "source_category": primary_source_category,
+        "source_categories": source_categories,
+        "collection_rank": rank,
+        "collection_page": page,
+        # Shopify product updated_at (drives the incremental sync watermark).
+        "source_updated_at": (p or {}).get("updated_at"),
+    }
+
+
+def _products_from_body(body: bytes) -> list:
+    products = _json_dict(body).get("products")
+    return products if isinstance(products, list) else []
 
-    if cmd_id:
-        log.info(f"COLLECTION_INDEX_START cmd_id={cmd_id} supplier=ONECHEQ")
 
-    handles: list[str] = []
-    page = 1
-    limit = 250
-    max_collections = int(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_MAX_COLLECTIONS", "2000") or "2000")
+def _iter_shopify_product_pages_sequential(
+    collection: str,
+    start_page: int,
+    max_pages: int,
+    limit: int,
+    client: httpx.Client,
+    sort_by: str | None = None,
+    cache: HTTPCache | None = None,
+) -> Iterator[tuple[int, list]]:
+    """One products.json request at a time; stops at the first empty page."""
+    page = start_page
+    pages_seen = 0
     while True:
-        u = _shopify_collections_json_url(page=page, limit=limit)
-        data = _fetch_json_with_retries(u, client=client)
-        cols = data.get("collections") if isinstance(data, dict) else None
-        if not cols or not isinstance(cols, list):
-            break
-        for c in cols:
-            if isinstance(c, dict) and (c.get("handle") or "").strip():
-                handles.append(str(c["handle"]).strip())
-        if len(handles) >= max_collections:
-            handles = handles[:max_collections]
-            break
-        if len(cols) < limit:
-            break
+        if max_pages and pages_seen >= int(max_pages):
+            return
+        url = _shopify_products_json_url(collection, page=page, limit=limit, sort_by=sort_by)
+        headers = {"User-Agent": "Mozilla/5.0"}
+        if cache is not None:
+            headers.update(cache.conditional_headers(url))
+        with GlobalHTTPThrottle.request(url):
+            r = client.get(url, headers=headers)
+        GlobalHTTPThrottle.feedback(url, r.status_code, r.headers)
+        if cache is None:
+            r.raise_for_status()
+            products = _products_from_body(r.content)
+        else:
+            if r.status_code != 304:
+                r.raise_for_status()
+            products = cache.resolve(url, r, _products_from_body)
+        if not products:
+            return
+        pages_seen += 1
+        yield page, products
         page += 1
 
-    handles = sorted(set(handles))
-    index: dict[str, list[str]] = {}
 
-    conc = int(os.getenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_CONCURRENCY", "2") or "2")  # Reduced from 4 to 2
-    conc = max(1, min(8, conc))
+async def _afetch_shopify_products_page(
+    client: httpx.AsyncClient, url: str, attempts: int = 4, cache: HTTPCache | None = None
+) -> list:
+    """Async products.json fetch with the same retry policy as `_fetch_json_with_retries`."""
+    last_err: Exception | None = None
+    for attempt in range(1, attempts + 1):
+        try:
+            headers = {"Accept": "application/json"}
+            if cache is not None:
+                headers.update(cache.conditional_headers(url))
+            async with GlobalHTTPThrottle.arequest(url):
+                r = await client.get(url, headers=headers)
+            GlobalHTTPThrottle.feedback(url, r.status_code, r.headers)
+            if r.status_code in (429, 503, 502, 504):
+                raise httpx.HTTPStatusError(f"{r.status_code} from supplier", request=r.request, response=r)
+            if cache is not None and r.status_code == 304:
+                return cache.resolve(url, r, _products_from_body)
+            r.raise_for_status()
+            # Decode (and hit the cache) off the event loop so other in-flight pages keep streaming.
+            if cache is not None:
+                return await asyncio.to_thread(cache.resolve, url, r, _products_from_body)
+            return await asyncio.to_thread(_products_from_body, r.content)
+        except Exception as e:
+            last_err = e
+            if attempt < attempts:
+                await asyncio.sleep(min(8.0, 0.7 * (2 ** (attempt - 1))))
+    raise RuntimeError(f"Failed to fetch JSON: {url} ({last_err})")
 
-    def _scan_collection(handle: str) -> tuple[str, list[str]]:
-        products: list[str] = []
-        p = 1
-        while True:
-            url = _shopify_products_json_url(collection=handle, page=p, limit=250)
-            d = _fetch_json_with_retries(url, client=client)
-            prods = d.get("products") if isinstance(d, dict) else None
-            if not prods or not isinstance(prods, list):
-                break
-            for pr in prods:
-                if isinstance(pr, dict) and pr.get("handle"):
-                    products.append(str(pr["handle"]))
-            if len(prods) < 250:
-                break
-            p += 1
-        return handle, products
-
-    with ThreadPoolExecutor(max_workers=min(conc, max(1, len(handles)))) as ex:
-        futs = [ex.submit(_scan_collection, h) for h in handles]
-        done = 0
-        for fut in as_completed(futs):
-            h, prods = fut.result()
-            for ph in prods:
-                index.setdefault(ph, []).append(h)
-            done += 1
-            if cmd_id and (done % 25 == 0):
-                log.info(f"COLLECTION_INDEX_PROGRESS cmd_id={cmd_id} supplier=ONECHEQ scanned={done}/{len(handles)}")
-
-    for k, v in list(index.items()):
-        index[k] = sorted(set(v), key=lambda x: (-len(x), x.lower()))
 
+async def _aiter_shopify_product_pages(
+    collection: str,
+    start_page: int,
+    max_pages: int,
+    limit: int,
+    client: httpx.AsyncClient,
+    window: int = 4,
+    sort_by: str | None = None,
+    cache: HTTPCache | None = None,
+):
+    """
+    Pipelined products.json crawl.
+    Keeps up to `window` pages in flight, yields (page, products) strictly in page order and
+    stops at the first short or empty page (pages requested beyond it are cancelled).
+    """
+    window = max(1, int(window))
+    last_page = (start_page + int(max_pages) - 1) if max_pages else None
+    pending: dict[int, asyncio.Task] = {}
+    next_page = start_page
+    page = start_page
     try:
-        cache_path.write_text(json.dumps({"built_at_unix": time.time(), "index": index}), encoding="utf-8")
-    except Exception:
-        pass
+        while True:
+            while len(pending) < window and (last_page is None or next_page <= last_page):
+                url = _shopify_products_json_url(collection, page=next_page, limit=limit, sort_by=sort_by)
+                pending[next_page] = asyncio.create_task(_afetch_shopify_products_page(client, url, cache=cache))
+                next_page += 1
+
+            task = pending.pop(page, None)
+            if task is None:
+                return
+            products = await task
+            if not products:
+                return
+            yield page, products
+            if len(products) < limit:
+                return
+            page += 1
+    finally:
+        for t in pending.values():
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending.values(), return_exceptions=True)
 
-    if cmd_id:
-        log.info(f"COLLECTION_INDEX_DONE cmd_id={cmd_id} supplier=ONECHEQ collections={len(handles)} products={len(index)}")
-    return index
 
+_PIPELINE_DONE = object()
 
-def _iter_onecheq_products_via_shopify_json(collection: str, max_pages: int, client: httpx.Client, cmd_id: str | None = None):
+
+def _iter_shopify_product_pages_pipelined(
+    collection: str,
+    start_page: int,
+    max_pages: int,
+    limit: int,
+    window: int = 4,
+    sort_by: str | None = None,
+    cache: HTTPCache | None = None,
+) -> Iterator[tuple[int, list]]:
+    """
+    Sync bridge over `_aiter_shopify_product_pages`.
+    The async crawl runs on a private event loop thread and hands pages over through a
+    bounded queue, so the consumer (normalize + upsert) overlaps with network waits.
+    """
+    out: queue.Queue = queue.Queue(maxsize=max(1, int(window)))
+    stop = threading.Event()
+
+    async def _put(item) -> bool:
+        # Non-blocking put so in-flight fetches keep progressing while the consumer is busy.
+        while not stop.is_set():
+            try:
+                out.put_nowait(item)
+                return True
+            except queue.Full:
+                await asyncio.sleep(0.02)
+        return False
+
+    async def _crawl() -> None:
+        try:
+            async with httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=30.0,
+                headers={"User-Agent": "Mozilla/5.0"},
+                transport=async_cassette_transport(),
+            ) as client:
+                async for item in _aiter_shopify_product_pages(
+                    collection, start_page, max_pages, limit, client, window=window, sort_by=sort_by, cache=cache
+                ):
+                    if not await _put(item):
+                        return
+        except Exception as e:
+            await _put(e)
+            return
+        await _put(_PIPELINE_DONE)
+
+    t = threading.Thread(target=lambda: asyncio.run(_crawl()), name="onecheq-json-crawl", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = out.get()
+            if item is _PIPELINE_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        t.join(timeout=10.0)
+
+
+def _iter_onecheq_products_via_shopify_json(
+    collection: str,
+    max_pages: int,
+    client: httpx.Client,
+    cmd_id: str | None = None,
+    updated_since: datetime | None = None,
+    start_page: int | None = None,
+):
     """
     Fast, authoritative Shopify JSON scrape.
     Iterates products from /collections/<handle>/products.json (250/page).
+    With RETAILOS_ONECHEQ_JSON_WINDOW > 1 (default 4) pages are fetched through the
+    pipelined async crawler; 1 keeps the strictly sequential loop.
+
+    Incremental mode (`updated_since` set): pages are requested sorted by update time,
+    only products updated after the watermark are yielded, and paging stops at the first
+    page that contains nothing newer.
+
+    `start_page` (resumed runs) overrides RETAILOS_ONECHEQ_START_PAGE; `max_pages` counts from it
+    and collection ranks continue where the earlier pages left off.
     """
     limit = int(os.getenv("RETAILOS_ONECHEQ_JSON_LIMIT", "250") or "250")
     limit = max(1, min(250, limit))
 
-    page = int(os.getenv("RETAILOS_ONECHEQ_START_PAGE", "1") or "1")
+    page = int(start_page or os.getenv("RETAILOS_ONECHEQ_START_PAGE", "1") or "1")
     if page < 1:
         page = 1
+    rank_base = (page - 1) * limit if start_page else 0
+
+    window = int(os.getenv("RETAILOS_ONECHEQ_JSON_WINDOW", "4") or "4")
+    window = max(1, min(16, window))
 
     pages_seen = 0
     total = 0
@@ -389,23 +671,42 @@ def _iter_onecheq_products_via_shopify_json(collection: str, max_pages: int, cli
     import logging
     log = logging.getLogger(__name__)
 
-    membership_index: dict[str, list[str]] | None = None
+    # /collections/all: derive source_category from the DB-backed membership index.
+    # The refresh is rolling (budgeted), so a lapsed TTL never stalls the scrape start.
+    membership_index = None
     if collection == "all":
+        from retail_os.scrapers.onecheq.collection_index import (
+            CollectionMembershipIndex,
+            refresh_onecheq_collection_index,
+        )
+
         try:
-            membership_index = build_onecheq_collection_index(client=client, cmd_id=cmd_id)
+            refresh_onecheq_collection_index(client=client, cmd_id=cmd_id)
         except Exception as e:
-            membership_index = None
             try:
                 if cmd_id:
                     log.warning(f"COLLECTION_INDEX_FAILED cmd_id={cmd_id} supplier=ONECHEQ error={str(e)[:200]}")
             except Exception:
                 pass
+        membership_index = CollectionMembershipIndex()
+
+    sort_by = None
+    if updated_since is not None:
+        sort_by = (os.getenv("RETAILOS_ONECHEQ_INCREMENTAL_SORT", "updated-at-descending") or "").strip() or None
+        if updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
+
+    http_cache = HTTPCache.default()
+    if window > 1:
+        pages_iter = _iter_shopify_product_pages_pipelined(
+            collection, page, max_pages, limit, window=window, sort_by=sort_by, cache=http_cache
+        )
+    else:
+        pages_iter = _iter_shopify_product_pages_sequential(
+            collection, page, max_pages, limit, client, sort_by=sort_by, cache=http_cache
+        )
 
-    while True:
-        if max_pages and pages_seen >= int(max_pages):
-            break
-
-        url = _shopify_products_json_url(collection, page=page, limit=limit)
+    for page, products in pages_iter:
         try:
             elapsed = _fmt_secs(time.monotonic() - started)
             print(f"[ONECHEQ] Shopify JSON page {page} (collection={collection}, limit={limit}) elapsed={elapsed}")
@@ -414,108 +715,38 @@ def _iter_onecheq_products_via_shopify_json(collection: str, max_pages: int, cli
         except Exception:
             pass
 
-        with GlobalHTTPThrottle.request(url):
-            r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        r.raise_for_status()
-        products = (r.json() or {}).get("products") or []
-        if not products:
-            break
+        if updated_since is not None:
+            fresh = []
+            for p in products:
+                ts = parse_shopify_timestamp((p or {}).get("updated_at"))
+                # Unknown timestamps are treated as changed (never silently skipped).
+                if ts is None or ts > updated_since:
+                    fresh.append(p)
+            if not fresh:
+                try:
+                    print(f"[ONECHEQ] Incremental stop at page {page}: nothing updated since {updated_since.isoformat()}")
+                    if cmd_id:
+                        log.info(f"ONECHEQ_INCREMENTAL_STOP cmd_id={cmd_id} collection={collection} page={page} watermark={updated_since.isoformat()}")
+                except Exception:
+                    pass
+                return
+            products = fresh
+
+        page_membership: dict[str, list[str]] | None = None
+        if membership_index is not None:
+            try:
+                page_membership = membership_index.lookup_many((p or {}).get("handle") or "" for p in products)
+            except Exception:
+                page_membership = None
 
         pages_seen += 1
         for p in products:
-            handle = (p or {}).get("handle") or ""
-            if not handle:
+            row = _shopify_product_to_row(p, collection, page_membership, rank=rank_base + total + 1, page=page)
+            if row is None:
                 continue
 
-            title = norm_ws((p or {}).get("title") or "") or handle
-            desc = _strip_html((p or {}).get("body_html") or "") or title
-
-            vendor = norm_ws((p or {}).get("vendor") or "")
-            product_type = norm_ws((p or {}).get("product_type") or "")
-
-            # OneCheq encodes condition inside vendor sometimes: "Condition: New"
-            condition = "Used"
-            brand = vendor
-            m = re.search(r"condition\s*:\s*(new|used|refurbished)", vendor, re.I)
-            if m:
-                condition = m.group(1).capitalize()
-                brand = ""
-
-            variants = (p or {}).get("variants") or []
-            price = 0.0
-            available = False
-            supplier_lot = ""
-            try:
-                if variants and isinstance(variants, list):
-                    v0 = variants[0] or {}
-                    price = float(str(v0.get("price") or "0").replace(",", ""))
-                    available = bool(v0.get("available", False))
-                    supplier_lot = normalize_sku(str(v0.get("sku") or v0.get("id") or ""))  # best-effort
-            except Exception:
-                price = 0.0
-
-            imgs = []
-            for im in (p or {}).get("images") or []:
-                if isinstance(im, dict):
-                    src = (im.get("src") or "").strip()
-                    if src:
-                        imgs.append(src.split("?")[0])
-                elif isinstance(im, str):
-                    imgs.append(im.split("?")[0])
-            imgs = [x for x in imgs if x][:4]
-
-            specs = {}
-            if brand:
-                specs["Vendor"] = brand
-            if product_type:
-                specs["ProductType"] = product_type
-            if supplier_lot:
-                lot = supplier_lot
-                if lot.isdigit() and lot.startswith("0"):
-                    lot = f"LOT{lot}"
-                specs["SupplierLot"] = lot
-            specs["Condition"] = condition
-
-            # Category membership (fix for /collections/all correctness):
-            # - collection != all: preserve traversal context
-            # - collection == all: derive from collection membership index
-            source_categories: list[str] = []
-            primary_source_category = collection
-            try:
-                if collection != "all":
-                    source_categories = [collection]
-                    primary_source_category = collection
-                else:
-                    cats = (membership_index or {}).get(handle) or []
-                    source_categories = list(cats)
-                    primary_source_category = _choose_primary_collection(cats)
-            except Exception:
-                source_categories = [collection]
-                primary_source_category = collection
-
             total += 1
-            yield {
-                "source_id": f"OC-{handle}",
-                "source_url": f"https://onecheq.co.nz/products/{handle}",
-                "title": title,
-                "description": desc,
-                "brand": brand,
-                "condition": condition,
-                "buy_now_price": price,
-                # Quantity is not reliably exposed by OneCheq (Shopify JSON). Keep null and use source_status.
-                "stock_level": None,
-                "photo1": imgs[0] if len(imgs) > 0 else None,
-                "photo2": imgs[1] if len(imgs) > 1 else None,
-                "photo3": imgs[2] if len(imgs) > 2 else None,
-                "photo4": imgs[3] if len(imgs) > 3 else None,
-                "source_status": "Available" if available else "Sold",
-                "specs": specs,
-                "sku": handle,
-                "source_category": primary_source_category,
-                "source_categories": source_categories,
-                "collection_rank": total,
-                "collection_page": page,
-            }
+            yield row
 
             if max_products and total >= int(max_products):
                 return
@@ -530,29 +761,50 @@ def _iter_onecheq_products_via_shopify_json(collection: str, max_pages: int, cli
             except Exception:
                 pass
 
-        page += 1
-
 
-def scrape_onecheq_product(url: str, client: Optional[httpx.Client] = None) -> Optional[Dict]:
+def scrape_onecheq_product(
+    url: str, client: Optional[httpx.Client] = None, cache: HTTPCache | None = None
+) -> Optional[Dict]:
     """
     Scrape a single OneCheq product page.
     Returns dict with product data or None if scraping fails.
+    With a cache (and a client) the fetch is conditional; a 304 returns the previously
+    parsed product without touching the HTML parser.
+    Parsing runs in the shared parse pool (RETAILOS_PARSE_WORKERS), off this I/O thread.
     """
     print(f"Scraping OneCheq product: {url}")
-    
-    # Extract product ID
-    product_id = extract_onecheq_id(url)
-    
+
+    if cache is not None and client is not None:
+        try:
+            return _fetch_parsed_with_retries(
+                url,
+                client,
+                lambda body: parse_in_pool(_parse_onecheq_product_body, body, url),
+                headers=_HTML_HEADERS,
+                cache=cache,
+            )
+        except Exception as e:
+            print(f"ERROR: Failed to fetch HTML from {url}: {e}")
+            return None
+
     # Fetch HTML
     html = get_html_via_httpx(url, client=client)
     if not html:
         print(f"ERROR: Failed to fetch HTML from {url}")
         return None
-    
-    if not HTMLParser:
-        print("ERROR: Selectolax not available")
-        return None
-    
+
+    return parse_in_pool(_parse_onecheq_product_html, html, url)
+
+
+def _parse_onecheq_product_body(body: bytes, url: str) -> Dict:
+    return _parse_onecheq_product_html(body.decode("utf-8", errors="replace"), url)
+
+
+def _parse_onecheq_product_html(html: str, url: str) -> Dict:
+    """Parse a OneCheq product page into the scraper row dict."""
+    # Extract product ID
+    product_id = extract_onecheq_id(url)
+
     # Parse with Selectolax
     doc = HTMLParser(html)
     products_jsonld = _iter_jsonld_products(doc)
@@ -848,13 +1100,22 @@ def scrape_onecheq_product(url: str, client: Optional[httpx.Client] = None) -> O
     }
 
 
-def scrape_onecheq(limit_pages: int = 1, collection: str = "all", concurrency: int = 8, cmd_id: str | None = None):
+def scrape_onecheq(
+    limit_pages: int = 1,
+    collection: str = "all",
+    concurrency: int = 8,
+    cmd_id: str | None = None,
+    updated_since: datetime | None = None,
+    start_page: int | None = None,
+):
     """
     Main entry point for OneCheq scraper.
     
     Args:
         limit_pages: Number of pages to scrape per collection (0 = unlimited)
         collection: Collection slug to scrape (default: "all" for all products)
+        updated_since: Incremental watermark (JSON mode only); None = full scrape
+        start_page: First products.json page (JSON mode only; resumed runs)
     
     Returns:
         List of product dictionaries
@@ -868,8 +1129,14 @@ def scrape_onecheq(limit_pages: int = 1, collection: str = "all", concurrency: i
     # Fast path: Shopify JSON (authoritative; scales to 10k+)
     if mode == "json":
         max_pages = 0 if limit_pages <= 0 else int(limit_pages)
-        with httpx.Client(follow_redirects=True, timeout=30.0) as client:
-            yield from _iter_onecheq_products_via_shopify_json(collection=collection, max_pages=max_pages, client=client, cmd_id=cmd_id)
+        yield from _iter_onecheq_products_via_shopify_json(
+            collection=collection,
+            max_pages=max_pages,
+            client=get_http_client("json"),
+            cmd_id=cmd_id,
+            updated_since=updated_since,
+            start_page=start_page,
+        )
         return
 
     # Build collection URL (HTML fallback)
@@ -884,13 +1151,11 @@ def scrape_onecheq(limit_pages: int = 1, collection: str = "all", concurrency: i
     max_products_env = os.getenv("RETAILOS_ONECHEQ_MAX_PRODUCTS")
     max_products = int(max_products_env) if (max_products_env and max_products_env.isdigit()) else None
 
-    # Reuse a single client for connection pooling (much faster).
-    client = httpx.Client(follow_redirects=True, timeout=20.0)
-    try:
-        product_urls = discover_products_from_collection(collection_url, max_pages, client=client, max_products=max_products)
-    finally:
-        # We recreate a new client for concurrent section to avoid sharing mutable state across threads on older httpx versions.
-        client.close()
+    # One pooled, keep-alive client for discovery and every product page (thread-safe).
+    client = get_http_client()
+    product_urls = discover_products_from_collection(
+        collection_url, max_pages, client=client, max_products=max_products, cache=HTTPCache.default()
+    )
     
     if not product_urls:
         print("No products found!")
@@ -900,10 +1165,10 @@ def scrape_onecheq(limit_pages: int = 1, collection: str = "all", concurrency: i
     total = len(product_urls)
     print(f"Scraping {total} product pages with concurrency={concurrency} ...")
 
-    # Use a threadpool; each worker uses its own client.
+    http_cache = HTTPCache.default()
+
     def _scrape(url: str) -> Optional[Dict]:
-        with httpx.Client(follow_redirects=True, timeout=20.0) as c:
-            return scrape_onecheq_product(url, client=c)
+        return scrape_onecheq_product(url, client=client, cache=http_cache)
 
     completed = 0
     with ThreadPoolExecutor(max_workers=concurrency) as ex:
@@ -26,6 +26,7 @@ from retail_os.core.database import (
     CommandLog,
 )
 from retail_os.core.database import init_db
+from retail_os.core.field_hashes import listing_inputs_changed
 from retail_os.core.validator import LaunchLock
 from retail_os.core.standardizer import Standardizer
 from retail_os.strategy.pricing import PricingStrategy
@@ -360,6 +361,10 @@ class CommandWorker:
             self.handle_validate_launchlock(command)
             return
 
+        elif command_type == "DRAIN_IMAGE_QUEUE":
+            self.handle_drain_image_queue(command)
+            return
+
         else:
             raise ValueError(f"Unknown Command Type: {command_type}")
     
@@ -503,6 +508,7 @@ class CommandWorker:
                         cmd_payload = cmd_row.payload or {}
                         cmd_payload["dry_run_generated_at"] = datetime.now(timezone.utc).isoformat()
                         cmd_payload["supplier_snapshot_hash"] = sp.snapshot_hash
+                        cmd_payload["supplier_field_hashes"] = sp.field_hashes
                         cmd_payload["supplier_last_scraped_at"] = (
                             sp.last_scraped_at.isoformat() if sp.last_scraped_at else None
                         )
@@ -638,11 +644,17 @@ class CommandWorker:
             if approved_from:
                 dr = session.query(SystemCommand).filter(SystemCommand.id == str(approved_from)).first()
                 expected_hash = None
+                expected_fields = None
                 try:
                     expected_hash = (dr.payload or {}).get("supplier_snapshot_hash") if dr else None
+                    expected_fields = (dr.payload or {}).get("supplier_field_hashes") if dr else None
                 except Exception:
                     expected_hash = None
-                if expected_hash and sp.snapshot_hash and str(expected_hash) != str(sp.snapshot_hash):
+                # Only listing inputs (price/content/images) count as drift; a stock-only change does not.
+                drifted = listing_inputs_changed(expected_fields, sp.field_hashes)
+                if drifted is None:
+                    drifted = bool(expected_hash and sp.snapshot_hash and str(expected_hash) != str(sp.snapshot_hash))
+                if drifted:
                     command.status = CommandStatus.HUMAN_REQUIRED
                     command.error_code = "DRYRUN_DRIFT_DETECTED"
                     command.error_message = "Supplier product changed since DRY_RUN approval; regenerate DRY_RUN"
@@ -962,6 +974,8 @@ class CommandWorker:
             pages = 100
         if pages < 0:
             pages = 0
+        # Continue the last interrupted run of the same scope from its checkpoint (scrape_runs ledger).
+        resume = bool(payload.get("resume", False))
         
         # Resolve supplier name from DB (do not rely on caller to pass supplier_name).
         try:
@@ -1018,6 +1032,8 @@ class CommandWorker:
                 
                 # Category-scoped scrape: Shopify collection handle
                 collection = source_category or payload.get("collection") or "all"
+                # full | incremental | auto (incremental + scheduled full sweep)
+                sync_mode = str(payload.get("sync_mode") or "full").strip().lower()
 
                 def _is_cancelled() -> bool:
                     try:
@@ -1078,6 +1094,8 @@ class CommandWorker:
                     progress_every=50,
                     progress_hook=_progress_hook,
                     should_abort=_is_cancelled,
+                    sync_mode=sync_mode,
+                    resume=resume,
                 )
 
                 # If an operator cancelled while the adapter was running, stop cleanly.
@@ -1088,15 +1106,9 @@ class CommandWorker:
                     logger.info(f"SCRAPE_SUPPLIER_CANCELLED cmd_id={command.id} supplier={supplier_name}")
                     return
                 
-                # Update last_scraped_at for existing products
-                from datetime import datetime
-                from retail_os.core.database import SupplierProduct
-                session.query(SupplierProduct).filter_by(supplier_id=supplier_id).update(
-                    {"last_scraped_at": datetime.now(timezone.utc)},
-                    synchronize_session=False
-                )
-                session.commit()
-                
+                # last_scraped_at of every product the run saw was stamped by the adapter's SeenSet.
+
+                self._ensure_image_drain(session)
                 logger.info(f"SCRAPE_SUPPLIER_END cmd_id={command.id} supplier={supplier_name} status=SUCCEEDED")
             elif "noel" in name_l or "leeming" in name_l:
                 # Noel Leeming scrape (Selenium). Supports category URL runs.
@@ -1168,6 +1180,7 @@ class CommandWorker:
                     cmd_id=str(command.id),
                     progress_hook=_progress_hook,
                     should_abort=_is_cancelled,
+                    resume=resume,
                 )
 
                 if _is_cancelled():
@@ -1177,6 +1190,7 @@ class CommandWorker:
                     logger.info(f"SCRAPE_SUPPLIER_CANCELLED cmd_id={command.id} supplier={supplier_name}")
                     return
 
+                self._ensure_image_drain(session)
                 logger.info(f"SCRAPE_SUPPLIER_END cmd_id={command.id} supplier={supplier_name} status=SUCCEEDED")
             else:
                 command.status = CommandStatus.HUMAN_REQUIRED
@@ -1189,6 +1203,7 @@ class CommandWorker:
             raise
         finally:
             session.close()
+            self._export_http_rates(command.id)
 
     def handle_onecheq_full_backfill(self, command):
         """
@@ -1438,11 +1453,81 @@ class CommandWorker:
                 job.summary = json.dumps(res, ensure_ascii=True)
             s.commit()
 
+    def _export_http_rates(self, cmd_id) -> None:
+        """Publish the throttle's learned per-host rates (SystemSetting http.rates, read by /metrics)."""
+        try:
+            from retail_os.core.database import SystemSetting
+            from retail_os.utils.http_throttle import GlobalHTTPThrottle
+
+            rates = GlobalHTTPThrottle.rates()
+            if not rates:
+                return
+            logger.info(
+                f"HTTP_RATES cmd_id={cmd_id} "
+                + " ".join(f"{h}={r['rps']}rps/throttled={r['throttled']}" for h, r in rates.items())
+            )
+            with SessionLocal() as s:
+                row = s.query(SystemSetting).filter(SystemSetting.key == "http.rates").first()
+                value = {"updated_at": datetime.now(timezone.utc).isoformat(), "hosts": rates}
+                if row:
+                    row.value = value
+                else:
+                    s.add(SystemSetting(key="http.rates", value=value))
+                s.commit()
+        except Exception as e:
+            logger.debug(f"HTTP rate export failed (non-critical): {e}")
+
+    def _ensure_image_drain(self, session) -> None:
+        """Queue a DRAIN_IMAGE_QUEUE command if the scrape left image jobs behind."""
+        try:
+            from retail_os.core.image_queue import ensure_drain_command
+
+            ensure_drain_command(session)
+        except Exception as e:
+            session.rollback()
+            logger.debug(f"Image drain enqueue failed (non-critical): {e}")
+
+    def handle_drain_image_queue(self, command):
+        """
+        Drain the durable image download queue (image_download_jobs).
+        Payload: max_jobs (optional), max_seconds (default 900), concurrency (optional).
+        Stops when the time budget runs out; jobs still pending are picked up by the next
+        DRAIN_IMAGE_QUEUE, which the scheduler's drain_images job enqueues (ensure_drain_command).
+        """
+        cmd_type, payload = self.resolve_command(command)
+        max_jobs = int(payload["max_jobs"]) if payload.get("max_jobs") is not None else None
+        max_seconds = float(payload.get("max_seconds", 900) or 900)
+        concurrency = int(payload["concurrency"]) if payload.get("concurrency") is not None else None
+
+        from retail_os.core.image_queue import ImageQueueDrainer
+
+        def _is_cancelled() -> bool:
+            try:
+                with SessionLocal() as s0:
+                    row0 = s0.query(SystemCommand).filter(SystemCommand.id == str(command.id)).first()
+                    if not row0:
+                        return False
+                    return row0.status == CommandStatus.CANCELLED
+            except Exception:
+                return False
+
+        logger.info(f"IMAGE_QUEUE_DRAIN_START cmd_id={command.id}")
+        with SessionLocal() as s:
+            res = ImageQueueDrainer(s, concurrency=concurrency).drain(
+                max_jobs=max_jobs, max_seconds=max_seconds, should_abort=_is_cancelled
+            )
+        logger.info(
+            f"IMAGE_QUEUE_DRAIN_END cmd_id={command.id} done={res.get('done')} failed={res.get('failed')} "
+            f"pending={res.get('pending')} seconds={res.get('seconds')}"
+        )
+        self._export_http_rates(command.id)
+
     def handle_validate_launchlock(self, command):
         cmd_type, payload = self.resolve_command(command)
         supplier_id = int(payload.get("supplier_id") or 0) if payload.get("supplier_id") is not None else None
         limit = payload.get("limit", 1000)
         validate_all = bool(payload.get("validate_all", False))
+        changed_only = bool(payload.get("changed_only", False))
         if validate_all or (isinstance(limit, str) and limit.upper() == "ALL"):
             limit = None
         try:
@@ -1525,7 +1610,15 @@ class CommandWorker:
                 except Exception:
                     return
 
-            res = validate_launchlock(session=s, supplier_id=supplier_id, limit=limit, cmd_id=str(command.id), progress_hook=_progress_hook, should_abort=_is_cancelled)
+            res = validate_launchlock(
+                session=s,
+                supplier_id=supplier_id,
+                limit=limit,
+                cmd_id=str(command.id),
+                progress_hook=_progress_hook,
+                should_abort=_is_cancelled,
+                changed_only=changed_only,
+            )
 
         with SessionLocal() as s:
             job = s.get(JobStatus, job_row_id) if job_row_id is not None else None
@@ -1805,8 +1898,10 @@ class CommandWorker:
 
         session = SessionLocal()
         try:
-            from retail_os.core.database import TradeMeListing, ListingMetricSnapshot, AuditLog
+            from retail_os.core.audit import AuditBuffer
+            from retail_os.core.database import TradeMeListing, ListingMetricSnapshot
 
+            audit = AuditBuffer()
             selling = self.api.get_all_selling_items()
             selling_ids = [str(i.get("ListingId")) for i in selling if i.get("ListingId") is not None][:limit]
 
@@ -1818,19 +1913,16 @@ class CommandWorker:
 
                     tm = session.query(TradeMeListing).filter(TradeMeListing.tm_listing_id == str(tm_id)).first()
                     if not tm:
-                        # Not ours (or not yet in DB) - record audit and continue
-                        session.add(
-                            AuditLog(
-                                entity_type="TradeMeListing",
-                                entity_id=str(tm_id),
-                                action="SELLING_SYNC_MISSING_LOCAL",
-                                old_value=None,
-                                new_value=str(details)[:2000],
-                                user="SellingSyncer",
-                                timestamp=datetime.now(timezone.utc),
-                            )
+                        # Not ours (or not yet in DB) - record audit (written in bulk below) and continue
+                        audit.diff(
+                            "TradeMeListing",
+                            tm_id,
+                            "SELLING_SYNC_MISSING_LOCAL",
+                            {},
+                            {k: details.get(k) for k in ("Title", "ParsedPrice", "Category") if details.get(k) is not None}
+                            or {"ListingId": str(tm_id)},
+                            user="SellingSyncer",
                         )
-                        session.commit()
                         continue
 
                     # Update local truth
@@ -1859,6 +1951,12 @@ class CommandWorker:
                     failed += 1
                     session.rollback()
 
+            try:
+                audit.flush(session, commit=True)
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"SELLING_SYNC_AUDIT_FAILED cmd_id={command.id} error={e}")
+
             if job_row_id is not None:
                 with SessionLocal() as s:
                     job = s.get(JobStatus, job_row_id)
@@ -1886,11 +1984,13 @@ class CommandWorker:
 
     def handle_reset_enrichment(self, command):
         """
-        Marks a SupplierProduct back to PENDING enrichment and clears enriched fields.
-        This is the operator's "requeue" button.
+        Marks a SupplierProduct back to PENDING enrichment.
+        This is the operator's "requeue" button. Enrichment is skipped if its inputs are unchanged
+        (enrichment fingerprint); `force=true` clears the enriched fields and fingerprint so it re-runs.
         """
         cmd_type, payload = self.resolve_command(command)
         sp_id = payload.get("supplier_product_id")
+        force = bool(payload.get("force", False))
         if sp_id is None:
             raise ValueError("RESET_ENRICHMENT requires supplier_product_id")
 
@@ -1910,8 +2010,10 @@ class CommandWorker:
 
             sp.enrichment_status = "PENDING"
             sp.enrichment_error = None
-            sp.enriched_title = None
-            sp.enriched_description = None
+            if force:
+                sp.enriched_title = None
+                sp.enriched_description = None
+                sp.enrichment_fingerprint = None
 
             session.add(
                 AuditLog(
@@ -1919,7 +2021,7 @@ class CommandWorker:
                     entity_id=str(sp.id),
                     action="ENRICHMENT_RESET",
                     old_value=str(old),
-                    new_value="PENDING",
+                    new_value="PENDING (forced)" if force else "PENDING",
                     user="Operator",
                     timestamp=datetime.now(timezone.utc),
                 )
@@ -0,0 +1,317 @@
+"""
+Asyncio image download engine for bulk backfills.
+
+Backfills used to push every candidate through a thread pool, each task running
+`ImageDownloader.download_image` with its own retries and curl fallback. This engine runs every
+download on one event loop instead:
+- one `httpx.AsyncClient` (keep-alive per host) plus `GlobalHTTPThrottle.arequest`, so the
+  process-wide in-flight cap and per-host rates still apply;
+- a per-host concurrency limit (RETAILOS_IMAGE_ENGINE_PER_HOST);
+- bodies streamed chunk by chunk into a temp file, then finalized off the loop by
+  `ImageDownloader.finalize` (transcode, content-addressed store or <sku>.jpg via atomic rename,
+  media_files index);
+- one retry budget shared by the whole run (RETAILOS_IMAGE_RETRY_BUDGET), so a failing host
+  cannot multiply the run time by the per-image attempt count;
+- bounded memory: jobs are pulled lazily from the caller's iterable through a small queue and
+  each in-flight download holds at most one chunk.
+`run` / `run_sync` return throughput (images/sec, bytes/sec) alongside the counts.
+`iter_results` runs the loop on a background thread and hands each result to the caller's
+thread instead, for per-result work that blocks (ORM updates, DB progress hooks).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from retail_os.utils.http_cassette import async_cassette_transport
+from retail_os.utils.http_throttle import GlobalHTTPThrottle
+from retail_os.utils.image_downloader import ImageDownloader, download_headers, image_ext
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _env_int(key: str, default: int, lo: int, hi: int) -> int:
+    try:
+        v = int((os.getenv(key) or "").strip() or default)
+    except ValueError:
+        v = default
+    return max(lo, min(hi, v))
+
+
+@dataclass
+class ImageJob:
+    key: str                                               # media file stem ("ABC123", "ABC123_2")
+    url: Optional[str] = None
+    ref: Any = None                                        # caller's handle, handed back with the result
+    discover: Optional[Callable[[], Optional[str]]] = None  # blocking URL lookup when `url` is None
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _BadStatus(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, _BadStatus):
+        return e.status in _RETRY_STATUSES
+    return isinstance(e, httpx.TransportError)
+
+
+def _fail(error: str, size: int = 0) -> dict:
+    return {"success": False, "path": None, "size": size, "error": error}
+
+
+class AsyncImageEngine:
+    def __init__(
+        self,
+        *,
+        downloader: Optional[ImageDownloader] = None,
+        concurrency: int = 32,
+        per_host: Optional[int] = None,
+        retry_budget: Optional[int] = None,
+        max_attempts: int = 3,
+        chunk_size: int = 64 * 1024,
+        max_seconds: Optional[float] = None,
+        should_abort: Optional[Callable[[], bool]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.downloader = downloader or ImageDownloader()
+        self.concurrency = max(1, min(256, int(concurrency)))
+        self.per_host = per_host or _env_int("RETAILOS_IMAGE_ENGINE_PER_HOST", 8, 1, 64)
+        self.retry_budget = (
+            int(retry_budget) if retry_budget is not None else _env_int("RETAILOS_IMAGE_RETRY_BUDGET", 200, 0, 100000)
+        )
+        self.max_attempts = max(1, int(max_attempts))
+        self.chunk_size = max(4096, int(chunk_size))
+        self.max_seconds = max_seconds
+        self.should_abort = should_abort
+        self._transport = transport
+
+        self.ok = 0
+        self.failed = 0
+        self.bytes = 0
+        self.retries = 0
+        self._retries_left = self.retry_budget
+        self._host_sems: dict[str, asyncio.Semaphore] = {}
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._closed = threading.Event()               # iter_results consumer went away
+        self._stop: Optional[asyncio.Event] = None    # no new jobs (deadline / abort)
+        self._cancel: Optional[asyncio.Event] = None  # abort: also interrupt in-flight streams
+
+    def stats(self) -> dict:
+        elapsed = max(1e-6, (self._finished or time.perf_counter()) - self._started)
+        return {
+            "images_ok": self.ok,
+            "images_failed": self.failed,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "retry_budget_left": self._retries_left,
+            "seconds": round(elapsed, 3),
+            "images_per_sec": round(self.ok / elapsed, 2),
+            "bytes_per_sec": int(self.bytes / elapsed),
+            "cancelled": bool(self._cancel is not None and self._cancel.is_set()),
+        }
+
+    def run_sync(self, jobs: Iterable[ImageJob], on_result: Optional[Callable[[ImageJob, dict], None]] = None) -> dict:
+        """Blocking wrapper; from inside a running event loop the engine gets a private loop thread."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run(jobs, on_result))
+        box: dict[str, Any] = {}
+
+        def _target() -> None:
+            try:
+                box["result"] = asyncio.run(self.run(jobs, on_result))
+            except BaseException as e:
+                box["error"] = e
+
+        t = threading.Thread(target=_target, name="image-engine", daemon=True)
+        t.start()
+        t.join()
+        if "error" in box:
+            raise box["error"]
+        return box["result"]
+
+    def iter_results(self, jobs: Iterable[ImageJob]) -> Iterator[tuple[ImageJob, dict]]:
+        """
+        Run the engine on a background loop thread and yield `(job, result)` on the calling thread
+        as downloads finish; the loop keeps downloading while the caller handles a result.
+        Closing the iterator early cancels the run. `stats()` covers the run once it is exhausted.
+        """
+        results: queue.Queue = queue.Queue()
+        done = object()
+        box: dict[str, Any] = {}
+
+        def _target() -> None:
+            try:
+                asyncio.run(self.run(jobs, lambda job, res: results.put((job, res))))
+            except BaseException as e:
+                box["error"] = e
+            finally:
+                results.put(done)
+
+        self._closed.clear()
+        t = threading.Thread(target=_target, name="image-engine", daemon=True)
+        t.start()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            self._closed.set()
+            t.join()
+        if "error" in box:
+            raise box["error"]
+
+    async def run(self, jobs: Iterable[ImageJob], on_result: Optional[Callable[[ImageJob, dict], None]] = None) -> dict:
+        """
+        Download every job (in order of submission, `concurrency` at a time). `on_result(job, result)`
+        runs on the loop thread with an ImageDownloader-style result dict, so it must not block
+        (see `iter_results`). Jobs not started before the deadline / an abort are neither
+        downloaded nor reported.
+        """
+        self._started = time.perf_counter()
+        self._finished = None
+        self._stop, self._cancel = asyncio.Event(), asyncio.Event()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+
+        async with httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=20.0,
+            limits=limits,
+            transport=self._transport or async_cassette_transport(),
+        ) as client:
+            workers = [asyncio.create_task(self._worker(client, queue, on_result)) for _ in range(self.concurrency)]
+            watcher = asyncio.create_task(self._watch())
+            try:
+                for job in jobs:
+                    if self._stop.is_set():
+                        break
+                    await queue.put(job)
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers, return_exceptions=True)
+                watcher.cancel()
+                await asyncio.gather(watcher, return_exceptions=True)
+        self._finished = time.perf_counter()
+        return self.stats()
+
+    async def _watch(self) -> None:
+        while not self._stop.is_set():
+            if self.max_seconds is not None and (time.perf_counter() - self._started) > self.max_seconds:
+                self._stop.set()
+                return
+            if self._closed.is_set():
+                self._cancel.set()
+                self._stop.set()
+                return
+            if self.should_abort is not None:
+                try:
+                    if await asyncio.to_thread(self.should_abort):
+                        self._cancel.set()
+                        self._stop.set()
+                        return
+                except Exception:
+                    pass
+            await asyncio.sleep(0.5)
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue, on_result) -> None:
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            if self._stop.is_set():
+                continue
+            res = await self._download(client, job)
+            if res.get("success"):
+                self.ok += 1
+            else:
+                self.failed += 1
+            if on_result is not None:
+                try:
+                    on_result(job, res)
+                except Exception as e:
+                    logger.warning(f"ImageEngine: result callback failed for {job.key}: {e}")
+
+    async def _download(self, client: httpx.AsyncClient, job: ImageJob) -> dict:
+        url = job.url
+        if not url and job.discover is not None:
+            try:
+                url = await asyncio.to_thread(job.discover)
+            except Exception as e:
+                return _fail(f"exception: {e}")
+            if not url:
+                return _fail("no_images_found_on_product_page")
+        if not url or url.startswith("https://placehold.co"):
+            return _fail("Placeholder URL")
+
+        host = urlparse(url).netloc.lower() or "unknown"
+        sem = self._host_sems.setdefault(host, asyncio.Semaphore(self.per_host))
+        tmp = self.downloader.temp_path(job.key, image_ext(url))
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with sem:
+                    size = await self._stream(client, url, tmp)
+                break
+            except _Cancelled:
+                tmp.unlink(missing_ok=True)
+                return _fail("Cancelled")
+            except Exception as e:
+                tmp.unlink(missing_ok=True)
+                if not _retryable(e) or attempt >= self.max_attempts or self._retries_left <= 0:
+                    return _fail(str(e)[:200] or type(e).__name__)
+                self._retries_left -= 1
+                self.retries += 1
+                await asyncio.sleep(min(4.0, 0.5 * (2 ** (attempt - 1))))
+
+        self.bytes += size
+        try:
+            # Transcode / hash / DB index are blocking: keep them off the loop.
+            return await asyncio.to_thread(self.downloader.finalize, tmp, job.key, url)
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            return _fail(f"finalize: {e}")
+
+    async def _stream(self, client: httpx.AsyncClient, url: str, tmp: Path) -> int:
+        async with GlobalHTTPThrottle.arequest(url):
+            async with client.stream("GET", url, headers=download_headers(url)) as response:
+                GlobalHTTPThrottle.feedback(url, response.status_code, response.headers)
+                if response.status_code >= 400:
+                    raise _BadStatus(response.status_code)
+                ctype = (response.headers.get("content-type") or "").lower()
+                if ctype and "image" not in ctype:
+                    raise ValueError(f"Non-image response content-type: {ctype}")
+                size = 0
+                with open(tmp, "wb") as f:
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        if self._cancel.is_set():
+                            raise _Cancelled()
+                        f.write(chunk)
+                        size += len(chunk)
+                return size
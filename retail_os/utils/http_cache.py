@@ -0,0 +1,172 @@
+"""
+Persistent conditional-request cache for supplier fetches.
+
+Per URL we keep the validators of the last 200 response (ETag / Last-Modified), a hash of
+its body and the *parsed* result the caller derived from it. Requests then go out with
+If-None-Match / If-Modified-Since; on 304 (or a byte-identical body from a server that
+ignores validators) the cached parse result is returned and the parser is skipped.
+
+Storage is a single SQLite file (default data/cache/http_cache.sqlite). Parsed results must
+be JSON-serializable (dicts/lists), which is what all scraper parsers return.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_sha256: Optional[str]
+    parsed: Any
+    fetched_at: float
+
+
+class HTTPCache:
+    """Thread-safe SQLite-backed validator + parse-result cache keyed by URL."""
+
+    _default: "HTTPCache | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+              url TEXT PRIMARY KEY,
+              etag TEXT,
+              last_modified TEXT,
+              body_sha256 TEXT,
+              parsed TEXT,
+              fetched_at REAL,
+              validated_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls) -> "HTTPCache | None":
+        """
+        Process-wide cache, or None when disabled (RETAILOS_HTTP_CACHE=0).
+        Path: RETAILOS_HTTP_CACHE_PATH (default data/cache/http_cache.sqlite).
+        """
+        enabled = (os.getenv("RETAILOS_HTTP_CACHE", "true") or "true").strip().lower() in ("1", "true", "yes", "on")
+        if not enabled:
+            return None
+        with cls._default_lock:
+            if cls._default is None:
+                path = os.getenv("RETAILOS_HTTP_CACHE_PATH") or str(Path("data") / "cache" / "http_cache.sqlite")
+                try:
+                    cls._default = HTTPCache(path)
+                except Exception:
+                    # A broken cache must never break scraping.
+                    return None
+            return cls._default
+
+    def get(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, etag, last_modified, body_sha256, parsed, fetched_at FROM http_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            parsed = json.loads(row[4]) if row[4] is not None else None
+        except Exception:
+            parsed = None
+        return CacheEntry(url=row[0], etag=row[1], last_modified=row[2], body_sha256=row[3], parsed=parsed, fetched_at=row[5] or 0.0)
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Validators to send for `url` (empty when we have nothing usable to fall back on)."""
+        entry = self.get(url)
+        if entry is None or entry.parsed is None:
+            return {}
+        headers: dict[str, str] = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, *, etag: str | None, last_modified: str | None, body_sha256: str, parsed: Any) -> None:
+        now = time.time()
+        payload = json.dumps(parsed, ensure_ascii=True)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO http_cache (url, etag, last_modified, body_sha256, parsed, fetched_at, validated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                  etag = excluded.etag,
+                  last_modified = excluded.last_modified,
+                  body_sha256 = excluded.body_sha256,
+                  parsed = excluded.parsed,
+                  fetched_at = excluded.fetched_at,
+                  validated_at = excluded.validated_at
+                """,
+                (url, etag, last_modified, body_sha256, payload, now, now),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str, *, etag: str | None = None, last_modified: str | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET validated_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url),
+            )
+            self._conn.commit()
+
+    def resolve(self, url: str, response, parse: Callable[[bytes], Any]) -> Any:
+        """
+        Turn a (possibly 304) response into a parse result, consulting/updating the cache.
+        The caller is responsible for raising on error statuses other than 304.
+        """
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        entry = self.get(url)
+
+        if response.status_code == 304 and entry is not None and entry.parsed is not None:
+            self.touch(url, etag=etag, last_modified=last_modified)
+            self.hits += 1
+            return entry.parsed
+
+        body = response.content or b""
+        digest = hashlib.sha256(body).hexdigest()
+        if entry is not None and entry.parsed is not None and entry.body_sha256 == digest:
+            self.touch(url, etag=etag, last_modified=last_modified)
+            self.hits += 1
+            return entry.parsed
+
+        parsed = parse(body)
+        self.misses += 1
+        try:
+            self.put(url, etag=etag, last_modified=last_modified, body_sha256=digest, parsed=parsed)
+        except Exception:
+            pass
+        return parsed
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,368 @@
+"""
+HTTP record/replay cassettes for offline scraper benchmarks.
+
+Recording (RETAILOS_HTTP_RECORD_DIR=<dir>): every request made through the pooled clients
+(`retail_os.utils.http_clients`) and the OneCheq async crawler is passed through to the network
+and its response (status, a few headers, decoded body) is written into the cassette directory:
+
+    <dir>/index.jsonl        one JSON line per response (latest line for a URL wins)
+    <dir>/bodies/<key>.bin   response bodies
+
+Replay (RETAILOS_HTTP_REPLAY_URL=http://127.0.0.1:<port>): requests are rerouted to a local
+`CassetteServer` as `/<scheme>/<host><path>?<query>`, which serves the recorded response after
+the recorded (or a fixed) latency plus jitter. The scrapers keep building the same supplier
+URLs, so hosts, throttling keys and redirects behave as they do live.
+
+See scripts/bench_replay.py for the record / benchmark command.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth replaying. Bodies are stored decoded, so content-encoding/length are dropped.
+_KEPT_HEADERS = ("content-type", "location", "etag", "last-modified", "cache-control", "retry-after")
+
+
+def url_id(url: httpx.URL) -> str:
+    """Canonical `scheme://host[:port]/path?query` used to key cassette entries."""
+    return f"{url.scheme}://{url.netloc.decode('ascii')}{url.raw_path.decode('ascii')}"
+
+
+def cassette_key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CassetteEntry:
+    method: str
+    url: str
+    status: int
+    headers: dict[str, str]
+    elapsed_ms: float
+    size: int
+
+    @property
+    def key(self) -> str:
+        return cassette_key(self.method, self.url)
+
+
+class Cassette:
+    """A cassette directory: thread-safe append on record, in-memory index on replay."""
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._entries: dict[str, CassetteEntry] = {}
+        index = self.directory / "index.jsonl"
+        if index.exists():
+            with open(index, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = CassetteEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
+                    self._entries[entry.key] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, method: str, url: str, status: int, headers, body: bytes, elapsed_s: float) -> CassetteEntry:
+        entry = CassetteEntry(
+            method=method.upper(),
+            url=url,
+            status=int(status),
+            headers={k: headers[k] for k in _KEPT_HEADERS if k in headers},
+            elapsed_ms=round(elapsed_s * 1000.0, 1),
+            size=len(body),
+        )
+        bodies = self.directory / "bodies"
+        with self._lock:
+            bodies.mkdir(parents=True, exist_ok=True)
+            (bodies / f"{entry.key}.bin").write_bytes(body)
+            with open(self.directory / "index.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry.__dict__, sort_keys=True) + "\n")
+            self._entries[entry.key] = entry
+        return entry
+
+    def lookup(self, method: str, url: str) -> Optional[tuple[CassetteEntry, bytes]]:
+        entry = self._entries.get(cassette_key(method, url))
+        if entry is None:
+            return None
+        try:
+            body = (self.directory / "bodies" / f"{entry.key}.bin").read_bytes()
+        except OSError:
+            return None
+        return entry, body
+
+
+def _recorded_response(request: httpx.Request, response: httpx.Response, body: bytes) -> httpx.Response:
+    headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+    return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Pass requests through to `inner` and write every response into `cassette`."""
+
+    def __init__(self, inner: httpx.BaseTransport, cassette: Cassette):
+        self._inner = inner
+        self.cassette = cassette
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        response = self._inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        self.cassette.record(request.method, url_id(request.url), response.status_code, response.headers, body, time.perf_counter() - t0)
+        return _recorded_response(request, response, body)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, cassette: Cassette):
+        self._inner = inner
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        self.cassette.record(request.method, url_id(request.url), response.status_code, response.headers, body, time.perf_counter() - t0)
+        return _recorded_response(request, response, body)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class RequestTimings:
+    """Client-side wall time per replayed request (for p95 reporting)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: list[float] = []
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = []
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self.samples)
+        if not data:
+            return None
+        # Nearest-rank percentile.
+        idx = min(len(data) - 1, max(0, math.ceil(p / 100.0 * len(data)) - 1))
+        return data[idx]
+
+
+replay_timings = RequestTimings()
+
+
+def _replay_request(request: httpx.Request, base_url: str) -> httpx.Request:
+    target = f"{base_url.rstrip('/')}/{request.url.scheme}/{request.url.netloc.decode('ascii')}{request.url.raw_path.decode('ascii')}"
+    target_url = httpx.URL(target)
+    headers = [("Host", target_url.netloc.decode("ascii"))]
+    headers += [(k, v) for k, v in request.headers.multi_items() if k.lower() != "host"]
+    return httpx.Request(request.method, target_url, headers=headers, stream=request.stream, extensions=request.extensions)
+
+
+class ReplayRoutingTransport(httpx.BaseTransport):
+    """Send every request to the cassette server at `base_url` instead of the real host."""
+
+    def __init__(self, inner: httpx.BaseTransport, base_url: str, timings: RequestTimings | None = None):
+        self._inner = inner
+        self.base_url = base_url
+        self.timings = timings if timings is not None else replay_timings
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        response = self._inner.handle_request(_replay_request(request, self.base_url))
+        self.timings.add(time.perf_counter() - t0)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncReplayRoutingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, base_url: str, timings: RequestTimings | None = None):
+        self._inner = inner
+        self.base_url = base_url
+        self.timings = timings if timings is not None else replay_timings
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        response = await self._inner.handle_async_request(_replay_request(request, self.base_url))
+        self.timings.add(time.perf_counter() - t0)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+_recording: dict[str, Cassette] = {}
+_recording_lock = threading.Lock()
+
+
+def _recording_cassette(directory: str) -> Cassette:
+    # One Cassette per directory so every client appends through the same lock.
+    with _recording_lock:
+        cassette = _recording.get(directory)
+        if cassette is None:
+            cassette = _recording[directory] = Cassette(directory)
+        return cassette
+
+
+def cassette_transport(inner: httpx.BaseTransport) -> Optional[httpx.BaseTransport]:
+    """`inner` wrapped for replay/record according to the environment, or None when neither is on."""
+    replay_url = (os.getenv("RETAILOS_HTTP_REPLAY_URL") or "").strip()
+    if replay_url:
+        return ReplayRoutingTransport(inner, replay_url)
+    record_dir = (os.getenv("RETAILOS_HTTP_RECORD_DIR") or "").strip()
+    if record_dir:
+        return RecordingTransport(inner, _recording_cassette(record_dir))
+    return None
+
+
+def async_cassette_transport(inner: httpx.AsyncBaseTransport | None = None) -> Optional[httpx.AsyncBaseTransport]:
+    """Async counterpart of `cassette_transport` (None = let httpx build its default transport)."""
+    replay_url = (os.getenv("RETAILOS_HTTP_REPLAY_URL") or "").strip()
+    record_dir = (os.getenv("RETAILOS_HTTP_RECORD_DIR") or "").strip()
+    if not replay_url and not record_dir:
+        return None
+    inner = inner or httpx.AsyncHTTPTransport()
+    if replay_url:
+        return AsyncReplayRoutingTransport(inner, replay_url)
+    return AsyncRecordingTransport(inner, _recording_cassette(record_dir))
+
+
+class CassetteServer:
+    """
+    Threaded local HTTP server replaying a cassette.
+
+    latency_ms: fixed per-response delay; None replays each response's recorded latency.
+    jitter_ms: extra uniform random delay in [0, jitter_ms] (seeded, so runs are repeatable).
+    Unrecorded URLs get a 404 and are counted in `misses`.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        latency_ms: float | None = None,
+        jitter_ms: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.cassette = Cassette(directory)
+        self.latency_ms = latency_ms
+        self.jitter_ms = max(0.0, float(jitter_ms or 0.0))
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses: list[str] = []
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay_s(self, entry: CassetteEntry | None) -> float:
+        base = self.latency_ms if self.latency_ms is not None else (entry.elapsed_ms if entry else 0.0)
+        with self._rng_lock:
+            jitter = self._rng.uniform(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, (float(base) + jitter) / 1000.0)
+
+    def _handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                scheme, _, rest = self.path.lstrip("/").partition("/")
+                netloc, slash, path = rest.partition("/")
+                url = f"{scheme}://{netloc}{slash}{path}"
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                found = server.cassette.lookup(self.command, url)
+                with server._stats_lock:
+                    if found is None:
+                        server.misses.append(f"{self.command} {url}")
+                    else:
+                        server.hits += 1
+                delay = server._delay_s(found[0] if found else None)
+                if delay:
+                    time.sleep(delay)
+                if found is None:
+                    status, headers, body = 404, {"content-type": "text/plain"}, b"not in cassette"
+                else:
+                    entry, body = found
+                    status, headers = entry.status, entry.headers
+                try:
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    if self.command != "HEAD":
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Look-ahead fetches cancelled by the client.
+                    pass
+
+            do_GET = do_HEAD = do_POST = _serve
+
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+        return _Handler
+
+    def start(self) -> "CassetteServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="cassette-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "CassetteServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,109 @@
+"""
+Process-wide pooled HTTP clients.
+
+Scrapers, downloaders and backfills used to open a fresh `httpx.Client` / `requests.Session`
+per product or per attempt, paying a TCP + TLS handshake on almost every request. This registry
+hands out one long-lived, thread-safe `httpx.Client` per profile instead, so connections to each
+supplier host are kept alive and reused across threads and commands.
+
+Profiles only differ in timeouts/default headers; pooling is per host inside each client.
+HTTP/2 is opt-in (RETAILOS_HTTP2=true) and needs the optional `h2` package; without it the
+clients silently stay on HTTP/1.1 keep-alive.
+
+Async callers that run their own event loop (e.g. the pipelined products.json crawler) keep
+their own `httpx.AsyncClient`: async clients are bound to the loop that created them.
+
+RETAILOS_HTTP_RECORD_DIR / RETAILOS_HTTP_REPLAY_URL swap in the cassette transports from
+`retail_os.utils.http_cassette` (offline benchmarks).
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+
+import httpx
+
+from retail_os.utils.http_cassette import cassette_transport
+
+logger = logging.getLogger(__name__)
+
+_PROFILES: dict[str, dict] = {
+    # Supplier HTML / JSON pages
+    "default": {"timeout": 20.0},
+    # Shopify products.json pages (larger bodies)
+    "json": {"timeout": 30.0, "headers": {"User-Agent": "Mozilla/5.0"}},
+    # Image downloads (body streamed to disk)
+    "media": {"timeout": 20.0},
+    # Cheap reachability probes
+    "probe": {"timeout": 5.0},
+}
+
+_lock = threading.Lock()
+_clients: dict[str, httpx.Client] = {}
+
+
+def _env_int(key: str, default: int, lo: int, hi: int) -> int:
+    try:
+        v = int((os.getenv(key) or "").strip() or default)
+    except ValueError:
+        v = default
+    return max(lo, min(hi, v))
+
+
+def _http2_enabled() -> bool:
+    if (os.getenv("RETAILOS_HTTP2", "false") or "false").strip().lower() not in ("1", "true", "yes", "on"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.info("RETAILOS_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_int("RETAILOS_HTTP_POOL_MAX", 64, 1, 512),
+        max_keepalive_connections=_env_int("RETAILOS_HTTP_POOL_KEEPALIVE", 32, 0, 512),
+        keepalive_expiry=float(_env_int("RETAILOS_HTTP_POOL_KEEPALIVE_S", 30, 1, 600)),
+    )
+
+
+def get_http_client(profile: str = "default") -> httpx.Client:
+    """Shared, thread-safe client for `profile` (created on first use, reused until shutdown)."""
+    client = _clients.get(profile)
+    if client is not None and not client.is_closed:
+        return client
+    with _lock:
+        client = _clients.get(profile)
+        if client is None or client.is_closed:
+            opts = _PROFILES.get(profile) or _PROFILES["default"]
+            limits, http2 = _limits(), _http2_enabled()
+            client = httpx.Client(
+                follow_redirects=True,
+                timeout=opts["timeout"],
+                headers=opts.get("headers"),
+                limits=limits,
+                http2=http2,
+                transport=cassette_transport(httpx.HTTPTransport(limits=limits, http2=http2)),
+            )
+            _clients[profile] = client
+        return client
+
+
+def close_http_clients() -> None:
+    """Close every pooled client (process shutdown, tests). Safe to call repeatedly."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_http_clients)
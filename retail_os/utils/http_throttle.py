@@ -3,18 +3,26 @@ Global outbound HTTP throttling.
 
 Goal:
 - Cap total concurrent outbound requests across the whole worker process
-- Add simple per-host rate limiting so suppliers aren't overwhelmed
+- Per-host rate limiting so suppliers aren't overwhelmed, adapted at runtime (AIMD):
+  healthy responses ramp a host's rate up additively, 429/503 cut it multiplicatively,
+  and `Retry-After` pauses the host entirely. Callers report outcomes via `feedback`.
 
 This is intentionally lightweight (threading-based) because the scraper/downloader
-currently use synchronous requests + thread pools.
+currently use synchronous requests + thread pools. Async callers (httpx.AsyncClient)
+use `arequest`, which shares the same semaphore and per-host schedule.
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
 import threading
 import time
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
 from urllib.parse import urlparse
 
 
@@ -34,18 +42,67 @@ def _env_float(key: str, default: float) -> float:
         return default
 
 
+def _env_bool(key: str, default: bool) -> bool:
+    raw = (os.getenv(key) or "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """`Retry-After` header value (delta-seconds or HTTP-date) -> seconds to wait, or None."""
+    if value is None:
+        return None
+    raw = str(value).strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(raw)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class _HostRate:
+    rps: float
+    min_rps: float
+    max_rps: float
+    tokens: float
+    last_refill: float
+    blocked_until: float = 0.0
+    last_decrease: float = 0.0
+    ok: int = 0
+    throttled: int = 0
+
+
 class GlobalHTTPThrottle:
     """
     Process-global throttle:
     - max in-flight requests across all threads
-    - per-host minimum interval between request starts (simple RPS cap)
+    - per-host token bucket whose rate adapts to supplier feedback (AIMD)
+    - per-host cooldown from `Retry-After`, waited out before taking an in-flight slot
     """
 
     _max_inflight = max(1, min(128, _env_int("RETAILOS_HTTP_MAX_INFLIGHT", 16)))
     _default_rps = max(0.2, min(50.0, _env_float("RETAILOS_HTTP_RPS_DEFAULT", 6.0)))
+    _burst = max(1.0, min(50.0, _env_float("RETAILOS_HTTP_BURST", 1.0)))
+    _aimd = _env_bool("RETAILOS_HTTP_AIMD", True)
+    _aimd_step = max(0.01, min(10.0, _env_float("RETAILOS_HTTP_AIMD_STEP", 0.5)))
+    _aimd_decrease = max(0.1, min(0.95, _env_float("RETAILOS_HTTP_AIMD_DECREASE", 0.5)))
+    _retry_after_max = max(1.0, min(900.0, _env_float("RETAILOS_HTTP_RETRY_AFTER_MAX", 120.0)))
+    _throttle_statuses = frozenset({429, 503})
     _sem = threading.BoundedSemaphore(_max_inflight)
     _lock = threading.Lock()
-    _next_allowed_by_host: dict[str, float] = {}
+    _hosts: dict[str, _HostRate] = {}
 
     @classmethod
     def _host_key(cls, url: str) -> str:
@@ -55,12 +112,116 @@ class GlobalHTTPThrottle:
         except Exception:
             return "unknown"
 
+    @classmethod
+    def _host_env(cls, prefix: str, host: str, default: float) -> float:
+        # Per-host overrides, e.g. RETAILOS_HTTP_RPS_ONECHEQ_CO_NZ=3.5
+        safe = host.upper().replace(".", "_").replace("-", "_").replace(":", "_")
+        return _env_float(f"{prefix}_{safe}", default)
+
     @classmethod
     def _rps_for_host(cls, host: str) -> float:
-        # Allow per-host overrides, e.g. RETAILOS_HTTP_RPS_ONECHEQ_CO_NZ=3.5
-        safe = host.upper().replace(".", "_").replace("-", "_")
-        key = f"RETAILOS_HTTP_RPS_{safe}"
-        return max(0.2, min(50.0, _env_float(key, cls._default_rps)))
+        return max(0.2, min(50.0, cls._host_env("RETAILOS_HTTP_RPS", host, cls._default_rps)))
+
+    @classmethod
+    def _state(cls, host: str) -> _HostRate:
+        """Caller holds `_lock`."""
+        st = cls._hosts.get(host)
+        if st is None:
+            start = cls._rps_for_host(host)
+            ceiling = cls._host_env("RETAILOS_HTTP_RPS_MAX", host, _env_float("RETAILOS_HTTP_RPS_MAX", 20.0))
+            floor = cls._host_env("RETAILOS_HTTP_RPS_MIN", host, _env_float("RETAILOS_HTTP_RPS_MIN", 0.2))
+            max_rps = max(start, min(50.0, ceiling)) if cls._aimd else start
+            min_rps = max(0.05, min(start, floor)) if cls._aimd else start
+            st = _HostRate(rps=start, min_rps=min_rps, max_rps=max_rps, tokens=cls._burst, last_refill=time.monotonic())
+            cls._hosts[host] = st
+        return st
+
+    @classmethod
+    def _reserve_start(cls, host: str) -> float:
+        """
+        Take one token from `host`'s bucket.
+        Returns how long the caller must wait before starting its request.
+        """
+        with cls._lock:
+            st = cls._state(host)
+            now = time.monotonic()
+            st.tokens = min(cls._burst, st.tokens + (now - st.last_refill) * st.rps)
+            st.last_refill = now
+            st.tokens -= 1.0
+            if st.tokens >= 0:
+                return 0.0
+            return -st.tokens / st.rps
+
+    @classmethod
+    def _cooldown_remaining(cls, host: str) -> float:
+        with cls._lock:
+            st = cls._hosts.get(host)
+            if st is None:
+                return 0.0
+            return max(0.0, st.blocked_until - time.monotonic())
+
+    @classmethod
+    def feedback(cls, host: str, status: Optional[int], headers: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Report a response outcome for `host` (a hostname or full URL).
+        429/503 shrink the host's rate (at most once per second, so one burst of rejections
+        counts once) and honour `Retry-After`; other non-5xx responses grow it additively.
+        """
+        if not host:
+            return
+        key = cls._host_key(host) if "://" in host else host.lower().strip()
+        try:
+            code = int(status or 0)
+        except (TypeError, ValueError):
+            code = 0
+        retry_after = None
+        if headers is not None and code in cls._throttle_statuses:
+            try:
+                retry_after = parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+            except Exception:
+                retry_after = None
+
+        with cls._lock:
+            st = cls._state(key)
+            now = time.monotonic()
+            if code in cls._throttle_statuses:
+                st.throttled += 1
+                if cls._aimd and now - st.last_decrease >= 1.0:
+                    st.rps = max(st.min_rps, st.rps * cls._aimd_decrease)
+                    st.last_decrease = now
+                    # Drop any saved-up burst so the cut takes effect immediately.
+                    st.tokens = min(st.tokens, 0.0)
+                    st.last_refill = now
+            elif 200 <= code < 500:
+                st.ok += 1
+                if cls._aimd and st.rps < st.max_rps:
+                    # +step rps per second of healthy traffic (one step spread over `rps` responses).
+                    st.rps = min(st.max_rps, st.rps + cls._aimd_step / st.rps)
+            if retry_after:
+                st.blocked_until = max(st.blocked_until, now + min(cls._retry_after_max, retry_after))
+
+    @classmethod
+    def rates(cls) -> dict[str, dict]:
+        """Live per-host limiter state, for logs and the /metrics export."""
+        with cls._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    "rps": round(st.rps, 3),
+                    "min_rps": round(st.min_rps, 3),
+                    "max_rps": round(st.max_rps, 3),
+                    "ok": st.ok,
+                    "throttled": st.throttled,
+                    "cooldown_s": round(max(0.0, st.blocked_until - now), 1),
+                }
+                for host, st in sorted(cls._hosts.items())
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget all learned per-host rates (tests, config reloads)."""
+        with cls._lock:
+            cls._hosts.clear()
 
     @classmethod
     @contextmanager
@@ -68,24 +229,47 @@ class GlobalHTTPThrottle:
         """
         Context manager around a single outbound request.
         Applies:
+        - per-host Retry-After cooldown (without holding an in-flight slot)
         - global concurrency cap
-        - per-host spacing (start-time based)
+        - per-host token bucket (start-time based)
         """
         host = cls._host_key(url)
-        rps = cls._rps_for_host(host)
-        min_interval = 1.0 / max(rps, 0.2)
+
+        cooldown = cls._cooldown_remaining(host)
+        if cooldown > 0:
+            time.sleep(cooldown)
 
         cls._sem.acquire()
         try:
             # Rate limit per host (best-effort)
-            with cls._lock:
-                now = time.monotonic()
-                next_allowed = cls._next_allowed_by_host.get(host, 0.0)
-                sleep_for = max(0.0, next_allowed - now)
-                cls._next_allowed_by_host[host] = max(next_allowed, now) + min_interval
+            sleep_for = cls._reserve_start(host)
             if sleep_for > 0:
                 time.sleep(min(5.0, sleep_for))
             yield
         finally:
             cls._sem.release()
 
+    @classmethod
+    @asynccontextmanager
+    async def arequest(cls, url: str):
+        """
+        Async counterpart of `request` for asyncio callers.
+        Same global cap, cooldown and per-host bucket, but waits without blocking the event loop.
+        """
+        host = cls._host_key(url)
+
+        cooldown = cls._cooldown_remaining(host)
+        if cooldown > 0:
+            await asyncio.sleep(cooldown)
+
+        # Poll instead of acquiring in a worker thread: a cancelled task must never
+        # end up owning a semaphore slot it can no longer release.
+        while not cls._sem.acquire(blocking=False):
+            await asyncio.sleep(0.01)
+        try:
+            sleep_for = cls._reserve_start(host)
+            if sleep_for > 0:
+                await asyncio.sleep(min(5.0, sleep_for))
+            yield
+        finally:
+            cls._sem.release()
@@ -1,15 +1,55 @@
 import os
 import logging
-import requests
 from pathlib import Path
 from urllib.parse import urlparse
 import time
 import threading
+import uuid
 
+from retail_os.core.database import SessionLocal
+from retail_os.core.media_index import record_media_file
+from retail_os.utils.http_clients import get_http_client
 from retail_os.utils.http_throttle import GlobalHTTPThrottle
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "image/*,*/*;q=0.8",
+}
+
+
+def referer_for(url: str) -> str | None:
+    """Supplier CDNs that hotlink-protect images want their own site as Referer."""
+    try:
+        host = urlparse(url).netloc.lower()
+    except Exception as e:
+        logger.debug(f"URL parse failed for referer: {e}")
+        return None
+    if "noelleeming.co.nz" in host:
+        return "https://www.noelleeming.co.nz/"
+    if "onecheq.co.nz" in host:
+        return "https://onecheq.co.nz/"
+    return None
+
+
+def download_headers(url: str) -> dict:
+    headers = dict(DOWNLOAD_HEADERS)
+    referer = referer_for(url)
+    if referer:
+        headers["Referer"] = referer
+    return headers
+
+
+def image_ext(url: str) -> str:
+    u = url.lower()
+    if ".png" in u:
+        return ".png"
+    if ".webp" in u:
+        return ".webp"
+    return ".jpg"
+
+
 class ImageDownloader:
     """Physical image download service with verification."""
     _locks: dict[str, threading.Lock] = {}
@@ -18,12 +58,24 @@ class ImageDownloader:
     def __init__(self, base_dir="data/media"):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        from retail_os.core.media_store import MediaStore, media_cas_enabled
+
+        # Content-addressed store (data/media/cas/...); None = legacy data/media/<sku>.jpg files.
+        self.store = MediaStore(self.base_dir) if media_cas_enabled() else None
     
     def download_image(self, url: str, sku: str, should_abort=None) -> dict:
         """
         Download image to local storage.
         Returns: {"success": bool, "path": str, "size": int, "error": str}
         """
+        # One session per image: the store lookup and the finalize writes (one transaction).
+        db = SessionLocal()
+        try:
+            return self._download_image(url, sku, should_abort, db)
+        finally:
+            db.close()
+
+    def _download_image(self, url: str, sku: str, should_abort, db) -> dict:
         try:
             if should_abort and bool(should_abort()):
                 return {"success": False, "path": None, "size": 0, "error": "Cancelled"}
@@ -33,42 +85,26 @@ class ImageDownloader:
         if not url or url.startswith("https://placehold.co"):
             return {"success": False, "path": None, "size": 0, "error": "Placeholder URL"}
         
-        def _referer_for(u: str) -> str | None:
-            try:
-                host = urlparse(u).netloc.lower()
-            except Exception as e:
-                logger.debug(f"URL parse failed for referer: {e}")
-                return None
-            if "noelleeming.co.nz" in host:
-                return "https://www.noelleeming.co.nz/"
-            if "onecheq.co.nz" in host:
-                return "https://onecheq.co.nz/"
-            return None
-
-        referer = _referer_for(url)
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "image/*,*/*;q=0.8",
-        }
-        if referer:
-            headers["Referer"] = referer
+        referer = referer_for(url)
+        headers = download_headers(url)
 
         try:
             # Per-SKU lock so concurrent threads don't fight over the same file.
             with self._get_lock(sku):
-                # Determine extension
-                ext = ".jpg"
-                if ".png" in url.lower():
-                    ext = ".png"
-                elif ".webp" in url.lower():
-                    ext = ".webp"
-
-                # Target path
+                ext = image_ext(url)
+
+                # Idempotent: already stored for this SKU (content-addressed store first, then legacy
+                # files; we always convert to JPG when PIL is available).
+                if self.store is not None:
+                    hit = self.store.lookup(sku, db=db)
+                    db.rollback()  # no read transaction held open across the download
+                    if hit:
+                        return {"success": True, "path": hit["path"], "size": hit["size"], "error": None}
+
+                # Target path (a temp file when the store takes it over afterwards)
                 filename = f"{sku}{ext}"
-                filepath = self.base_dir / filename
+                filepath = self.store.temp_path(sku, ext) if self.store is not None else self.base_dir / filename
 
-                # Idempotent: if we already have a usable JPG for this SKU, skip download.
-                # (We always convert to JPG when PIL is available.)
                 jpg_path = self.base_dir / f"{sku}.jpg"
                 existing = jpg_path if jpg_path.exists() else filepath
                 if existing.exists():
@@ -79,7 +115,8 @@ class ImageDownloader:
                     except Exception:
                         pass
 
-                # Use a session for better connection handling + retries (NL can be flaky)
+                # Pooled keep-alive client shared across threads/products + retries (NL can be flaky)
+                client = get_http_client("media")
                 last_err: Exception | None = None
                 for attempt in range(1, 4):
                     try:
@@ -88,55 +125,49 @@ class ImageDownloader:
                                 return {"success": False, "path": None, "size": 0, "error": "Cancelled"}
                         except Exception:
                             pass
-                        with requests.Session() as session:
-                            with GlobalHTTPThrottle.request(url):
-                                response = session.get(url, headers=headers, timeout=20, stream=True, allow_redirects=True)
+                        with GlobalHTTPThrottle.request(url):
+                            with client.stream("GET", url, headers=headers) as response:
+                                GlobalHTTPThrottle.feedback(url, response.status_code, response.headers)
                                 response.raise_for_status()
 
-                            ctype = (response.headers.get("content-type") or "").lower()
-                            if ctype and "image" not in ctype:
-                                raise RuntimeError(f"Non-image response content-type: {ctype}")
-
-                            with open(filepath, "wb") as f:
-                                for chunk in response.iter_content(chunk_size=8192):
-                                    try:
-                                        if should_abort and bool(should_abort()):
-                                            return {"success": False, "path": None, "size": 0, "error": "Cancelled"}
-                                    except Exception:
-                                        pass
-                                    if chunk:
-                                        f.write(chunk)
+                                ctype = (response.headers.get("content-type") or "").lower()
+                                if ctype and "image" not in ctype:
+                                    raise RuntimeError(f"Non-image response content-type: {ctype}")
+
+                                with open(filepath, "wb") as f:
+                                    for chunk in response.iter_bytes(chunk_size=8192):
+                                        try:
+                                            if should_abort and bool(should_abort()):
+                                                f.close()
+                                                filepath.unlink(missing_ok=True)
+                                                return {"success": False, "path": None, "size": 0, "error": "Cancelled"}
+                                        except Exception:
+                                            pass
+                                        if chunk:
+                                            f.write(chunk)
                         last_err = None
                         break
                     except Exception as e:
                         last_err = e
+                        # A partial body must not outlive its attempt (the curl fallback writes its own file).
+                        filepath.unlink(missing_ok=True)
                         time.sleep(min(2.0, 0.5 * (2 ** (attempt - 1))))
                 if last_err is not None:
                     raise last_err
 
+                if self.store is not None:
+                    return self.finalize(filepath, sku, url, db=db)
+
                 # --- IMAGE TUNING (Added for Trade Me Compliance) ---
+                dims = (None, None)
                 # Trade Me prefers JPG. We convert everything to JPG.
                 try:
-                    from PIL import Image
-
-                    with Image.open(filepath) as img:
-                        # Convert P (indexed) or RGBA to RGB
-                        if img.mode in ("RGBA", "P"):
-                            img = img.convert("RGB")
-
-                        # Target Filename (force .jpg)
-                        jpg_filename = f"{sku}.jpg"
-                        jpg_path = self.base_dir / jpg_filename
-
-                        # Resize if huge (Trade Me Max 2048x2048 recommended)
-                        if img.width > 2048 or img.height > 2048:
-                            img.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
+                    from retail_os.core.media_store import transcode_to_jpeg
 
-                        img.save(jpg_path, "JPEG", quality=85, optimize=True)
-
-                        # Update return path to the new JPG
-                        filepath = jpg_path
-                        filename = jpg_filename
+                    # RGB, at most 2048x2048, saved as <sku>.jpg
+                    jpg_path = self.base_dir / f"{sku}.jpg"
+                    dims = transcode_to_jpeg(filepath, jpg_path)
+                    filepath = jpg_path
 
                 except ImportError:
                     print("ImageDownloader: PIL not installed. Skipping tuning.")
@@ -155,20 +186,18 @@ class ImageDownloader:
                 if file_size < 300:
                     return {"success": False, "path": None, "size": file_size, "error": "File too small (<300B)"}
 
+                record_media_file(sku, str(filepath), file_size, *dims)
                 return {"success": True, "path": str(filepath), "size": file_size, "error": None}
 
         except Exception as e:
             # Fallback to system curl (robustness for Pilot)
-            print(f"ImageDownloader: Python requests failed ({e}). Trying system curl...")
+            print(f"ImageDownloader: HTTP download failed ({e}). Trying system curl...")
             try:
                 import subprocess
-                # Determine extension again just in case
-                ext = ".jpg"
-                if ".png" in url.lower(): ext = ".png"
-                elif ".webp" in url.lower(): ext = ".webp"
+                ext = image_ext(url)
                 
                 filename = f"{sku}{ext}"
-                filepath = self.base_dir / filename
+                filepath = self.store.temp_path(sku, ext) if self.store is not None else self.base_dir / filename
                 
                 # curl -L --retry ... --fail -o <path> <url> with browser-like headers
                 cmd = [
@@ -184,25 +213,34 @@ class ImageDownloader:
                 if referer:
                     cmd += ["-H", f"Referer: {referer}"]
                 cmd += [url]
-                subprocess.run(cmd, check=True, capture_output=True)
-                
-                if filepath.exists() and filepath.stat().st_size > 1000:
-                    # Success via curl
-                    # Optional: Convert/Tune if needed (copy-paste logic or extract to method)
-                    # For now, just return this
+                kept = False
+                try:
+                    subprocess.run(cmd, check=True, capture_output=True)
+
+                    if filepath.exists() and filepath.stat().st_size > 1000:
+                        # Success via curl (finalize takes the file over, or removes it)
+                        kept = True
+                        if self.store is not None:
+                            return self.finalize(filepath, sku, url, db=db)
+                        record_media_file(sku, str(filepath), filepath.stat().st_size)
+                        # Optional: Convert/Tune if needed (copy-paste logic or extract to method)
+                        # For now, just return this
+                        return {
+                            "success": True,
+                            "path": str(filepath),
+                            "size": filepath.stat().st_size,
+                            "error": None
+                        }
                     return {
-                        "success": True,
-                        "path": str(filepath),
-                        "size": filepath.stat().st_size,
-                        "error": None
-                    }
-                else:
-                     return {
                         "success": False,
                         "path": None,
                         "size": 0,
                         "error": "Curl failed to download valid file"
-                     }
+                    }
+                finally:
+                    # curl may have left a partial file behind (failed transfer, --fail after a redirect).
+                    if not kept:
+                        filepath.unlink(missing_ok=True)
             except Exception as curl_e:
                 return {
                     "success": False,
@@ -214,8 +252,68 @@ class ImageDownloader:
             # Final sanity check for return
             pass
     
+    def temp_path(self, sku: str, ext: str = ".jpg") -> Path:
+        """Where to stream a download for `sku` before `finalize` moves it into place."""
+        if self.store is not None:
+            return self.store.temp_path(sku, ext)
+        return self.base_dir / f".{sku}.{uuid.uuid4().hex[:8]}{ext}"
+
+    def finalize(self, filepath: Path, sku: str, url: str, db=None) -> dict:
+        """
+        Turn a completed temp download into the stored image for `sku` and index it: the
+        content-addressed store (dedupes identical bytes) or, legacy, <sku>.jpg via temp + rename.
+        media_objects, product_media and media_files are written in one transaction on `db`
+        (a session of its own when None).
+        """
+        size = filepath.stat().st_size
+        if size < 300:
+            filepath.unlink(missing_ok=True)
+            return {"success": False, "path": None, "size": size, "error": "File too small (<300B)"}
+        own = db is None
+        db = SessionLocal() if own else db
+        try:
+            return self._finalize(filepath, sku, url, db)
+        finally:
+            if own:
+                db.close()
+
+    def _finalize(self, filepath: Path, sku: str, url: str, db) -> dict:
+        if self.store is not None:
+            stored = self.store.put(filepath, sku, source_url=url, db=db)
+            self._index(db, sku, stored["path"], stored["size"], stored["width"], stored["height"])
+            return {"success": True, "path": stored["path"], "size": stored["size"], "error": None}
+
+        from retail_os.core.media_store import transcode_to_jpeg
+
+        target = self.base_dir / f"{sku}.jpg"
+        part = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            dims = transcode_to_jpeg(filepath, part)
+            filepath.unlink(missing_ok=True)
+        except Exception as e:
+            print(f"ImageDownloader: Tuning Failed ({e}). Using raw.")
+            part.unlink(missing_ok=True)
+            target, part, dims = self.base_dir / f"{sku}{filepath.suffix or '.jpg'}", filepath, (None, None)
+        os.replace(part, target)
+        size = target.stat().st_size
+        self._index(db, sku, str(target), size, *dims)
+        return {"success": True, "path": str(target), "size": size, "error": None}
+
+    @staticmethod
+    def _index(db, sku: str, path: str, size: int, width=None, height=None) -> None:
+        # Best effort: the file is in place, and the reconciler indexes anything missed here.
+        try:
+            record_media_file(sku, path, size, width, height, db=db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"ImageDownloader: could not index {sku}: {e}")
+
     def verify_image(self, sku: str) -> dict:
         """Check if image exists locally."""
+        hit = self.store.lookup(sku) if self.store is not None else None
+        if hit:
+            return {"exists": True, "path": hit["path"], "size": hit["size"]}
         for ext in [".jpg", ".png", ".webp"]:
             filepath = self.base_dir / f"{sku}{ext}"
             if filepath.exists():
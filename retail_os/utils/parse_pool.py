@@ -0,0 +1,95 @@
+"""
+Process-wide HTML parse pool.
+
+The HTML scrape paths (OneCheq product pages in RETAILOS_ONECHEQ_SOURCE=html mode, Cash
+Converters item pages) fetch on I/O threads and then parse on the same thread: JSON-LD
+extraction, selectolax walks and spec extraction are pure-Python and GIL-bound, so adding fetch
+threads stops helping once parsing saturates one core.
+
+`parse_in_pool(fn, *args)` hands a fetched body to a shared `ProcessPoolExecutor` and blocks the
+calling I/O thread until the worker returns a plain dict (the GIL is released while waiting).
+`fn` must be a module-level function and its arguments/result picklable.
+
+RETAILOS_PARSE_WORKERS sets the pool size (default: min(4, CPUs)); 0 parses inline on the
+calling thread. Workers use the "spawn" start method: forking a process that already runs HTTP
+pools, DB engines and worker threads is unsafe. If the pool breaks (a worker crashed) it is
+recreated on next use and the failed call is parsed inline.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def parse_workers() -> int:
+    raw = (os.getenv("RETAILOS_PARSE_WORKERS") or "").strip()
+    default = min(4, os.cpu_count() or 1)
+    try:
+        n = int(raw) if raw else default
+    except ValueError:
+        n = default
+    return max(0, min(32, n))
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is None or _pool_workers != workers:
+            old = _pool
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+            _pool_workers = workers
+            if old is not None:
+                old.shutdown(wait=False)
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is pool:
+            _pool, _pool_workers = None, 0
+    try:
+        pool.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+
+
+def parse_in_pool(fn: Callable[..., T], *args: Any) -> T:
+    """Run `fn(*args)` in the parse pool (or inline when RETAILOS_PARSE_WORKERS=0)."""
+    workers = parse_workers()
+    if workers <= 0:
+        return fn(*args)
+    pool = _get_pool(workers)
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        logger.warning("parse pool broke; recreating it and parsing this page inline")
+        _discard_pool(pool)
+        return fn(*args)
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the worker processes (process shutdown, tests). Safe to call repeatedly."""
+    global _pool, _pool_workers
+    with _lock:
+        pool, _pool, _pool_workers = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_parse_pool)
@@ -0,0 +1,140 @@
+"""
+OneCheq Shopify JSON crawl benchmark (OFFLINE replay).
+
+Starts a local fake Shopify server that serves a synthetic
+  /collections/<handle>/products.json?limit=250&page=N
+catalog with configurable per-request latency, then runs the OneCheq JSON iterator
+against it twice:
+- sequential (RETAILOS_ONECHEQ_JSON_WINDOW=1)
+- pipelined  (RETAILOS_ONECHEQ_JSON_WINDOW=<window>)
+
+No DB writes and no real network. Prints a JSON report (seconds, pages, products/sec).
+
+Env:
+- RETAILOS_BENCH_PRODUCTS (default 9000)
+- RETAILOS_BENCH_LATENCY_MS (default 400, per products.json request)
+- RETAILOS_BENCH_WINDOW (default 4)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+# Ensure repo root is importable when executed as a script.
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def _fake_product(i: int) -> dict[str, Any]:
+    return {
+        "id": 1000000 + i,
+        "handle": f"bench-product-{i:06d}",
+        "title": f"Bench Product {i}",
+        "body_html": f"<p>Synthetic product {i} for crawl benchmarking.</p>",
+        "vendor": "Condition: Used" if i % 3 else "BenchBrand",
+        "product_type": "Bench",
+        "updated_at": "2026-01-01T00:00:00+13:00",
+        "variants": [{"id": 2000000 + i, "sku": f"{i:06d}", "price": f"{(i % 500) + 9.99:.2f}", "available": bool(i % 7)}],
+        "images": [{"src": f"https://cdn.example.invalid/bench/{i}.jpg?v=1"}],
+    }
+
+
+def make_fake_shopify_server(total_products: int, latency_s: float) -> ThreadingHTTPServer:
+    """Threaded fake Shopify server bound to an ephemeral localhost port."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 (http.server API)
+            u = urlparse(self.path)
+            if not u.path.endswith("/products.json"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            q = parse_qs(u.query)
+            limit = max(1, min(250, int((q.get("limit") or ["250"])[0])))
+            page = max(1, int((q.get("page") or ["1"])[0]))
+            start = (page - 1) * limit
+            end = min(total_products, start + limit)
+            products = [_fake_product(i) for i in range(start, end)] if start < total_products else []
+            body = json.dumps({"products": products}).encode("utf-8")
+            if latency_s > 0:
+                time.sleep(latency_s)
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Look-ahead pages past the last short page are cancelled by the crawler.
+                pass
+
+        def log_message(self, *args):  # keep benchmark output clean
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+
+
+def _run_once(window: int) -> dict[str, Any]:
+    import httpx
+    from retail_os.scrapers.onecheq import scraper
+
+    os.environ["RETAILOS_ONECHEQ_JSON_WINDOW"] = str(window)
+    pages: set[int] = set()
+    count = 0
+    t0 = time.perf_counter()
+    with httpx.Client(follow_redirects=True, timeout=30.0) as client:
+        for row in scraper._iter_onecheq_products_via_shopify_json(collection="bench", max_pages=0, client=client):
+            count += 1
+            pages.add(int(row["collection_page"]))
+    dt = time.perf_counter() - t0
+    return {
+        "window": window,
+        "seconds": round(dt, 3),
+        "pages": len(pages),
+        "products": count,
+        "products_per_sec": round(count / dt, 1) if dt > 0 else None,
+    }
+
+
+def main() -> None:
+    total = int(os.getenv("RETAILOS_BENCH_PRODUCTS", "9000"))
+    latency_ms = float(os.getenv("RETAILOS_BENCH_LATENCY_MS", "400"))
+    window = max(2, int(os.getenv("RETAILOS_BENCH_WINDOW", "4")))
+
+    server = make_fake_shopify_server(total, latency_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+
+    # Must be set before the scraper/throttle modules are imported.
+    os.environ["RETAILOS_ONECHEQ_BASE_URL"] = f"http://{host}:{port}"
+    os.environ.setdefault("RETAILOS_HTTP_RPS_DEFAULT", "50")
+    os.environ.setdefault("RETAILOS_HTTP_MAX_INFLIGHT", "32")
+    # Measure the crawl itself, not conditional-request cache hits from a previous run.
+    os.environ["RETAILOS_HTTP_CACHE"] = "false"
+
+    try:
+        sequential = _run_once(1)
+        pipelined = _run_once(window)
+    finally:
+        server.shutdown()
+
+    report = {
+        "catalog_products": total,
+        "latency_ms": latency_ms,
+        "sequential": sequential,
+        "pipelined": pipelined,
+        "speedup": round(sequential["seconds"] / pipelined["seconds"], 2) if pipelined["seconds"] else None,
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Parse-stage throughput benchmark (OFFLINE).
+
+Parses the same product page HTML many times the way the HTML scrape paths do - fetch threads
+handing bodies to `parse_in_pool` - for each RETAILOS_PARSE_WORKERS value, and reports pages/sec
+and speedup over inline (GIL-bound) parsing. No network: the "fetch" is a bytes copy.
+
+The OneCheq fixture is a stripped page, so by default it is padded with theme-like markup to
+~200 KB (real storefront pages are 150-400 KB); without padding, IPC dominates the parse cost.
+
+Examples:
+  python scripts/bench_parse_pool.py
+  python scripts/bench_parse_pool.py --pages 2000 --workers 0,1,2,4,8 --html path/to/page.html
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+# Ensure repo root is importable when executed as a script.
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+_DEFAULT_HTML = os.path.join(REPO_ROOT, "tests", "fixtures", "scrapers", "onecheq", "product.html")
+
+
+def _pad(body: bytes, kb: int) -> bytes:
+    block = (
+        '<div class="grid__item"><a class="card" href="/products/x"><span class="price">$1.00</span>'
+        '<img src="//cdn.shopify.com/s/files/x.jpg" alt="x"></a><ul><li>Spec</li><li>Value</li></ul></div>\n'
+    ).encode()
+    filler = block * max(0, (kb * 1024 - len(body)) // len(block))
+    return body.replace(b"</body>", filler + b"</body>") if b"</body>" in body else body + filler
+
+
+def _run(body: bytes, pages: int, workers: int, fetch_threads: int) -> dict[str, Any]:
+    from retail_os.scrapers.onecheq.scraper import _parse_onecheq_product_body
+    from retail_os.utils.parse_pool import parse_in_pool, shutdown_parse_pool
+
+    os.environ["RETAILOS_PARSE_WORKERS"] = str(workers)
+    url = "https://onecheq.co.nz/products/bench-item"
+
+    def _one(_i: int) -> str:
+        return parse_in_pool(_parse_onecheq_product_body, bytes(body), url)["source_id"]
+
+    try:
+        if workers > 0:
+            # Warm-up: spawn the workers (and their imports) outside the timed window.
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(_one, range(workers * 2)))
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=fetch_threads) as ex:
+            ids = list(ex.map(_one, range(pages)))
+        seconds = time.perf_counter() - t0
+    finally:
+        shutdown_parse_pool()
+
+    assert len(ids) == pages
+    return {"workers": workers, "seconds": round(seconds, 3), "pages_per_sec": round(pages / seconds, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--html", default=_DEFAULT_HTML, help="Product page to parse (default: OneCheq fixture)")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--pad-kb", type=int, default=200, help="Pad the page to this size (0 = as is)")
+    parser.add_argument("--workers", default=None, help="Comma-separated pool sizes (default: 0,1,2,4..CPUs)")
+    parser.add_argument("--fetch-threads", type=int, default=16, help="I/O threads feeding the pool")
+    args = parser.parse_args()
+
+    with open(args.html, "rb") as f:
+        body = f.read()
+    if args.pad_kb > 0:
+        body = _pad(body, args.pad_kb)
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        sizes = [int(w) for w in args.workers.split(",") if w.strip()]
+    else:
+        sizes = [0, 1] + [n for n in (2, 4, 8, 16) if n <= cpus]
+
+    results = [_run(body, args.pages, w, args.fetch_threads) for w in sizes]
+    baseline = results[0]["pages_per_sec"] if results and results[0]["workers"] == 0 else None
+    for r in results:
+        r["speedup"] = round(r["pages_per_sec"] / baseline, 2) if baseline else None
+
+    print(json.dumps({"cpus": cpus, "html_bytes": len(body), "pages": args.pages, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
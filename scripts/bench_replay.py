@@ -0,0 +1,168 @@
+"""
+Record/replay scraper benchmark (OFFLINE, reproducible).
+
+record: run a real OneCheq sync (and optionally the Noel Leeming grid fast path) with
+        RETAILOS_HTTP_RECORD_DIR set, capturing every supplier response into a cassette:
+        products.json pages, collection pages, product HTML, NL grid HTML and - with --images -
+        the image downloads drained from the queue. Products go to a throwaway SQLite DB and
+        images to a throwaway media directory, never the real catalog or data/media.
+
+run:    replay the cassette from a local server (recorded or fixed latency, plus jitter) and
+        time `OneCheqAdapter.run_sync` against it on a throwaway SQLite DB (and media directory).
+
+Prints a JSON report: products/sec, p50/p95 per-request time, cassette misses, peak RSS.
+
+Examples:
+  python scripts/bench_replay.py record --cassette data/cassettes/onecheq --pages 4 --images
+  python scripts/bench_replay.py run --cassette data/cassettes/onecheq --pages 4 --latency-ms 150 --jitter-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any
+
+# Ensure repo root is importable when executed as a script.
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0, 1)
+
+
+def _isolated_db() -> str:
+    # Must be set before retail_os.core.database is imported (engine is created at import).
+    db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='retailos_bench_'), 'bench.sqlite')}"
+    os.environ["DATABASE_URL"] = db_url
+    return db_url
+
+
+def _drain_images() -> dict[str, Any]:
+    from retail_os.core.database import SessionLocal
+    from retail_os.core.image_queue import ImageQueueDrainer
+    from retail_os.utils.image_downloader import ImageDownloader
+
+    media_dir = tempfile.mkdtemp(prefix="retailos_bench_media_")
+    session = SessionLocal()
+    try:
+        stats = ImageQueueDrainer(session, downloader=ImageDownloader(base_dir=media_dir)).drain()
+    finally:
+        session.close()
+    return {**stats, "media_dir": media_dir}
+
+
+def record(args: argparse.Namespace) -> dict[str, Any]:
+    os.makedirs(args.cassette, exist_ok=True)
+    os.environ["RETAILOS_HTTP_RECORD_DIR"] = os.path.abspath(args.cassette)
+    # Record full responses, not 304s answered from a previous run's validators.
+    os.environ["RETAILOS_HTTP_CACHE"] = "false"
+    _isolated_db()
+
+    from retail_os.core.database import init_db
+    from retail_os.scrapers.onecheq.adapter import OneCheqAdapter
+    from retail_os.utils.http_cassette import Cassette
+
+    init_db()
+    OneCheqAdapter().run_sync(pages=int(args.pages), collection=args.collection)
+    images = _drain_images() if args.images else None
+    for url in args.nl_category or []:
+        from retail_os.scrapers.noel_leeming.grid import scrape_category_grid
+
+        scrape_category_grid(url, max_pages=int(args.pages))
+
+    return {
+        "cassette": os.path.abspath(args.cassette),
+        "entries": len(Cassette(args.cassette)),
+        "images": images,
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    from retail_os.utils.http_cassette import CassetteServer, replay_timings
+
+    server = CassetteServer(args.cassette, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed).start()
+    os.environ["RETAILOS_HTTP_REPLAY_URL"] = server.url
+    os.environ["RETAILOS_HTTP_CACHE"] = "false"
+    # The replay server is local: measure the scraper, not the production politeness limits.
+    os.environ.setdefault("RETAILOS_HTTP_RPS_DEFAULT", "50")
+    os.environ.setdefault("RETAILOS_HTTP_MAX_INFLIGHT", "32")
+    _isolated_db()
+
+    from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, init_db
+    from retail_os.scrapers.onecheq.adapter import OneCheqAdapter
+
+    init_db()
+    try:
+        replay_timings.reset()
+        t0 = time.perf_counter()
+        OneCheqAdapter().run_sync(pages=int(args.pages), collection=args.collection)
+        images = _drain_images() if args.images else None
+        seconds = time.perf_counter() - t0
+    finally:
+        server.stop()
+
+    session = SessionLocal()
+    try:
+        products = (
+            session.query(SupplierProduct)
+            .join(Supplier, Supplier.id == SupplierProduct.supplier_id)
+            .filter(Supplier.name == "ONECHEQ")
+            .count()
+        )
+    finally:
+        session.close()
+
+    p50, p95 = replay_timings.percentile(50), replay_timings.percentile(95)
+    return {
+        "cassette": os.path.abspath(args.cassette),
+        "entries": len(server.cassette),
+        "latency_ms": args.latency_ms if args.latency_ms is not None else "recorded",
+        "jitter_ms": args.jitter_ms,
+        "products": products,
+        "seconds": round(seconds, 3),
+        "products_per_sec": round(products / seconds, 1) if seconds > 0 else None,
+        "requests": len(replay_timings.samples),
+        "p50_request_ms": round(p50 * 1000.0, 1) if p50 is not None else None,
+        "p95_request_ms": round(p95 * 1000.0, 1) if p95 is not None else None,
+        "cassette_hits": server.hits,
+        "cassette_misses": len(server.misses),
+        "first_misses": server.misses[:5],
+        "images": images,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="mode", required=True)
+    for name in ("record", "run"):
+        p = sub.add_parser(name)
+        p.add_argument("--cassette", required=True, help="Cassette directory")
+        p.add_argument("--collection", default="all", help="OneCheq collection handle (default: all)")
+        p.add_argument("--pages", type=int, default=1, help="products.json / collection pages (0 = all)")
+        p.add_argument("--images", action="store_true", help="Also drain the image queue")
+    sub.choices["record"].add_argument("--nl-category", action="append", help="Also record a Noel Leeming category grid")
+    sub.choices["run"].add_argument("--latency-ms", type=float, default=None, help="Fixed latency (default: recorded)")
+    sub.choices["run"].add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random latency")
+    sub.choices["run"].add_argument("--seed", type=int, default=0, help="Jitter seed")
+    args = parser.parse_args()
+
+    report = record(args) if args.mode == "record" else run(args)
+    print(json.dumps(report, indent=2, sort_keys=True, default=str))
+
+
+if __name__ == "__main__":
+    main()
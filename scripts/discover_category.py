@@ -3,7 +3,7 @@ import os
 sys.path.append(os.getcwd())
 
 import re
-from typing import List, Set
+from typing import List, Set, Tuple
 import math
 from selectolax.parser import HTMLParser
 import subprocess
@@ -34,6 +34,17 @@ def discover_cash_converters_urls(base_url: str, max_pages: int = 5) -> List[str
     Returns list of /Listing/Details/XXXXX URLs.
     Continues through ALL pages up to max_pages (doesn't stop on empty pages).
     """
+    return discover_cash_converters(base_url, max_pages)[0]
+
+
+def discover_cash_converters(base_url: str, max_pages: int = 5) -> Tuple[List[str], bool]:
+    """
+    `discover_cash_converters_urls` plus whether the browse was exhausted: every page fetched
+    and the last one fetched listed nothing new (empty, or a repeat past the final page).
+    Only an exhausted browse may drive reconciliation.
+    """
+    from retail_os.scrapers.cash_converters.scraper import fetch_html
+
     print("=" * 60)
     print("CASH CONVERTERS DISCOVERY")
     print("=" * 60)
@@ -41,14 +52,17 @@ def discover_cash_converters_urls(base_url: str, max_pages: int = 5) -> List[str
     seen_ids: Set[str] = set()
     urls = []
     consecutive_empty = 0
+    failed_pages = 0
+    last_page_new = None
     
     for page in range(1, max_pages + 1):
         url = f"{base_url}?page={page}" if page > 1 else base_url
         print(f"\nPage {page}: {url}")
         
-        html = get_html_via_curl(url)
+        html = fetch_html(url)
         if not html:
             print(f"  [FAIL] Could not fetch page {page}")
+            failed_pages += 1
             consecutive_empty += 1
             if consecutive_empty >= 5:  # Stop after 5 consecutive failures
                 print(f"  [STOP] 5 consecutive page failures, stopping")
@@ -71,6 +85,7 @@ def discover_cash_converters_urls(base_url: str, max_pages: int = 5) -> List[str
                     new_count += 1
         
         print(f"  Found {new_count} new listings (total: {len(urls)})")
+        last_page_new = new_count
         
         # Reset consecutive empty counter if we found items
         if new_count > 0:
@@ -83,7 +98,8 @@ def discover_cash_converters_urls(base_url: str, max_pages: int = 5) -> List[str
                 break
     
     print(f"\n[OK] Discovered {len(urls)} unique Cash Converters URLs")
-    return urls
+    reached_end = failed_pages == 0 and last_page_new == 0
+    return urls, reached_end
 
 def discover_noel_leeming_urls(base_url: str, max_pages: int = 5, max_items: int | None = None) -> List[str]:
     """
@@ -10,7 +10,8 @@ sys.path.append(os.getcwd())
 
 from typing import Optional
 
-from retail_os.core.database import SessionLocal, SupplierProduct, SystemSetting
+from retail_os.core.database import SessionLocal, Supplier, SupplierProduct, SystemSetting
+from retail_os.core.enrichment_fingerprint import enrichment_fingerprint, is_enrichment_current, mark_stale_if_mode_changed
 
 
 def _filter_public_specs(specs: dict) -> dict:
@@ -98,9 +99,27 @@ def _build_minimal_template(title: str, specs: dict, url: str | None = None) ->
     parts.append("Please review the specifications carefully before purchase.")
     return "\n".join(parts)
 
+def _supplier_mode(policy: dict, supplier_name: str) -> str:
+    return (policy.get("by_supplier", {}).get((supplier_name or "").upper()) or policy.get("default") or "NONE").upper()
+
+
+def _mark_policy_changes_stale(db, policy: dict, supplier_id: Optional[int]) -> int:
+    """Rows enriched under another mode / prompt-template version go back to PENDING (once per change)."""
+    q = db.query(Supplier)
+    if supplier_id is not None:
+        q = q.filter(Supplier.id == int(supplier_id))
+    flipped = sum(mark_stale_if_mode_changed(db, s.id, _supplier_mode(policy, s.name)) for s in q.all())
+    db.commit()
+    if flipped:
+        print(f"Marked {flipped} products stale (enrichment policy/version changed)")
+    return flipped
+
+
 def enrich_batch(batch_size: int = 10, delay_seconds: int = 5, supplier_id: Optional[int] = None, source_category: Optional[str] = None):
     """
     Process a batch of pending products.
+    Products whose enrichment fingerprint (inputs + mode + version) still matches are marked
+    SUCCESS without re-running enrichment.
     
     Args:
         batch_size: How many to process in one run
@@ -112,8 +131,8 @@ def enrich_batch(batch_size: int = 10, delay_seconds: int = 5, supplier_id: Opti
     
     try:
         policy = _get_enrichment_policy(db)
+        _mark_policy_changes_stale(db, policy, supplier_id)
 
-        # Get pending products
         # Get pending products
         # Prioritize Priority 1 items (Noel Leeming has collection_rank > 0)
         # Then newest items first
@@ -148,7 +167,15 @@ def enrich_batch(batch_size: int = 10, delay_seconds: int = 5, supplier_id: Opti
                 print(f"  Processing {item.external_sku}...")
 
                 supplier_name = (item.supplier.name if getattr(item, "supplier", None) else "").upper()
-                mode = (policy.get("by_supplier", {}).get(supplier_name) or policy.get("default") or "NONE").upper()
+                mode = _supplier_mode(policy, supplier_name)
+
+                if is_enrichment_current(item, mode):
+                    # Requeued (e.g. RESET_ENRICHMENT) but nothing enrichment reads has changed.
+                    item.enrichment_status = "SUCCESS"
+                    item.enrichment_error = None
+                    db.commit()
+                    print("    SKIPPED (inputs unchanged)")
+                    continue
 
                 if mode == "AI":
                     # AI mode must fail loudly (no silent fallback).
@@ -206,7 +233,8 @@ def enrich_batch(batch_size: int = 10, delay_seconds: int = 5, supplier_id: Opti
                     item.enrichment_status = "SUCCESS"
                     item.enrichment_error = None
                     print("    SUCCESS (NONE)")
-                
+
+                item.enrichment_fingerprint = enrichment_fingerprint(item, mode)
                 db.commit()
                 
                 # Rate limit protection
@@ -83,7 +83,7 @@ def main() -> None:
     from retail_os.core.database import init_db, SessionLocal, Supplier, SupplierProduct
     from retail_os.utils.image_downloader import ImageDownloader
     from retail_os.scrapers.onecheq.scraper import scrape_onecheq_product
-    import httpx
+    from retail_os.utils.http_clients import get_http_client
 
     init_db()
 
@@ -128,8 +128,7 @@ def main() -> None:
         def _dl(sp_id: int, sku: str, url: str, mode: Literal["remote", "html_discover"]) -> tuple[int, dict]:
             try:
                 if mode == "html_discover":
-                    with httpx.Client(follow_redirects=True, timeout=25.0) as c:
-                        parsed = scrape_onecheq_product(url, client=c) or {}
+                    parsed = scrape_onecheq_product(url, client=get_http_client()) or {}
                     # Extract candidate remote image URLs from parsed product page
                     remote_imgs = [parsed.get(k) for k in ("photo1", "photo2", "photo3", "photo4") if parsed.get(k)]
                     if not remote_imgs:
@@ -0,0 +1,140 @@
+"""
+Seed a synthetic catalog for scale testing (see retail_os/core/synthetic_catalog.py).
+
+Creates supplier/internal products, Trade Me listings, metric snapshots, orders, commands and
+command logs with realistic distributions, optionally writes the matching fake Shopify catalog
+as a replay cassette, and optionally times the main API endpoints against the seeded DB.
+
+Safety: writes to a dedicated SQLite DB in /tmp unless --db names another one (DATABASE_URL is
+ignored), refuses a database that already has products, and files everything under its own
+SYNTHETIC supplier.
+
+Examples:
+  python scripts/seed_synthetic_catalog.py --scale 100k --measure
+  python scripts/seed_synthetic_catalog.py --products 20000 --shopify-cassette data/cassettes/synthetic
+  python scripts/bench_replay.py run --cassette data/cassettes/synthetic --pages 0 --latency-ms 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any
+
+# Ensure repo root is importable when executed as a script.
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Kept here (not imported): nothing from retail_os may load before DATABASE_URL is set.
+_SCALES = {"10k": 10_000, "100k": 100_000, "500k": 500_000}
+
+_MEASURED_ENDPOINTS = [
+    "/metrics",
+    "/products?page=1&per_page=50",
+    "/orders?page=1&per_page=50",
+    "/commands?page=1&per_page=50",
+    "/vaults/raw?page=1&per_page=50",
+    "/vaults/enriched?page=1&per_page=50",
+    "/vaults/live?page=1&per_page=50",
+    "/ops/summary",
+    "/ops/kpis",
+]
+
+
+def _measure_endpoints(repeats: int = 3) -> dict[str, Any]:
+    os.environ.setdefault("RETAIL_OS_INSECURE_ALLOW_HEADER_ROLES", "true")
+    from fastapi.testclient import TestClient
+    from services.api.main import app
+
+    out: dict[str, Any] = {}
+    # No `with`: skip app startup, which would start the background worker/scheduler.
+    client = TestClient(app)
+    for path in _MEASURED_ENDPOINTS:
+        timings = []
+        status = None
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            r = client.get(path, headers={"X-RetailOS-Role": "power"})
+            timings.append(time.perf_counter() - t0)
+            status = r.status_code
+        out[path] = {"status": status, "best_ms": round(min(timings) * 1000, 1), "worst_ms": round(max(timings) * 1000, 1)}
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=sorted(_SCALES), default="10k")
+    size.add_argument("--products", type=int, help="Exact product count (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="Database URL (default: /tmp/retailos_synthetic_<n>.sqlite); must have no products")
+    parser.add_argument(
+        "--supplier",
+        default="SYNTHETIC",
+        help="Supplier the rows are filed under (ONECHEQ: a bench_replay run of the cassette updates them)",
+    )
+    parser.add_argument("--metric-days", type=int, default=14)
+    parser.add_argument("--logs-per-command", type=int, default=40)
+    parser.add_argument("--shopify-cassette", help="Also write the matching fake Shopify catalog here")
+    parser.add_argument("--measure", action="store_true", help="Time the main API endpoints after seeding")
+    args = parser.parse_args()
+
+    n = int(args.products or _SCALES[args.scale])
+    # Must be set before retail_os.core.database is imported (engine is created at import).
+    # Never inherited from DATABASE_URL: seeding the configured (possibly production) DB by accident
+    # would bury the real catalog under synthetic rows.
+    db_url = args.db or f"sqlite:////tmp/retailos_synthetic_{n}.sqlite"
+    os.environ["DATABASE_URL"] = db_url
+
+    from retail_os.core.database import SessionLocal, SupplierProduct, init_db
+    from retail_os.core.synthetic_catalog import SyntheticCatalogSpec, seed_database, write_shopify_cassette
+
+    init_db()
+    check = SessionLocal()
+    try:
+        existing = check.query(SupplierProduct.id).limit(1).first()
+    finally:
+        check.close()
+    if existing is not None:
+        parser.error(f"{db_url} already has products; seed an empty database (delete it or pass another --db)")
+
+    spec = SyntheticCatalogSpec(
+        products=n,
+        seed=args.seed,
+        supplier=args.supplier,
+        metric_days=args.metric_days,
+        logs_per_command=args.logs_per_command,
+    )
+
+    def _progress(phase: str, done: int, total: int) -> None:
+        print(f"  {phase}: {done}/{total}", file=sys.stderr)
+
+    report: dict[str, Any] = {"database_url": db_url, "products": n, "seed": args.seed}
+    session = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        report["rows"] = seed_database(session, spec, progress=_progress)
+        report["seed_seconds"] = round(time.perf_counter() - t0, 2)
+    finally:
+        session.close()
+
+    if args.shopify_cassette:
+        t0 = time.perf_counter()
+        report["shopify_cassette"] = {
+            "directory": os.path.abspath(args.shopify_cassette),
+            "responses": write_shopify_cassette(args.shopify_cassette, spec),
+            "seconds": round(time.perf_counter() - t0, 2),
+        }
+
+    if args.measure:
+        report["endpoints"] = _measure_endpoints()
+
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy import func, or_, text
 
 from retail_os.core.database import (
+    AuditDailyRollup,
     AuditLog,
     CommandLog,
     CommandProgress,
@@ -32,6 +33,7 @@ from retail_os.core.validator import LaunchLock
 from retail_os.trademe.api import TradeMeAPI
 from retail_os.core.llm_enricher import enricher as _llm_enricher
 from retail_os.core.category_mapper import CategoryMapper
+from retail_os.core.media_index import image_list, local_images, present_media_paths
 
 from .schemas import PageResponse, HealthResponse
 from .utils import _REPO_ROOT, _MEDIA_ROOT, _dt, _public_image_urls, _serialize_supplier_product, _serialize_internal_product, _serialize_listing
@@ -200,6 +202,10 @@ def metrics() -> dict[str, Any]:
                 Order.fulfillment_status == "PENDING"
             ).scalar() or 0
             
+            # Per-host adaptive HTTP rates, as last published by the worker
+            rates_row = session.query(SystemSetting).filter(SystemSetting.key == "http.rates").first()
+            http_rates = rates_row.value if rates_row and isinstance(rates_row.value, dict) else {}
+            
             return {
                 "status": "ok",
                 "utc": datetime.now(timezone.utc).isoformat(),
@@ -214,7 +220,8 @@ def metrics() -> dict[str, Any]:
                     "commands_executing": cmd_executing,
                     "commands_failed": cmd_failed,
                     "orders_pending_fulfillment": orders_pending,
-                }
+                },
+                "http_rates": http_rates,
             }
     except Exception as e:
         return {
@@ -934,13 +941,7 @@ def listing_detail(listing_id: int) -> dict[str, Any]:
 
             # Require at least one local image usable for upload.
             # (Remote-only images are blocked to avoid “looks visible but can’t upload” failures.)
-            has_local = False
-            if sp and sp.images and isinstance(sp.images, list):
-                import os as _os
-                for img in sp.images:
-                    if isinstance(img, str) and _os.path.exists(img):
-                        has_local = True
-                        break
+            has_local = bool(sp and isinstance(sp.images, list) and local_images(session, sp.images))
             _add("images_usable", has_local, "Images unavailable for upload (no local images)" if not has_local else None)
 
             ready = all(x.get("ok") for x in checks)
@@ -1174,37 +1175,15 @@ def ops_readiness(
     - at least one local image exists
     - category mapping exists
     """
-    import os
     from collections import Counter
 
     if limit < 1 or limit > 200000:
         raise HTTPException(status_code=400, detail="Invalid limit")
 
-    # Build a fast set of media filenames for existence checks (O(1) membership)
-    media_files: set[str] = set()
-    try:
-        if _MEDIA_ROOT.exists():
-            for p in _MEDIA_ROOT.iterdir():
-                if p.is_file():
-                    media_files.add(p.name)
-    except Exception:
-        media_files = set()
-
     def has_local_image(images: Any) -> bool:
         if not images or not isinstance(images, list):
             return False
-        for raw in images:
-            if not raw or not isinstance(raw, str):
-                continue
-            norm = raw.replace("\\", "/")
-            if norm.startswith("data/media/"):
-                fn = norm[len("data/media/") :]
-                if fn in media_files:
-                    return True
-                # fallback (slower) if dir listing failed
-                if not media_files and os.path.exists(norm):
-                    return True
-        return False
+        return any(x.replace("\\", "/").startswith("data/media/") for x in local_images(None, images, present))
 
     with get_db_session() as session:
         q = session.query(InternalProduct).join(SupplierProduct, InternalProduct.primary_supplier_product_id == SupplierProduct.id)
@@ -1212,6 +1191,10 @@ def ops_readiness(
             q = q.join(Supplier, SupplierProduct.supplier_id == Supplier.id).filter(func.lower(Supplier.name) == supplier.lower())
 
         ips = q.limit(limit).all()
+        # One indexed media_files lookup for every image of the batch (no per-file stat)
+        present = present_media_paths(
+            session, (img for ip in ips if ip.supplier_product for img in image_list(ip.supplier_product.images))
+        )
 
         totals = {"internal_products": len(ips), "ready": 0, "blocked": 0}
         reasons: Counter[str] = Counter()
@@ -1315,6 +1298,16 @@ def ops_removed_items(
                     .first()
                 )
                 removed_at = _dt(al.timestamp) if al else None
+                if removed_at is None:
+                    # Older removals survive only as daily audit rollups.
+                    ru = (
+                        session.query(AuditDailyRollup)
+                        .filter(AuditDailyRollup.entity_type == "SupplierProduct", AuditDailyRollup.entity_id == str(sp.id))
+                        .filter(AuditDailyRollup.action == "STATUS_CHANGE", AuditDailyRollup.last_value == "REMOVED")
+                        .order_by(AuditDailyRollup.last_at.desc())
+                        .first()
+                    )
+                    removed_at = _dt(ru.last_at) if ru else None
             except Exception:
                 removed_at = None
 
@@ -22,6 +22,8 @@ from retail_os.core.database import (
     get_db_session,
 )
 from retail_os.core.category_mapper import CategoryMapper
+from retail_os.core.field_hashes import listing_inputs_changed
+from retail_os.core.media_index import image_list, local_images, present_media_paths
 from retail_os.core.validator import LaunchLock
 from retail_os.core.inventory_ops import InventoryOperations
 from retail_os.trademe.api import TradeMeAPI
@@ -566,6 +568,10 @@ def bulk_dryrun_publish(req: BulkDryRunPublishRequest, _role: Role = Depends(req
         q = q.order_by(SupplierProduct.last_scraped_at.desc())
 
         candidates = q.limit(int(req.limit)).all()
+        present = present_media_paths(
+            session,
+            (img for ip in candidates if ip.supplier_product for img in image_list(ip.supplier_product.images)),
+        )
 
         enqueued = 0
         skipped_existing_cmd = 0
@@ -593,13 +599,8 @@ def bulk_dryrun_publish(req: BulkDryRunPublishRequest, _role: Role = Depends(req
             if not (sp.enriched_description or "").strip():
                 return False, "Missing enriched description"
             imgs = sp.images or []
-            try:
-                import os as _os
-                if isinstance(imgs, list):
-                    if not any(isinstance(x, str) and _os.path.exists(x) for x in imgs):
-                        return False, "Images unavailable for upload (no local images)"
-            except Exception:
-                return False, "Images unavailable for upload (check local media folder)"
+            if isinstance(imgs, list) and not local_images(None, imgs, present):
+                return False, "Images unavailable for upload (no local images)"
 
             try:
                 cat = CategoryMapper.map_category(
@@ -675,12 +676,15 @@ def bulk_dryrun_publish(req: BulkDryRunPublishRequest, _role: Role = Depends(req
 
 class BulkWithdrawRemovedRequest(BaseModel):
     supplier_id: Optional[int] = None
+    # Default: sweep every REMOVED product (also re-queues withdraws that failed or were cancelled);
+    # False only checks products removed since the last incremental run (product_changes feed).
+    full: bool = True
 
 @router.post("/bulk/withdraw_removed", response_model=dict[str, Any])
 def bulk_withdraw_removed(req: BulkWithdrawRemovedRequest, _role: Role = Depends(require_role("power"))) -> dict[str, Any]:
     with get_db_session() as session:
         ops = InventoryOperations(session)
-        enqueued = ops.withdraw_unavailable_items(supplier_id=req.supplier_id)
+        enqueued = ops.withdraw_unavailable_items(supplier_id=req.supplier_id, full=bool(req.full))
         return {"enqueued": enqueued}
 
 class BulkApprovePublishRequest(BaseModel):
@@ -770,8 +774,10 @@ def bulk_approve_publish(req: BulkApprovePublishRequest, _role: Role = Depends(r
                 continue
 
             snap = None
+            snap_fields = None
             try:
                 snap = (dryrun_cmd.payload or {}).get("supplier_snapshot_hash")
+                snap_fields = (dryrun_cmd.payload or {}).get("supplier_field_hashes")
             except Exception:
                 snap = None
             if not snap:
@@ -779,10 +785,15 @@ def bulk_approve_publish(req: BulkApprovePublishRequest, _role: Role = Depends(r
                 continue
 
             try:
-                current_snap = l.internal_product.supplier_product.snapshot_hash
+                current_sp = l.internal_product.supplier_product
+                current_snap, current_fields = current_sp.snapshot_hash, current_sp.field_hashes
             except Exception:
-                current_snap = None
-            if not current_snap or str(current_snap) != str(snap):
+                current_snap, current_fields = None, None
+            # Only listing inputs (price/content/images) count as drift; a stock-only change does not.
+            drifted = listing_inputs_changed(snap_fields, current_fields)
+            if drifted is None:
+                drifted = not current_snap or str(current_snap) != str(snap)
+            if drifted:
                 skipped_drift += 1
                 continue
 
@@ -852,6 +863,8 @@ class BulkResetEnrichmentRequest(BaseModel):
     source_category: Optional[str] = None
     limit: int = 200
     priority: int = 60
+    # False: products whose enrichment inputs are unchanged are skipped by the enricher.
+    force: bool = False
 
 @router.post("/bulk/reset_enrichment", response_model=dict[str, Any])
 def bulk_reset_enrichment(req: BulkResetEnrichmentRequest, _role: Role = Depends(require_role("power"))) -> dict[str, Any]:
@@ -876,7 +889,7 @@ def bulk_reset_enrichment(req: BulkResetEnrichmentRequest, _role: Role = Depends
                 SystemCommand(
                     id=str(uuid.uuid4()),
                     type="RESET_ENRICHMENT",
-                    payload={"supplier_product_id": sp.id},
+                    payload={"supplier_product_id": sp.id, "force": bool(req.force)},
                     status=CommandStatus.PENDING,
                     priority=int(req.priority),
                 )
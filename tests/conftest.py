@@ -7,7 +7,7 @@ from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from retail_os.core.database import Base, get_db_session
+from retail_os.core.database import Base, Supplier, get_db_session
 from services.api.main import app
 
 # Ensure repo root is importable when running tests from any cwd.
@@ -23,6 +23,10 @@ def test_env_setup():
     # Allow headers to define role (e.g. X-RetailOS-Role: power)
     os.environ["RETAIL_OS_INSECURE_ALLOW_HEADER_ROLES"] = "true"
     os.environ["RETAIL_OS_DEFAULT_ROLE"] = "power"
+    # Keep scraper tests hermetic: no persistent conditional-request cache under data/cache.
+    os.environ["RETAILOS_HTTP_CACHE"] = "false"
+    # Parse inline so patched parsers apply; tests that exercise the pool opt back in.
+    os.environ["RETAILOS_PARSE_WORKERS"] = "0"
     yield
 
 @pytest.fixture(scope="session")
@@ -57,6 +61,37 @@ def db_session(engine):
     transaction.rollback()
     connection.close()
 
+@pytest.fixture
+def make_supplier(db_session):
+    """
+    Factory: add a Supplier with `name` and flush, returning the row.
+    """
+    def _make(name):
+        s = Supplier(name=name, base_url="https://example.test")
+        db_session.add(s)
+        db_session.flush()
+        return s
+
+    return _make
+
+@pytest.fixture
+def listing_data():
+    """
+    Factory: one scraped listing, as adapters hand it to ProductUpserter.prepare.
+    """
+    def _make(sku="FH1", price=10, title="Drill", description="d", stock=3, status="Active"):
+        return {
+            "source_listing_id": sku,
+            "title": title,
+            "description": description,
+            "buy_now_price": price,
+            "stock_level": stock,
+            "source_url": f"https://example.test/{sku}",
+            "source_status": status,
+        }
+
+    return _make
+
 @pytest.fixture(autouse=True)
 def mock_db_session_global(db_session):
     """
@@ -0,0 +1,99 @@
+import asyncio
+import io
+import threading
+from collections import Counter
+
+import httpx
+from PIL import Image
+
+from retail_os.utils import image_downloader
+from retail_os.utils.async_image_engine import AsyncImageEngine, ImageJob
+from retail_os.utils.http_throttle import GlobalHTTPThrottle
+
+
+def _png_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), "orange").save(buf, "PNG")
+    return buf.getvalue() + b"\0" * 400
+
+
+def _transport(calls: Counter, in_flight: Counter, peak: Counter):
+    body = _png_bytes()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host, path = request.url.host, request.url.path
+        calls[path] += 1
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        try:
+            await asyncio.sleep(0.3)
+            if path == "/missing.png":
+                return httpx.Response(404)
+            if path == "/flaky.png" and calls[path] == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, content=body, headers={"content-type": "image/png"})
+        finally:
+            in_flight[host] -= 1
+
+    return httpx.MockTransport(handler)
+
+
+def _run(tmp_path, monkeypatch, jobs, **kw):
+    monkeypatch.setenv("RETAILOS_MEDIA_CAS", "false")
+    monkeypatch.setattr(image_downloader, "record_media_file", lambda *a, **k: None)
+    GlobalHTTPThrottle.reset()
+    calls, in_flight, peak = Counter(), Counter(), Counter()
+    results = {}
+    engine = AsyncImageEngine(
+        downloader=image_downloader.ImageDownloader(base_dir=tmp_path),
+        concurrency=8,
+        per_host=2,
+        transport=_transport(calls, in_flight, peak),
+        **kw,
+    )
+    stats = engine.run_sync(iter(jobs), lambda job, res: results.__setitem__(job.key, res))
+    GlobalHTTPThrottle.reset()
+    return stats, results, calls, peak
+
+
+def test_engine_streams_retries_within_budget_and_limits_each_host(tmp_path, monkeypatch):
+    jobs = [ImageJob(key=f"A{i}", url=f"https://a.test/img{i}.png") for i in range(4)]
+    jobs += [
+        ImageJob(key="FLAKY", url="https://b.test/flaky.png"),
+        ImageJob(key="GONE", url="https://b.test/missing.png"),
+        ImageJob(key="FOUND", discover=lambda: "https://b.test/found.png"),
+    ]
+    stats, results, calls, peak = _run(tmp_path, monkeypatch, jobs)
+
+    assert sorted(k for k, r in results.items() if r["success"]) == ["A0", "A1", "A2", "A3", "FLAKY", "FOUND"]
+    assert results["GONE"]["error"] == "HTTP 404" and calls["/missing.png"] == 1  # 4xx is not retried
+    assert calls["/flaky.png"] == 2 and stats["retries"] == 1
+    assert results["A0"]["path"].endswith("A0.jpg") and (tmp_path / "A0.jpg").exists()
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".")]  # no temp files left behind
+    assert max(peak.values()) <= 2
+    assert stats["images_ok"] == 6 and stats["bytes"] > 0
+    assert stats["images_per_sec"] > 0 and stats["bytes_per_sec"] > 0
+
+
+def test_exhausted_retry_budget_fails_fast(tmp_path, monkeypatch):
+    stats, results, calls, _ = _run(
+        tmp_path, monkeypatch, [ImageJob(key="FLAKY", url="https://b.test/flaky.png")], retry_budget=0
+    )
+    assert results["FLAKY"]["error"] == "HTTP 503" and calls["/flaky.png"] == 1
+    assert stats["retries"] == 0 and stats["images_failed"] == 1
+
+
+def test_iter_results_hands_results_to_the_calling_thread(tmp_path, monkeypatch):
+    monkeypatch.setenv("RETAILOS_MEDIA_CAS", "false")
+    monkeypatch.setattr(image_downloader, "record_media_file", lambda *a, **k: None)
+    GlobalHTTPThrottle.reset()
+    engine = AsyncImageEngine(
+        downloader=image_downloader.ImageDownloader(base_dir=tmp_path),
+        concurrency=4,
+        transport=_transport(Counter(), Counter(), Counter()),
+    )
+    jobs = [ImageJob(key=f"A{i}", url=f"https://a.test/img{i}.png") for i in range(3)]
+    threads = {threading.get_ident() for _job, res in engine.iter_results(iter(jobs)) if res["success"]}
+    GlobalHTTPThrottle.reset()
+    assert threads == {threading.get_ident()}
+    assert engine.stats()["images_ok"] == 3
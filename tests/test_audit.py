@@ -0,0 +1,80 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from retail_os.core import audit as audit_mod
+from retail_os.core.audit import json_diff, rollup_audit_logs
+from retail_os.core.database import AuditDailyRollup, AuditLog
+from retail_os.core.product_upserter import ProductUpserter
+
+
+def test_json_diff_keeps_only_changed_fields_and_clips_long_values():
+    old, new = json_diff({"cost": 10.0, "title": "A", "stock_level": 1}, {"cost": 12.5, "title": "A" * 500, "stock_level": 1})
+    assert json.loads(old) == {"cost": 10.0, "title": "A"}
+    new = json.loads(new)
+    assert new["cost"] == 12.5 and new["title"].endswith("(500 chars)") and len(new["title"]) < 120
+    assert json_diff({"a": 1}, {"a": 1}) == (None, None)
+
+
+def test_upserter_writes_one_compact_change_row_per_product_with_the_batch(db_session, make_supplier, listing_data):
+    s = make_supplier("AUDIT_UPSERT")
+    up = ProductUpserter(db_session, s.id)
+
+    first = [up.prepare(listing_data(f"S{i}", title=f"Item {i}"), f"S{i}", "AU") for i in range(3)]
+    assert up.write_batch(first) == ["created"] * 3
+    changed = [
+        up.prepare(listing_data("S0", title="Item 0", price=15), "S0", "AU"),
+        up.prepare(listing_data("S1", title="Item 1 (boxed)"), "S1", "AU"),
+        up.prepare(listing_data("S2", title="Item 2", description="new copy"), "S2", "AU"),
+    ]
+    assert up.write_batch(changed) == ["updated"] * 3
+    assert len(up.audit) == 0
+
+    rows = db_session.query(AuditLog).filter_by(action="PRODUCT_CHANGE").order_by(AuditLog.id).all()
+    # S2 only changed its description: the snapshot moved but no audited field did.
+    assert [(json.loads(r.old_value), json.loads(r.new_value)) for r in rows] == [
+        ({"cost": 10.0}, {"cost": 15.0}),
+        ({"title": "Item 1"}, {"title": "Item 1 (boxed)"}),
+    ]
+
+
+def test_rollup_folds_old_rows_into_daily_summaries(db_session):
+    now = datetime.now(timezone.utc)
+    old_day = (now - timedelta(days=40)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def _log(entity_id, action, value, ts):
+        db_session.add(
+            AuditLog(entity_type="SupplierProduct", entity_id=entity_id, action=action, new_value=value, timestamp=ts)
+        )
+
+    _log("1", "STATUS_CHANGE", "MISSING_ONCE", old_day)
+    _log("1", "STATUS_CHANGE", "REMOVED", old_day + timedelta(hours=3))
+    _log("2", "PRODUCT_CHANGE", '{"cost":5}', old_day + timedelta(hours=1))
+    _log("2", "PRODUCT_CHANGE", '{"cost":6}', old_day + timedelta(days=2))
+    _log("3", "PRODUCT_CHANGE", '{"cost":7}', now - timedelta(days=1))
+    db_session.commit()
+
+    assert rollup_audit_logs(db_session, retention_days=30) == {"days": 2, "rows": 4, "rollups": 3}
+    assert [r.entity_id for r in db_session.query(AuditLog).all()] == ["3"]
+    removed = db_session.query(AuditDailyRollup).filter_by(entity_id="1").one()
+    assert (removed.events, removed.last_value) == (2, "REMOVED")
+    assert removed.day == old_day.date().isoformat()
+
+    # A late row for an already rolled-up day extends its summary.
+    _log("1", "STATUS_CHANGE", "PRESENT", old_day + timedelta(hours=5))
+    db_session.commit()
+    assert rollup_audit_logs(db_session, retention_days=30)["rollups"] == 1
+    db_session.refresh(removed)
+    assert (removed.events, removed.last_value) == (3, "PRESENT")
+
+
+def test_standalone_events_are_flushed_in_bulk(db_session, monkeypatch):
+    monkeypatch.setattr(audit_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_AUDIT_BATCH", "3")
+    monkeypatch.setenv("RETAILOS_AUDIT_FLUSH_SECONDS", "3600")
+    audit_mod.flush_audit_events()
+
+    audit_mod.audit_event("AI_COST", "Enricher", "OpenAI", new_value="in:1, out:2")
+    audit_mod.audit_event("AI_COST", "Enricher", "OpenAI", new_value="in:3, out:4")
+    assert db_session.query(AuditLog).filter_by(action="AI_COST").count() == 0
+    audit_mod.audit_event("AI_COST", "Enricher", "Gemini", new_value="in:5, out:6")
+    assert db_session.query(AuditLog).filter_by(action="AI_COST").count() == 3
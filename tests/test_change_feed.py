@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+from retail_os.core.change_feed import (
+    commit_offset,
+    consumer_offset,
+    latest_change_id,
+    prune_changes,
+    read_changes,
+)
+from retail_os.core.database import (
+    ChangeFeedOffset,
+    InternalProduct,
+    ProductChange,
+    SupplierProduct,
+    SystemCommand,
+    TradeMeListing,
+)
+from retail_os.core.inventory_ops import InventoryOperations
+from retail_os.core.product_upserter import ProductUpserter
+from retail_os.core.reconciliation import ReconciliationEngine
+from retail_os.core.seen_set import SeenSet
+
+
+def test_upserter_and_reconciliation_append_typed_events(db_session, make_supplier, listing_data):
+    supplier_id = make_supplier("FEED_EVENTS").id
+    up = ProductUpserter(db_session, supplier_id)
+
+    def _write(*rows):
+        up.write_batch([up.prepare(d, d["source_listing_id"], "FE") for d in rows])
+
+    _write(listing_data("A"), listing_data("B"), listing_data("C"))
+    start = latest_change_id(db_session)
+    _write(listing_data("A", price=12), listing_data("B", title="Drill (boxed)"), listing_data("C", stock=0, status="Sold"))
+    _write(listing_data("A", price=12), listing_data("B", title="Drill (boxed)"), listing_data("C", stock=0, status="Sold"))  # no-op
+
+    for _ in range(2):  # PRESENT -> MISSING_ONCE -> REMOVED
+        seen = SeenSet(db_session, supplier_id, run_id=f"feed-{_}")
+        seen.add(["A", "B"])
+        ReconciliationEngine(db_session).process_orphans(supplier_id, seen=seen)
+        seen.finish()
+
+    ids = {sp.external_sku: sp.id for sp in db_session.query(SupplierProduct).filter_by(supplier_id=supplier_id)}
+    events = [(e.supplier_product_id, e.kind) for e in read_changes(db_session, start, supplier_id=supplier_id)]
+    assert events == [
+        (ids["A"], "PRICE_CHANGED"),
+        (ids["B"], "CONTENT_CHANGED"),
+        (ids["C"], "OUT_OF_STOCK"),
+        (ids["C"], "REMOVED"),
+    ]
+    assert db_session.query(ProductChange).filter_by(supplier_id=supplier_id, kind="NEW").count() == 3
+
+
+def test_withdraw_sweep_only_looks_at_products_removed_since_its_offset(db_session, make_supplier):
+    supplier_id = make_supplier("FEED_WITHDRAW").id
+
+    def _live_removed(sku, listing_id):
+        sp = SupplierProduct(supplier_id=supplier_id, external_sku=sku, title=sku, sync_status="REMOVED")
+        db_session.add(sp)
+        db_session.flush()
+        ip = InternalProduct(sku=f"FW-{sku}", primary_supplier_product_id=sp.id)
+        db_session.add(ip)
+        db_session.flush()
+        db_session.add(TradeMeListing(internal_product_id=ip.id, tm_listing_id=listing_id, actual_state="Live"))
+        db_session.commit()
+        return sp
+
+    def _withdraws():
+        return sorted(
+            c.payload["listing_id"] for c in db_session.query(SystemCommand).filter_by(type="WITHDRAW_LISTING")
+        )
+
+    ops = InventoryOperations(db_session)
+    _live_removed("OLD", "9001")
+    # First run has no offset: full sweep.
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id) == 1
+    consumer = f"withdraw_unavailable:{supplier_id}"
+    assert consumer_offset(db_session, consumer) == latest_change_id(db_session)
+
+    # The earlier withdraw was cancelled by an operator; an incremental run leaves it alone.
+    db_session.query(SystemCommand).filter_by(type="WITHDRAW_LISTING").update({"status": "CANCELLED"})
+    new = _live_removed("NEW", "9002")
+    db_session.add(ProductChange(supplier_product_id=new.id, supplier_id=supplier_id, kind="REMOVED"))
+    db_session.commit()
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id) == 1
+    assert _withdraws() == ["9001", "9002"]
+
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id) == 0
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id, full=True) == 1
+    assert _withdraws() == ["9001", "9001", "9002"]
+
+    commit_offset(db_session, consumer, 0)  # offsets never move backwards
+    assert consumer_offset(db_session, consumer) == latest_change_id(db_session)
+
+
+def test_withdraw_sweep_rereads_the_overlap_for_late_commits(db_session, make_supplier, monkeypatch):
+    supplier_id = make_supplier("FEED_LATE").id
+    sps = []
+    for sku, listing_id in (("EARLY", "9101"), ("LATE", "9102")):
+        sp = SupplierProduct(supplier_id=supplier_id, external_sku=sku, title=sku, sync_status="PRESENT")
+        db_session.add(sp)
+        db_session.flush()
+        ip = InternalProduct(sku=f"FL-{sku}", primary_supplier_product_id=sp.id)
+        db_session.add(ip)
+        db_session.flush()
+        db_session.add(TradeMeListing(internal_product_id=ip.id, tm_listing_id=listing_id, actual_state="Live"))
+        sps.append(sp)
+    db_session.commit()
+
+    consumer = f"withdraw_unavailable:{supplier_id}"
+    base = latest_change_id(db_session)
+    commit_offset(db_session, consumer, base + 2)
+    db_session.commit()
+    # Event base+1 was allocated before base+2 but committed after the consumer moved past it.
+    sps[1].sync_status = "REMOVED"
+    db_session.add(ProductChange(id=base + 1, supplier_product_id=sps[1].id, supplier_id=supplier_id, kind="REMOVED"))
+    db_session.commit()
+
+    ops = InventoryOperations(db_session)
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id) == 0  # SQLite: no overlap
+    monkeypatch.setenv("RETAILOS_CHANGE_FEED_OVERLAP", "5")
+    assert ops.withdraw_unavailable_items(supplier_id=supplier_id) == 1
+    assert consumer_offset(db_session, consumer) == base + 2
+
+
+def test_prune_keeps_unread_events_and_resets_idle_consumers(db_session, make_supplier):
+    supplier_id = make_supplier("FEED_PRUNE").id
+    sp = SupplierProduct(supplier_id=supplier_id, external_sku="P1", title="P1")
+    db_session.add(sp)
+    db_session.flush()
+    old = datetime.now(timezone.utc) - timedelta(days=40)
+    ids = []
+    for created in (old, old, datetime.now(timezone.utc)):
+        change = ProductChange(supplier_product_id=sp.id, supplier_id=supplier_id, kind="NEW", created_at=created)
+        db_session.add(change)
+        db_session.flush()
+        ids.append(change.id)
+    commit_offset(db_session, "active", ids[0])
+    db_session.add(ChangeFeedOffset(consumer="idle", last_id=ids[0] - 1, updated_at=old))
+    db_session.commit()
+
+    # The active consumer has not read the second old event yet: only the first goes.
+    assert prune_changes(db_session, retention_days=30) == {"deleted": 1, "pruned_through": ids[0]}
+    assert consumer_offset(db_session, "active") == ids[0]
+    assert consumer_offset(db_session, "idle") is None  # missed pruned events: full pass
+
+    commit_offset(db_session, "active", ids[2])
+    db_session.commit()
+    assert prune_changes(db_session, retention_days=30)["deleted"] == 1
+    assert [c.id for c in read_changes(db_session, 0)] == [ids[2]]
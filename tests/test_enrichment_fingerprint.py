@@ -0,0 +1,91 @@
+from scripts import enrich_products
+from retail_os.core.database import Supplier, SupplierProduct, SystemSetting
+from retail_os.core import enrichment_fingerprint as fingerprint
+from retail_os.core.enrichment_fingerprint import mark_enrichment_stale
+
+
+def _set_policy(db_session, mode):
+    row = db_session.query(SystemSetting).filter_by(key="enrichment.policy").first()
+    if row is None:
+        row = SystemSetting(key="enrichment.policy")
+        db_session.add(row)
+    row.value = {"default": mode, "by_supplier": {"FP_SUPPLIER": mode}}
+    db_session.commit()
+
+
+def _product(db_session):
+    s = Supplier(name="FP_SUPPLIER", base_url="https://example.test")
+    db_session.add(s)
+    db_session.commit()
+    sp = SupplierProduct(
+        supplier_id=s.id,
+        external_sku="FP1",
+        title="Makita Drill 18V",
+        description="Cordless drill",
+        specs={"Voltage": "18V"},
+        cost_price=50,
+        product_url="https://example.test/FP1",
+        enrichment_status="PENDING",
+    )
+    db_session.add(sp)
+    db_session.commit()
+    return s.id, sp.id
+
+
+def _enrich(db_session, supplier_id, sp_id):
+    enrich_products.enrich_batch(batch_size=10, delay_seconds=0, supplier_id=supplier_id)
+    # enrich_batch closes its session, which detaches our rows.
+    return db_session.get(SupplierProduct, sp_id)
+
+
+def test_requeued_products_with_unchanged_inputs_are_not_re_enriched(db_session, monkeypatch):
+    monkeypatch.setattr(enrich_products, "SessionLocal", lambda: db_session)
+    supplier_id, sp_id = _product(db_session)
+    _set_policy(db_session, "TEMPLATE")
+
+    sp = _enrich(db_session, supplier_id, sp_id)
+    assert sp.enrichment_status == "SUCCESS" and sp.enrichment_fingerprint.startswith("TEMPLATE:1:")
+
+    # Operator requeue: inputs unchanged, so the existing copy is kept.
+    sp.enrichment_status, sp.enriched_description = "PENDING", "kept copy"
+    db_session.commit()
+    sp = _enrich(db_session, supplier_id, sp_id)
+    assert (sp.enrichment_status, sp.enriched_description) == ("SUCCESS", "kept copy")
+
+    # A policy mode change makes every row enriched under the old mode stale.
+    _set_policy(db_session, "NONE")
+    sp = _enrich(db_session, supplier_id, sp_id)
+    assert sp.enrichment_status == "SUCCESS" and sp.enrichment_fingerprint.startswith("NONE:1:")
+    assert sp.enriched_description != "kept copy"
+
+
+def test_supplier_writes_mark_enrichment_stale_only_when_its_inputs_change(db_session, monkeypatch):
+    monkeypatch.setattr(enrich_products, "SessionLocal", lambda: db_session)
+    supplier_id, sp_id = _product(db_session)
+    _set_policy(db_session, "TEMPLATE")
+    sp = _enrich(db_session, supplier_id, sp_id)
+
+    sp.brand = "Makita"  # not an enrichment input
+    assert not mark_enrichment_stale(sp)
+    sp.specs = {"Voltage": "18V", "Battery": "2x 5Ah"}
+    assert mark_enrichment_stale(sp)
+    assert sp.enrichment_status == "PENDING" and sp.enriched_title
+
+
+def test_policy_stale_sweep_runs_once_per_mode_change(db_session, monkeypatch):
+    monkeypatch.setattr(enrich_products, "SessionLocal", lambda: db_session)
+    sweeps = []
+    real = fingerprint.mark_stale_for_mode
+    monkeypatch.setattr(fingerprint, "mark_stale_for_mode", lambda db, sid, mode: sweeps.append(mode) or real(db, sid, mode))
+    supplier_id, sp_id = _product(db_session)
+    _set_policy(db_session, "TEMPLATE")
+
+    for _ in range(3):
+        _enrich(db_session, supplier_id, sp_id)
+    assert sweeps == ["TEMPLATE"]
+
+    _set_policy(db_session, "NONE")
+    _enrich(db_session, supplier_id, sp_id)
+    sp = _enrich(db_session, supplier_id, sp_id)
+    assert sweeps == ["TEMPLATE", "NONE"]
+    assert sp.enrichment_fingerprint.startswith("NONE:1:")
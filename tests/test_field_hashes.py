@@ -0,0 +1,49 @@
+from retail_os.core.database import SupplierProduct
+from retail_os.core.field_hashes import (
+    changed_groups,
+    field_group_hashes,
+    listing_inputs_changed,
+    product_field_hashes,
+)
+from retail_os.core.product_upserter import ProductUpserter
+
+
+def test_groups_change_independently():
+    base = field_group_hashes(cost=10, title="Drill", description="d", stock_level=3)
+    assert changed_groups(base, field_group_hashes(cost="10.00", title="Drill", description="d", stock_level=3)) == set()
+    assert changed_groups(base, field_group_hashes(cost=12, title="Drill", description="d", stock_level=3)) == {"pricing"}
+    stock_only = field_group_hashes(cost=10, title="Drill", description="d", stock_level=0)
+    assert changed_groups(base, stock_only) == {"stock"}
+    assert listing_inputs_changed(base, stock_only) is False
+    assert listing_inputs_changed(None, stock_only) is None
+
+
+def test_content_change_marks_enrichment_stale_but_price_change_does_not(db_session, make_supplier, listing_data):
+    s = make_supplier("FIELD_HASHES")
+    up = ProductUpserter(db_session, s.id)
+
+    def _write(**kw):
+        return up.write_batch([up.prepare(listing_data(**kw), "FH1", "FH")])[0]
+
+    assert _write() == "created"
+    sp = db_session.query(SupplierProduct).filter_by(supplier_id=s.id, external_sku="FH1").one()
+    assert set(sp.field_hashes) == {"pricing", "content", "images", "stock"}
+    sp.enrichment_status, sp.enriched_title = "SUCCESS", "Cordless Drill"
+    db_session.commit()
+
+    assert _write(price=12) == "updated"
+    assert sp.enrichment_status == "SUCCESS"
+
+    assert _write(price=12, description="now with battery") == "updated"
+    # Stale, but the previous enriched copy stays until enrichment runs again.
+    assert (sp.enrichment_status, sp.enriched_title) == ("PENDING", "Cordless Drill")
+
+
+def test_rows_without_stored_hashes_fall_back_to_their_columns(db_session, make_supplier):
+    s = make_supplier("FIELD_HASHES_LEGACY")
+    sp = SupplierProduct(supplier_id=s.id, external_sku="OLD", title="Drill", description="d", cost_price=10, stock_level=3)
+    db_session.add(sp)
+    db_session.commit()
+
+    legacy = product_field_hashes(sp)
+    assert changed_groups(legacy, field_group_hashes(cost=10, title="Drill", description="d", stock_level=3)) == set()
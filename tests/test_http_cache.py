@@ -0,0 +1,77 @@
+import json
+
+import httpx
+
+from retail_os.scrapers.onecheq import scraper
+from retail_os.utils.http_cache import HTTPCache
+
+
+def _etag_transport(payload: dict, etag: str = '"v1"', seen: list | None = None):
+    body = json.dumps(payload).encode("utf-8")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if seen is not None:
+            seen.append(dict(request.headers))
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=body, headers={"ETag": etag, "Content-Type": "application/json"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_304_returns_cached_parse_without_reparsing(tmp_path):
+    cache = HTTPCache(tmp_path / "http_cache.sqlite")
+    seen: list = []
+    calls = []
+
+    def parse(body: bytes):
+        calls.append(body)
+        return json.loads(body)
+
+    url = "https://onecheq.co.nz/collections.json?limit=250&page=1"
+    with httpx.Client(transport=_etag_transport({"collections": [{"handle": "a"}]}, seen=seen)) as client:
+        first = scraper._fetch_parsed_with_retries(url, client, parse, cache=cache)
+        second = scraper._fetch_parsed_with_retries(url, client, parse, cache=cache)
+
+    assert first == second == {"collections": [{"handle": "a"}]}
+    assert len(calls) == 1
+    assert "if-none-match" not in seen[0]
+    assert seen[1]["if-none-match"] == '"v1"'
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_identical_body_without_validators_skips_parser(tmp_path):
+    cache = HTTPCache(tmp_path / "http_cache.sqlite")
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b'{"products": []}')
+
+    def parse(body: bytes):
+        calls.append(body)
+        return json.loads(body)
+
+    url = "https://onecheq.co.nz/collections/all/products.json?limit=250&page=9"
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        scraper._fetch_parsed_with_retries(url, client, parse, cache=cache)
+        scraper._fetch_parsed_with_retries(url, client, parse, cache=cache)
+
+    assert len(calls) == 1
+
+
+def test_sequential_pages_use_cached_products_on_304(tmp_path):
+    cache = HTTPCache(tmp_path / "http_cache.sqlite")
+    products = [{"id": 1, "handle": "x", "variants": [{"sku": "1", "price": "1.00"}]}]
+    transport = _etag_transport({"products": products})
+
+    with httpx.Client(transport=transport) as client:
+        first = list(scraper._iter_shopify_product_pages_sequential("all", 1, 1, 250, client, cache=cache))
+        second = list(scraper._iter_shopify_product_pages_sequential("all", 1, 1, 250, client, cache=cache))
+
+    assert first == second == [(1, products)]
+    assert cache.hits == 1
+
+
+def test_default_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("RETAILOS_HTTP_CACHE", "false")
+    assert HTTPCache.default() is None
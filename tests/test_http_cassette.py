@@ -0,0 +1,80 @@
+import time
+
+import httpx
+
+from retail_os.utils import http_cassette
+from retail_os.utils.http_cassette import (
+    Cassette,
+    CassetteServer,
+    RecordingTransport,
+    ReplayRoutingTransport,
+    RequestTimings,
+)
+
+
+def _origin(request):
+    if request.url.path == "/old":
+        return httpx.Response(301, headers={"Location": "https://shop.test/new"})
+    if request.url.path == "/new":
+        return httpx.Response(200, json={"page": request.url.params.get("page")})
+    return httpx.Response(404)
+
+
+def _record(tmp_path):
+    cassette = Cassette(tmp_path)
+    transport = RecordingTransport(httpx.MockTransport(_origin), cassette)
+    with httpx.Client(transport=transport, follow_redirects=True) as client:
+        live = client.get("https://shop.test/old")
+        client.get("https://shop.test/new?page=2")
+    return cassette, live
+
+
+def test_record_then_replay_through_local_server(tmp_path):
+    cassette, live = _record(tmp_path)
+    assert len(cassette) == 3 and len(Cassette(tmp_path)) == 3
+
+    timings = RequestTimings()
+    with CassetteServer(tmp_path, latency_ms=0) as server:
+        transport = ReplayRoutingTransport(httpx.HTTPTransport(), server.url, timings=timings)
+        with httpx.Client(transport=transport, follow_redirects=True) as client:
+            replayed = client.get("https://shop.test/old")
+            page2 = client.get("https://shop.test/new?page=2")
+            missing = client.get("https://shop.test/new?page=3")
+
+    # Same status/body, redirect followed against the original host name.
+    assert replayed.status_code == live.status_code == 200
+    assert replayed.json() == live.json() == {"page": None}
+    assert str(replayed.url) == "https://shop.test/new"
+    assert page2.json() == {"page": "2"}
+    assert missing.status_code == 404
+    assert server.hits == 3 and server.misses == ["GET https://shop.test/new?page=3"]
+    assert len(timings.samples) == 4
+
+
+def test_replay_latency_and_jitter(tmp_path):
+    _record(tmp_path)
+    with CassetteServer(tmp_path, latency_ms=80, jitter_ms=40, seed=1) as server:
+        transport = ReplayRoutingTransport(httpx.HTTPTransport(), server.url, timings=RequestTimings())
+        with httpx.Client(transport=transport) as client:
+            t0 = time.perf_counter()
+            client.get("https://shop.test/new?page=2")
+            assert time.perf_counter() - t0 >= 0.08
+
+
+def test_env_selects_cassette_transport(tmp_path, monkeypatch):
+    inner = httpx.HTTPTransport()
+    assert http_cassette.cassette_transport(inner) is None
+
+    monkeypatch.setenv("RETAILOS_HTTP_RECORD_DIR", str(tmp_path))
+    assert isinstance(http_cassette.cassette_transport(inner), RecordingTransport)
+
+    monkeypatch.setenv("RETAILOS_HTTP_REPLAY_URL", "http://127.0.0.1:9")
+    assert isinstance(http_cassette.cassette_transport(inner), ReplayRoutingTransport)
+
+
+def test_percentile_nearest_rank():
+    t = RequestTimings()
+    for ms in range(1, 101):
+        t.add(ms / 1000.0)
+    assert t.percentile(95) == 0.095
+    assert t.percentile(50) == 0.05
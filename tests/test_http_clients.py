@@ -0,0 +1,32 @@
+import threading
+
+from retail_os.utils import http_clients
+from retail_os.utils.http_clients import close_http_clients, get_http_client
+
+
+def test_registry_shares_one_client_per_profile_across_threads():
+    close_http_clients()
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(get_http_client("json"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in seen}) == 1
+    assert get_http_client("json") is seen[0]
+    assert get_http_client("default") is not seen[0]
+    assert seen[0].timeout.read == 30.0
+    close_http_clients()
+
+
+def test_close_recreates_and_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setenv("RETAILOS_HTTP2", "true")
+    monkeypatch.setattr(http_clients, "_http2_enabled", lambda: False)
+    first = get_http_client("probe")
+    close_http_clients()
+
+    assert first.is_closed
+    second = get_http_client("probe")
+    assert second is not first and not second.is_closed
+    close_http_clients()
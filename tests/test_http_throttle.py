@@ -0,0 +1,67 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from retail_os.utils.http_throttle import GlobalHTTPThrottle, parse_retry_after
+
+
+@pytest.fixture(autouse=True)
+def _fresh_throttle():
+    GlobalHTTPThrottle.reset()
+    yield
+    GlobalHTTPThrottle.reset()
+
+
+def test_healthy_responses_ramp_rate_up_to_ceiling(monkeypatch):
+    monkeypatch.setenv("RETAILOS_HTTP_RPS_AIMD_TEST", "2")
+    monkeypatch.setenv("RETAILOS_HTTP_RPS_MAX_AIMD_TEST", "4")
+    for _ in range(10):
+        GlobalHTTPThrottle.feedback("aimd.test", 200)
+    rate = GlobalHTTPThrottle.rates()["aimd.test"]
+    assert 2.0 < rate["rps"] <= 4.0
+
+    for _ in range(200):
+        GlobalHTTPThrottle.feedback("http://aimd.test/page", 200)
+    assert GlobalHTTPThrottle.rates()["aimd.test"]["rps"] == 4.0
+
+
+def test_throttling_cuts_rate_once_per_burst_and_respects_floor(monkeypatch):
+    monkeypatch.setenv("RETAILOS_HTTP_RPS_AIMD_TEST", "8")
+    GlobalHTTPThrottle.feedback("aimd.test", 429)
+    # Rejections from the same burst don't compound.
+    GlobalHTTPThrottle.feedback("aimd.test", 503)
+    rate = GlobalHTTPThrottle.rates()["aimd.test"]
+    assert rate["rps"] == 4.0 and rate["throttled"] == 2
+
+    for _ in range(20):
+        with GlobalHTTPThrottle._lock:
+            GlobalHTTPThrottle._hosts["aimd.test"].last_decrease = 0.0
+        GlobalHTTPThrottle.feedback("aimd.test", 429)
+    assert GlobalHTTPThrottle.rates()["aimd.test"]["rps"] == pytest.approx(0.2)
+
+
+def test_retry_after_pauses_host_before_next_request(monkeypatch):
+    monkeypatch.setenv("RETAILOS_HTTP_RPS_AIMD_TEST", "50")
+    GlobalHTTPThrottle.feedback("aimd.test", 429, {"Retry-After": "0.3"})
+    assert GlobalHTTPThrottle.rates()["aimd.test"]["cooldown_s"] > 0
+
+    t0 = time.monotonic()
+    with GlobalHTTPThrottle.request("http://aimd.test/x"):
+        pass
+    assert time.monotonic() - t0 >= 0.25
+
+    # Other hosts are unaffected.
+    t0 = time.monotonic()
+    with GlobalHTTPThrottle.request("http://other.test/x"):
+        pass
+    assert time.monotonic() - t0 < 0.1
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(when) <= 30
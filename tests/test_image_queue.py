@@ -0,0 +1,100 @@
+from retail_os.core.database import (
+    CommandStatus,
+    ImageDownloadJob,
+    MediaFile,
+    Supplier,
+    SupplierProduct,
+    SystemCommand,
+    SystemSetting,
+)
+from retail_os.core.image_queue import ImageQueueDrainer, enqueue_product_images, ensure_drain_command, pending_count
+from retail_os.core.media_index import RECONCILED_KEY
+from retail_os.core.product_upserter import ProductUpserter
+
+
+class _FakeDownloader:
+    def __init__(self, tmp_path, fail_urls=()):
+        self.tmp_path = tmp_path
+        self.fail_urls = set(fail_urls)
+        self.calls = []
+
+    def download_image(self, url, sku, should_abort=None):
+        self.calls.append(url)
+        if url in self.fail_urls:
+            return {"success": False, "error": "HTTP 503"}
+        path = self.tmp_path / f"{sku}.jpg"
+        path.write_bytes(b"img")
+        return {"success": True, "path": str(path)}
+
+
+def _upsert(db_session, monkeypatch, photos):
+    monkeypatch.setenv("RETAILOS_IMAGE_QUEUE", "true")
+    supplier = Supplier(name="IMG_QUEUE_TEST", base_url="http://example.com")
+    db_session.add(supplier)
+    db_session.flush()
+    data = {
+        "title": "Queued Images",
+        "buy_now_price": "10.00",
+        "source_listing_id": "IQ1",
+        "source_url": "http://example.com/IQ1",
+        "source_status": "Active",
+    }
+    data.update({f"photo{i}": url for i, url in enumerate(photos, 1)})
+    upserter = ProductUpserter(db_session, supplier_id=supplier.id)
+    assert upserter.upsert(data, "IQ1", "IQ") == "created"
+    return db_session.query(SupplierProduct).filter_by(supplier_id=supplier.id, external_sku="IQ1").one()
+
+
+def test_upsert_stores_remote_urls_and_drain_swaps_in_local_paths(db_session, monkeypatch, tmp_path):
+    sp = _upsert(db_session, monkeypatch, ["http://cdn/a.jpg", "http://cdn/b.jpg"])
+    assert sp.images == ["http://cdn/a.jpg", "http://cdn/b.jpg"]
+    assert pending_count(db_session) == 2
+
+    dl = _FakeDownloader(tmp_path)
+    stats = ImageQueueDrainer(db_session, concurrency=2, downloader=dl).drain()
+
+    assert stats["done"] == 2 and stats["pending"] == 0
+    db_session.refresh(sp)
+    assert sp.images == [str(tmp_path / "IQ1.jpg"), str(tmp_path / "IQ1_2.jpg")]
+
+
+def test_enqueue_answers_local_presence_from_the_media_index(db_session, monkeypatch, tmp_path):
+    sp = _upsert(db_session, monkeypatch, ["http://cdn/a.jpg", "http://cdn/b.jpg"])
+    ImageQueueDrainer(db_session, concurrency=2, downloader=_FakeDownloader(tmp_path)).drain()
+
+    # Index ready, but only IQ1 recorded: IQ1_2's file on disk is not probed, so it is re-queued.
+    db_session.add(SystemSetting(key=RECONCILED_KEY, value={"at": "now"}))
+    db_session.add(MediaFile(image_key="IQ1", sku="IQ1", ordinal=1, path=str(tmp_path / "IQ1.jpg"), bytes=3))
+    db_session.flush()
+    images = enqueue_product_images(db_session, sp, ["http://cdn/a.jpg", "http://cdn/b.jpg"], "IQ1")
+    assert images == [str(tmp_path / "IQ1.jpg"), "http://cdn/b.jpg"]
+    assert pending_count(db_session) == 1
+
+
+def test_failed_download_backs_off_then_gives_up(db_session, monkeypatch, tmp_path):
+    monkeypatch.setenv("RETAILOS_IMAGE_QUEUE_MAX_ATTEMPTS", "2")
+    sp = _upsert(db_session, monkeypatch, ["http://cdn/broken.jpg"])
+    drainer = ImageQueueDrainer(db_session, downloader=_FakeDownloader(tmp_path, fail_urls={"http://cdn/broken.jpg"}))
+
+    assert drainer.drain()["failed"] == 1
+    job = db_session.query(ImageDownloadJob).filter_by(supplier_product_id=sp.id).one()
+    assert job.status == "PENDING" and job.next_attempt_at is not None
+    # Backoff: the job is not claimable again straight away.
+    assert drainer.drain()["claimed"] == 0
+
+    job.next_attempt_at = None
+    db_session.commit()
+    drainer.drain()
+    db_session.refresh(job)
+    assert job.status == "FAILED" and job.attempts == 2
+    assert sp.images == ["http://cdn/broken.jpg"]
+
+
+def test_ensure_drain_command_dedupes(db_session, monkeypatch):
+    assert ensure_drain_command(db_session) is False
+    _upsert(db_session, monkeypatch, ["http://cdn/a.jpg"])
+
+    assert ensure_drain_command(db_session) is True
+    assert ensure_drain_command(db_session) is False
+    cmds = db_session.query(SystemCommand).filter_by(type="DRAIN_IMAGE_QUEUE").all()
+    assert len(cmds) == 1 and cmds[0].status == CommandStatus.PENDING
@@ -0,0 +1,38 @@
+from PIL import Image
+
+from retail_os.core import media_index
+from retail_os.core.database import MediaFile
+from retail_os.core.media_index import local_images, reconcile_media_files, record_media_file
+
+
+def _jpg(path, size=(40, 30)):
+    Image.new("RGB", size, "green").save(path, "JPEG", quality=95)
+    with open(path, "ab") as f:
+        f.write(b"\0" * 400)
+    return str(path)
+
+
+def test_presence_answers_from_the_index_once_reconciled(db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(media_index, "SessionLocal", lambda: db_session)
+    recorded = _jpg(tmp_path / "SKU9_2.jpg")
+    legacy = _jpg(tmp_path / "OLD1.jpg", (20, 10))
+    gone = str(tmp_path / "GONE.jpg")
+
+    # Not reconciled yet: the filesystem is still the source of truth.
+    assert local_images(db_session, [gone, legacy, "https://example.test/a.jpg"]) == [legacy]
+
+    record_media_file("SKU9_2", recorded, 1234)
+    row = db_session.get(MediaFile, "SKU9_2")
+    assert (row.sku, row.ordinal, row.width, row.height) == ("SKU9", 2, 40, 30)
+
+    stats = reconcile_media_files(db_session, media_root=str(tmp_path))
+    assert stats == {"verified": 1, "removed": 0, "added": 1}
+    assert db_session.get(MediaFile, "SKU9_2").bytes != 1234  # refreshed from disk
+    assert db_session.get(MediaFile, "OLD1").width == 20
+
+    # Index answers without touching disk: a file deleted behind its back stays "present"
+    # until the next reconcile drops it.
+    (tmp_path / "OLD1.jpg").unlink()
+    assert local_images(db_session, [legacy, recorded, gone]) == [legacy, recorded]
+    assert reconcile_media_files(db_session, media_root=str(tmp_path))["removed"] == 1
+    assert local_images(db_session, [legacy, recorded]) == [recorded]
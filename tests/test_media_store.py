@@ -0,0 +1,135 @@
+import io
+import os
+
+from PIL import Image
+
+from retail_os.core import media_store
+from retail_os.core.database import MediaFile, MediaObject, ProductMedia
+from retail_os.core.media_store import MediaStore, gc_unreferenced_media
+from retail_os.utils.image_downloader import ImageDownloader
+
+
+def _png(store, key, color):
+    buf = io.BytesIO()
+    Image.new("RGBA", (64, 48), color).save(buf, "PNG")
+    path = store.temp_path(key, ".png")
+    path.write_bytes(buf.getvalue() + b"\0" * 400)  # keep it above the 300B "error page" floor
+    return path
+
+
+def test_identical_downloads_are_stored_once_and_refcounted(db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(media_store, "SessionLocal", lambda: db_session)
+    store = MediaStore(tmp_path)
+
+    a = store.put(_png(store, "SKU1", "red"), "SKU1", "https://example.test/stock.png")
+    b = store.put(_png(store, "SKU2_2", "red"), "SKU2_2", "https://example.test/other-stock.png")
+    assert a["path"] == b["path"] and b["deduped"] and not a["deduped"]
+    assert "/cas/" + a["sha256"][:2] + "/" + a["sha256"][2:4] + "/" in a["path"]
+    assert not list(store.tmp_dir.iterdir())
+
+    obj = db_session.get(MediaObject, a["sha256"])
+    assert (obj.refcount, obj.format, obj.width, obj.height) == (2, "JPEG", 64, 48)
+    assert ImageDownloader(base_dir=tmp_path).verify_image("SKU2_2")["path"] == a["path"]
+
+    # Both SKUs get new photos: the shared object is unreferenced and garbage-collected.
+    store.put(_png(store, "SKU1", "blue"), "SKU1")
+    store.put(_png(store, "SKU2_2", "blue"), "SKU2_2")
+    db_session.expire_all()
+    assert db_session.get(MediaObject, a["sha256"]).refcount == 0
+    assert db_session.query(ProductMedia).filter_by(sha256=a["sha256"]).count() == 0
+
+    assert gc_unreferenced_media(db_session)["removed"] == 1
+    assert db_session.get(MediaObject, a["sha256"]) is None
+    assert not (tmp_path / a["path"]).exists()
+    assert store.lookup("SKU1")["sha256"] != a["sha256"]
+
+
+def test_failed_downloads_leave_no_temp_files_and_stale_ones_are_swept(db_session, monkeypatch, tmp_path):
+    import os
+    import subprocess
+    import time
+
+    import httpx
+
+    from retail_os.utils import image_downloader
+
+    monkeypatch.setattr(media_store, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(image_downloader, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(image_downloader.time, "sleep", lambda _s: None)
+    def dropped(request):
+        def body():
+            yield b"\xff\xd8 first chunk"
+            raise httpx.ReadError("connection reset", request=request)
+
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=body())
+
+    client = httpx.Client(transport=httpx.MockTransport(dropped))
+    monkeypatch.setattr(image_downloader, "get_http_client", lambda _name: client)
+
+    def partial_curl(cmd, **_kw):
+        with open(cmd[cmd.index("-o") + 1], "wb") as f:
+            f.write(b"\xff\xd8 truncated")
+        raise subprocess.CalledProcessError(18, cmd)
+
+    monkeypatch.setattr(subprocess, "run", partial_curl)
+    downloader = ImageDownloader(base_dir=tmp_path)
+    res = downloader.download_image("https://example.test/a.jpg", "SKU404")
+    assert not res["success"] and "Curl" in res["error"]
+    assert not list(downloader.store.tmp_dir.iterdir())
+
+    # Leftovers of a crashed process are swept once stale; a fresh (in-flight) one is kept.
+    stale, fresh = downloader.store.temp_path("OLD"), downloader.store.temp_path("NEW")
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    old = time.time() - media_store.STALE_TMP_SECONDS - 60
+    os.utime(stale, (old, old))
+    MediaStore(tmp_path)
+    assert sorted(p.name for p in downloader.store.tmp_dir.iterdir()) == [fresh.name]
+
+
+def test_put_deduping_onto_an_object_gc_removes_stores_it_again(db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(media_store, "SessionLocal", lambda: db_session)
+    store = MediaStore(tmp_path)
+    red = store.put(_png(store, "SKU1", "red"), "SKU1")
+    store.put(_png(store, "SKU1", "blue"), "SKU1")  # "red" is now unreferenced
+
+    # GC runs after put found the red object on disk but before it registered SKU3 against it.
+    real_register = store._register
+
+    def _register(*args, **kwargs):
+        store._register = real_register
+        assert gc_unreferenced_media(db_session)["removed"] == 1
+        real_register(*args, **kwargs)
+
+    store._register = _register
+    again = store.put(_png(store, "SKU3", "red"), "SKU3")
+    assert again["sha256"] == red["sha256"] and not again["deduped"]
+    assert os.path.exists(again["path"])
+    db_session.expire_all()
+    assert db_session.get(MediaObject, red["sha256"]).refcount == 1
+
+    # Referenced again: a later GC pass keeps it.
+    assert gc_unreferenced_media(db_session)["removed"] == 0
+    assert os.path.exists(again["path"])
+
+
+def test_finalize_writes_object_mapping_and_index_in_one_transaction(db_session, monkeypatch, tmp_path):
+    from retail_os.core import media_index
+    from retail_os.utils import image_downloader
+
+    def _no_session():
+        raise AssertionError("finalize opened a second session")
+
+    monkeypatch.setattr(media_store, "SessionLocal", _no_session)
+    monkeypatch.setattr(media_index, "SessionLocal", _no_session)
+    monkeypatch.setattr(image_downloader, "SessionLocal", lambda: db_session)
+    commits = []
+    real_commit = db_session.commit
+    monkeypatch.setattr(db_session, "commit", lambda: commits.append(1) or real_commit())
+
+    downloader = ImageDownloader(base_dir=tmp_path)
+    res = downloader.finalize(_png(downloader.store, "SKU7", "green"), "SKU7", "https://example.test/g.png")
+    assert res["success"] and len(commits) == 1
+    pm = db_session.get(ProductMedia, "SKU7")
+    assert db_session.get(MediaObject, pm.sha256).refcount == 1
+    assert db_session.get(MediaFile, "SKU7").width == 64
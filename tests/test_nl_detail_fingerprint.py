@@ -0,0 +1,93 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from retail_os.core.change_feed import ChangeBuffer
+from retail_os.core.database import Supplier, SupplierProduct
+from retail_os.scrapers.noel_leeming import scraper
+from retail_os.scrapers.noel_leeming.adapter import NoelLeemingAdapter
+from retail_os.scrapers.noel_leeming.scraper import _reuse_known_details, extract_products_from_html
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures/scrapers/noel_leeming")
+
+
+def _tiles():
+    with open(os.path.join(FIXTURE_DIR, "category_page1.html"), "r", encoding="utf-8") as f:
+        return extract_products_from_html(f.read(), 1, 1)
+
+
+def _adapter(db_session):
+    supplier = Supplier(name="NL_FINGERPRINT_TEST", base_url="https://www.noelleeming.co.nz")
+    db_session.add(supplier)
+    db_session.flush()
+    adapter = NoelLeemingAdapter.__new__(NoelLeemingAdapter)
+    adapter.db = db_session
+    adapter.supplier_id = supplier.id
+    adapter.changes = ChangeBuffer(supplier.id)
+    return adapter
+
+
+def test_fingerprint_tracks_tile_fields():
+    a, b, c = _tiles()
+    assert a["tile_fingerprint"] == _tiles()[0]["tile_fingerprint"]
+    assert len({a["tile_fingerprint"], b["tile_fingerprint"], c["tile_fingerprint"]}) == 3
+
+    repriced = dict(a, price="799.00")
+    assert scraper.tile_fingerprint(repriced) != a["tile_fingerprint"]
+    # Badges (e.g. a sale or stock label) are part of the tile.
+    assert scraper.tile_fingerprint(a, ["sale.svg"]) != scraper.tile_fingerprint(a)
+
+
+def test_unchanged_recent_tiles_reuse_stored_details(monkeypatch):
+    monkeypatch.setenv("RETAILOS_NL_DETAIL_MAX_AGE_HOURS", "24")
+    fresh, changed, stale = _tiles()
+    now = datetime.now(timezone.utc)
+    known = {
+        fresh["source_listing_id"]: {
+            "tile_fingerprint": fresh["tile_fingerprint"],
+            # SQLite hands back naive UTC datetimes.
+            "detail_scraped_at": (now - timedelta(hours=1)).replace(tzinfo=None),
+            "images": ["/media/NL-N100001.jpg", "/media/NL-N100001_2.jpg"],
+            "specs": {"RAM": "16GB"},
+        },
+        changed["source_listing_id"]: {"tile_fingerprint": "old", "detail_scraped_at": now, "images": [], "specs": {}},
+        stale["source_listing_id"]: {
+            "tile_fingerprint": stale["tile_fingerprint"],
+            "detail_scraped_at": now - timedelta(hours=48),
+            "images": [],
+            "specs": {},
+        },
+    }
+
+    to_fetch = _reuse_known_details([fresh, changed, stale], known)
+
+    assert to_fetch == [changed, stale]
+    assert fresh["detail_reused"] is True
+    assert fresh["photo1"] == "/media/NL-N100001.jpg" and fresh["photo2"] == "/media/NL-N100001_2.jpg"
+    assert fresh["specs"] == {"RAM": "16GB"}
+
+
+def test_fingerprint_is_recorded_only_after_a_detail_scrape(db_session, monkeypatch):
+    monkeypatch.setenv("RETAILOS_IMAGE_QUEUE", "true")
+    adapter = _adapter(db_session)
+    tile, listed_only, _ = _tiles()
+    tile.update({"detail_scraped": True, "specs": {"RAM": "16GB"}, "description": "Detail page copy. Fast and light."})
+
+    for row in (tile, listed_only):
+        adapter._write_product(adapter._prepare_product(adapter._row_to_data(row, "https://nl/c/computers")))
+
+    by_sku = {sp.external_sku: sp for sp in db_session.query(SupplierProduct).filter_by(supplier_id=adapter.supplier_id)}
+    assert by_sku["N100001"].tile_fingerprint == tile["tile_fingerprint"]
+    assert by_sku["N100001"].detail_scraped_at is not None
+    assert by_sku["N100002"].tile_fingerprint is None
+
+    known = adapter._load_known_details()
+    assert set(known) == {"N100001"}
+    assert known["N100001"]["specs"] == {"RAM": "16GB"}
+    # Next run: same tile, detail page not needed.
+    reused = _tiles()[0]
+    assert _reuse_known_details([reused], known) == []
+
+    # The reused details reproduce the stored content (description included): when anything else
+    # changes, the content group does not, so no spurious CONTENT_CHANGED / re-enrichment.
+    prepared = adapter._prepare_product(adapter._row_to_data(reused, "https://nl/c/computers"))
+    assert prepared["field_hashes"]["content"] == by_sku["N100001"].field_hashes["content"]
@@ -0,0 +1,83 @@
+import threading
+
+from retail_os.scrapers.noel_leeming import scraper
+from retail_os.scrapers.noel_leeming.scraper import WebDriverPool
+
+
+class _FakeDriver:
+    def __init__(self, n):
+        self.n = n
+        self.alive = True
+        self.quit_called = False
+        self.cdp = []
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _pool(monkeypatch, **kw):
+    started = []
+
+    def fake_setup(headless=True):
+        d = _FakeDriver(len(started) + 1)
+        started.append(d)
+        return d
+
+    monkeypatch.setattr(scraper, "setup_driver", fake_setup)
+    return WebDriverPool(idle_s=0, **kw), started
+
+
+def test_pool_reuses_warm_drivers_and_recycles_after_n_pages(monkeypatch):
+    pool, started = _pool(monkeypatch, max_drivers=1, recycle_after=3)
+
+    d1 = pool.get()
+    pool.release(d1, pages=1)
+    assert pool.get() is d1
+    pool.release(d1, pages=2)
+
+    # Served 3 pages: retired, the next checkout starts a fresh browser.
+    assert d1.quit_called
+    d2 = pool.get()
+    assert d2 is not d1 and len(started) == 2
+    pool.shutdown()
+    assert d2.quit_called
+
+
+def test_unhealthy_driver_is_replaced_and_pool_stays_bounded(monkeypatch):
+    pool, started = _pool(monkeypatch, max_drivers=2, recycle_after=100)
+    a, b = pool.get(), pool.get()
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.get(timeout=5)))
+    waiter.start()
+    waiter.join(0.2)
+    assert not got and len(started) == 2  # at capacity: the third caller waits
+
+    a.alive = False
+    pool.release(a)
+    waiter.join(5)
+    assert got and got[0] is not a and a.quit_called
+    assert len(started) == 3
+    pool.release(b)
+    pool.release(got[0])
+    pool.shutdown()
+
+
+def test_resource_blocking_can_lift_images(monkeypatch):
+    monkeypatch.setenv("RETAILOS_NL_BLOCK_RESOURCES", "true")
+    d = _FakeDriver(1)
+    scraper._apply_resource_blocking(d)
+    blocked = d.cdp[-1][1]["urls"]
+    assert "*.woff2" in blocked and "*googletagmanager.com*" in blocked and "*/dw/image/*" in blocked
+
+    with scraper.browser_images_allowed(d):
+        assert "*/dw/image/*" not in d.cdp[-1][1]["urls"]
+    assert "*/dw/image/*" in d.cdp[-1][1]["urls"]
@@ -0,0 +1,104 @@
+import os
+
+import httpx
+import pytest
+
+from retail_os.scrapers.noel_leeming import grid, scraper
+from retail_os.scrapers.noel_leeming.scraper import extract_products_from_html, scrape_category
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures/scrapers/noel_leeming")
+CATEGORY_URL = "https://www.noelleeming.co.nz/search?cgid=computersofficetech-computers"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def nl_site(monkeypatch):
+    """Recorded NL pages behind a MockTransport; `status` lets a test break individual URLs."""
+    page1 = load_fixture("category_page1.html")
+    page2 = load_fixture("update_grid_page2.html")
+    requested = []
+    status = {}
+
+    def handler(request):
+        url = str(request.url)
+        requested.append(url)
+        if url in status:
+            return httpx.Response(status[url], text="blocked")
+        if request.url.path.endswith("Search-UpdateGrid"):
+            start = int(request.url.params.get("start", "0"))
+            return httpx.Response(200, text=page2 if start == 32 else "")
+        if request.url.path == "/search":
+            return httpx.Response(200, text=page1)
+        return httpx.Response(200, text="<html></html>")
+
+    client = httpx.Client(transport=httpx.MockTransport(handler), follow_redirects=True)
+    monkeypatch.setattr(grid, "nl_http_client", lambda: (client, False))
+    monkeypatch.setattr(scraper, "nl_http_client", lambda: (client, False))
+    monkeypatch.setenv("RETAILOS_NL_FAST_PATH", "true")
+    yield {"requested": requested, "status": status, "page1": page1, "page2": page2}
+    client.close()
+
+
+def test_fast_path_matches_selenium_extraction(nl_site, monkeypatch):
+    def no_browser(**_kw):
+        raise AssertionError("Selenium must not start when the fast path covers every page")
+
+    monkeypatch.setattr(scraper, "setup_driver", no_browser)
+    coverage = {}
+    rows = scrape_category(category_url=CATEGORY_URL, coverage=coverage)
+    assert coverage == {"last_page": 2, "complete": True}
+
+    # Parity: same rows the Selenium path extracts from the same HTML, ranked continuously.
+    expected = extract_products_from_html(nl_site["page1"], 1, 1) + extract_products_from_html(nl_site["page2"], 2, 4)
+    assert rows == expected
+    assert [r["noel_leeming_rank"] for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[1]["photo1"].startswith("https://www.noelleeming.co.nz/dw/image/")
+    assert rows[2]["photo1"] == ""
+
+    grid_calls = [u for u in nl_site["requested"] if "Search-UpdateGrid" in u]
+    assert len(grid_calls) == 1 and "start=32" in grid_calls[0] and "sz=32" in grid_calls[0]
+
+
+def test_failed_grid_page_falls_back_to_selenium(nl_site, monkeypatch):
+    nl_site["status"][
+        "https://www.noelleeming.co.nz/on/demandware.store/Sites-nlnz-Site/en_NZ/Search-UpdateGrid"
+        "?cgid=computersofficetech-computers&start=32&sz=32"
+    ] = 403
+    selenium_pages = []
+
+    class _Driver:
+        def quit(self):
+            pass
+
+    def fake_page(driver, category_url, page_num, should_abort=None):
+        selenium_pages.append(page_num)
+        return extract_products_from_html(nl_site["page2"], page_num, 1)
+
+    monkeypatch.setattr(scraper, "setup_driver", lambda **_kw: _Driver())
+    monkeypatch.setattr(scraper, "_scrape_page_selenium", fake_page)
+
+    try:
+        rows = scrape_category(category_url=CATEGORY_URL)
+    finally:
+        scraper.shutdown_driver_pool()
+
+    assert selenium_pages == [2]
+    assert [r["source_listing_id"] for r in rows] == ["N100001", "N100002", "N100003", "N100004", "N100005"]
+    assert [r["noel_leeming_rank"] for r in rows] == [1, 2, 3, 4, 5]
+
+
+def test_grid_helpers():
+    page1 = load_fixture("category_page1.html")
+    assert grid.parse_total_pages(page1) == 2
+    assert grid.find_update_grid_url(page1, CATEGORY_URL).endswith("Search-UpdateGrid?cgid=computersofficetech-computers&start=32&sz=32")
+    assert grid.grid_page_url("https://www.noelleeming.co.nz/c/smarthome", 3) == "https://www.noelleeming.co.nz/c/smarthome?start=64&sz=32"
+
+
+def test_page_limit_below_the_page_count_is_not_complete(nl_site):
+    coverage = {}
+    rows = scrape_category(category_url=CATEGORY_URL, max_pages=1, coverage=coverage)
+    assert len(rows) == 3 and coverage["complete"] is False
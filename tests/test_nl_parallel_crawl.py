@@ -0,0 +1,88 @@
+import threading
+import time
+
+from retail_os.scrapers.noel_leeming import adapter, scraper
+from retail_os.scrapers.noel_leeming.adapter import iter_category_rows
+
+
+def _row(sku):
+    return {"source_listing_id": sku, "title": sku}
+
+
+def test_categories_run_concurrently_and_dedupe_to_latest_category(monkeypatch):
+    listings = {
+        "c/audio": [_row("A1"), _row("H1")],
+        "c/audio/headphones": [_row("H1"), _row("H2")],
+        "c/gaming": [_row("G1")],
+    }
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_scrape(category_url, should_abort=None, **_kw):
+        with lock:
+            running.append(category_url)
+            peak.append(len(running))
+        # The broad category finishes last, after its subcategory already claimed H1.
+        time.sleep(0.2 if category_url == "c/audio" else 0.05)
+        with lock:
+            running.remove(category_url)
+        return listings[category_url]
+
+    monkeypatch.setattr(adapter, "scrape_category", fake_scrape)
+    out = list(iter_category_rows(list(listings), workers=3))
+
+    assert max(peak) == 3
+    assert sorted((r["source_listing_id"], cat) for r, cat in out) == [
+        ("A1", "c/audio"),
+        ("G1", "c/gaming"),
+        ("H1", "c/audio/headphones"),
+        ("H2", "c/audio/headphones"),
+    ]
+
+
+def test_abort_stops_streaming_and_skips_queued_categories(monkeypatch):
+    scraped = []
+    abort = threading.Event()
+
+    def fake_scrape(category_url, should_abort=None, **_kw):
+        scraped.append(category_url)
+        return [_row(f"{category_url}-1")]
+
+    monkeypatch.setattr(adapter, "scrape_category", fake_scrape)
+    rows = iter_category_rows([f"c{i}" for i in range(10)], workers=1, should_abort=abort.is_set)
+    next(rows)
+    abort.set()
+    assert list(rows) == []
+    assert len(scraped) < 10
+
+
+def test_selenium_pages_are_sharded_across_pool_drivers(monkeypatch):
+    class _Pool:
+        max_drivers = 3
+
+        def __init__(self):
+            self.out = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+
+        def get(self, timeout=None):
+            with self.lock:
+                self.out += 1
+                self.peak = max(self.peak, self.out)
+                return object()
+
+        def release(self, driver, pages=1):
+            with self.lock:
+                self.out -= 1
+
+    def fake_page(driver, category_url, page_num, should_abort=None):
+        time.sleep(0.05)
+        return None if page_num == 4 else [_row(f"P{page_num}")]
+
+    monkeypatch.setattr(scraper, "_scrape_page_selenium", fake_page)
+    pool = _Pool()
+    pages = scraper._scrape_pages_selenium(pool, "c/x", [2, 3, 4, 5, 6, 7])
+
+    assert sorted(pages) == [2, 3, 5, 6, 7]
+    assert pool.peak == 3 and pool.out == 0
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta
+
+import httpx
+
+from retail_os.core.database import CollectionIndexState, CollectionMembership
+from retail_os.scrapers.onecheq.collection_index import (
+    CollectionMembershipIndex,
+    refresh_onecheq_collection_index,
+)
+
+
+def _catalog_transport(catalog: dict[str, dict], requested: list[str]):
+    """catalog: collection handle -> {"updated_at": str, "products": [handles]}"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        page = int(request.url.params.get("page", "1"))
+        if path == "/collections.json":
+            cols = [{"handle": h, "updated_at": c["updated_at"]} for h, c in catalog.items()] if page == 1 else []
+            return httpx.Response(200, content=json.dumps({"collections": cols}).encode())
+        handle = path.split("/")[2]
+        requested.append(handle)
+        prods = [{"handle": ph} for ph in catalog[handle]["products"]] if page == 1 else []
+        return httpx.Response(200, content=json.dumps({"products": prods}).encode())
+
+    return httpx.MockTransport(handler)
+
+
+def _states(db) -> dict[str, CollectionIndexState]:
+    return {s.collection_handle: s for s in db.query(CollectionIndexState).all()}
+
+
+def test_rolling_refresh_only_rescans_new_changed_and_stale(db_session, monkeypatch):
+    monkeypatch.setenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_REFRESH_BUDGET", "0")
+    catalog = {
+        "phones": {"updated_at": "t1", "products": ["iphone-x", "galaxy-s9"]},
+        "apple": {"updated_at": "t1", "products": ["iphone-x"]},
+        "laptops": {"updated_at": "t1", "products": ["macbook"]},
+    }
+    requested: list[str] = []
+    with httpx.Client(transport=_catalog_transport(catalog, requested), base_url="https://onecheq.co.nz") as client:
+        stats = refresh_onecheq_collection_index(client, db=db_session)
+        assert stats["refreshed"] == 3
+        assert _states(db_session)["phones"].product_count == 2
+
+        # Nothing changed and nothing stale: no collection is re-scanned.
+        requested.clear()
+        stats = refresh_onecheq_collection_index(client, db=db_session)
+        assert stats["refreshed"] == 0 and requested == []
+
+        # One changed, one stale, one removed.
+        catalog["phones"] = {"updated_at": "t2", "products": ["galaxy-s9"]}
+        _states(db_session)["apple"].last_refreshed = datetime.utcnow() - timedelta(days=3)
+        db_session.commit()
+        del catalog["laptops"]
+        requested.clear()
+        stats = refresh_onecheq_collection_index(client, db=db_session)
+
+    assert sorted(requested) == ["apple", "phones"]
+    assert stats["removed"] == 1
+    assert "laptops" not in _states(db_session)
+    assert db_session.query(CollectionMembership).filter_by(collection_handle="laptops").count() == 0
+
+    index = CollectionMembershipIndex(db=db_session)
+    assert index.lookup_many(["iphone-x", "galaxy-s9", "macbook"]) == {
+        "iphone-x": ["apple"],
+        "galaxy-s9": ["phones"],
+    }
+
+
+def test_refresh_budget_caps_collections_per_run(db_session, monkeypatch):
+    monkeypatch.setenv("RETAILOS_ONECHEQ_COLLECTION_INDEX_REFRESH_BUDGET", "2")
+    catalog = {f"c{i}": {"updated_at": "t", "products": [f"p{i}"]} for i in range(5)}
+    requested: list[str] = []
+    with httpx.Client(transport=_catalog_transport(catalog, requested), base_url="https://onecheq.co.nz") as client:
+        first = refresh_onecheq_collection_index(client, db=db_session)
+        second = refresh_onecheq_collection_index(client, db=db_session)
+
+    assert first["refreshed"] == 2 and first["pending"] == 3
+    assert second["refreshed"] == 2 and second["pending"] == 1
+    assert len(set(requested)) == 4
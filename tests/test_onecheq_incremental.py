@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from retail_os.scrapers.onecheq import scraper
+
+
+def _product(i: int, updated_at: str) -> dict:
+    return {"handle": f"p-{i}", "title": f"P {i}", "updated_at": updated_at}
+
+
+def test_incremental_iteration_stops_at_first_page_older_than_watermark(monkeypatch):
+    monkeypatch.setenv("RETAILOS_ONECHEQ_JSON_WINDOW", "1")
+    monkeypatch.setenv("RETAILOS_ONECHEQ_JSON_LIMIT", "2")
+    pages = {
+        1: [_product(1, "2026-05-03T10:00:00+12:00"), _product(2, "2026-05-02T10:00:00+12:00")],
+        2: [_product(3, "2026-05-01T12:00:00+12:00"), _product(4, "2026-04-01T10:00:00+12:00")],
+        3: [_product(5, "2026-03-01T10:00:00+12:00"), _product(6, "2026-02-01T10:00:00+12:00")],
+        4: [_product(7, "2026-01-01T10:00:00+12:00")],
+    }
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(200, json={"products": pages.get(int(request.url.params["page"]), [])})
+
+    watermark = datetime(2026, 4, 15, tzinfo=timezone.utc)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        rows = list(
+            scraper._iter_onecheq_products_via_shopify_json(
+                collection="phones", max_pages=0, client=client, updated_since=watermark
+            )
+        )
+
+    assert [r["sku"] for r in rows] == ["p-1", "p-2", "p-3"]
+    assert rows[0]["source_updated_at"] == "2026-05-03T10:00:00+12:00"
+    # Page 3 holds only older products -> paging stops there.
+    assert len(requested) == 3
+    assert all("sort_by=updated-at-descending" in u for u in requested)
+
+
+def test_parse_shopify_timestamp_normalizes_to_utc():
+    ts = scraper.parse_shopify_timestamp("2026-05-03T10:00:00+12:00")
+    assert ts == datetime(2026, 5, 2, 22, 0, tzinfo=timezone.utc)
+    assert scraper.parse_shopify_timestamp("") is None
+    assert scraper.parse_shopify_timestamp("not-a-date") is None
+
+
+def test_adapter_auto_mode_forces_full_sweep_when_stale(db_session, monkeypatch):
+    from retail_os.scrapers.onecheq import adapter as adapter_mod
+
+    monkeypatch.setattr(adapter_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_ONECHEQ_SOURCE", "json")
+    monkeypatch.setenv("RETAILOS_ONECHEQ_FULL_SWEEP_HOURS", "24")
+    a = adapter_mod.OneCheqAdapter()
+
+    # No watermark yet -> full
+    assert a._resolve_sync_mode("auto", "all") == ("full", None)
+
+    now = datetime.now(timezone.utc)
+    a._save_sync_state(watermark=(now - timedelta(hours=1)).isoformat(), last_full_sweep_at=(now - timedelta(hours=2)).isoformat())
+    mode, wm = a._resolve_sync_mode("auto", "all")
+    assert mode == "incremental" and wm is not None
+
+    # Collection-scoped runs and explicit full never go incremental.
+    assert a._resolve_sync_mode("auto", "phones")[0] == "full"
+    assert a._resolve_sync_mode("full", "all")[0] == "full"
+
+    a._save_sync_state(last_full_sweep_at=(now - timedelta(hours=30)).isoformat())
+    assert a._resolve_sync_mode("auto", "all")[0] == "full"
+    assert a._resolve_sync_mode("incremental", "all")[0] == "incremental"
+
+
+def test_watermark_stays_below_a_row_that_failed_to_write(db_session, monkeypatch):
+    from retail_os.core.product_upserter import ProductUpserter
+    from retail_os.scrapers.onecheq import adapter as adapter_mod
+
+    monkeypatch.setattr(adapter_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_ONECHEQ_SOURCE", "json")
+    updated = {"a": "2026-05-03T10:00:00+12:00", "b": "2026-05-01T10:00:00+12:00", "c": "2026-05-02T10:00:00+12:00"}
+    rows = [
+        {
+            "source_id": f"OC-{h}",
+            "source_url": f"https://onecheq.test/products/{h}",
+            "title": h,
+            "buy_now_price": 10.0,
+            "source_updated_at": ts,
+        }
+        for h, ts in updated.items()
+    ]
+    monkeypatch.setattr(adapter_mod, "scrape_onecheq", lambda **_kw: iter(rows))
+
+    real_write = ProductUpserter.write_batch
+
+    def _write_batch(self, batch, *a, **kw):
+        ok = iter(real_write(self, [p for p in batch if p.external_sku != "b"], *a, **kw))
+        return ["failed" if p.external_sku == "b" else next(ok) for p in batch]
+
+    monkeypatch.setattr(ProductUpserter, "write_batch", _write_batch)
+
+    a = adapter_mod.OneCheqAdapter()
+    a.run_sync(pages=0)
+    watermark = scraper.parse_shopify_timestamp(a._load_sync_state()["watermark"])
+    # "a" was written later than "b", but the next incremental run must still fetch "b".
+    assert watermark < scraper.parse_shopify_timestamp(updated["b"])
+    assert watermark > scraper.parse_shopify_timestamp(updated["b"]) - timedelta(seconds=1)
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+
+from retail_os.scrapers.onecheq import scraper
+
+
+def _fake_catalog_transport(total: int, requested: list[int]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        limit = int(request.url.params.get("limit"))
+        page = int(request.url.params.get("page"))
+        requested.append(page)
+        start = (page - 1) * limit
+        products = [{"handle": f"p-{i}", "title": f"P {i}"} for i in range(start, min(total, start + limit))]
+        return httpx.Response(200, json={"products": products})
+
+    return httpx.MockTransport(handler)
+
+
+def _collect(total: int, limit: int, window: int, max_pages: int = 0):
+    requested: list[int] = []
+
+    async def _run():
+        out = []
+        async with httpx.AsyncClient(transport=_fake_catalog_transport(total, requested)) as client:
+            async for page, products in scraper._aiter_shopify_product_pages(
+                "bench", 1, max_pages, limit, client, window=window
+            ):
+                out.append((page, [p["handle"] for p in products]))
+        return out
+
+    return asyncio.run(_run()), requested
+
+
+def test_pipelined_pages_are_yielded_in_order_and_stop_on_short_page():
+    pages, requested = _collect(total=23, limit=5, window=3)
+
+    assert [p for p, _ in pages] == [1, 2, 3, 4, 5]
+    handles = [h for _, hs in pages for h in hs]
+    assert handles == [f"p-{i}" for i in range(23)]
+    # Look-ahead is bounded by the window past the short page.
+    assert max(requested) <= 5 + 3
+
+
+def test_pipelined_stops_on_empty_page_and_respects_max_pages():
+    pages, _ = _collect(total=10, limit=5, window=4)
+    assert [p for p, _ in pages] == [1, 2]
+
+    pages, requested = _collect(total=100, limit=5, window=4, max_pages=3)
+    assert [p for p, _ in pages] == [1, 2, 3]
+    assert max(requested) == 3
+
+
+def test_shopify_product_row_mapping_matches_sequential_shape():
+    row = scraper._shopify_product_to_row(
+        {
+            "handle": "iphone-12",
+            "title": "iPhone 12",
+            "body_html": "<p>Good phone</p>",
+            "vendor": "Condition: Refurbished",
+            "variants": [{"price": "1,299.00", "available": True, "sku": "0123"}],
+            "images": [{"src": "https://cdn.example/x.jpg?v=2"}],
+        },
+        collection="smartphones",
+        membership_index=None,
+        rank=7,
+        page=2,
+    )
+    assert row["source_id"] == "OC-iphone-12"
+    assert row["condition"] == "Refurbished"
+    assert row["buy_now_price"] == 1299.0
+    assert row["photo1"] == "https://cdn.example/x.jpg"
+    assert row["specs"]["SupplierLot"] == "LOT0123"
+    assert row["source_categories"] == ["smartphones"]
+    assert (row["collection_rank"], row["collection_page"]) == (7, 2)
+    assert scraper._shopify_product_to_row({"title": "no handle"}, "all", None, 1, 1) is None
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from retail_os.scrapers.cash_converters import scraper as cc_scraper
+from retail_os.scrapers.onecheq.scraper import _parse_onecheq_product_html, scrape_onecheq_product
+from retail_os.utils import parse_pool
+from retail_os.utils.parse_pool import parse_in_pool, shutdown_parse_pool
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "scrapers", "onecheq", "product.html")
+URL = "https://onecheq.co.nz/products/test-product-slug"
+
+CC_HTML = """<html><head><title>Cash Converters - Ignored</title></head><body>
+<h1>  Dyson   V8 Vacuum </h1>
+<div class="awe-rt-BuyNowPrice"><span class="NumberPart">1,249</span><span class="NumberPart">.50</span></div>
+<ul><li>Condition: Good</li><li>Brand: Dyson</li></ul>
+<img src="https://auctionworxstoragelive1.blob.core.windows.net/a/1_fullsize.jpg">
+<img src="https://auctionworxstoragelive1.blob.core.windows.net/a/1_thumb.jpg">
+</body></html>"""
+
+
+def test_pool_parses_like_inline(monkeypatch):
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    inline = _parse_onecheq_product_html(html, URL)
+
+    monkeypatch.setenv("RETAILOS_PARSE_WORKERS", "2")
+    try:
+        with patch("retail_os.scrapers.onecheq.scraper.get_html_via_httpx", return_value=html):
+            with ThreadPoolExecutor(max_workers=4) as ex:
+                pooled = list(ex.map(lambda _i: scrape_onecheq_product(URL), range(6)))
+        cc = parse_in_pool(cc_scraper.parse_item_html, CC_HTML, "https://shop.cashconverters.co.nz/Listing/Details/123/x")
+    finally:
+        shutdown_parse_pool()
+
+    assert all(p == inline for p in pooled)
+    assert cc["source_id"] == "CC-123" and cc["title"] == "Dyson V8 Vacuum"
+    assert cc["buy_now_price"] == 1249.5
+    assert cc["specs"] == {"Condition": "Good", "Brand": "Dyson"}
+    assert cc["photo1"].endswith("1_fullsize.jpg") and cc["photo2"] is None
+
+
+def test_inline_mode_and_broken_pool_fallback(monkeypatch):
+    assert parse_pool.parse_workers() == 0  # conftest: parse inline
+    assert parse_in_pool(len, "abc") == 3
+
+    class _Broken:
+        def submit(self, *_a):
+            raise parse_pool.BrokenProcessPool("worker died")
+
+        def shutdown(self, **_kw):
+            pass
+
+    monkeypatch.setenv("RETAILOS_PARSE_WORKERS", "3")
+    monkeypatch.setattr(parse_pool, "_get_pool", lambda _n: _Broken())
+    assert parse_in_pool(len, "abcd") == 4
+
+
+def test_cc_scrape_items_keeps_order_and_skips_failures(monkeypatch):
+    pages = {f"https://cc.test/Listing/Details/{i}/x": CC_HTML for i in (1, 2, 4)}
+    monkeypatch.setattr(cc_scraper, "fetch_html", lambda url: pages.get(url))
+    urls = [f"https://cc.test/Listing/Details/{i}/x" for i in range(1, 5)]
+
+    items = list(cc_scraper.scrape_items(urls, concurrency=3))
+    assert [i["source_id"] for i in items] == ["CC-1", "CC-2", "CC-4"]
+
+
+def test_cc_fetches_are_throttled_and_report_their_status(monkeypatch):
+    import subprocess
+
+    from retail_os.utils.http_throttle import GlobalHTTPThrottle
+
+    statuses = {"https://cc.test/Listing/Details/1/x": 200, "https://cc.test/Listing/Details/2/x": 429}
+    entered = []
+    real_request = GlobalHTTPThrottle.request
+    monkeypatch.setattr(GlobalHTTPThrottle, "request", lambda url: (entered.append(url), real_request(url))[1])
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda cmd, **_kw: subprocess.CompletedProcess(cmd, 0, stdout=f"{CC_HTML}\n{statuses[cmd[-1]]}", stderr=""),
+    )
+    GlobalHTTPThrottle.reset()
+    try:
+        assert cc_scraper.get_html_via_curl("https://cc.test/Listing/Details/1/x") == CC_HTML
+        assert cc_scraper.get_html_via_curl("https://cc.test/Listing/Details/2/x") is None
+        assert entered == list(statuses)
+        assert GlobalHTTPThrottle.rates()["cc.test"]["throttled"] == 1
+    finally:
+        GlobalHTTPThrottle.reset()
+
+
+def test_cc_pages_use_the_pooled_client_and_fall_back_to_curl_when_refused(monkeypatch):
+    import httpx
+
+    def handler(request):
+        if request.url.path.startswith("/blocked"):
+            return httpx.Response(403, text="denied")
+        return httpx.Response(200, text=CC_HTML)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(cc_scraper, "get_http_client", lambda *_a: client)
+    curled = []
+    monkeypatch.setattr(cc_scraper, "get_html_via_curl", lambda url: curled.append(url) or "<html>curl</html>")
+
+    assert cc_scraper.fetch_html("https://cc.test/Listing/Details/1/x") == CC_HTML
+    assert cc_scraper.fetch_html("https://cc.test/blocked/2") == "<html>curl</html>"
+    assert curled == ["https://cc.test/blocked/2"]
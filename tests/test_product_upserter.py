@@ -58,3 +58,34 @@ def test_product_upserter_update_no_change():
     
     # If we want to test "unchanged", we'd need to pre-calc the hash or mock the hash function.
     pass
+
+
+def test_product_upserter_write_batch_single_commit(db_session):
+    from retail_os.core.database import Supplier
+
+    supplier = Supplier(name="BATCH_TEST", base_url="http://example.com")
+    db_session.add(supplier)
+    db_session.flush()
+    upserter = ProductUpserter(db_session, supplier_id=supplier.id)
+
+    def _data(sku, price):
+        return {
+            "title": f"Product {sku}",
+            "buy_now_price": price,
+            "source_listing_id": sku,
+            "source_url": f"http://example.com/{sku}",
+            "description": "Desc",
+            "source_status": "Active",
+        }
+
+    with patch.object(upserter, "_download_images", return_value=[]):
+        batch = [upserter.prepare(_data(s, "10.00"), s, "BT") for s in ("A1", "A2", "A3")]
+        # Same SKU twice in one batch: the second write must update, not duplicate.
+        batch.append(upserter.prepare(_data("A1", "12.00"), "A1", "BT"))
+        with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+            results = upserter.write_batch(batch)
+
+    assert results == ["created", "created", "created", "updated"]
+    assert commit.call_count == 1
+    assert db_session.query(SupplierProduct).filter_by(supplier_id=supplier.id).count() == 3
+    assert db_session.query(SupplierProduct).filter_by(supplier_id=supplier.id, external_sku="A1").one().cost_price == 12.0
@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from retail_os.core.database import (
+    AuditLog,
+    CommandStatus,
+    InternalProduct,
+    SupplierProduct,
+    SystemCommand,
+    TradeMeListing,
+)
+from retail_os.core.reconciliation import ReconciliationEngine
+
+RUN_START = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+BEFORE = RUN_START - timedelta(days=1)
+AFTER = RUN_START + timedelta(minutes=5)
+
+
+def _product(session, supplier, sku, status, scraped_at, live_listing=None):
+    sp = SupplierProduct(
+        supplier_id=supplier.id, external_sku=sku, title=sku, sync_status=status, last_scraped_at=scraped_at
+    )
+    session.add(sp)
+    session.flush()
+    if live_listing:
+        ip = InternalProduct(sku=f"T-{sku}", title=sku, primary_supplier_product_id=sp.id)
+        session.add(ip)
+        session.flush()
+        session.add(TradeMeListing(internal_product_id=ip.id, tm_listing_id=live_listing, actual_state="Live"))
+    return sp
+
+
+def test_transitions_audit_and_deduped_withdraws(db_session, make_supplier):
+    s = make_supplier("RECON_TEST")
+    other = make_supplier("RECON_OTHER")
+    present = _product(db_session, s, "A", "PRESENT", BEFORE)
+    unset = _product(db_session, s, "B", None, BEFORE)
+    confirm = _product(db_session, s, "C", "MISSING_ONCE", BEFORE, live_listing="900")
+    already_queued = _product(db_session, s, "D", "MISSING_ONCE", BEFORE, live_listing="901")
+    healed = _product(db_session, s, "E", "REMOVED", AFTER)
+    untouched = _product(db_session, s, "F", "PRESENT", AFTER)
+    foreign = _product(db_session, other, "G", "MISSING_ONCE", BEFORE, live_listing="902")
+    db_session.add(
+        SystemCommand(
+            id="existing-withdraw", type="WITHDRAW_LISTING", payload={"listing_id": "901"}, status=CommandStatus.PENDING
+        )
+    )
+    db_session.commit()
+
+    result = ReconciliationEngine(db_session).process_orphans(s.id, RUN_START)
+
+    assert result == {"missing_once": 2, "removed": 2, "healed": 1, "withdrawals": 1}
+    for sp in (present, unset, confirm, already_queued, healed, untouched, foreign):
+        db_session.refresh(sp)
+    assert (present.sync_status, unset.sync_status) == ("MISSING_ONCE", "MISSING_ONCE")
+    assert (confirm.sync_status, already_queued.sync_status) == ("REMOVED", "REMOVED")
+    assert healed.sync_status == "PRESENT" and untouched.sync_status == "PRESENT"
+    assert foreign.sync_status == "MISSING_ONCE"
+
+    withdraws = db_session.query(SystemCommand).filter_by(type="WITHDRAW_LISTING").all()
+    assert sorted(c.payload["listing_id"] for c in withdraws) == ["900", "901"]
+
+    audits = {
+        (a.entity_id, a.old_value, a.new_value)
+        for a in db_session.query(AuditLog).filter_by(user="ReconciliationEngine").all()
+    }
+    assert audits == {
+        (str(present.id), "PRESENT", "MISSING_ONCE"),
+        (str(unset.id), "PRESENT", "MISSING_ONCE"),
+        (str(confirm.id), "MISSING_ONCE", "REMOVED"),
+        (str(already_queued.id), "MISSING_ONCE", "REMOVED"),
+        (str(healed.id), "REMOVED", "PRESENT"),
+    }
+
+    # Second run: first misses are confirmed, REMOVED items stay put, no duplicate withdraws.
+    again = ReconciliationEngine(db_session).process_orphans(s.id, RUN_START)
+    assert again == {"missing_once": 0, "removed": 2, "healed": 0, "withdrawals": 0}
+
+
+def test_thousands_of_orphans_in_one_pass(db_session, make_supplier):
+    s = make_supplier("RECON_BULK")
+    db_session.bulk_insert_mappings(
+        SupplierProduct,
+        [
+            {"supplier_id": s.id, "external_sku": f"BULK-{i}", "title": "x", "sync_status": "PRESENT", "last_scraped_at": BEFORE}
+            for i in range(5000)
+        ],
+    )
+    db_session.commit()
+
+    t0 = time.perf_counter()
+    result = ReconciliationEngine(db_session).process_orphans(s.id, RUN_START)
+    elapsed = time.perf_counter() - t0
+
+    assert result["missing_once"] == 5000
+    assert db_session.query(AuditLog).filter_by(new_value="MISSING_ONCE").count() >= 5000
+    assert elapsed < 5.0
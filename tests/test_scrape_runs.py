@@ -0,0 +1,145 @@
+import pytest
+
+from retail_os.core.database import ScrapeRun, ScrapeRunSeen, Supplier, SupplierProduct
+from retail_os.core.scrape_runs import RunProgress, ScrapeRunLedger
+
+
+def test_cursor_waits_for_rows_still_in_flight():
+    progress = RunProgress()
+    for page, rows in ((1, 2), (2, 2), (3, 1)):
+        for _ in range(rows):
+            progress.feed(page)
+    progress.seal(1)
+    progress.seal(2)
+
+    # Page 2 finished first, but page 1 still has a row in the pipeline.
+    progress.settle(2)
+    progress.settle(2, failed=True)
+    progress.settle(1)
+    assert progress.completed_prefix() == (None, 0, 0)
+    assert progress.completed() == ([2], 2, 1)
+
+    progress.settle(1)
+    progress.settle(3)
+    # Page 3 is not sealed: the source may still yield rows for it.
+    assert progress.completed_prefix() == (2, 4, 1)
+    progress.seal_all()
+    assert progress.completed_prefix() == (3, 5, 1)
+
+
+def test_fresh_run_abandons_unfinished_ones_and_drops_their_staging(db_session):
+    s = Supplier(name="LEDGER_TEST", base_url="https://example.test")
+    db_session.add(s)
+    db_session.commit()
+
+    first = ScrapeRunLedger.start(db_session, s.id, "all", params={"pages": 0})
+    seen = first.seen_set()
+    seen.add(["A", "B"])
+    first.interrupt(seen)
+
+    resumed = ScrapeRunLedger.start(db_session, s.id, "all", resume=True)
+    assert resumed.id == first.id and resumed.resumed
+    assert len(resumed.seen_set()) == 2
+
+    fresh = ScrapeRunLedger.start(db_session, s.id, "all")
+    assert fresh.id != first.id
+    assert db_session.get(ScrapeRun, first.id).status == "ABANDONED"
+    assert db_session.query(ScrapeRunSeen).filter_by(run_id=first.id).count() == 0
+
+
+def test_onecheq_sweep_resumes_after_crash_and_reconciles_once_complete(db_session, monkeypatch):
+    from retail_os.scrapers.onecheq import adapter as adapter_mod
+
+    monkeypatch.setattr(adapter_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_ONECHEQ_SOURCE", "json")
+
+    def _row(handle, page):
+        return {
+            "source_id": f"OC-{handle}",
+            "source_url": f"https://onecheq.test/products/{handle}",
+            "title": handle,
+            "buy_now_price": 10.0,
+            "collection_page": page,
+        }
+
+    pages = {1: list("abc"), 2: list("def"), 3: list("gh")}
+    calls = []
+
+    def crashing_sweep(**kw):
+        calls.append(kw)
+        for page in (1, 2):
+            for h in pages[page]:
+                yield _row(h, page)
+        yield _row("g", 3)
+        raise RuntimeError("worker died")
+
+    def resumed_sweep(**kw):
+        calls.append(kw)
+        for page in range(kw.get("start_page") or 1, 4):
+            for h in pages[page]:
+                yield _row(h, page)
+
+    a = adapter_mod.OneCheqAdapter()
+    db_session.add(SupplierProduct(supplier_id=a.supplier_id, external_sku="zz", title="gone", sync_status="PRESENT"))
+    db_session.commit()
+
+    monkeypatch.setattr(adapter_mod, "scrape_onecheq", crashing_sweep)
+    with pytest.raises(RuntimeError):
+        a.run_sync(pages=0)
+
+    run = db_session.query(ScrapeRun).filter_by(supplier_id=a.supplier_id).one()
+    assert run.status == "RUNNING"
+    assert run.cursor["page"] == 2 and run.rows_done == 6
+    run_id = run.id
+    # No reconciliation for a run that never finished.
+    assert db_session.query(SupplierProduct).filter_by(external_sku="zz").one().sync_status == "PRESENT"
+
+    monkeypatch.setattr(adapter_mod, "scrape_onecheq", resumed_sweep)
+    adapter_mod.OneCheqAdapter().run_sync(pages=0, resume=True)
+
+    assert calls[-1]["start_page"] == 3
+    db_session.expire_all()
+    run = db_session.get(ScrapeRun, run_id)
+    assert (run.status, run.attempts) == ("COMPLETED", 2)
+    status = {sp.external_sku: sp.sync_status for sp in db_session.query(SupplierProduct).filter_by(supplier_id=a.supplier_id)}
+    # Products settled before the crash still count as seen.
+    assert status == {**dict.fromkeys("abcdefgh", "PRESENT"), "zz": "MISSING_ONCE"}
+    assert db_session.query(ScrapeRunSeen).count() == 0
+
+
+def test_noel_leeming_walk_resumes_with_remaining_categories(db_session, monkeypatch):
+    from retail_os.scrapers.noel_leeming import adapter as adapter_mod
+
+    monkeypatch.setattr(adapter_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_NL_CATEGORY_WORKERS", "2")
+    crawled = []
+
+    def fake_scrape(category_url, should_abort=None, **_kw):
+        crawled.append(category_url)
+        slug = category_url.rstrip("/").split("/")[-1]
+        return [{"source_listing_id": f"NL-{slug}", "title": slug, "price": 99, "category": "electronics"}]
+
+    monkeypatch.setattr(adapter_mod, "scrape_category", fake_scrape)
+    a = adapter_mod.NoelLeemingAdapter()
+    a.run_sync(pages=0, deep_scrape=False)
+    categories = list(crawled)
+    first = db_session.query(ScrapeRun).filter_by(supplier_id=a.supplier_id).one()
+    assert first.status == "COMPLETED"
+    assert sorted(first.cursor["categories"]) == sorted(categories)
+
+    # A walk that was interrupted after all but the last two categories.
+    ledger = ScrapeRunLedger.start(db_session, a.supplier_id, "categories", params={"pages": 0, "deep_scrape": False})
+    ledger.checkpoint({"categories": categories[:-2]}, len(categories) - 2, 0)
+    seen = ledger.seen_set()
+    seen.add(f"NL-{c.rstrip('/').split('/')[-1]}" for c in categories[:-2])
+    ledger.interrupt(seen)
+    run_id = ledger.id
+
+    crawled.clear()
+    adapter_mod.NoelLeemingAdapter().run_sync(pages=0, resume=True)
+
+    assert sorted(crawled) == sorted(categories[-2:])
+    statuses = {sp.sync_status for sp in db_session.query(SupplierProduct).filter_by(supplier_id=a.supplier_id)}
+    assert statuses == {"PRESENT"}
+    db_session.expire_all()
+    assert db_session.get(ScrapeRun, run_id).status == "COMPLETED"
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+
+from retail_os.core.database import ScrapeRunSeen, SupplierProduct
+from retail_os.core.reconciliation import ReconciliationEngine
+from retail_os.core.seen_set import OBSERVED, SeenSet
+
+OLD = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _products(session, supplier, rows):
+    out = {}
+    for sku, category, status in rows:
+        sp = SupplierProduct(
+            supplier_id=supplier.id, external_sku=sku, title=sku, source_category=category,
+            sync_status=status, last_scraped_at=OLD,
+        )
+        session.add(sp)
+        out[sku] = sp
+    session.commit()
+    return out
+
+
+def test_scoped_anti_join_flags_only_unseen_in_scope(db_session, monkeypatch, make_supplier):
+    monkeypatch.setenv("RETAILOS_SEEN_BATCH", "50")
+    s = make_supplier("SEEN_SCOPED")
+    sps = _products(
+        db_session,
+        s,
+        [("A", "phones", "PRESENT"), ("B", "phones", "PRESENT"), ("C", "phones", "REMOVED"), ("D", "laptops", "PRESENT")]
+        + [(f"X{i}", "phones", "PRESENT") for i in range(120)],
+    )
+
+    seen = SeenSet(db_session, s.id, scopes=["phones"])
+    seen.add(["A", "C"] + [f"X{i}" for i in range(120)])
+    # Batches flush on their own once RETAILOS_SEEN_BATCH SKUs are pending.
+    assert db_session.query(ScrapeRunSeen).filter_by(run_id=seen.run_id).count() == 100
+
+    result = ReconciliationEngine(db_session).process_orphans(s.id, seen=seen)
+    assert result == {"missing_once": 1, "removed": 0, "healed": 1, "withdrawals": 0}
+    for sp in sps.values():
+        db_session.refresh(sp)
+    assert sps["B"].sync_status == "MISSING_ONCE"
+    assert sps["C"].sync_status == "PRESENT"
+    assert sps["D"].sync_status == "PRESENT"  # out of scope: another collection
+
+    assert seen.finish() == 122
+    db_session.refresh(sps["A"])
+    db_session.refresh(sps["B"])
+    assert sps["A"].last_scraped_at.replace(tzinfo=timezone.utc) > OLD
+    assert sps["B"].last_scraped_at.replace(tzinfo=timezone.utc) == OLD
+    assert db_session.query(ScrapeRunSeen).count() == 0
+
+
+def test_observed_scope_and_stale_run_purge(db_session, make_supplier):
+    s = make_supplier("SEEN_OBSERVED")
+    sps = _products(
+        db_session, s, [("A", "tvs", "PRESENT"), ("B", "tvs", "PRESENT"), ("C", "cameras", "PRESENT")]
+    )
+    db_session.add(
+        ScrapeRunSeen(run_id="crashed", external_sku="A", supplier_id=s.id, created_at=OLD - timedelta(days=3))
+    )
+    db_session.commit()
+
+    seen = SeenSet(db_session, s.id, scopes=OBSERVED)
+    seen.add(["A"])
+    ReconciliationEngine(db_session).process_orphans(s.id, seen=seen)
+    for sp in sps.values():
+        db_session.refresh(sp)
+    # Only the category the run observed ("tvs") is in scope.
+    assert (sps["A"].sync_status, sps["B"].sync_status, sps["C"].sync_status) == ("PRESENT", "MISSING_ONCE", "PRESENT")
+
+    seen.finish()
+    assert db_session.query(ScrapeRunSeen).count() == 0
+
+
+def test_onecheq_partial_run_skips_reconciliation_and_stamps_only_seen_rows(db_session, monkeypatch):
+    from retail_os.scrapers.onecheq import adapter as adapter_mod
+
+    monkeypatch.setattr(adapter_mod, "SessionLocal", lambda: db_session)
+    monkeypatch.setenv("RETAILOS_ONECHEQ_SOURCE", "json")
+    monkeypatch.setenv("RETAILOS_ONECHEQ_JSON_LIMIT", "3")
+
+    def _rows(handles):
+        return [
+            {"source_id": f"OC-{h}", "source_url": f"https://onecheq.test/products/{h}", "title": h, "buy_now_price": 10.0}
+            for h in handles
+        ]
+
+    catalog = {"rows": _rows(list("abcdefgh"))}
+    monkeypatch.setattr(adapter_mod, "scrape_onecheq", lambda **_kw: iter(catalog["rows"]))
+
+    def _status():
+        return {
+            sp.external_sku: sp.sync_status
+            for sp in db_session.query(SupplierProduct).filter(SupplierProduct.external_sku.in_(list("abcdefgh"))).all()
+        }
+
+    a = adapter_mod.OneCheqAdapter()
+    a.run_sync(pages=0)
+    assert _status() == dict.fromkeys("abcdefgh", "PRESENT")
+    stamp_b = db_session.query(SupplierProduct).filter_by(external_sku="b").one().last_scraped_at
+
+    # Page-limited run that filled its last page: it may not have seen the whole catalog.
+    catalog["rows"] = _rows(["a", "c", "d"])
+    adapter_mod.OneCheqAdapter().run_sync(pages=1)
+    assert _status() == dict.fromkeys("abcdefgh", "PRESENT")
+    assert db_session.query(SupplierProduct).filter_by(external_sku="b").one().last_scraped_at == stamp_b
+
+    # Complete sweep: "b" and "e" are gone.
+    catalog["rows"] = _rows(list("acdfgh"))
+    adapter_mod.OneCheqAdapter().run_sync(pages=0)
+    assert _status() == {**dict.fromkeys("acdfgh", "PRESENT"), "b": "MISSING_ONCE", "e": "MISSING_ONCE"}
+    assert db_session.query(ScrapeRunSeen).count() == 0
+
+
+def test_cash_converters_reconciles_only_when_browse_reaches_its_last_page(db_session, monkeypatch):
+    from retail_os.scrapers.cash_converters import adapter as cc_adapter
+    from retail_os.scrapers.cash_converters import scraper as cc_scraper
+
+    browse = "https://cc.test/Browse/R1"
+    listing_ids = [str(1000 + i) for i in range(6)]
+    page_one = "".join(f'<a href="/Listing/Details/{i}/item">x</a>' for i in listing_ids)
+    monkeypatch.setattr(cc_scraper, "fetch_html", lambda url: page_one if url == browse else "<html></html>")
+    monkeypatch.setattr(
+        cc_scraper,
+        "scrape_items",
+        lambda urls: iter(
+            {"source_id": f"CC-{u.rstrip('/').rsplit('/', 1)[-1]}", "title": "Item", "buy_now_price": 10.0,
+             "source_url": u, "source_status": "Available"}
+            for u in urls
+        ),
+    )
+    monkeypatch.setattr(cc_adapter, "SessionLocal", lambda: db_session)
+
+    adapter = cc_adapter.CashConvertersAdapter()
+    gone = SupplierProduct(supplier_id=adapter.supplier_id, external_sku="999", title="Sold", source_category=browse,
+                           sync_status="PRESENT")
+    db_session.add(gone)
+    db_session.commit()
+
+    # Page limit hit while page 1 was still full: the browse may continue, so no reconciliation.
+    adapter.run_sync(pages=1, browse_url=browse)
+    assert db_session.query(SupplierProduct).filter_by(external_sku="999").one().sync_status == "PRESENT"
+
+    # Page 2 comes back empty: the browse is exhausted and the unseen listing is flagged.
+    cc_adapter.CashConvertersAdapter().run_sync(pages=3, browse_url=browse)
+    assert db_session.query(SupplierProduct).filter_by(external_sku="999").one().sync_status == "MISSING_ONCE"
+    assert db_session.query(ScrapeRunSeen).count() == 0
+
+
+def test_noel_leeming_page_limited_run_reconciles_when_every_category_was_exhausted(db_session, monkeypatch):
+    from retail_os.scrapers.noel_leeming import adapter as nl_adapter
+
+    monkeypatch.setattr(nl_adapter, "SessionLocal", lambda: db_session)
+    short = set()
+
+    def fake_scrape(category_url, coverage, should_abort=None, **_kw):
+        slug = category_url.rstrip("/").split("/")[-1]
+        coverage.update(last_page=1, complete=category_url not in short)
+        return [{"source_listing_id": f"NL-{slug}", "title": slug, "price": 99, "category": "electronics"}]
+
+    monkeypatch.setattr(nl_adapter, "scrape_category", fake_scrape)
+    adapter = nl_adapter.NoelLeemingAdapter()
+    adapter.run_sync(pages=1)
+    scope = db_session.query(SupplierProduct).filter_by(supplier_id=adapter.supplier_id).first().source_category
+    gone = SupplierProduct(supplier_id=adapter.supplier_id, external_sku="NL-GONE", title="Gone",
+                           source_category=scope, sync_status="PRESENT")
+    db_session.add(gone)
+    db_session.commit()
+
+    # One category still had pages past the limit: its unseen products may just be further on.
+    short.add("https://www.noelleeming.co.nz/c/gaming")
+    nl_adapter.NoelLeemingAdapter().run_sync(pages=1)
+    assert db_session.query(SupplierProduct).filter_by(external_sku="NL-GONE").one().sync_status == "PRESENT"
+
+    # Every category fits within the page limit: a scheduled (page-limited) run reconciles.
+    short.clear()
+    nl_adapter.NoelLeemingAdapter().run_sync(pages=1)
+    assert db_session.query(SupplierProduct).filter_by(external_sku="NL-GONE").one().sync_status == "MISSING_ONCE"
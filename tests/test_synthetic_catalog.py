@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timezone
+
+from retail_os.core.database import (
+    CommandLog,
+    InternalProduct,
+    ListingMetricSnapshot,
+    Order,
+    Supplier,
+    SupplierProduct,
+    SystemCommand,
+    TradeMeListing,
+)
+from retail_os.core.synthetic_catalog import (
+    SyntheticCatalogSpec,
+    seed_database,
+    synthetic_product,
+    write_shopify_cassette,
+)
+from retail_os.scrapers.onecheq.scraper import _shopify_product_to_row
+from retail_os.utils.http_cassette import Cassette
+
+NOW = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+def test_seed_is_deterministic_and_linked(db_session):
+    spec = SyntheticCatalogSpec(products=300, seed=7, metric_days=3, commands=10, logs_per_command=5, chunk=128, now=NOW)
+    counts = seed_database(db_session, spec)
+
+    assert counts["supplier_products"] == counts["internal_products"] == 300
+    assert db_session.query(SupplierProduct).count() >= 300
+    assert 120 <= counts["listings"] <= 240
+    assert counts["metrics"] == counts["listings"] * 3
+    assert counts["orders"] < counts["listings"]
+    assert counts["commands"] == 10 and counts["command_logs"] >= 10
+
+    # Every listing points at a seeded internal product, which points at its supplier product.
+    listing = db_session.query(TradeMeListing).order_by(TradeMeListing.id.desc()).first()
+    ip = db_session.get(InternalProduct, listing.internal_product_id)
+    sp = db_session.get(SupplierProduct, ip.primary_supplier_product_id)
+    assert ip.sku == f"SYN-{sp.external_sku}"
+    assert db_session.get(Supplier, sp.supplier_id).name == "SYNTHETIC"
+    assert db_session.query(ListingMetricSnapshot).filter_by(listing_id=listing.id).count() == 3
+    assert db_session.query(Order).count() == counts["orders"]
+    assert db_session.query(CommandLog).join(SystemCommand, SystemCommand.id == CommandLog.command_id).count() == counts["command_logs"]
+
+    assert synthetic_product(42, seed=7) == synthetic_product(42, seed=7)
+    assert synthetic_product(42, seed=7) != synthetic_product(42, seed=8)
+
+
+def test_shopify_cassette_matches_seeded_products(tmp_path):
+    spec = SyntheticCatalogSpec(products=260, seed=3, now=NOW)
+    written = write_shopify_cassette(str(tmp_path), spec)
+    cassette = Cassette(tmp_path)
+    assert len(cassette) == written
+
+    _entry, body = cassette.lookup("GET", "https://onecheq.co.nz/collections/all/products.json?limit=250&page=2")
+    page2 = json.loads(body)["products"]
+    assert len(page2) == 10
+    _entry, body = cassette.lookup("GET", "https://onecheq.co.nz/collections/all/products.json?limit=250&page=3")
+    assert json.loads(body)["products"] == []
+
+    # The scraper's normalizer sees the same product the DB seed wrote.
+    expected = synthetic_product(250, seed=3)
+    row = _shopify_product_to_row(page2[0], collection="all", membership_index=None, rank=251, page=2)
+    assert row["source_id"] == f"OC-{expected['handle']}"
+    assert row["buy_now_price"] == expected["price"]
+    assert row["title"] == expected["title"]